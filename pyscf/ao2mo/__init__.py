@@ -34,6 +34,8 @@ import h5py
 from pyscf.ao2mo import incore
 from pyscf.ao2mo import outcore
 from pyscf.ao2mo import r_outcore
+from pyscf.ao2mo import irrep
+from pyscf.ao2mo import shard
 from pyscf.ao2mo.addons import load, restore
 
 def full(eri_or_mol, mo_coeff, *args, **kwargs):
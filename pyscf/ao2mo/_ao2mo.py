@@ -55,6 +55,28 @@ class AO2MOpt(object):
                       c_bas.ctypes.data_as(ctypes.c_void_p), nbas,
                       c_env.ctypes.data_as(ctypes.c_void_p))
 
+    def set_dm(self, dm, atm, bas, env):
+        '''Set dm_cond of the optimizer (the max |dm| of each shell pair) for
+        the prescreen functions which test the density matrix, e.g.
+        CVHFnrs8_vj_prescreen'''
+        c_atm = numpy.asarray(atm, dtype=numpy.int32, order='C')
+        c_bas = numpy.asarray(bas, dtype=numpy.int32, order='C')
+        c_env = numpy.asarray(env, dtype=numpy.double, order='C')
+        natm = ctypes.c_int(c_atm.shape[0])
+        nbas = ctypes.c_int(c_bas.shape[0])
+        if isinstance(dm, numpy.ndarray) and dm.ndim == 2:
+            n_dm = 1
+        else:
+            n_dm = len(dm)
+        dm = numpy.asarray(dm, order='C')
+        ao_loc = make_loc(c_bas, self._intor)
+        libao2mo.CVHFsetnr_direct_scf_dm(
+            self._this, dm.ctypes.data_as(ctypes.c_void_p), ctypes.c_int(n_dm),
+            ao_loc.ctypes.data_as(ctypes.c_void_p),
+            c_atm.ctypes.data_as(ctypes.c_void_p), natm,
+            c_bas.ctypes.data_as(ctypes.c_void_p), nbas,
+            c_env.ctypes.data_as(ctypes.c_void_p))
+
     def __del__(self):
         libao2mo.CVHFdel_optimizer(ctypes.byref(self._this))
 
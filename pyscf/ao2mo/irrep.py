@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''
+MO integrals in the irrep-blocked format
+
+For symmetry adapted orbitals, (ij|kl) is non-zero only if the irreps of the
+orbital pairs ij and kl are identical.  The orbital pairs (i >= j, in the
+compound index i*(i+1)/2+j) are grouped by their irreps.  For each irrep,
+only the square block of the pairs of this irrep is computed and stored.
+The second half transformation is carried out for the allowed blocks of
+orbital irreps only.
+
+The irrep of a pair is the product of the orbital irreps in the D2h
+subgroup (orbsym % 10), i.e. orbsym[i] ^ orbsym[j].
+'''
+
+import time
+import numpy
+import h5py
+from pyscf import lib
+from pyscf import gto
+from pyscf.lib import logger
+from pyscf.ao2mo import _ao2mo
+from pyscf.ao2mo import incore
+from pyscf.ao2mo import outcore
+from pyscf import __config__
+
+MAX_MEMORY = getattr(__config__, 'ao2mo_irrep_max_memory', 2000)
+
+
+class IrrepBlockedERI(object):
+    '''MO integrals (ij|kl) with 4-fold permutation symmetry stored in the
+    blocks of the orbital-pair irreps.
+
+    Attributes:
+        orbsym : 1D int array
+            Irreps (D2h subgroup IDs) of the orbitals
+        pairs : dict
+            The compound indices (i*(i+1)/2+j, i >= j) of the orbital pairs
+            for each pair irrep.  The indices are sorted.
+        blocks : dict
+            2D array of (len(pairs[ir]), len(pairs[ir])) for each pair irrep
+
+    Slicing the object by rows, eri[p0:p1], returns the rows of the dense
+    4-fold symmetric array (npair,npair).
+    '''
+    def __init__(self, orbsym, pairs, blocks):
+        self.orbsym = numpy.asarray(orbsym)
+        self.pairs = pairs
+        self.blocks = blocks
+
+    @property
+    def nmo(self):
+        return len(self.orbsym)
+
+    @property
+    def shape(self):
+        npair = self.nmo * (self.nmo+1) // 2
+        return (npair, npair)
+
+    @property
+    def nnz(self):
+        '''Number of the stored integrals'''
+        return sum(x.size for x in self.blocks.values())
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice) or key.step not in (None, 1):
+            raise IndexError('Only the row slices are supported')
+        p0, p1 = key.indices(self.shape[0])[:2]
+        out = numpy.zeros((max(0, p1-p0), self.shape[1]))
+        for ir, pairs in self.pairs.items():
+            r0, r1 = numpy.searchsorted(pairs, (p0, p1))
+            if r1 > r0:
+                out[pairs[r0:r1]-p0,pairs[:,None]] = self.blocks[ir][r0:r1].T
+        return out
+
+    def restore(self, symmetry=4):
+        '''Dense MO integrals of the given permutation symmetry (see
+        :func:`ao2mo.restore`)'''
+        from pyscf.ao2mo import addons
+        return addons.restore(symmetry, self[:], self.nmo)
+
+    def save(self, erifile, dataname='eri_mo'):
+        '''Save the blocks and the pair index in HDF5 file'''
+        if isinstance(erifile, h5py.Group):
+            feri = erifile
+        else:
+            feri = h5py.File(erifile, 'a')
+        if dataname in feri:
+            del(feri[dataname])
+        g = feri.create_group(dataname)
+        g['orbsym'] = self.orbsym
+        for ir in self.pairs:
+            g['pairs/%d'%ir] = self.pairs[ir]
+            g['blocks/%d'%ir] = self.blocks[ir]
+        if not isinstance(erifile, h5py.Group):
+            feri.close()
+        return erifile
+
+def load(erifile, dataname='eri_mo'):
+    '''Load the irrep-blocked MO integrals saved by :func:`full` or
+    :meth:`IrrepBlockedERI.save`'''
+    if isinstance(erifile, h5py.Group):
+        feri = erifile
+    else:
+        feri = h5py.File(erifile, 'r')
+    g = feri[dataname]
+    pairs = dict((int(k), numpy.asarray(v)) for k, v in g['pairs'].items())
+    blocks = dict((int(k), numpy.asarray(v)) for k, v in g['blocks'].items())
+    orbsym = numpy.asarray(g['orbsym'])
+    if not isinstance(erifile, h5py.Group):
+        feri.close()
+    return IrrepBlockedERI(orbsym, pairs, blocks)
+
+def is_irrep_blocked(erifile, dataname='eri_mo'):
+    '''Whether the dataset in erifile is in the irrep-blocked format'''
+    if isinstance(erifile, h5py.Group):
+        return isinstance(erifile.get(dataname), h5py.Group)
+    if not h5py.is_hdf5(erifile):
+        return False
+    with h5py.File(erifile, 'r') as feri:
+        return isinstance(feri.get(dataname), h5py.Group)
+
+
+def full(eri_or_mol, mo_coeff, orbsym=None, erifile=None, dataname='eri_mo',
+         max_memory=MAX_MEMORY, verbose=logger.WARN):
+    '''Irrep-blocked MO integrals with 4-fold permutation symmetry.
+
+    Args:
+        eri_or_mol : ndarray or Mole
+            AO integrals (with 8-fold or 4-fold symmetry), or the Mole
+            object to compute the AO integrals.
+        mo_coeff : ndarray
+            Symmetry adapted orbitals
+        orbsym : list of int
+            Irrep IDs of the orbitals.  If not given, mo_coeff.orbsym is
+            used.
+
+    Kwargs:
+        erifile : str or h5py Group
+            If given, the blocks are saved in the group dataname of erifile.
+
+    Returns:
+        :class:`IrrepBlockedERI` object, or erifile if erifile is given.
+
+    Examples:
+
+    >>> mol = gto.M(atom='N 0 0 0; N 0 0 1.1', basis='ccpvdz', symmetry=True)
+    >>> mf = scf.RHF(mol).run()
+    >>> eri = ao2mo.irrep.full(mf._eri, mf.mo_coeff)
+    >>> print(eri.nnz, eri.shape[0]**2)
+    '''
+    time0 = (time.clock(), time.time())
+    if isinstance(eri_or_mol, gto.Mole):
+        log = logger.new_logger(eri_or_mol, verbose)
+    else:
+        log = logger.new_logger(None, verbose)
+
+    if orbsym is None:
+        orbsym = getattr(mo_coeff, 'orbsym', None)
+        if orbsym is None:
+            raise RuntimeError('orbsym is required for irrep-blocked ao2mo')
+    orbsym = numpy.asarray(orbsym) % 10
+    mo_coeff = numpy.asarray(mo_coeff, order='F')
+    nao, nmo = mo_coeff.shape
+    pairs = _pairs_by_irrep(orbsym)
+    e2blocks = _e2_blocks(mo_coeff, orbsym, pairs)
+    log.debug('irrep-blocked ao2mo: %d of %d integrals are stored',
+              sum(x.size**2 for x in pairs.values()), (nmo*(nmo+1)//2)**2)
+
+    if erifile is None:
+        blocks = dict((ir, numpy.empty((x.size,x.size)))
+                      for ir, x in pairs.items())
+        out = blocks
+    else:
+        if isinstance(erifile, h5py.Group):
+            feri = erifile
+        else:
+            feri = h5py.File(erifile, 'a')
+        if dataname in feri:
+            del(feri[dataname])
+        g = feri.create_group(dataname)
+        g['orbsym'] = orbsym
+        out = {}
+        for ir, x in pairs.items():
+            g['pairs/%d'%ir] = x
+            out[ir] = g.create_dataset('blocks/%d'%ir, (x.size,x.size), 'f8')
+
+    def e2(buf, p0, p1, ao_loc=None):
+        for ir, lst in pairs.items():
+            r0, r1 = numpy.searchsorted(lst, (p0, p1))
+            if r1 == r0:
+                continue
+            rows = numpy.asarray(buf[lst[r0:r1]-p0], order='C')
+            tmp = numpy.empty((r1-r0,lst.size))
+            for mo, klshape, mosym, cols in e2blocks[ir]:
+                tmp[:,cols] = _ao2mo.nr_e2(rows, mo, klshape, aosym='s4',
+                                           mosym=mosym, ao_loc=ao_loc)
+            out[ir][r0:r1] = tmp
+
+    npair = nmo * (nmo+1) // 2
+    if isinstance(eri_or_mol, gto.Mole):
+        mol = eri_or_mol
+        nao_pair = nao * (nao+1) // 2
+        fswap = lib.H5TmpFile()
+        outcore.half_e1(mol, (mo_coeff,mo_coeff), fswap, 'int2e', 's4', 1,
+                        max_memory, verbose=log)
+        # AO pairs in the swap file are blocked by shell pairs
+        ao_loc = mol.ao_loc_nr()
+        blksize = int(max(4, max_memory*.3e6/8/(nao_pair+npair)))
+        buf = numpy.empty((min(blksize,npair),nao_pair))
+        for p0, p1 in lib.prange(0, npair, blksize):
+            outcore._load_from_h5g(fswap['0'], p0, p1, buf)
+            e2(buf[:p1-p0], p0, p1, ao_loc)
+        fswap = None
+    else:
+        buf = incore.half_e1(eri_or_mol, (mo_coeff,mo_coeff), compact=True)
+        e2(buf, 0, npair)
+    buf = None
+    log.timer('irrep-blocked ao2mo', *time0)
+
+    if erifile is None:
+        return IrrepBlockedERI(orbsym, pairs, blocks)
+    if not isinstance(erifile, h5py.Group):
+        feri.close()
+    return erifile
+
+def _pairs_by_irrep(orbsym):
+    pair_irrep = lib.pack_tril(orbsym[:,None] ^ orbsym)
+    return dict((ir, numpy.where(pair_irrep == ir)[0])
+                for ir in numpy.unique(pair_irrep))
+
+def _e2_blocks(mo_coeff, orbsym, pairs):
+    '''For each pair irrep, the orbital blocks (k in irrep a, l in irrep b)
+    of the second half transformation and the columns of their output in
+    the irrep block.'''
+    irreps = numpy.unique(orbsym)
+    orbs = [numpy.where(orbsym == a)[0] for a in irreps]
+    e2blocks = dict((ir, []) for ir in pairs)
+    for ia, a in enumerate(irreps):
+        for ib, b in enumerate(irreps[:ia+1]):
+            ka, lb = orbs[ia], orbs[ib]
+            if a == b:
+                k, l = numpy.tril_indices(ka.size)
+                k, l = ka[k], ka[l]
+            else:
+                k = numpy.repeat(ka, lb.size)
+                l = numpy.tile(lb, ka.size)
+            kl = numpy.maximum(k, l)
+            kl = kl*(kl+1)//2 + numpy.minimum(k, l)
+            mosym, nkl, mo, klshape = incore._conc_mos(mo_coeff[:,ka],
+                                                       mo_coeff[:,lb], a == b)
+            ir = a ^ b
+            cols = numpy.searchsorted(pairs[ir], kl)
+            e2blocks[ir].append((mo, klshape, mosym, cols))
+    return e2blocks
+
+del(MAX_MEMORY)
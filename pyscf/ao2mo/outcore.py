@@ -13,7 +13,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 import time
+import tempfile
 import numpy
 import h5py
 from pyscf import gto
@@ -21,18 +23,27 @@ from pyscf import lib
 from pyscf.lib import logger
 from pyscf.ao2mo import _ao2mo
 from pyscf.ao2mo import incore
+from pyscf.ao2mo import shard
 from pyscf import __config__
 
 IOBLK_SIZE = getattr(__config__, 'ao2mo_outcore_ioblk_size', 256)  # 256 MB
 IOBUF_WORDS = getattr(__config__, 'ao2mo_outcore_iobuf_words', 1e8)  # 800 MB
 IOBUF_ROW_MIN = getattr(__config__, 'ao2mo_outcore_row_min', 160)
 MAX_MEMORY = getattr(__config__, 'ao2mo_outcore_max_memory', 2000)  # 2GB
+# Number of pending blocks between the compute, transpose and write threads
+PIPELINE_DEPTH = getattr(__config__, 'ao2mo_outcore_pipeline_depth', 1)
+# ioblk_size is tuned to the measured disk throughput if the swap file is
+# larger than IOBLK_AUTOTUNE_MIN (MB).  Set it to None to disable autotuning.
+IOBLK_AUTOTUNE_MIN = getattr(__config__, 'ao2mo_outcore_ioblk_autotune_min', 8000)
+# Screen the shell quartets with the Schwarz bound weighted by the MO
+# coefficients of the transformed shell pair
+MO_SCREEN = getattr(__config__, 'ao2mo_outcore_mo_screen', True)
 
 
 def full(mol, mo_coeff, erifile, dataname='eri_mo',
          intor='int2e', aosym='s4', comp=None,
          max_memory=MAX_MEMORY, ioblk_size=IOBLK_SIZE, verbose=logger.WARN,
-         compact=True):
+         compact=True, shard_dirs=shard.SHARD_DIRS):
     r'''Transfer arbitrary spherical AO integrals to MO integrals for given orbitals
 
     Args:
@@ -79,6 +90,10 @@ def full(mol, mo_coeff, erifile, dataname='eri_mo',
             returned MO integrals has (up to 4-fold) permutation symmetry.
             If it's False, the function will abandon any permutation symmetry,
             and return the "plain" MO integrals
+        shard_dirs : list of str
+            If given, the rows of the MO integrals are sharded across files
+            in these directories.  The dataset in erifile is the index of the
+            shards (see :mod:`ao2mo.shard`).
 
     Returns:
         None
@@ -108,13 +123,14 @@ def full(mol, mo_coeff, erifile, dataname='eri_mo',
     dataset ['eri_mo', 'new'], shape (3, 100, 55)
     '''
     general(mol, (mo_coeff,)*4, erifile, dataname,
-            intor, aosym, comp, max_memory, ioblk_size, verbose, compact)
+            intor, aosym, comp, max_memory, ioblk_size, verbose, compact,
+            shard_dirs)
     return erifile
 
 def general(mol, mo_coeffs, erifile, dataname='eri_mo',
             intor='int2e', aosym='s4', comp=None,
             max_memory=MAX_MEMORY, ioblk_size=IOBLK_SIZE, verbose=logger.WARN,
-            compact=True):
+            compact=True, shard_dirs=shard.SHARD_DIRS):
     r'''For the given four sets of orbitals, transfer arbitrary spherical AO
     integrals to MO integrals on the fly.
 
@@ -163,6 +179,10 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
             returned MO integrals has (up to 4-fold) permutation symmetry.
             If it's False, the function will abandon any permutation symmetry,
             and return the "plain" MO integrals
+        shard_dirs : list of str
+            If given, the rows of the MO integrals are sharded across files
+            in these directories.  The dataset in erifile is the index of the
+            shards (see :mod:`ao2mo.shard`).
 
     Returns:
         None
@@ -237,8 +257,7 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
     if isinstance(erifile, str):
         if h5py.is_hdf5(erifile):
             feri = h5py.File(erifile)
-            if dataname in feri:
-                del(feri[dataname])
+            shard.remove(feri, dataname)
         else:
             feri = h5py.File(erifile, 'w')
     else:
@@ -257,6 +276,11 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
         if isinstance(erifile, str):
             feri.close()
         return erifile
+    elif shard.shardable(feri, shard_dirs):
+        h5d_eri = shard.create_dataset(feri, dataname, shape, 'f8', chunks,
+                                       shard_dirs)
+        log.debug('MO integrals are sharded in %d files in %s',
+                  len(h5d_eri.shards), shard_dirs)
     else:
         h5d_eri = feri.create_dataset(dataname, shape, 'f8', chunks=chunks)
 
@@ -265,6 +289,8 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
               float(nij_pair)*nkl_pair*comp, nij_pair*nkl_pair*comp*8/1e6)
 
 # transform e1
+    ioblk_size = _autotune_ioblk_size(ioblk_size, nij_pair*nao_pair*comp*8/1e6,
+                                      max_memory, log)
     fswap = lib.H5TmpFile()
     half_e1(mol, mo_coeffs, fswap, intor, aosym, comp, max_memory, ioblk_size,
             log, compact)
@@ -272,65 +298,54 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
     time_1pass = log.timer('AO->MO transformation for %s 1 pass'%intor,
                            *time_0pass)
 
-    def load(icomp, row0, row1, buf):
-        if icomp+1 < comp:
-            icomp += 1
-        else:  # move to next row-block
-            row0, row1 = row1, min(nij_pair, row1+iobuflen)
-            icomp = 0
-        if row0 < row1:
-            _load_from_h5g(fswap['%d'%icomp], row0, row1, buf)
+    def load(icomp, row0, row1):
+        buf = numpy.empty((row1-row0,nao_pair))
+        _load_from_h5g(fswap['%d'%icomp], row0, row1, buf)
+        return icomp, row0, row1, buf
+
+    def transform(icomp, row0, row1, buf):
+        out = _ao2mo.nr_e2(buf, mokl, klshape, aosym, klmosym, ao_loc=ao_loc)
+        return icomp, row0, row1, out
 
     def save(icomp, row0, row1, buf):
         if comp == 1:
-            h5d_eri[row0:row1] = buf[:row1-row0]
+            h5d_eri[row0:row1] = buf
         else:
-            h5d_eri[icomp,row0:row1] = buf[:row1-row0]
+            h5d_eri[icomp,row0:row1] = buf
 
     ioblk_size = max(max_memory*.1, ioblk_size)
     iobuflen = guess_e2bufsize(ioblk_size, nij_pair, max(nao_pair,nkl_pair))[0]
-    buf = numpy.empty((iobuflen,nao_pair))
-    buf_prefetch = numpy.empty_like(buf)
-    outbuf = numpy.empty((iobuflen,nkl_pair))
-    buf_write = numpy.empty_like(outbuf)
+    # The blocks of AO and MO integrals held by the pipeline threads and queues
+    max_rows = max_memory*1e6/8 / (_pipeline_nbuf()*(nao_pair+nkl_pair))
+    iobuflen = max(min(iobuflen, int(max_rows//IOBUF_ROW_MIN)*IOBUF_ROW_MIN),
+                   IOBUF_ROW_MIN)
 
     log.debug('step2: kl-pair (ao %d, mo %d), mem %.8g MB, ioblock %.8g MB',
-              nao_pair, nkl_pair, iobuflen*nao_pair*8/1e6,
+              nao_pair, nkl_pair,
+              _pipeline_nbuf()*iobuflen*(nao_pair+nkl_pair)*8/1e6,
               iobuflen*nkl_pair*8/1e6)
 
-    klaoblks = len(fswap['0'])
     ijmoblks = int(numpy.ceil(float(nij_pair)/iobuflen)) * comp
     ao_loc = mol.ao_loc_nr('_cart' in intor)
-    ti0 = time_1pass
     istep = 0
-    with lib.call_in_background(load) as prefetch:
-        with lib.call_in_background(save) as async_write:
-            _load_from_h5g(fswap['0'], 0, min(nij_pair, iobuflen), buf_prefetch)
-
-            for row0, row1 in prange(0, nij_pair, iobuflen):
-                nrow = row1 - row0
-
-                for icomp in range(comp):
-                    istep += 1
-                    log.debug1('step 2 [%d/%d], [%d,%d:%d], row = %d',
-                               istep, ijmoblks, icomp, row0, row1, nrow)
-
-                    buf, buf_prefetch = buf_prefetch, buf
-                    prefetch(icomp, row0, row1, buf_prefetch)
-                    _ao2mo.nr_e2(buf[:nrow], mokl, klshape, aosym, klmosym,
-                                 ao_loc=ao_loc, out=outbuf)
-                    async_write(icomp, row0, row1, outbuf)
-                    outbuf, buf_write = buf_write, outbuf  # avoid flushing writing buffer
-
-                    ti1 = (time.clock(), time.time())
-                    log.debug1('step 2 [%d/%d] CPU time: %9.2f, Wall time: %9.2f',
-                               istep, ijmoblks, ti1[0]-ti0[0], ti1[1]-ti0[1])
-                    ti0 = ti1
+    # Reading, transformation and writing are executed in three threads
+    with lib.call_in_pipeline(load, transform, save,
+                              depth=PIPELINE_DEPTH) as pipe:
+        for row0, row1 in prange(0, nij_pair, iobuflen):
+            for icomp in range(comp):
+                istep += 1
+                log.debug1('step 2 [%d/%d], [%d,%d:%d], row = %d',
+                           istep, ijmoblks, icomp, row0, row1, row1-row0)
+                pipe(icomp, row0, row1)
     fswap = None
+    if isinstance(h5d_eri, shard.ShardedDataset):
+        h5d_eri.close()
     if isinstance(erifile, str):
         feri.close()
 
-    log.timer('AO->MO transformation for %s 2 pass'%intor, *time_1pass)
+    time_2pass = log.timer('AO->MO transformation for %s 2 pass'%intor, *time_1pass)
+    _report_pipeline(log, 'step 2', time_2pass[1]-time_1pass[1], pipe,
+                     ('read', 'transform', 'write'))
     log.timer('AO->MO transformation for %s '%intor, *time_0pass)
     return erifile
 
@@ -406,21 +421,30 @@ def half_e1(mol, mo_coeffs, swapfile,
             incore._conc_mos(mo_coeffs[0], mo_coeffs[1],
                              compact and aosym in ('s4', 's2ij'))
 
+    ioblk_size = _autotune_ioblk_size(ioblk_size, nij_pair*nao_pair*comp*8/1e6,
+                                      max_memory, log)
     e1buflen, mem_words, iobuf_words, ioblk_words = \
             guess_e1bufsize(max_memory, ioblk_size, nij_pair, nao_pair, comp)
     ioblk_size = ioblk_words * 8/1e6
-# The buffer to hold AO integrals in C code, see line (@)
-    aobuflen = max(int((mem_words - 2*comp*e1buflen*nij_pair) // (nao_pair*comp)),
-                   IOBUF_ROW_MIN)
+# The buffer to hold AO integrals in C code, see line (@), and the output of
+# the first half transformation of the AO buffer
+    aobuflen = max(int((mem_words - (_pipeline_nbuf()+1)*comp*e1buflen*nij_pair)
+                       // ((nao_pair+nij_pair)*comp)), IOBUF_ROW_MIN)
     ao_loc = mol.ao_loc_nr('_cart' in intor)
-    shranges = guess_shell_ranges(mol, (aosym in ('s4', 's2kl')), e1buflen,
-                                  aobuflen, ao_loc)
     if ao2mopt is None:
-        if intor == 'int2e_cart' or intor == 'int2e_sph':
+        if (intor == 'int2e_cart' or intor == 'int2e_sph') and MO_SCREEN:
+            ao2mopt = _ao2mo.AO2MOpt(mol, intor, 'CVHFnrs8_vj_prescreen',
+                                     'CVHFsetnr_direct_scf')
+            ao2mopt.set_dm(_mo_cond_dm(mo_coeffs, ao_loc), mol._atm,
+                           mol._bas, mol._env)
+        elif intor == 'int2e_cart' or intor == 'int2e_sph':
             ao2mopt = _ao2mo.AO2MOpt(mol, intor, 'CVHFnr_schwarz_cond',
                                      'CVHFsetnr_direct_scf')
         else:
             ao2mopt = _ao2mo.AO2MOpt(mol, intor)
+    q_cond = gto.scheduler.get_q_cond(ao2mopt, mol.nbas)
+    shranges = guess_shell_ranges(mol, (aosym in ('s4', 's2kl')), e1buflen,
+                                  aobuflen, ao_loc, q_cond=q_cond)
 
     if isinstance(swapfile, h5py.Group):
         fswap = swapfile
@@ -436,24 +460,30 @@ def half_e1(mol, mo_coeffs, swapfile,
     e1buflen = max([x[2] for x in shranges])
 
     e2buflen, chunks = guess_e2bufsize(ioblk_size, nij_pair, e1buflen)
+    def transpose(istep, iobuf):
+        return istep, [lib.transpose(x) for x in iobuf]
+
     def save(istep, iobuf):
         for icomp in range(comp):
-            _transpose_to_h5g(fswap, '%d/%d'%(icomp,istep), iobuf[icomp],
-                              e2buflen, None)
+            key = '%d/%d'%(icomp,istep)
+            dset = fswap.create_dataset(key, iobuf[icomp].shape, 'f8')
+            for row0, row1 in prange(0, iobuf[icomp].shape[0], e2buflen):
+                dset[row0:row1] = iobuf[icomp][row0:row1]
 
     # transform e1
     ti0 = log.timer('Initializing ao2mo.outcore.half_e1', *time0)
-    with lib.call_in_background(save) as async_write:
+    # AO integrals and the first half transformation in the main thread.
+    # The transposing and the writing of the transformed blocks are
+    # executed in two background threads.
+    with lib.call_in_pipeline(transpose, save, depth=PIPELINE_DEPTH) as pipe:
         buf1 = numpy.empty((comp*e1buflen,nao_pair))
-        buf2 = numpy.empty((comp*e1buflen,nij_pair))
-        buf_write = numpy.empty_like(buf2)
         fill = _ao2mo.nr_e1fill
         f_e1 = _ao2mo.nr_e1
         for istep,sh_range in enumerate(shranges):
             log.debug1('step 1 [%d/%d], AO [%d:%d], len(buf) = %d', \
                        istep+1, nstep, *(sh_range[:3]))
             buflen = sh_range[2]
-            iobuf = numpy.ndarray((comp,buflen,nij_pair), buffer=buf2)
+            iobuf = numpy.empty((comp,buflen,nij_pair))
             nmic = len(sh_range[3])
             p1 = 0
             for imic, aoshs in enumerate(sh_range[3]):
@@ -466,12 +496,99 @@ def half_e1(mol, mo_coeffs, swapfile,
                 iobuf[:,p0:p1] = buf.reshape(comp,aoshs[2],nij_pair)
             ti0 = log.timer_debug1('gen AO/transform MO [%d/%d]'%(istep+1,nstep), *ti0)
 
-            async_write(istep, iobuf)
-            buf2, buf_write = buf_write, buf2
+            pipe(istep, iobuf)
+            iobuf = None
 
+    wall1 = time.time()
+    _report_pipeline(log, 'half_e1', wall1-time0[1], pipe, ('transpose', 'write'))
     fswap = None
     return swapfile
 
+def _mo_cond_dm(mo_coeffs, ao_loc):
+    '''A matrix for AO2MOpt.set_dm to screen the shell quartets (IJ|KL) of
+    half_e1 with the MO-weighted Schwarz bound
+
+        q_IJ * q_KL * w_IJ < direct_scf_cutoff
+
+    w_IJ = a0_I*a1_J + a1_I*a0_J bounds the contributions of the shell pair IJ
+    to the transformed integrals.  a_I is the sum over the AOs of shell I of
+    the largest |C_{mu,p}| of the orbitals.  The value w/4 is put on the
+    first AO of each shell pair so that CVHFnrs8_vj_prescreen tests
+    q_IJ * q_KL * max(w_IJ, w_KL).
+    '''
+    nao = ao_loc[-1]
+    nbas = len(ao_loc) - 1
+    def shell_bound(c):
+        if c.shape[1] == 0:
+            return numpy.zeros(nbas)
+        return numpy.add.reduceat(abs(c).max(axis=1), ao_loc[:-1])
+    a0 = shell_bound(numpy.asarray(mo_coeffs[0]))
+    a1 = shell_bound(numpy.asarray(mo_coeffs[1]))
+    w = a0[:,None] * a1
+    w += w.T
+    dm = numpy.zeros((nao,nao))
+    dm[ao_loc[:-1,None],ao_loc[:-1]] = w * .25
+    return dm
+
+def _pipeline_nbuf():
+    # Blocks held by the compute thread, the transpose thread, the write
+    # thread and the two queues between them
+    return 3 + 2 * PIPELINE_DEPTH
+
+def _report_pipeline(log, title, wall, pipe, stages):
+    if log.verbose < logger.INFO or wall <= 0:
+        return
+    wall = max(wall, 1e-9)
+    msg = ['%s %.2f s (%.0f%%)' % (name, t, t/wall*100)
+           for name, t in zip(stages, pipe.busy_time)]
+    log.info('ao2mo.outcore %s  wall time %.2f s, %s; '
+             'waiting for the pipeline %.2f s (%.0f%%)',
+             title, wall, ', '.join(msg), pipe.blocked_time,
+             pipe.blocked_time/wall*100)
+
+_io_throughput_cache = {}
+def tune_ioblk_size(tmpdir=None, max_ioblk_size=IOBLK_SIZE*4, verbose=logger.WARN):
+    '''Measure the write throughput of the disk of tmpdir for a series of
+    block sizes up to max_ioblk_size.  Returns the smallest block size (in
+    MB) which reaches 90% of the best throughput.  The result is never
+    larger than max_ioblk_size.  The measured throughput is cached for each
+    tmpdir and block size.
+    '''
+    if tmpdir is None:
+        tmpdir = lib.param.TMPDIR
+    log = logger.new_logger(None, verbose)
+    throughput = _io_throughput_cache.setdefault(tmpdir, {})
+    sizes = [x for x in (1, 4, 16, 64, 256) if x <= max_ioblk_size] or [1]
+    missing = [x for x in sizes if x not in throughput]
+    if missing:
+        with tempfile.NamedTemporaryFile(dir=tmpdir) as f:
+            for size in missing:
+                # Each block size writes at least 16 MB so that the results
+                # of different calls are comparable
+                probe_size = max(size, 16)
+                buf = numpy.ones(int(size*1e6/8)).tobytes()
+                f.seek(0)
+                t0 = time.time()
+                for i in range(probe_size // size):
+                    f.write(buf)
+                f.flush()
+                os.fsync(f.fileno())
+                t1 = time.time()
+                throughput[size] = probe_size / max(t1-t0, 1e-6)
+                log.debug('ioblk_size %d MB, write throughput %.1f MB/s',
+                          size, throughput[size])
+    best = max(throughput[x] for x in sizes)
+    ioblk_size = [x for x in sizes if throughput[x] >= best*.9][0]
+    return min(ioblk_size, max_ioblk_size)
+
+def _autotune_ioblk_size(ioblk_size, swap_size, max_memory, log):
+    if IOBLK_AUTOTUNE_MIN is None or swap_size < IOBLK_AUTOTUNE_MIN:
+        return ioblk_size
+    ioblk_size = tune_ioblk_size(max_ioblk_size=max(1, max_memory*.1),
+                                 verbose=log)
+    log.debug('ioblk_size = %d MB by autotuning', ioblk_size)
+    return ioblk_size
+
 def _load_from_h5g(h5group, row0, row1, out):
     nrow = row1 - row0
     col0 = 0
@@ -677,7 +794,9 @@ def guess_e1bufsize(max_memory, ioblk_size, nij_pair, nao_pair, comp):
     iobuf_words = max(int(mem_words//6), IOBUF_WORDS)
     ioblk_words = int(min(ioblk_size*1e6/8, iobuf_words))
 
-    e1buflen = int(mem_words*.66/(comp*(nij_pair*2+nao_pair)))
+    # The pipeline of half_e1 holds _pipeline_nbuf() iobuf blocks, plus the
+    # output of lib.transpose in the transpose thread
+    e1buflen = int(mem_words*.66/(comp*(nij_pair*(_pipeline_nbuf()+1)+nao_pair)))
     e1buflen = max(e1buflen, IOBUF_ROW_MIN)
     return e1buflen, mem_words, iobuf_words, ioblk_words
 
@@ -689,13 +808,15 @@ def guess_e2bufsize(ioblk_size, nrows, ncols):
 
 # based on the size of buffer, dynamic range of AO-shells for each buffer
 def guess_shell_ranges(mol, aosym, max_iobuf, max_aobuf=None, ao_loc=None,
-                       compress_diag=True):
+                       compress_diag=True, q_cond=None):
     if ao_loc is None: ao_loc = mol.ao_loc_nr()
     max_iobuf = max(1, max_iobuf)
 
     dims = ao_loc[1:] - ao_loc[:-1]
     dijs = (dims.reshape(-1,1) * dims)
     nbas = dijs.shape[0]
+    # The batches of shell pairs are balanced by the estimated cost
+    costs = gto.scheduler.shell_pair_cost(mol, ao_loc, q_cond)
 
     if aosym:
         if compress_diag:
@@ -715,6 +836,7 @@ def guess_shell_ranges(mol, aosym, max_iobuf, max_aobuf=None, ao_loc=None,
             #:        dj = ao_loc[j+1] - ao_loc[j]
             #:        lstdij.append(di*dj)
             lstdij = dijs[numpy.tril_indices(nbas)]
+        costs = costs[numpy.tril_indices(nbas)]
     else:
         #:for i in range(mol.nbas):
         #:    di = ao_loc[i+1] - ao_loc[i]
@@ -722,16 +844,17 @@ def guess_shell_ranges(mol, aosym, max_iobuf, max_aobuf=None, ao_loc=None,
         #:        dj = ao_loc[j+1] - ao_loc[j]
         #:        lstdij.append(di*dj)
         lstdij = dijs.ravel()
+        costs = costs.ravel()
 
-    dij_loc = numpy.append(0, numpy.cumsum(lstdij))
-    ijsh_range = balance_partition(dij_loc, max_iobuf)
+    ijsh_range = gto.scheduler.balanced_partition(costs, lstdij, max_iobuf)
 
     if max_aobuf is not None:
         max_aobuf = max(1, max_aobuf)
         def div_each_iobuf(ijstart, ijstop, buflen):
 # to fill each iobuf, AO integrals may need to be fill to aobuf several times
             return (ijstart, ijstop, buflen,
-                    balance_partition(dij_loc, max_aobuf, ijstart, ijstop))
+                    gto.scheduler.balanced_partition(costs, lstdij, max_aobuf,
+                                                     ijstart, ijstop))
         ijsh_range = [div_each_iobuf(*x) for x in ijsh_range]
     return ijsh_range
 
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''
+Integral datasets sharded across multiple files
+
+The rows of the dataset (the ij pairs of the MO integrals (ij|kl), or the
+auxiliary index of the DF integrals) are split into blocks.  The blocks are
+distributed round-robin over N shard files, and the shard files are placed
+round-robin in the given directories (e.g. one directory on each local
+disk).  The dataset in the main HDF5 file is an HDF5 virtual dataset which
+maps the blocks to the shard files.  It is the index of the shards and can
+be read by any HDF5 reader as a regular dataset, e.g. ao2mo.load.
+
+The shard files are named <erifile>.<dataname>.<shard id>.  The index
+refers to them by the path relative to the main file where possible, so the
+main file and the shards can be moved together.  They are not removed when
+the dataset is deleted from the main file, see :func:`remove`.  If the main
+file is an anonymous temporary file (lib.H5TmpFile), the shard files are
+removed when the temporary file is closed.
+'''
+
+import os
+import numpy
+import h5py
+from pyscf import lib
+from pyscf import __config__
+
+# Directories of the shard files.  If not set, the integrals are saved in
+# one dataset.
+SHARD_DIRS = getattr(__config__, 'ao2mo_shard_dirs', None)
+# Size (in MB) of the blocks which are distributed over the shard files
+BLKSIZE = getattr(__config__, 'ao2mo_shard_blksize', 256)
+
+
+class ShardedDataset(object):
+    '''Writer of a dataset sharded along the row axis (the second last
+    axis).  Slices h5d[row0:row1] and h5d[icomp,row0:row1] can be assigned.
+
+    Attributes:
+        shape : tuple
+            Shape of the full dataset
+        blocks : list
+            (row0, row1, shard id, row offset in the shard) of each block
+        shards : list
+            The h5py datasets of the shard files
+    '''
+    def __init__(self, shape, blocks, shards):
+        self.shape = shape
+        self.blocks = blocks
+        self.shards = shards
+
+    def __setitem__(self, key, val):
+        if isinstance(key, tuple):
+            icomp, rows = key
+        else:
+            icomp, rows = None, key
+        p0, p1 = rows.indices(self.shape[-2])[:2]
+        val = numpy.asarray(val)
+        for r0, r1, ishard, s0 in self.blocks:
+            b0, b1 = max(p0, r0), min(p1, r1)
+            if b0 >= b1:
+                continue
+            s = slice(s0+b0-r0, s0+b1-r0)
+            if icomp is None:
+                self.shards[ishard][...,s,:] = val[...,b0-p0:b1-p0,:]
+            else:
+                self.shards[ishard][icomp,s] = val[...,b0-p0:b1-p0,:]
+
+    def close(self):
+        for dset in self.shards:
+            dset.file.close()
+        self.shards = []
+
+
+def create_dataset(feri, dataname, shape, dtype='f8', chunks=None,
+                   shard_dirs=SHARD_DIRS, nshard=None, blksize=None):
+    '''Create the shard files and the virtual dataset (the index of the
+    shards) in feri.
+
+    Args:
+        feri : h5py File or Group
+            The main HDF5 file.  It must be a named file on disk or a
+            lib.H5TmpFile.
+        shape : tuple
+            (nrow, ncol) or (comp, nrow, ncol).  The rows are sharded.
+
+    Kwargs:
+        shard_dirs : list of str
+            Directories of the shard files
+        nshard : int
+            Number of shard files.  len(shard_dirs) by default.
+        blksize : float
+            Size (in MB) of the blocks distributed over the shard files.
+            BLKSIZE by default.
+
+    Returns:
+        :class:`ShardedDataset` object to write the data
+    '''
+    if not hasattr(h5py, 'VirtualLayout'):
+        raise RuntimeError('Sharded dataset requires h5py 2.9 or newer '
+                           '(HDF5 virtual dataset)')
+    if isinstance(shard_dirs, str):
+        shard_dirs = [shard_dirs]
+    if nshard is None:
+        nshard = len(shard_dirs)
+    if blksize is None:
+        blksize = BLKSIZE
+    nrow = shape[-2]
+    rowsize = numpy.prod(shape) // max(1, nrow)
+    blkrows = max(1, int(blksize*1e6/8/max(1, rowsize)))
+    if chunks is not None:
+        blkrows = (blkrows + chunks[-2] - 1) // chunks[-2] * chunks[-2]
+    nshard = max(1, min(nshard, (nrow+blkrows-1)//blkrows))
+
+    blocks = []
+    shard_rows = [0] * nshard
+    for ib, (r0, r1) in enumerate(lib.prange(0, nrow, blkrows)):
+        ishard = ib % nshard
+        blocks.append((r0, r1, ishard, shard_rows[ishard]))
+        shard_rows[ishard] += r1 - r0
+
+    maindir = os.path.dirname(os.path.abspath(feri.file.filename))
+    prefix = '%s.%s' % (os.path.basename(feri.file.filename),
+                        dataname.strip('/').replace('/', '_'))
+    layout = h5py.VirtualLayout(shape, dtype)
+    shards = []
+    filenames = []
+    for ishard in range(nshard):
+        filename = os.path.abspath(os.path.join(
+            shard_dirs[ishard % len(shard_dirs)], '%s.%d' % (prefix, ishard)))
+        sshape = shape[:-2] + (shard_rows[ishard], shape[-1])
+        if chunks is not None:
+            schunks = tuple(min(c, max(1, n)) for c, n in zip(chunks, sshape))
+        else:
+            schunks = None
+        fshard = h5py.File(filename, 'w')
+        shards.append(fshard.create_dataset('eri', sshape, dtype,
+                                            chunks=schunks))
+        if isinstance(feri, lib.H5TmpFile) and not os.path.isfile(feri.filename):
+            feri.attached_files.append(filename)
+        # HDF5 resolves the relative source paths against the directory of
+        # the main file
+        try:
+            filenames.append(os.path.relpath(filename, maindir))
+        except ValueError:  # On different drives
+            filenames.append(filename)
+
+    for r0, r1, ishard, s0 in blocks:
+        vsource = h5py.VirtualSource(filenames[ishard], 'eri',
+                                     shape=shards[ishard].shape)
+        layout[...,r0:r1,:] = vsource[...,s0:s0+r1-r0,:]
+    h5d = feri.create_virtual_dataset(dataname, layout, fillvalue=0)
+    h5d.attrs['shard_files'] = numpy.array(filenames, dtype='S')
+    h5d.attrs['shard_blocks'] = numpy.array(blocks, dtype=numpy.int64)
+    return ShardedDataset(shape, blocks, shards)
+
+def is_sharded(h5d):
+    '''Whether the dataset is the index of a sharded dataset'''
+    return isinstance(h5d, h5py.Dataset) and 'shard_files' in h5d.attrs
+
+def shard_files(h5d):
+    '''Filenames of the shards of the sharded dataset'''
+    maindir = os.path.dirname(os.path.abspath(h5d.file.filename))
+    return [os.path.normpath(os.path.join(maindir, x.decode()))
+            for x in h5d.attrs['shard_files']]
+
+def remove(feri, dataname):
+    '''Delete the dataset from feri.  If the dataset is sharded, the shard
+    files are removed as well.'''
+    if dataname not in feri:
+        return
+    h5d = feri[dataname]
+    filenames = shard_files(h5d) if is_sharded(h5d) else []
+    del(feri[dataname])
+    for filename in filenames:
+        if os.path.isfile(filename):
+            os.remove(filename)
+
+def shardable(feri, shard_dirs=SHARD_DIRS):
+    '''Whether the integrals can be sharded.  The main file must be a named
+    file on disk, or an anonymous lib.H5TmpFile which removes the shard files
+    when it is closed.'''
+    return bool(shard_dirs) and (os.path.isfile(feri.file.filename) or
+                                 isinstance(feri, lib.H5TmpFile))
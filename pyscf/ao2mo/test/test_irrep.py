@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import tempfile
+import numpy
+from pyscf import lib
+from pyscf import gto
+from pyscf import scf
+from pyscf import ao2mo
+from pyscf import cc
+from pyscf import mcscf
+from pyscf.ao2mo import irrep
+from pyscf.tools import fcidump
+
+mol = gto.Mole()
+mol.verbose = 0
+mol.atom = '''
+      o     0    0.       0
+      h     0    -0.757   0.587
+      h     0    0.757    0.587'''
+mol.basis = 'cc-pvdz'
+mol.symmetry = True
+mol.build()
+mf = scf.RHF(mol).run()
+
+def tearDownModule():
+    global mol, mf
+    del mol, mf
+
+class KnownValues(unittest.TestCase):
+    def test_full(self):
+        ref = ao2mo.full(mf._eri, mf.mo_coeff)
+        eri = irrep.full(mf._eri, mf.mo_coeff)
+        self.assertEqual(eri.shape, ref.shape)
+        self.assertTrue(eri.nnz < ref.size / 3)
+        self.assertAlmostEqual(abs(eri[:] - ref).max(), 0, 9)
+        self.assertAlmostEqual(abs(eri[7:31] - ref[7:31]).max(), 0, 9)
+        self.assertAlmostEqual(abs(eri.restore(1) -
+                                   ao2mo.restore(1, ref, eri.nmo)).max(), 0, 9)
+
+        ftmp = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        irrep.full(mol, mf.mo_coeff, erifile=ftmp.name, max_memory=10)
+        self.assertTrue(irrep.is_irrep_blocked(ftmp.name))
+        eri = irrep.load(ftmp.name)
+        self.assertAlmostEqual(abs(eri[:] - ref).max(), 0, 9)
+
+    def test_loaders(self):
+        ftmp = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        fcidump.from_scf(mf, ftmp.name, tol=1e-12)
+        dic = fcidump.read(ftmp.name)
+        ref = ao2mo.restore(8, ao2mo.full(mf._eri, mf.mo_coeff), mf.mo_coeff.shape[1])
+        self.assertAlmostEqual(abs(dic['H2'] - ref).max(), 0, 9)
+
+        mycc = cc.CCSD(mf)
+        mycc.frozen = 1
+        eris = mycc.ao2mo()
+        mycc.mo_coeff = numpy.asarray(mf.mo_coeff)
+        eris_ref = mycc.ao2mo()
+        self.assertAlmostEqual(abs(eris.ovvv - eris_ref.ovvv).max(), 0, 9)
+        self.assertAlmostEqual(abs(eris.vvvv - eris_ref.vvvv).max(), 0, 9)
+        self.assertAlmostEqual(abs(eris.oooo - eris_ref.oooo).max(), 0, 9)
+
+        mc = mcscf.CASCI(mf, 6, 6)
+        e_symm = mc.kernel()[0]
+        mc = mcscf.CASCI(mf.view(scf.hf.RHF), 6, 6)
+        self.assertAlmostEqual(mc.kernel()[0], e_symm, 9)
+
+
+if __name__ == "__main__":
+    print("Full Tests for irrep-blocked ao2mo")
+    unittest.main()
@@ -104,6 +104,30 @@ class KnownValues(unittest.TestCase):
         with ao2mo.load(erifile, 'eri_mo') as eri:
             self.assertTrue(eri.size == 0)
 
+    def test_e1bufsize(self):
+        # nij_pair >> nao_pair, the iobuf blocks of the pipeline fit in max_memory
+        max_memory = 2000
+        nij_pair, nao_pair = 400**2, 100*101//2
+        e1buflen = ao2mo.outcore.guess_e1bufsize(max_memory, 256, nij_pair, nao_pair, 1)[0]
+        nbuf = ao2mo.outcore._pipeline_nbuf() + 1
+        self.assertTrue(nbuf*e1buflen*nij_pair*8/1e6 < max_memory)
+
+    def test_ioblk_autotune(self):
+        ftmp = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        erifile = ftmp.name
+        eri0 = ao2mo.incore.full(mol.intor('int2e', aosym='s8'), mo)
+        autotune_min = ao2mo.outcore.IOBLK_AUTOTUNE_MIN
+        ao2mo.outcore.IOBLK_AUTOTUNE_MIN = 0
+        try:
+            ao2mo.outcore.full(mol, mo, erifile, max_memory=10, ioblk_size=.5)
+        finally:
+            ao2mo.outcore.IOBLK_AUTOTUNE_MIN = autotune_min
+        with ao2mo.load(erifile) as eri1:
+            self.assertAlmostEqual(abs(eri1[:]-eri0).max(), 0, 9)
+        self.assertTrue(ao2mo.outcore.tune_ioblk_size(max_ioblk_size=4) <= 4)
+        self.assertTrue(ao2mo.outcore.tune_ioblk_size(max_ioblk_size=1) <= 1)
+        self.assertTrue(ao2mo.outcore.tune_ioblk_size(max_ioblk_size=.5) <= .5)
+
     def test_group_segs(self):
         numpy.random.seed(1)
         segs = numpy.asarray(numpy.random.random(40)*50, dtype=int)
@@ -124,6 +148,32 @@ class KnownValues(unittest.TestCase):
         eri = ao2mo.kernel(mol, mo, intor='int2e_cart')
         self.assertAlmostEqual(lib.finger(eri), -977.99841341828437, 9)
 
+    def test_mo_weighted_screening(self):
+        pmol = gto.M(atom='''O 0 0 0; H 0 -.757 .587; H 0 .757 .587;
+                     O 0 0 9; H 0 -.757 9.587; H 0 .757 9.587''',
+                     basis='6-31g', verbose=0)
+        nao = pmol.nao_nr()
+        numpy.random.seed(2)
+        # orbitals on the first molecule only
+        mo1 = numpy.zeros((nao,5))
+        mo1[:nao//2] = numpy.random.random((nao//2,5))
+        mo2 = numpy.random.random((nao,3))
+        eri0 = pmol.intor('int2e', aosym='s8')
+        ftmp = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        for mos, aosym in (((mo1,mo1,mo2,mo2), 's4'),
+                           ((mo1,mo2,mo2,mo1), 's1'),
+                           ((mo2,mo2,mo1,mo1), 's4')):
+            ref = ao2mo.incore.general(eri0, mos, compact=False)
+            ao2mo.outcore.general(pmol, mos, ftmp.name, aosym=aosym,
+                                  compact=False)
+            with ao2mo.load(ftmp.name) as eri1:
+                self.assertAlmostEqual(abs(eri1[:]-ref).max(), 0, 9)
+
+        ao_loc = pmol.ao_loc_nr()
+        dm = ao2mo.outcore._mo_cond_dm((mo1,mo1), ao_loc)
+        nbas1 = pmol.nbas // 2
+        self.assertTrue(abs(dm[ao_loc[nbas1]:,ao_loc[nbas1]:]).max() == 0)
+
 if __name__ == '__main__':
     print('Full Tests for ao2mo.outcore')
     unittest.main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import unittest
+import tempfile
+import numpy
+import h5py
+from pyscf import lib
+from pyscf import gto
+from pyscf import ao2mo
+from pyscf import df
+from pyscf.ao2mo import shard
+
+mol = gto.Mole()
+mol.verbose = 0
+mol.atom = '''
+      o     0    0.       0
+      h     0    -0.757   0.587
+      h     0    0.757    0.587'''
+mol.basis = 'cc-pvdz'
+mol.build()
+nao = mol.nao_nr()
+numpy.random.seed(1)
+mo = numpy.random.random((nao,nao))
+
+def setUpModule():
+    global tmpdirs
+    tmpdirs = [tempfile.mkdtemp(dir=lib.param.TMPDIR) for i in range(2)]
+
+def tearDownModule():
+    global mol, mo, tmpdirs
+    for d in tmpdirs:
+        shutil.rmtree(d)
+    del mol, mo, tmpdirs
+
+class KnownValues(unittest.TestCase):
+    def test_outcore_sharded(self):
+        ftmp = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        eri0 = ao2mo.incore.general(mol.intor('int2e', aosym='s8'), (mo,)*4)
+        blksize = shard.BLKSIZE
+        shard.BLKSIZE = .1
+        try:
+            ao2mo.outcore.full(mol, mo, ftmp.name, max_memory=10,
+                               ioblk_size=.2, shard_dirs=tmpdirs)
+        finally:
+            shard.BLKSIZE = blksize
+        with h5py.File(ftmp.name, 'r') as feri:
+            self.assertTrue(shard.is_sharded(feri['eri_mo']))
+            files = shard.shard_files(feri['eri_mo'])
+        self.assertTrue(len(files) == 2)
+        self.assertTrue(os.path.dirname(files[1]) == os.path.abspath(tmpdirs[1]))
+        with ao2mo.load(ftmp.name) as eri1:
+            self.assertAlmostEqual(abs(eri1[:]-eri0).max(), 0, 9)
+
+        # overwriting the dataset removes the old shards
+        ao2mo.outcore.full(mol, mo[:,:4], ftmp.name)
+        self.assertTrue(not any(os.path.isfile(f) for f in files))
+
+        mo1 = mo[:,:6]
+        eri0 = ao2mo.incore.general(mol.intor('int2e', aosym='s8'), (mo1,)*4,
+                                    compact=False)
+        ao2mo.outcore.general(mol, (mo1,)*4, ftmp.name, 'ab', compact=False,
+                              shard_dirs=tmpdirs)
+        with ao2mo.load(ftmp.name, 'ab') as eri1:
+            self.assertAlmostEqual(abs(eri1[:]-eri0).max(), 0, 9)
+
+    def test_create_dataset(self):
+        ftmp = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        ref = numpy.random.random((3,50,7))
+        with h5py.File(ftmp.name, 'w') as feri:
+            h5d = shard.create_dataset(feri, 'x', ref.shape, chunks=(1,4,7),
+                                       shard_dirs=tmpdirs, nshard=3,
+                                       blksize=1e-4)
+            self.assertTrue(len(h5d.shards) == 3)
+            h5d[:,:20] = ref[:,:20]
+            h5d[2,20:] = ref[2,20:]
+            for i in range(2):
+                h5d[i,20:] = ref[i,20:]
+            h5d.close()
+        with h5py.File(ftmp.name, 'a') as feri:
+            self.assertAlmostEqual(abs(feri['x'][:]-ref).max(), 0, 12)
+            files = shard.shard_files(feri['x'])
+            shard.remove(feri, 'x')
+            self.assertTrue('x' not in feri)
+        self.assertTrue(not any(os.path.isfile(f) for f in files))
+
+    def test_df_outcore_sharded(self):
+        ftmp = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        mo1 = mo[:,:8]
+        df.outcore.general(mol, (mo1,mo1), ftmp.name, 'weigend')
+        with h5py.File(ftmp.name, 'r') as feri:
+            ref = feri['eri_mo'][:]
+        df.outcore.general(mol, (mo1,mo1), ftmp.name, 'weigend',
+                           shard_dirs=tmpdirs)
+        with h5py.File(ftmp.name, 'r') as feri:
+            self.assertTrue(shard.is_sharded(feri['eri_mo']))
+            self.assertAlmostEqual(abs(feri['eri_mo'][:]-ref).max(), 0, 12)
+
+    def test_tmpfile_sharded(self):
+        mo1 = mo[:,:4]
+        eri0 = ao2mo.incore.full(mol.intor('int2e', aosym='s8'), mo1)
+        feri = lib.H5TmpFile()
+        ao2mo.outcore.full(mol, mo1, feri, shard_dirs=tmpdirs)
+        self.assertTrue(shard.is_sharded(feri['eri_mo']))
+        self.assertAlmostEqual(abs(feri['eri_mo'][:]-eri0).max(), 0, 9)
+        files = shard.shard_files(feri['eri_mo'])
+        self.assertTrue(all(os.path.isfile(f) for f in files))
+        # The shards are removed with the temporary file
+        feri.close()
+        self.assertTrue(not any(os.path.isfile(f) for f in files))
+
+    def test_relative_path(self):
+        ftmp = tempfile.NamedTemporaryFile(dir=tmpdirs[0])
+        ao2mo.outcore.full(mol, mo[:,:4], ftmp.name, shard_dirs=tmpdirs)
+        with h5py.File(ftmp.name, 'r') as feri:
+            ref = feri['eri_mo'][:]
+            paths = [x.decode() for x in feri['eri_mo'].attrs['shard_files']]
+            files = shard.shard_files(feri['eri_mo'])
+        self.assertTrue(not any(os.path.isabs(x) for x in paths))
+        self.assertTrue(all(os.path.isfile(f) for f in files))
+
+        # The main file and the shards are moved together
+        newdir = os.path.abspath(tempfile.mkdtemp(dir=lib.param.TMPDIR))
+        try:
+            for d in tmpdirs:
+                shutil.copytree(d, os.path.join(newdir, os.path.basename(d)))
+            mainfile = os.path.join(newdir, os.path.basename(tmpdirs[0]),
+                                    os.path.basename(ftmp.name))
+            with h5py.File(mainfile, 'r') as feri:
+                self.assertAlmostEqual(abs(feri['eri_mo'][:]-ref).max(), 0, 12)
+                self.assertTrue(all(os.path.dirname(f).startswith(newdir)
+                                    for f in shard.shard_files(feri['eri_mo'])))
+        finally:
+            shutil.rmtree(newdir)
+        with h5py.File(ftmp.name, 'a') as feri:
+            shard.remove(feri, 'eri_mo')
+
+
+if __name__ == '__main__':
+    print('Full Tests for ao2mo.shard')
+    unittest.main()
@@ -510,7 +510,9 @@ def _contract_s4vvvv_t2(mycc, mol, vvvv, t2, out=None, verbose=None):
                                  'CVHFsetnr_direct_scf')
         blksize = max(BLKMIN, numpy.sqrt(max_memory*.9e6/8/nvirb**2/2.5))
         blksize = int(min((nvira+3)/4, blksize))
-        sh_ranges = ao2mo.outcore.balance_partition(ao_loc, blksize)
+        sh_ranges = gto.scheduler.shell_ranges(
+                mol, 0, mol.nbas, blksize, ao_loc,
+                gto.scheduler.get_q_cond(ao2mopt, mol.nbas))
         blksize = max(x[2] for x in sh_ranges)
         eribuf = numpy.empty((blksize,blksize,nvirb,nvirb))
         loadbuf = numpy.empty((blksize,blksize,nvirb,nvirb))
@@ -1266,7 +1268,16 @@ def _make_eris_incore(mycc, mo_coeff=None):
     nmo = eris.fock.shape[0]
     nvir = nmo - nocc
 
-    eri1 = ao2mo.incore.full(mycc._scf._eri, eris.mo_coeff)
+    if mo_coeff is None:
+        mo_coeff = mycc.mo_coeff
+    orbsym = getattr(mo_coeff, 'orbsym', None)
+    if orbsym is not None and len(orbsym) == mo_coeff.shape[1]:
+        # Symmetry forbidden blocks are not transformed.  Slices of eri1 are
+        # the rows of the 4-fold symmetric integrals.
+        orbsym = numpy.asarray(orbsym)[mycc.get_frozen_mask()]
+        eri1 = ao2mo.irrep.full(mycc._scf._eri, eris.mo_coeff, orbsym)
+    else:
+        eri1 = ao2mo.incore.full(mycc._scf._eri, eris.mo_coeff)
     #:eri1 = ao2mo.restore(1, eri1, nmo)
     #:eris.oooo = eri1[:nocc,:nocc,:nocc,:nocc].copy()
     #:eris.ovoo = eri1[:nocc,nocc:,:nocc,:nocc].copy()
@@ -244,6 +244,23 @@ def make_rdm2(mycc, t1, t2, l1, l2):
     d2 = _gamma2_outcore(mycc, t1, t2, l1, l2, f, False)
     return _make_rdm2(mycc, d1, d2, with_dm1=True, with_frozen=True)
 
+def loop_rdm2(mycc, t1, t2, l1, l2, blksize=None):
+    r'''
+    Generator of the spin-traced two-particle density matrix in MO basis.
+    It yields (p0, p1, dm2[p0:p1]) so that the full nmo^4 array is never
+    held in memory.  The convention of dm2 is the same to :func:`make_rdm2`.
+    '''
+    d1 = _gamma1_intermediates(mycc, t1, t2, l1, l2)
+    f = lib.H5TmpFile()
+    d2 = _gamma2_outcore(mycc, t1, t2, l1, l2, f, False)
+    nmo = mycc.mo_occ.size
+    if blksize is None:
+        max_memory = max(0, mycc.max_memory - lib.current_memory()[0])
+        blksize = int(max_memory*.4e6/8/nmo**3)
+    blksize = min(nmo, max(1, blksize))
+    for p0, p1 in lib.prange(0, nmo, blksize):
+        yield p0, p1, _make_rdm2_block(mycc, d1, d2, p0, p1)
+
 def _make_rdm1(mycc, d1, with_frozen=True, ao_repr=False):
     '''dm1[p,q] = <q_alpha^\dagger p_alpha> + <q_beta^\dagger p_beta>
 
@@ -370,6 +387,95 @@ def _make_rdm2(mycc, d1, d2, with_dm1=True, with_frozen=True):
     #   E = einsum('pqrs,pqrs', eri, rdm2)
     return dm2.transpose(1,0,3,2)
 
+def _make_rdm2_block(mycc, d1, d2, p0, p1, with_dm1=True, with_frozen=True):
+    '''dm2[p0:p1] of :func:`_make_rdm2`'''
+    nocc, nvir = d2[0].shape[:2]
+    nmo = nocc + nvir
+    if with_frozen and not (mycc.frozen is 0 or mycc.frozen is None):
+        nmo_full = mycc.mo_occ.size
+        moidx = numpy.where(mycc.get_frozen_mask())[0]
+        k0, k1 = numpy.searchsorted(moidx, (p0, p1))
+        dm2a = _rdm2_block_active(d2, k0, k1)
+        dm2 = numpy.zeros((p1-p0,nmo_full**3), dtype=dm2a.dtype)
+        if k0 < k1:
+            idx = (moidx[:,None,None] * nmo_full**2 +
+                   moidx[:,None] * nmo_full + moidx).ravel()
+            lib.takebak_2d(dm2, dm2a.reshape(k1-k0,nmo**3), moidx[k0:k1]-p0, idx)
+        dm2 = dm2.reshape(p1-p0,nmo_full,nmo_full,nmo_full)
+        nmo = nmo_full
+        nocc = numpy.count_nonzero(mycc.mo_occ > 0)
+    else:
+        dm2 = _rdm2_block_active(d2, p0, p1)
+
+    if with_dm1:
+        dm1 = _make_rdm1(mycc, d1, with_frozen)
+        dm1[numpy.diag_indices(nocc)] -= 2
+        for i in range(nocc):
+            dm2[:,:,i,i] += dm1[p0:p1] * 2
+            dm2[:,i,i,:] -= dm1[p0:p1]
+        for i in range(p0, min(p1, nocc)):
+            dm2[i-p0,i] += dm1 * 2
+            dm2[i-p0,:,:,i] -= dm1.T
+            for j in range(nocc):
+                dm2[i-p0,i,j,j] += 4
+                dm2[i-p0,j,j,i] -= 2
+
+    # dm2 satisfies dm2[q,p,s,r] = dm2[p,q,r,s].conj().  The transpose in
+    # _make_rdm2 is equivalent to the complex conjugation.
+    return dm2.conj()
+
+def _rdm2_block_active(d2, p0, p1):
+    '''Rows p0:p1 of the active-space 2-pdm <p^\dagger r^\dagger s q>'''
+    dovov, dvvvv, doooo, doovv, dovvo, dvvov, dovvv, dooov = d2
+    nocc, nvir = dovov.shape[:2]
+    nmo = nocc + nvir
+    dm2 = numpy.zeros((p1-p0,nmo,nmo,nmo), dtype=numpy.result_type(*d2[:5]))
+
+    i0, i1 = min(p0, nocc), min(p1, nocc)
+    if i0 < i1:
+        o = dm2[:i1-i0]
+        o[:,:nocc,:nocc,:nocc] = doooo[i0:i1]
+        o[:,:nocc,:nocc,:nocc]+= _cp(doooo[:,i0:i1]).transpose(1,0,3,2).conj()
+        o[:,:nocc,:nocc,:nocc]*= 2
+        o[:,:nocc,:nocc,nocc:] = dooov[i0:i1]
+        o[:,:nocc,nocc:,:nocc] = _cp(dooov[:,i0:i1]).transpose(1,0,3,2).conj()
+        o[:,:nocc,nocc:,nocc:] = doovv[i0:i1]
+        o[:,:nocc,nocc:,nocc:]+= _cp(doovv[:,i0:i1]).transpose(1,0,3,2).conj()
+        o[:,nocc:,:nocc,:nocc] = _cp(dooov[:,:,i0:i1]).transpose(2,3,0,1)
+        o[:,nocc:,:nocc,nocc:] = dovov[i0:i1]
+        o[:,nocc:,:nocc,nocc:]+= _cp(dovov[:,:,i0:i1]).transpose(2,3,0,1)
+        o[:,nocc:,nocc:,:nocc] = dovvo[i0:i1]
+        o[:,nocc:,nocc:,:nocc]+= _cp(dovvo[:,:,:,i0:i1]).transpose(3,2,1,0).conj()
+        o[:,nocc:,nocc:,nocc:] = dovvv[i0:i1]
+
+    a0, a1 = max(p0, nocc) - nocc, max(p1, nocc) - nocc
+    if a0 < a1:
+        v = dm2[i1-i0:]
+        v[:,:nocc,:nocc,:nocc] = _cp(dooov[:,:,:,a0:a1]).transpose(3,2,1,0).conj()
+        v[:,:nocc,:nocc,nocc:] = _cp(dovvo[:,a0:a1]).transpose(1,0,3,2).conj()
+        v[:,:nocc,:nocc,nocc:]+= _cp(dovvo[:,:,a0:a1]).transpose(2,3,0,1)
+        v[:,:nocc,nocc:,:nocc] = _cp(dovov[:,a0:a1]).transpose(1,0,3,2).conj()
+        v[:,:nocc,nocc:,:nocc]+= _cp(dovov[:,:,:,a0:a1]).transpose(3,2,1,0).conj()
+        v[:,:nocc,nocc:,nocc:] = _cp(dovvv[:,a0:a1]).transpose(1,0,3,2).conj()
+        v[:,nocc:,:nocc,:nocc] = _cp(doovv[:,:,a0:a1]).transpose(2,3,0,1)
+        v[:,nocc:,:nocc,:nocc]+= _cp(doovv[:,:,:,a0:a1]).transpose(3,2,1,0).conj()
+        v[:,nocc:,:nocc,nocc:] = _cp(dovvv[:,:,a0:a1]).transpose(2,3,0,1)
+        v[:,nocc:,nocc:,:nocc] = _cp(dovvv[:,:,:,a0:a1]).transpose(3,2,1,0).conj()
+        if len(dvvvv.shape) == 2:
+            idx = lib.square_mat_in_trilu_indices(nvir)[a0:a1].ravel()
+            uniq_idx, inverse = numpy.unique(idx, return_inverse=True)
+            vvvv = _cp(dvvvv[uniq_idx])[inverse]
+            v[:,nocc:,nocc:,nocc:] = lib.unpack_tril(vvvv).reshape(a1-a0,nvir,nvir,nvir)
+            v[:,nocc:,nocc:,nocc:]*= 4
+        else:
+            v[:,nocc:,nocc:,nocc:] = dvvvv[a0:a1]
+            v[:,nocc:,nocc:,nocc:]+= _cp(dvvvv[:,a0:a1]).transpose(1,0,3,2).conj()
+            v[:,nocc:,nocc:,nocc:]*= 2
+    return dm2
+
+def _cp(a):
+    return numpy.array(a, copy=False, order='C')
+
 
 if __name__ == '__main__':
     from functools import reduce
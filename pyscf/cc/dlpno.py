@@ -0,0 +1,430 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''
+Local CCSD in the pair natural orbital (PNO) domains, LPNO-CCSD style.
+
+The occupied orbitals are localized and the pairs are screened by the
+semicanonical MP2 pair energies (see :mod:`pyscf.mp.dlpno`).  The doubles
+amplitudes T_ij of the strong pairs are stored in the PNO basis of the pair
+and the amplitudes of the weak pairs are zero.  The singles amplitudes are
+kept in the canonical virtual basis.
+
+The CCSD equations are solved in the T1-dressed form.  In each iteration
+the 3-index DF integrals and the Fock matrix are dressed with T1.  The
+residual of pair ij is then built in the PNO basis of ij from the
+PNO-transformed dressed DF integrals.  The external virtual indices of the
+amplitudes of the other pairs are projected onto the PNOs of ij with the PNO
+overlap S_{ij,kl} = Q_ij^T Q_kl; the internal virtual indices are summed in
+the canonical virtual basis.  The vvvv term is evaluated with the
+PNO-transformed (L|ab) of each pair and is never formed in the full virtual
+space.  The MP2 energy of the weak pairs and the MP2 estimate of the PNO
+truncation error are added to the correlation energy.
+
+Ref: Neese, Wennmohs, Hansen, JCP 130, 114108 (2009)
+     Koch, Christiansen, Jorgensen, et al, JCP 100, 8178 (1994)
+'''
+
+import time
+from functools import reduce
+import numpy
+from pyscf import lib
+from pyscf import df
+from pyscf.lib import logger
+from pyscf.cc import ccsd
+from pyscf.ao2mo import _ao2mo
+from pyscf.mp import dlpno as mp_dlpno
+from pyscf import __config__
+
+
+def update_amps(mycc, t1, t2, eris):
+    '''Jacobi update of the amplitudes.  t2 is a dict of the PNO amplitudes
+    T_ij of the strong pairs (i,j), i <= j.'''
+    time0 = time.clock(), time.time()
+    log = logger.Logger(mycc.stdout, mycc.verbose)
+    nocc = mycc.nocc
+    pno_coeff = mycc.pno_coeff
+    keys = sorted(pno_coeff.keys())
+    fock, Lpq = _dress(t1, eris)
+    Loo = Lpq[:,:nocc,:nocc]
+    Lov = Lpq[:,:nocc,nocc:]
+    Lvo = Lpq[:,nocc:,:nocc]
+    Lvv = Lpq[:,nocc:,nocc:]
+    fov = fock[:nocc,nocc:]
+
+    def ordered_pairs(k, l):
+        '''(p, r, T_pr) of the pair (k,l), k <= l'''
+        if k == l:
+            return ((k, k, t2[(k,k)]),)
+        else:
+            return ((k, l, t2[(k,l)]), (l, k, t2[(k,l)].T))
+
+    # Intermediates which are summed over all pairs
+    foo = fock[:nocc,:nocc].copy()
+    fvv = fock[nocc:,nocc:].copy()
+    r1 = fock[nocc:,:nocc].T.copy()
+    for kl in keys:
+        q = pno_coeff[kl]
+        ovL = eris.ovL[kl]
+        for p, r, t in ordered_pairs(*kl):
+            u = t * 2 - t.T
+            fvv -= q.dot(u).dot(lib.dot(ovL[:,r].T, Lov[:,p]))
+            foo[:,r] += lib.einsum('cd,Lmd,Lc->m', u, ovL, ovL[:,p])
+            goo = lib.dot(Loo[:,p].T, ovL[:,r])
+            r1 -= goo.dot(u.T).dot(q.T)
+            r1[p] += q.dot(u.dot(q.T.dot(fov[r])))
+
+    mo_e = eris.mo_energy
+    fii = mo_e[:nocc]
+    eia = fii[:,None] - mo_e[nocc:] - mycc.level_shift
+    t2new = {}
+    for ij in keys:
+        i, j = ij
+        q = pno_coeff[ij]
+        ovL = eris.ovL[ij]
+        vvL = lib.einsum('Lab,bx->Lax', Lvv, q)
+        for p, r, t in ordered_pairs(i, j):
+            w = lib.einsum('Lc,cd->Ld', ovL[:,p], t * 2 - t.T)
+            r1[r] += lib.einsum('Lad,Ld->a', vvL, w)
+        vvL = lib.einsum('ax,Lab->Lxb', q, Lvv)
+
+        # The external indices of the amplitudes are projected onto the PNOs
+        # of ij.  The internal indices are summed in the canonical virtual
+        # basis.
+        #   tproj[kl] = S_{ij,kl} T_kl S_{ij,kl}^T
+        #   hk[m][k][a,d] = t_km^{ad}, a in the PNOs of ij
+        #   hm[m][k][a,d] = t_mk^{ad}, a in the PNOs of ij
+        npno = q.shape[1]
+        nvir = q.shape[0]
+        tproj = {}
+        hk = dict((m, numpy.zeros((nocc,npno,nvir))) for m in ij)
+        hm = dict((m, numpy.zeros((nocc,npno,nvir))) for m in ij)
+        for kl in keys:
+            k, l = kl
+            s = numpy.dot(q.T, pno_coeff[kl])
+            tproj[kl] = reduce(numpy.dot, (s, t2[kl], s.T))
+            if k in ij or l in ij:
+                hkl = reduce(numpy.dot, (s, t2[kl], pno_coeff[kl].T))
+                hlk = reduce(numpy.dot, (s, t2[kl].T, pno_coeff[kl].T))
+                if l in ij:
+                    hk[l][k] = hkl
+                    hm[l][k] = hlk
+                if k in ij:
+                    hm[k][l] = hkl
+                    hk[k][l] = hlk
+
+        tij = t2[ij]
+        voL = dict((m, lib.einsum('ax,La->Lx', q, Lvo[:,:,m])) for m in ij)
+        rij = lib.einsum('La,Lb->ab', voL[i], voL[j])
+        vvL_ij = lib.einsum('Lxb,by->Lxy', vvL, q)
+        rij += lib.einsum('Lac,cd,Lbd->ab', vvL_ij, tij, vvL_ij)
+        vvL_ij = None
+        woo = lib.einsum('Lk,Ll->kl', Loo[:,:,i], Loo[:,:,j])
+        woo += lib.einsum('Lkc,cd,Lld->kl', ovL, tij, ovL)
+        for (k, l), tkl in tproj.items():
+            rij += woo[k,l] * tkl
+            if k != l:
+                rij += woo[l,k] * tkl.T
+
+        ymat = {}
+        vmat = {}
+        uh = {}
+        for m in ij:
+            # uh[m][l] = Q_ij^T U_ml,  U_ml = 2 T_ml - T_ml^T
+            uh[m] = hm[m] * 2 - hk[m]
+            ymat[m] = lib.einsum('Lk,Lac->kac', Loo[:,:,m], vvL)
+            z = lib.einsum('lad,Lkd->Lkla', hk[m], Lov)
+            ymat[m] -= .5 * lib.einsum('Lkla,Llc->kac', z, Lov)
+            vmat[m] = lib.einsum('La,Lkc->kac', voL[m], Lov) * 2
+            vmat[m] -= lib.einsum('Lac,Lk->kac', vvL, Loo[:,:,m])
+            z = lib.einsum('lad,Lld->La', uh[m], Lov)
+            vmat[m] += lib.einsum('La,Lkc->kac', z, Lov)
+            z = lib.einsum('lad,Lkd->Lkla', uh[m], Lov)
+            vmat[m] -= .5 * lib.einsum('Lkla,Llc->kac', z, Lov)
+        z = None
+        fvv_ij = reduce(numpy.dot, (q.T, fvv, q))
+
+        def xterm(p, r, tpr):
+            x = -.5 * lib.einsum('kac,kbc->ab', ymat[p], hk[r])
+            x -= lib.einsum('kac,kbc->ab', ymat[r], hk[p])
+            x += .5 * lib.einsum('kbc,kac->ab', uh[r], vmat[p])
+            x += numpy.dot(tpr, fvv_ij.T)
+            x -= lib.einsum('kac,k->ac', hm[p], foo[:,r]).dot(q)
+            return x
+        rij += xterm(i, j, tij)
+        rij += xterm(j, i, tij.T).T
+
+        e_pno = mycc._pno_energy[ij] + mycc.level_shift
+        t2new[ij] = tij - rij / (e_pno[:,None] + e_pno - fii[i] - fii[j])
+
+    t1new = t1 + r1 / eia
+    log.timer_debug1('update t1 t2', *time0)
+    return t1new, t2new
+
+def energy(mycc, t1=None, t2=None, eris=None):
+    '''CCSD energy of the strong pairs plus the MP2 energy of the weak pairs
+    and the PNO truncation correction'''
+    if t1 is None: t1 = mycc.t1
+    if t2 is None: t2 = mycc.t2
+    if eris is None: eris = mycc.ao2mo()
+    nocc = mycc.nocc
+    Lov = eris.Lpq[:,:nocc,nocc:]
+    e = 2 * numpy.einsum('ia,ia', eris.fock[:nocc,nocc:], t1)
+    x = lib.einsum('Lia,ja->Lij', Lov, t1)
+    e += 2 * numpy.einsum('Lii,Ljj', x, x) - numpy.einsum('Lij,Lji', x, x)
+    for (i, j), tij in t2.items():
+        ovL = eris.ovL[(i,j)]
+        kij = lib.einsum('La,Lb->ab', ovL[:,i], ovL[:,j])
+        e += numpy.einsum('ab,ab', tij*2-tij.T, kij) * (1 + (i!=j))
+    return e + mycc.e_weak + mycc.e_pno_corr
+
+def _dress(t1, eris):
+    '''T1-dressed DF integrals (L|pq) and Fock matrix'''
+    nocc = t1.shape[0]
+    Lpq = eris.Lpq.copy()
+    Lpq[:,nocc:] -= lib.einsum('ka,Lkq->Laq', t1, eris.Lpq[:,:nocc])
+    Lpq[:,:,:nocc] += lib.einsum('Lpb,ib->Lpi', Lpq[:,:,nocc:], t1)
+    hcore = eris.hcore.copy()
+    hcore[nocc:] -= numpy.dot(t1.T, hcore[:nocc])
+    hcore[:,:nocc] += numpy.dot(hcore[:,nocc:], t1.T)
+    return hcore + _get_veff(Lpq, nocc), Lpq
+
+def _get_veff(Lpq, nocc):
+    '''2J - K of the occupied orbitals from the DF integrals'''
+    vj = numpy.einsum('Lkk->L', Lpq[:,:nocc,:nocc])
+    veff = lib.einsum('Lpq,L->pq', Lpq, vj) * 2
+    veff -= lib.einsum('Lpk,Lkq->pq', Lpq[:,:,:nocc], Lpq[:,:nocc])
+    return veff
+
+
+class _PNOERIs(ccsd._ChemistsERIs):
+    def __init__(self, mol=None):
+        ccsd._ChemistsERIs.__init__(self, mol)
+        self.Lpq = None
+        self.hcore = None
+        self.ovL = None
+
+def _make_pno_eris(mycc, mo_coeff=None):
+    cput0 = (time.clock(), time.time())
+    eris = _PNOERIs()
+    eris._common_init_(mycc, mo_coeff)
+    nocc = eris.nocc
+    nmo = eris.fock.shape[0]
+    with_df = mycc.with_df
+    naux = with_df.get_naoaux()
+    mo = numpy.asarray(eris.mo_coeff, order='F')
+    Lpq = eris.Lpq = numpy.empty((naux,nmo,nmo))
+    p1 = 0
+    for eri1 in with_df.loop():
+        p0, p1 = p1, p1 + eri1.shape[0]
+        _ao2mo.nr_e2(eri1, mo, (0,nmo,0,nmo), aosym='s2', mosym='s1',
+                     out=Lpq[p0:p1].reshape(p1-p0,nmo*nmo))
+    # The exact Fock matrix and the DF two-electron part of the dressed Fock
+    # matrix, the same as DF-CCSD
+    eris.hcore = eris.fock - _get_veff(Lpq, nocc)
+    eris.ovL = {}
+    for ij, q in mycc.pno_coeff.items():
+        eris.ovL[ij] = lib.einsum('Lkc,cx->Lkx', Lpq[:,:nocc,nocc:], q)
+    logger.timer(mycc, 'DLPNO-CCSD integral transformation', *cput0)
+    return eris
+
+
+class DLPNOCCSD(ccsd.CCSD):
+    '''CCSD with the doubles amplitudes of the strong pairs in the PNO basis
+
+    Attributes:
+        localization : str
+            Method to localize the occupied orbitals.  It can be 'boys',
+            'pm' (Pipek-Mezey), 'ibo' or 'none' (canonical orbitals).
+        pair_thresh : float
+            Pairs with |semicanonical MP2 pair energy| below this threshold
+            are treated as weak pairs.  Default is 1e-4.
+        pno_thresh : float
+            PNOs with occupation numbers below this threshold are dropped.
+            Default is 1e-7.
+        pair_prescreen_thresh, domain_thresh :
+            Pair prescreening and PAO domain thresholds of the PNO
+            construction, see :class:`pyscf.mp.dlpno.DLPNOMP2`.
+
+    Saved results:
+        lo_coeff : 2D array
+            Localized occupied orbitals
+        pno_coeff : dict
+            PNO coefficients (in the basis of canonical virtual orbitals)
+            of each strong pair (i,j), i <= j
+        t1 : 2D array
+            Singles amplitudes in the canonical virtual basis
+        t2 : dict
+            Doubles amplitudes T_ij[a,b] of each strong pair (i,j), i <= j,
+            in the PNO basis of the pair.  See also :meth:`make_t2`.
+        e_weak : float
+            MP2 energy of the weak pairs
+        e_pno_corr : float
+            MP2 estimate of the PNO truncation error
+
+    Examples:
+
+    >>> mol = gto.M(atom='O 0 0 0; H 0 1 0; H 0 0 1', basis='ccpvdz')
+    >>> mf = scf.RHF(mol).run()
+    >>> mycc = cc.dlpno.DLPNOCCSD(mf).run()
+    '''
+
+    localization = getattr(__config__, 'cc_dlpno_DLPNOCCSD_localization', 'pm')
+    pair_thresh = getattr(__config__, 'cc_dlpno_DLPNOCCSD_pair_thresh', 1e-4)
+    pno_thresh = getattr(__config__, 'cc_dlpno_DLPNOCCSD_pno_thresh', 1e-7)
+    pair_prescreen_thresh = getattr(__config__, 'cc_dlpno_DLPNOCCSD_pair_prescreen_thresh', None)
+    domain_thresh = getattr(__config__, 'cc_dlpno_DLPNOCCSD_domain_thresh', 1e-4)
+
+    def __init__(self, mf, frozen=0, mo_coeff=None, mo_occ=None):
+        ccsd.CCSD.__init__(self, mf, frozen, mo_coeff, mo_occ)
+        if getattr(mf, 'with_df', None):
+            self.with_df = mf.with_df
+        else:
+            self.with_df = df.DF(mf.mol)
+            self.with_df.auxbasis = df.make_auxbasis(mf.mol, mp2fit=True)
+        self.lo_coeff = None
+        self.pno_coeff = None
+        self.e_weak = 0
+        self.e_pno_corr = 0
+        self._pno_energy = None
+        keys = set(('with_df', 'localization', 'pair_thresh', 'pno_thresh',
+                    'pair_prescreen_thresh', 'domain_thresh'))
+        self._keys = set(self.__dict__.keys()).union(keys)
+
+    def dump_flags(self):
+        ccsd.CCSD.dump_flags(self)
+        log = logger.Logger(self.stdout, self.verbose)
+        log.info('localization = %s', self.localization)
+        log.info('pair_thresh = %g', self.pair_thresh)
+        log.info('pno_thresh = %g', self.pno_thresh)
+        log.info('pair_prescreen_thresh = %s', self.pair_prescreen_thresh)
+        log.info('domain_thresh = %g', self.domain_thresh)
+        return self
+
+    def build_pno(self):
+        '''Localize the occupied orbitals and generate the PNO domains of the
+        strong pairs with the semicanonical MP2 amplitudes'''
+        pt = mp_dlpno.DLPNOMP2(self._scf, self.frozen, self.mo_coeff,
+                               self.mo_occ)
+        pt.with_df = self.with_df
+        pt.localization = self.localization
+        pt.pair_thresh = self.pair_thresh
+        pt.pno_thresh = self.pno_thresh
+        pt.pair_prescreen_thresh = self.pair_prescreen_thresh
+        pt.domain_thresh = self.domain_thresh
+        pt.verbose = self.verbose
+        pt.stdout = self.stdout
+        foo, pairs, self.e_weak, self.e_pno_corr = mp_dlpno.build_pno(pt)
+        self.lo_coeff = pt.lo_coeff
+        self.pno_coeff = pt.pno_coeff
+        self._pno_energy = dict((ij, pno[1]) for ij, pno in pairs.items())
+        nocc = foo.shape[0]
+        logger.info(self, 'Strong pairs %d  weak pairs %d', len(pairs),
+                    nocc*(nocc+1)//2 - len(pairs))
+        return self
+
+    def local_mo_coeff(self):
+        '''MO coefficients with the active occupied orbitals replaced by the
+        localized orbitals'''
+        mo_coeff = numpy.array(self.mo_coeff)
+        idx = numpy.where(self.get_frozen_mask())[0]
+        mo_coeff[:,idx[:self.nocc]] = self.lo_coeff
+        return mo_coeff
+
+    def kernel(self, t1=None, t2=None, eris=None):
+        if eris is None:
+            self.build_pno()
+            eris = self.ao2mo(self.local_mo_coeff())
+        return self.ccsd(t1, t2, eris)
+
+    def ao2mo(self, mo_coeff=None):
+        return _make_pno_eris(self, mo_coeff)
+
+    def init_amps(self, eris=None):
+        if eris is None:
+            eris = self.ao2mo(self.local_mo_coeff())
+        nocc = self.nocc
+        mo_e = eris.mo_energy
+        eia = mo_e[:nocc,None] - mo_e[None,nocc:]
+        t1 = eris.fock[:nocc,nocc:] / eia
+        t2 = {}
+        emp2 = 0
+        for (i, j), ovL in eris.ovL.items():
+            e_pno = self._pno_energy[(i,j)]
+            kij = lib.einsum('La,Lb->ab', ovL[:,i], ovL[:,j])
+            t2[(i,j)] = -kij / (e_pno[:,None] + e_pno - mo_e[i] - mo_e[j])
+            emp2 += numpy.einsum('ab,ab', t2[(i,j)]*2-t2[(i,j)].T, kij) * (1 + (i!=j))
+        self.emp2 = emp2 + self.e_weak + self.e_pno_corr
+        logger.info(self, 'Init t2, MP2 energy = %.15g', self.emp2)
+        return self.emp2, t1, t2
+
+    energy = energy
+    update_amps = update_amps
+
+    def amplitudes_to_vector(self, t1, t2, out=None):
+        vec = [t1.ravel()] + [t2[ij].ravel() for ij in sorted(t2.keys())]
+        return numpy.hstack(vec)
+
+    def vector_to_amplitudes(self, vec, nmo=None, nocc=None):
+        if nocc is None: nocc = self.nocc
+        if nmo is None: nmo = self.nmo
+        nvir = nmo - nocc
+        t1 = vec[:nocc*nvir].reshape(nocc,nvir)
+        t2 = {}
+        p0 = nocc * nvir
+        for ij in sorted(self.pno_coeff.keys()):
+            npno = self.pno_coeff[ij].shape[1]
+            t2[ij] = vec[p0:p0+npno**2].reshape(npno,npno)
+            p0 += npno**2
+        return t1, t2
+
+    def make_t2(self, t2=None):
+        '''Doubles amplitudes t2[i,j,a,b] in the canonical virtual basis'''
+        if t2 is None: t2 = self.t2
+        nocc = self.nocc
+        nvir = self.nmo - nocc
+        t2full = numpy.zeros((nocc,nocc,nvir,nvir))
+        for (i, j), tij in t2.items():
+            q = self.pno_coeff[(i,j)]
+            t2full[i,j] = reduce(numpy.dot, (q, tij, q.T))
+            t2full[j,i] = t2full[i,j].T
+        return t2full
+
+    def ccsd_t(self, t1=None, t2=None, eris=None):
+        raise NotImplementedError
+
+    def nuc_grad_method(self):
+        raise NotImplementedError
+
+DLPNO_CCSD = DLPNOCCSD
+
+
+if __name__ == '__main__':
+    from pyscf import gto
+    from pyscf import scf
+    from pyscf.cc import dfccsd
+    mol = gto.Mole()
+    mol.verbose = 0
+    mol.atom = [
+        [8 , (0. , 0.     , 0.)],
+        [1 , (0. , -0.757 , 0.587)],
+        [1 , (0. , 0.757  , 0.587)]]
+    mol.basis = 'cc-pvdz'
+    mol.build()
+    mf = scf.RHF(mol).run()
+    e_ref = dfccsd.RCCSD(mf).kernel()[0]
+    mycc = DLPNOCCSD(mf)
+    mycc.kernel()
+    print(mycc.e_corr - e_ref)
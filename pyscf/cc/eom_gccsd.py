@@ -93,6 +93,15 @@ class EOMIP(eom_rccsd.EOMIP):
     get_diag = ipccsd_diag
     ipccsd_star = None
 
+    def gen_matvec(self, imds=None, left=False, **kwargs):
+        if imds is None: imds = self.make_imds()
+        diag = self.get_diag(imds)
+        if left:
+            matvec = lambda xs: [self.l_matvec(x, imds, diag) for x in xs]
+        else:
+            matvec = lambda xs: [self.matvec(x, imds, diag) for x in xs]
+        return matvec, diag
+
     def vector_to_amplitudes(self, vector, nmo=None, nocc=None):
         if nmo is None: nmo = self.nmo
         if nocc is None: nocc = self.nocc
@@ -183,6 +192,15 @@ class EOMEA(eom_rccsd.EOMEA):
     get_diag = eaccsd_diag
     eaccsd_star = None
 
+    def gen_matvec(self, imds=None, left=False, **kwargs):
+        if imds is None: imds = self.make_imds()
+        diag = self.get_diag(imds)
+        if left:
+            matvec = lambda xs: [self.l_matvec(x, imds, diag) for x in xs]
+        else:
+            matvec = lambda xs: [self.matvec(x, imds, diag) for x in xs]
+        return matvec, diag
+
     def vector_to_amplitudes(self, vector, nmo=None, nocc=None):
         if nmo is None: nmo = self.nmo
         if nocc is None: nocc = self.nocc
@@ -169,47 +169,54 @@ def amplitudes_to_vector_ip(r1, r2):
     return vector
 
 def ipccsd_matvec(eom, vector, imds=None, diag=None):
+    '''IP-EOM-CCSD sigma vector.  vector can be a single vector or a 2D array
+    of stacked vectors.  For a block of vectors, each intermediate is loaded
+    and contracted only once for the entire block.
+    '''
     # Ref: Nooijen and Snijders, J. Chem. Phys. 102, 1681 (1995) Eqs.(8)-(9)
     if imds is None: imds = eom.make_imds()
     nocc = eom.nocc
     nmo = eom.nmo
-    r1, r2 = vector_to_amplitudes_ip(vector, nmo, nocc)
+    vector, is_1d = _as_vector_block(vector)
+    r1, r2 = _vector_to_amplitudes_ip_block(vector, nmo, nocc)
 
     # 1h-1h block
-    Hr1 = -np.einsum('ki,k->i', imds.Loo, r1)
+    Hr1 = -lib.einsum('ki,xk->xi', imds.Loo, r1)
     #1h-2h1p block
-    Hr1 += 2*np.einsum('ld,ild->i', imds.Fov, r2)
-    Hr1 +=  -np.einsum('kd,kid->i', imds.Fov, r2)
-    Hr1 += -2*np.einsum('klid,kld->i', imds.Wooov, r2)
-    Hr1 +=    np.einsum('lkid,kld->i', imds.Wooov, r2)
+    Hr1 += 2*lib.einsum('ld,xild->xi', imds.Fov, r2)
+    Hr1 +=  -lib.einsum('kd,xkid->xi', imds.Fov, r2)
+    Hr1 += -2*lib.einsum('klid,xkld->xi', imds.Wooov, r2)
+    Hr1 +=    lib.einsum('lkid,xkld->xi', imds.Wooov, r2)
 
     # 2h1p-1h block
-    Hr2 = -np.einsum('kbij,k->ijb', imds.Wovoo, r1)
+    Hr2 = -lib.einsum('kbij,xk->xijb', imds.Wovoo, r1)
     # 2h1p-2h1p block
     if eom.partition == 'mp':
         fock = imds.eris.fock
         foo = fock[:nocc,:nocc]
         fvv = fock[nocc:,nocc:]
-        Hr2 += lib.einsum('bd,ijd->ijb', fvv, r2)
-        Hr2 += -lib.einsum('ki,kjb->ijb', foo, r2)
-        Hr2 += -lib.einsum('lj,ilb->ijb', foo, r2)
+        Hr2 += lib.einsum('bd,xijd->xijb', fvv, r2)
+        Hr2 += -lib.einsum('ki,xkjb->xijb', foo, r2)
+        Hr2 += -lib.einsum('lj,xilb->xijb', foo, r2)
     elif eom.partition == 'full':
         diag_matrix2 = vector_to_amplitudes_ip(diag, nmo, nocc)[1]
         Hr2 += diag_matrix2 * r2
     else:
-        Hr2 += lib.einsum('bd,ijd->ijb', imds.Lvv, r2)
-        Hr2 += -lib.einsum('ki,kjb->ijb', imds.Loo, r2)
-        Hr2 += -lib.einsum('lj,ilb->ijb', imds.Loo, r2)
-        Hr2 +=  lib.einsum('klij,klb->ijb', imds.Woooo, r2)
-        Hr2 += 2*lib.einsum('lbdj,ild->ijb', imds.Wovvo, r2)
-        Hr2 +=  -lib.einsum('kbdj,kid->ijb', imds.Wovvo, r2)
-        Hr2 +=  -lib.einsum('lbjd,ild->ijb', imds.Wovov, r2) #typo in Ref
-        Hr2 +=  -lib.einsum('kbid,kjd->ijb', imds.Wovov, r2)
-        tmp = 2*np.einsum('lkdc,kld->c', imds.Woovv, r2)
-        tmp += -np.einsum('kldc,kld->c', imds.Woovv, r2)
-        Hr2 += -np.einsum('c,ijcb->ijb', tmp, imds.t2)
-
-    vector = amplitudes_to_vector_ip(Hr1, Hr2)
+        Hr2 += lib.einsum('bd,xijd->xijb', imds.Lvv, r2)
+        Hr2 += -lib.einsum('ki,xkjb->xijb', imds.Loo, r2)
+        Hr2 += -lib.einsum('lj,xilb->xijb', imds.Loo, r2)
+        Hr2 +=  lib.einsum('klij,xklb->xijb', imds.Woooo, r2)
+        Hr2 += 2*lib.einsum('lbdj,xild->xijb', imds.Wovvo, r2)
+        Hr2 +=  -lib.einsum('kbdj,xkid->xijb', imds.Wovvo, r2)
+        Hr2 +=  -lib.einsum('lbjd,xild->xijb', imds.Wovov, r2) #typo in Ref
+        Hr2 +=  -lib.einsum('kbid,xkjd->xijb', imds.Wovov, r2)
+        tmp = 2*lib.einsum('lkdc,xkld->xc', imds.Woovv, r2)
+        tmp += -lib.einsum('kldc,xkld->xc', imds.Woovv, r2)
+        Hr2 += -lib.einsum('xc,ijcb->xijb', tmp, imds.t2)
+
+    vector = _amplitudes_to_vector_block(Hr1, Hr2)
+    if is_1d:
+        vector = vector[0]
     return vector
 
 def lipccsd_matvec(eom, vector, imds=None, diag=None):
@@ -221,40 +228,43 @@ def lipccsd_matvec(eom, vector, imds=None, diag=None):
     if imds is None: imds = eom.make_imds()
     nocc = eom.nocc
     nmo = eom.nmo
-    r1, r2 = vector_to_amplitudes_ip(vector, nmo, nocc)
+    vector, is_1d = _as_vector_block(vector)
+    r1, r2 = _vector_to_amplitudes_ip_block(vector, nmo, nocc)
 
     # 1h-1h block
-    Hr1 = -np.einsum('ki,i->k', imds.Loo, r1)
+    Hr1 = -lib.einsum('ki,xi->xk', imds.Loo, r1)
     #1h-2h1p block
-    Hr1 += -np.einsum('kbij,ijb->k', imds.Wovoo, r2)
+    Hr1 += -lib.einsum('kbij,xijb->xk', imds.Wovoo, r2)
 
     # 2h1p-1h block
-    Hr2 = -np.einsum('kd,l->kld', imds.Fov, r1)
-    Hr2 += 2.*np.einsum('ld,k->kld', imds.Fov, r1)
-    Hr2 += -np.einsum('klid,i->kld', 2.*imds.Wooov-imds.Wooov.transpose(1,0,2,3), r1)
+    Hr2 = -lib.einsum('kd,xl->xkld', imds.Fov, r1)
+    Hr2 += 2.*lib.einsum('ld,xk->xkld', imds.Fov, r1)
+    Hr2 += -lib.einsum('klid,xi->xkld', 2.*imds.Wooov-imds.Wooov.transpose(1,0,2,3), r1)
     # 2h1p-2h1p block
     if eom.partition == 'mp':
         fock = imds.eris.fock
         foo = fock[:nocc,:nocc]
         fvv = fock[nocc:,nocc:]
-        Hr2 += lib.einsum('bd,klb->kld', fvv, r2)
-        Hr2 += -lib.einsum('ki,ild->kld', foo, r2)
-        Hr2 += -lib.einsum('lj,kjd->kld', foo, r2)
+        Hr2 += lib.einsum('bd,xklb->xkld', fvv, r2)
+        Hr2 += -lib.einsum('ki,xild->xkld', foo, r2)
+        Hr2 += -lib.einsum('lj,xkjd->xkld', foo, r2)
     elif eom.partition == 'full':
         diag_matrix2 = vector_to_amplitudes_ip(diag, nmo, nocc)[1]
         Hr2 += diag_matrix2 * r2
     else:
-        Hr2 += lib.einsum('bd,klb->kld', imds.Lvv, r2)
-        Hr2 += -lib.einsum('ki,ild->kld', imds.Loo, r2)
-        Hr2 += -lib.einsum('lj,kjd->kld', imds.Loo, r2)
-        Hr2 += lib.einsum('lbdj,kjb->kld', 2.*imds.Wovvo-imds.Wovov.transpose(0,1,3,2), r2)
-        Hr2 += -lib.einsum('kbdj,ljb->kld', imds.Wovvo, r2)
-        Hr2 += lib.einsum('klij,ijd->kld', imds.Woooo, r2)
-        Hr2 += -lib.einsum('kbid,ilb->kld', imds.Wovov, r2)
-        tmp = np.einsum('ijcb,ijb->c', imds.t2, r2)
-        Hr2 += -np.einsum('lkdc,c->kld', 2.*imds.Woovv-imds.Woovv.transpose(1,0,2,3), tmp)
-
-    vector = amplitudes_to_vector_ip(Hr1, Hr2)
+        Hr2 += lib.einsum('bd,xklb->xkld', imds.Lvv, r2)
+        Hr2 += -lib.einsum('ki,xild->xkld', imds.Loo, r2)
+        Hr2 += -lib.einsum('lj,xkjd->xkld', imds.Loo, r2)
+        Hr2 += lib.einsum('lbdj,xkjb->xkld', 2.*imds.Wovvo-imds.Wovov.transpose(0,1,3,2), r2)
+        Hr2 += -lib.einsum('kbdj,xljb->xkld', imds.Wovvo, r2)
+        Hr2 += lib.einsum('klij,xijd->xkld', imds.Woooo, r2)
+        Hr2 += -lib.einsum('kbid,xilb->xkld', imds.Wovov, r2)
+        tmp = lib.einsum('ijcb,xijb->xc', imds.t2, r2)
+        Hr2 += -lib.einsum('lkdc,xc->xkld', 2.*imds.Woovv-imds.Woovv.transpose(1,0,2,3), tmp)
+
+    vector = _amplitudes_to_vector_block(Hr1, Hr2)
+    if is_1d:
+        vector = vector[0]
     return vector
 
 def ipccsd_diag(eom, imds=None):
@@ -391,9 +401,9 @@ class EOMIP(EOM):
         if imds is None: imds = self.make_imds()
         diag = self.get_diag(imds)
         if left:
-            matvec = lambda xs: [self.l_matvec(x, imds, diag) for x in xs]
+            matvec = lambda xs: list(self.l_matvec(xs, imds, diag))
         else:
-            matvec = lambda xs: [self.matvec(x, imds, diag) for x in xs]
+            matvec = lambda xs: list(self.matvec(xs, imds, diag))
         return matvec, diag
 
     def vector_to_amplitudes(self, vector, nmo=None, nocc=None):
@@ -443,47 +453,54 @@ def amplitudes_to_vector_ea(r1, r2):
     return vector
 
 def eaccsd_matvec(eom, vector, imds=None, diag=None):
+    '''EA-EOM-CCSD sigma vector.  vector can be a single vector or a 2D array
+    of stacked vectors.  For a block of vectors, each intermediate (including
+    Wvvvv) is loaded and contracted only once for the entire block.
+    '''
     # Ref: Nooijen and Bartlett, J. Chem. Phys. 102, 3629 (1994) Eqs.(30)-(31)
     if imds is None: imds = eom.make_imds()
     nocc = eom.nocc
     nmo = eom.nmo
     nvir = nmo - nocc
-    r1, r2 = vector_to_amplitudes_ea(vector, nmo, nocc)
+    vector, is_1d = _as_vector_block(vector)
+    r1, r2 = _vector_to_amplitudes_ea_block(vector, nmo, nocc)
 
     # Eq. (30)
     # 1p-1p block
-    Hr1 =  np.einsum('ac,c->a', imds.Lvv, r1)
+    Hr1 =  lib.einsum('ac,xc->xa', imds.Lvv, r1)
     # 1p-2p1h block
-    Hr1 += np.einsum('ld,lad->a', 2.*imds.Fov, r2)
-    Hr1 += np.einsum('ld,lda->a',   -imds.Fov, r2)
-    Hr1 += np.einsum('alcd,lcd->a', 2.*imds.Wvovv-imds.Wvovv.transpose(0,1,3,2), r2)
+    Hr1 += lib.einsum('ld,xlad->xa', 2.*imds.Fov, r2)
+    Hr1 += lib.einsum('ld,xlda->xa',   -imds.Fov, r2)
+    Hr1 += lib.einsum('alcd,xlcd->xa', 2.*imds.Wvovv-imds.Wvovv.transpose(0,1,3,2), r2)
     # Eq. (31)
     # 2p1h-1p block
-    Hr2 = np.einsum('abcj,c->jab', imds.Wvvvo, r1)
+    Hr2 = lib.einsum('abcj,xc->xjab', imds.Wvvvo, r1)
     # 2p1h-2p1h block
     if eom.partition == 'mp':
         fock = imds.eris.fock
         foo = fock[:nocc,:nocc]
         fvv = fock[nocc:,nocc:]
-        Hr2 +=  lib.einsum('ac,jcb->jab', fvv, r2)
-        Hr2 +=  lib.einsum('bd,jad->jab', fvv, r2)
-        Hr2 += -lib.einsum('lj,lab->jab', foo, r2)
+        Hr2 +=  lib.einsum('ac,xjcb->xjab', fvv, r2)
+        Hr2 +=  lib.einsum('bd,xjad->xjab', fvv, r2)
+        Hr2 += -lib.einsum('lj,xlab->xjab', foo, r2)
     elif eom.partition == 'full':
         diag_matrix2 = vector_to_amplitudes_ea(diag, nmo, nocc)[1]
         Hr2 += diag_matrix2 * r2
     else:
-        Hr2 +=  lib.einsum('ac,jcb->jab', imds.Lvv, r2)
-        Hr2 +=  lib.einsum('bd,jad->jab', imds.Lvv, r2)
-        Hr2 += -lib.einsum('lj,lab->jab', imds.Loo, r2)
-        Hr2 += lib.einsum('lbdj,lad->jab', 2.*imds.Wovvo-imds.Wovov.transpose(0,1,3,2), r2)
-        Hr2 += -lib.einsum('lajc,lcb->jab', imds.Wovov, r2)
-        Hr2 += -lib.einsum('lbcj,lca->jab', imds.Wovvo, r2)
-        for a in range(nvir):
-            Hr2[:,a,:] += lib.einsum('bcd,jcd->jb', imds.Wvvvv[a], r2)
-        tmp = np.einsum('klcd,lcd->k', 2.*imds.Woovv-imds.Woovv.transpose(0,1,3,2), r2)
-        Hr2 += -np.einsum('k,kjab->jab', tmp, imds.t2)
-
-    vector = amplitudes_to_vector_ea(Hr1,Hr2)
+        Hr2 +=  lib.einsum('ac,xjcb->xjab', imds.Lvv, r2)
+        Hr2 +=  lib.einsum('bd,xjad->xjab', imds.Lvv, r2)
+        Hr2 += -lib.einsum('lj,xlab->xjab', imds.Loo, r2)
+        Hr2 += lib.einsum('lbdj,xlad->xjab', 2.*imds.Wovvo-imds.Wovov.transpose(0,1,3,2), r2)
+        Hr2 += -lib.einsum('lajc,xlcb->xjab', imds.Wovov, r2)
+        Hr2 += -lib.einsum('lbcj,xlca->xjab', imds.Wovvo, r2)
+        for p0, p1, Wvvvv in _iter_Wvvvv(imds):
+            Hr2[:,:,p0:p1] += lib.einsum('abcd,xjcd->xjab', Wvvvv, r2)
+        tmp = lib.einsum('klcd,xlcd->xk', 2.*imds.Woovv-imds.Woovv.transpose(0,1,3,2), r2)
+        Hr2 += -lib.einsum('xk,kjab->xjab', tmp, imds.t2)
+
+    vector = _amplitudes_to_vector_block(Hr1, Hr2)
+    if is_1d:
+        vector = vector[0]
     return vector
 
 def leaccsd_matvec(eom, vector, imds=None, diag=None):
@@ -495,42 +512,45 @@ def leaccsd_matvec(eom, vector, imds=None, diag=None):
     nocc = eom.nocc
     nmo = eom.nmo
     nvir = nmo - nocc
-    r1, r2 = vector_to_amplitudes_ea(vector, nmo, nocc)
+    vector, is_1d = _as_vector_block(vector)
+    r1, r2 = _vector_to_amplitudes_ea_block(vector, nmo, nocc)
 
     # Eq. (30)
     # 1p-1p block
-    Hr1 = np.einsum('ac,a->c', imds.Lvv, r1)
+    Hr1 = lib.einsum('ac,xa->xc', imds.Lvv, r1)
     # 1p-2p1h block
-    Hr1 += np.einsum('abcj,jab->c', imds.Wvvvo, r2)
+    Hr1 += lib.einsum('abcj,xjab->xc', imds.Wvvvo, r2)
     # Eq. (31)
     # 2p1h-1p block
-    Hr2 = 2.*np.einsum('c,ld->lcd', r1, imds.Fov)
-    Hr2 +=  -np.einsum('d,lc->lcd', r1, imds.Fov)
-    Hr2 += np.einsum('a,alcd->lcd', r1, 2.*imds.Wvovv-imds.Wvovv.transpose(0,1,3,2))
+    Hr2 = 2.*lib.einsum('xc,ld->xlcd', r1, imds.Fov)
+    Hr2 +=  -lib.einsum('xd,lc->xlcd', r1, imds.Fov)
+    Hr2 += lib.einsum('xa,alcd->xlcd', r1, 2.*imds.Wvovv-imds.Wvovv.transpose(0,1,3,2))
     # 2p1h-2p1h block
     if eom.partition == 'mp':
         fock = imds.eris.fock
         foo = fock[:nocc,:nocc]
         fvv = fock[nocc:,nocc:]
-        Hr2 += lib.einsum('lad,ac->lcd', r2, fvv)
-        Hr2 += lib.einsum('lcb,bd->lcd', r2, fvv)
-        Hr2 += -lib.einsum('jcd,lj->lcd', r2, foo)
+        Hr2 += lib.einsum('xlad,ac->xlcd', r2, fvv)
+        Hr2 += lib.einsum('xlcb,bd->xlcd', r2, fvv)
+        Hr2 += -lib.einsum('xjcd,lj->xlcd', r2, foo)
     elif eom.partition == 'full':
         diag_matrix2 = vector_to_amplitudes_ea(diag, nmo, nocc)[1]
         Hr2 += diag_matrix2 * r2
     else:
-        Hr2 += lib.einsum('lad,ac->lcd', r2, imds.Lvv)
-        Hr2 += lib.einsum('lcb,bd->lcd', r2, imds.Lvv)
-        Hr2 += -lib.einsum('jcd,lj->lcd', r2, imds.Loo)
-        Hr2 += lib.einsum('jcb,lbdj->lcd', r2, 2.*imds.Wovvo-imds.Wovov.transpose(0,1,3,2))
-        Hr2 += -lib.einsum('lajc,jab->lcb', imds.Wovov, r2)
-        Hr2 += -lib.einsum('lbcj,jab->lca', imds.Wovvo, r2)
-        for a in range(nvir):
-            Hr2 += lib.einsum('lb,bcd->lcd', r2[:,a,:], imds.Wvvvv[a])
-        tmp = np.einsum('ijcb,ibc->j', imds.t2, r2)
-        Hr2 += -np.einsum('kjfe,j->kef', 2.*imds.Woovv-imds.Woovv.transpose(0,1,3,2),tmp)
-
-    vector = amplitudes_to_vector_ea(Hr1,Hr2)
+        Hr2 += lib.einsum('xlad,ac->xlcd', r2, imds.Lvv)
+        Hr2 += lib.einsum('xlcb,bd->xlcd', r2, imds.Lvv)
+        Hr2 += -lib.einsum('xjcd,lj->xlcd', r2, imds.Loo)
+        Hr2 += lib.einsum('xjcb,lbdj->xlcd', r2, 2.*imds.Wovvo-imds.Wovov.transpose(0,1,3,2))
+        Hr2 += -lib.einsum('lajc,xjab->xlcb', imds.Wovov, r2)
+        Hr2 += -lib.einsum('lbcj,xjab->xlca', imds.Wovvo, r2)
+        for p0, p1, Wvvvv in _iter_Wvvvv(imds):
+            Hr2 += lib.einsum('xlab,abcd->xlcd', r2[:,:,p0:p1], Wvvvv)
+        tmp = lib.einsum('ijcb,xibc->xj', imds.t2, r2)
+        Hr2 += -lib.einsum('kjfe,xj->xkef', 2.*imds.Woovv-imds.Woovv.transpose(0,1,3,2),tmp)
+
+    vector = _amplitudes_to_vector_block(Hr1, Hr2)
+    if is_1d:
+        vector = vector[0]
     return vector
 
 def eaccsd_diag(eom, imds=None):
@@ -545,9 +565,12 @@ def eaccsd_diag(eom, imds=None):
 
     Hr1 = np.diag(imds.Lvv)
     Hr2 = np.zeros((nocc,nvir,nvir), dtype)
+    if eom.partition != 'mp':
+        Wvvvv_diag = np.empty((nvir,nvir), dtype)
+        for p0, p1, Wvvvv in _iter_Wvvvv(imds):
+            for a in range(p0, p1):
+                Wvvvv_diag[a] = Wvvvv[a-p0,:,a].diagonal()
     for a in range(nvir):
-        if eom.partition != 'mp':
-            _Wvvvva = np.array(imds.Wvvvv[a])
         for b in range(nvir):
             for j in range(nocc):
                 if eom.partition == 'mp':
@@ -562,7 +585,7 @@ def eaccsd_diag(eom, imds=None):
                     Hr2[j,a,b] += -imds.Wovov[j,b,j,b]
                     Hr2[j,a,b] += -imds.Wovov[j,a,j,a]
                     Hr2[j,a,b] += -imds.Wovvo[j,b,b,j]*(a==b)
-                    Hr2[j,a,b] += _Wvvvva[b,a,b]
+                    Hr2[j,a,b] += Wvvvv_diag[a,b]
                     Hr2[j,a,b] += -2*np.dot(imds.Woovv[:,j,a,b], t2[:,j,a,b])
                     Hr2[j,a,b] += np.dot(imds.Woovv[:,j,b,a], t2[:,j,a,b])
 
@@ -671,9 +694,9 @@ class EOMEA(EOM):
         if imds is None: imds = self.make_imds()
         diag = self.get_diag(imds)
         if left:
-            matvec = lambda xs: [self.l_matvec(x, imds, diag) for x in xs]
+            matvec = lambda xs: list(self.l_matvec(xs, imds, diag))
         else:
-            matvec = lambda xs: [self.matvec(x, imds, diag) for x in xs]
+            matvec = lambda xs: list(self.matvec(xs, imds, diag))
         return matvec, diag
 
     def vector_to_amplitudes(self, vector, nmo=None, nocc=None):
@@ -881,167 +904,187 @@ def vector_to_amplitudes_triplet(vector, nmo, nocc):
     return t1, (t2aa, t2ab)
 
 def eeccsd_matvec_singlet(eom, vector, imds=None):
+    '''EOM-EE-CCSD singlet sigma vector.  vector can be a single vector or a
+    2D array of stacked vectors.  For a block of vectors, the integrals and
+    intermediates (vvvv, ovvv, ovov, ...) are loaded only once.
+    '''
     if imds is None: imds = eom.make_imds()
     nocc = eom.nocc
     nmo = eom.nmo
     nvir = nmo - nocc
 
-    r1, r2 = vector_to_amplitudes_singlet(vector, nmo, nocc)
+    vector, is_1d = _as_vector_block(vector)
+    amps = [vector_to_amplitudes_singlet(v, nmo, nocc) for v in vector]
+    r1 = np.asarray([x[0] for x in amps])
+    r2 = np.asarray([x[1] for x in amps])
+    amps = None
     t1, t2, eris = imds.t1, imds.t2, imds.eris
     nocc, nvir = t1.shape
+    nvec = vector.shape[0]
 
-    rho = r2*2 - r2.transpose(0,1,3,2)
-    Hr1  = lib.einsum('ae,ie->ia', imds.Fvv, r1)
-    Hr1 -= lib.einsum('mi,ma->ia', imds.Foo, r1)
-    Hr1 += np.einsum('me,imae->ia',imds.Fov, rho)
+    rho = r2*2 - r2.transpose(0,1,2,4,3)
+    Hr1  = lib.einsum('ae,xie->xia', imds.Fvv, r1)
+    Hr1 -= lib.einsum('mi,xma->xia', imds.Foo, r1)
+    Hr1 += lib.einsum('me,ximae->xia',imds.Fov, rho)
 
     #:eris_vvvv = ao2mo.restore(1,np.asarray(eris.vvvv), t1.shape[1])
     #:Hr2 += lib.einsum('ijef,aebf->ijab', tau2, eris_vvvv) * .5
-    tau2 = _make_tau(r2, r1, t1, fac=2)
-    Hr2 = eom._cc._add_vvvv(None, tau2, eris, with_ovvv=False, t2sym='jiba')
+    tau2 = _make_tau_block(r2, r1, t1, fac=2)
+    Hr2 = _add_vvvv_block(eom, tau2, eris, t2sym='jiba')
     Hr2 *= .5
 
-    Hr2 += lib.einsum('mnij,mnab->ijab', imds.woOoO, r2) * .5
-    Hr2 += lib.einsum('be,ijae->ijab', imds.Fvv   , r2)
-    Hr2 -= lib.einsum('mj,imab->ijab', imds.Foo   , r2)
+    Hr2 += lib.einsum('mnij,xmnab->xijab', imds.woOoO, r2) * .5
+    Hr2 += lib.einsum('be,xijae->xijab', imds.Fvv   , r2)
+    Hr2 -= lib.einsum('mj,ximab->xijab', imds.Foo   , r2)
 
     mem_now = lib.current_memory()[0]
     max_memory = max(0, lib.param.MAX_MEMORY - mem_now)
-    blksize = min(nocc, max(ccsd.BLKMIN, int(max_memory*1e6/8/(nvir**3*3))))
+    blksize = min(nocc, max(ccsd.BLKMIN, int(max_memory*1e6/8/(nvir**3*3+nvec*nocc**2*nvir))))
     for p0,p1 in lib.prange(0, nocc, blksize):
         ovvv = eris.get_ovvv(slice(p0,p1))  # ovvv = eris.ovvv[p0:p1]
-        Hr1 += lib.einsum('mfae,imef->ia', ovvv, rho[:,p0:p1])
-        tmp = lib.einsum('meaf,ijef->maij', ovvv, tau2)
-        Hr2 -= lib.einsum('ma,mbij->ijab', t1[p0:p1], tmp)
-        tmp  = lib.einsum('meaf,me->af', ovvv, r1[p0:p1]) * 2
-        tmp -= lib.einsum('mfae,me->af', ovvv, r1[p0:p1])
-        Hr2 += lib.einsum('af,ijfb->ijab', tmp, t2)
+        Hr1 += lib.einsum('mfae,ximef->xia', ovvv, rho[:,:,p0:p1])
+        tmp = lib.einsum('meaf,xijef->xmaij', ovvv, tau2)
+        Hr2 -= lib.einsum('ma,xmbij->xijab', t1[p0:p1], tmp)
+        tmp  = lib.einsum('meaf,xme->xaf', ovvv, r1[:,p0:p1]) * 2
+        tmp -= lib.einsum('mfae,xme->xaf', ovvv, r1[:,p0:p1])
+        Hr2 += lib.einsum('xaf,ijfb->xijab', tmp, t2)
         ovvv = tmp = None
-    Hr2 -= lib.einsum('mbij,ma->ijab', imds.woVoO, r1)
+    Hr2 -= lib.einsum('mbij,xma->xijab', imds.woVoO, r1)
 
-    Hr1-= lib.einsum('mnie,mnae->ia', imds.woOoV, rho)
-    tmp = lib.einsum('nmie,me->ni', imds.woOoV, r1) * 2
-    tmp-= lib.einsum('mnie,me->ni', imds.woOoV, r1)
-    Hr2 -= lib.einsum('ni,njab->ijab', tmp, t2)
+    Hr1-= lib.einsum('mnie,xmnae->xia', imds.woOoV, rho)
+    tmp = lib.einsum('nmie,xme->xni', imds.woOoV, r1) * 2
+    tmp-= lib.einsum('mnie,xme->xni', imds.woOoV, r1)
+    Hr2 -= lib.einsum('xni,njab->xijab', tmp, t2)
     tmp = None
     for p0, p1 in lib.prange(0, nvir, nocc):
-        Hr2 += lib.einsum('ejab,ie->ijab', np.asarray(imds.wvOvV[p0:p1]), r1[:,p0:p1])
+        Hr2 += lib.einsum('ejab,xie->xijab', np.asarray(imds.wvOvV[p0:p1]), r1[:,:,p0:p1])
 
     oVVo = np.asarray(imds.woVVo)
-    tmp = lib.einsum('mbej,imea->jiab', oVVo, r2)
+    tmp = lib.einsum('mbej,ximea->xjiab', oVVo, r2)
     Hr2 += tmp
-    Hr2 += tmp.transpose(0,1,3,2) * .5
+    Hr2 += tmp.transpose(0,1,2,4,3) * .5
     oVvO = np.asarray(imds.woVvO) + oVVo * .5
     oVVo = tmp = None
-    Hr1 += np.einsum('maei,me->ia', oVvO, r1) * 2
-    Hr2 += lib.einsum('mbej,imae->ijab', oVvO, rho)
+    Hr1 += lib.einsum('maei,xme->xia', oVvO, r1) * 2
+    Hr2 += lib.einsum('mbej,ximae->xijab', oVvO, rho)
     oVvO = None
 
     eris_ovov = np.asarray(eris.ovov)
-    tau2 = _make_tau(r2, r1, t1, fac=2)
-    tmp = lib.einsum('menf,ijef->mnij', eris_ovov, tau2)
+    tau2 = _make_tau_block(r2, r1, t1, fac=2)
+    tmp = lib.einsum('menf,xijef->xmnij', eris_ovov, tau2)
     tau2 = None
     tau = _make_tau(t2, t1, t1)
-    Hr2 += lib.einsum('mnij,mnab->ijab', tmp, tau) * .5
+    Hr2 += lib.einsum('xmnij,mnab->xijab', tmp, tau) * .5
     tau = tmp = None
 
-    tmp = lib.einsum('nemf,imef->ni', eris_ovov, rho)
-    Hr1 -= lib.einsum('na,ni->ia', t1, tmp)
-    Hr2 -= lib.einsum('mj,miab->ijba', tmp, t2)
+    tmp = lib.einsum('nemf,ximef->xni', eris_ovov, rho)
+    Hr1 -= lib.einsum('na,xni->xia', t1, tmp)
+    Hr2 -= lib.einsum('xmj,miab->xijba', tmp, t2)
     tmp = None
 
-    tmp  = np.einsum('mfne,mf->en', eris_ovov, r1) * 2
-    tmp -= np.einsum('menf,mf->en', eris_ovov, r1)
-    tmp  = np.einsum('en,nb->eb', tmp, t1)
-    tmp += lib.einsum('menf,mnbf->eb', eris_ovov, rho)
-    Hr2 -= lib.einsum('eb,ijea->jiab', tmp, t2)
+    tmp  = lib.einsum('mfne,xmf->xen', eris_ovov, r1) * 2
+    tmp -= lib.einsum('menf,xmf->xen', eris_ovov, r1)
+    tmp  = lib.einsum('xen,nb->xeb', tmp, t1)
+    tmp += lib.einsum('menf,xmnbf->xeb', eris_ovov, rho)
+    Hr2 -= lib.einsum('xeb,ijea->xjiab', tmp, t2)
     tmp = eris_ovov = rho = None
 
-    Hr2 = Hr2 + Hr2.transpose(1,0,3,2)
-    vector = amplitudes_to_vector_ee(Hr1, Hr2)
+    Hr2 = Hr2 + Hr2.transpose(0,2,1,4,3)
+    vector = np.asarray([amplitudes_to_vector_ee(Hr1[k], Hr2[k])
+                         for k in range(nvec)])
+    if is_1d:
+        vector = vector[0]
     return vector
 
 def eeccsd_matvec_triplet(eom, vector, imds=None):
+    '''EOM-EE-CCSD triplet sigma vector for a single vector or a 2D array of
+    stacked vectors.  See also eeccsd_matvec_singlet.
+    '''
     if imds is None: imds = eom.make_imds()
     nocc = eom.nocc
     nmo = eom.nmo
     nvir = nmo - nocc
 
-    r1, r2 = vector_to_amplitudes_triplet(vector, nmo, nocc)
-    r2aa, r2ab = r2
+    vector, is_1d = _as_vector_block(vector)
+    amps = [vector_to_amplitudes_triplet(v, nmo, nocc) for v in vector]
+    r1 = np.asarray([x[0] for x in amps])
+    r2aa = np.asarray([x[1][0] for x in amps])
+    r2ab = np.asarray([x[1][1] for x in amps])
+    amps = None
     t1, t2, eris = imds.t1, imds.t2, imds.eris
     nocc, nvir = t1.shape
+    nvec = vector.shape[0]
 
     theta = r2aa + r2ab
 
-    Hr1  = lib.einsum('ae,ie->ia', imds.Fvv, r1)
-    Hr1 -= lib.einsum('mi,ma->ia', imds.Foo, r1)
-    Hr1 += np.einsum('me,imae->ia',imds.Fov, r2aa)
-    Hr1 += np.einsum('ME,iMaE->ia',imds.Fov, r2ab)
+    Hr1  = lib.einsum('ae,xie->xia', imds.Fvv, r1)
+    Hr1 -= lib.einsum('mi,xma->xia', imds.Foo, r1)
+    Hr1 += lib.einsum('me,ximae->xia',imds.Fov, r2aa)
+    Hr1 += lib.einsum('ME,xiMaE->xia',imds.Fov, r2ab)
 
-    Hr2aa = lib.einsum('mnij,mnab->ijab', imds.woOoO, r2aa) * .25
-    Hr2ab = lib.einsum('mNiJ,mNaB->iJaB', imds.woOoO, r2ab) * .5
-    Hr2aa+= lib.einsum('be,ijae->ijab', imds.Fvv*.5, r2aa)
-    Hr2aa-= lib.einsum('mj,imab->ijab', imds.Foo*.5, r2aa)
-    Hr2ab+= lib.einsum('BE,iJaE->iJaB', imds.Fvv, r2ab)
-    Hr2ab-= lib.einsum('MJ,iMaB->iJaB', imds.Foo, r2ab)
+    Hr2aa = lib.einsum('mnij,xmnab->xijab', imds.woOoO, r2aa) * .25
+    Hr2ab = lib.einsum('mNiJ,xmNaB->xiJaB', imds.woOoO, r2ab) * .5
+    Hr2aa+= lib.einsum('be,xijae->xijab', imds.Fvv*.5, r2aa)
+    Hr2aa-= lib.einsum('mj,ximab->xijab', imds.Foo*.5, r2aa)
+    Hr2ab+= lib.einsum('BE,xiJaE->xiJaB', imds.Fvv, r2ab)
+    Hr2ab-= lib.einsum('MJ,xiMaB->xiJaB', imds.Foo, r2ab)
 
-    tau2ab = np.einsum('ia,jb->ijab', r1, t1)
-    tau2ab-= np.einsum('ia,jb->ijab', t1, r1)
+    tau2ab = np.einsum('xia,jb->xijab', r1, t1)
+    tau2ab-= np.einsum('ia,xjb->xijab', t1, r1)
     tau2ab+= r2ab
-    tau2aa = np.einsum('ia,jb->ijab', r1, t1)
-    tau2aa-= np.einsum('ia,jb->jiab', r1, t1)
-    tau2aa = tau2aa - tau2aa.transpose(0,1,3,2)
+    tau2aa = np.einsum('xia,jb->xijab', r1, t1)
+    tau2aa-= np.einsum('xia,jb->xjiab', r1, t1)
+    tau2aa = tau2aa - tau2aa.transpose(0,1,2,4,3)
     tau2aa+= r2aa
 
     mem_now = lib.current_memory()[0]
     max_memory = max(0, lib.param.MAX_MEMORY - mem_now)
-    blksize = min(nocc, max(ccsd.BLKMIN, int(max_memory*1e6/8/(nvir**3*3))))
-    tmp1 = np.zeros((nvir,nvir), dtype=r1.dtype)
+    blksize = min(nocc, max(ccsd.BLKMIN, int(max_memory*1e6/8/(nvir**3*3+nvec*nocc**2*nvir*2))))
+    tmp1 = np.zeros((nvec,nvir,nvir), dtype=r1.dtype)
     for p0,p1 in lib.prange(0, nocc, blksize):
         ovvv = eris.get_ovvv(slice(p0,p1))  # ovvv = eris.ovvv[p0:p1]
-        Hr1 += lib.einsum('mfae,imef->ia', ovvv, theta[:,p0:p1])
-        tmpaa = lib.einsum('meaf,ijef->maij', ovvv, tau2aa)
-        tmpab = lib.einsum('meAF,iJeF->mAiJ', ovvv, tau2ab)
-        tmp1 += lib.einsum('mfae,me->af', ovvv, r1[p0:p1])
-        Hr2aa+= lib.einsum('mb,maij->ijab', t1[p0:p1]*.5, tmpaa)
-        Hr2ab-= lib.einsum('mb,mAiJ->iJbA', t1[p0:p1], tmpab)
+        Hr1 += lib.einsum('mfae,ximef->xia', ovvv, theta[:,:,p0:p1])
+        tmpaa = lib.einsum('meaf,xijef->xmaij', ovvv, tau2aa)
+        tmpab = lib.einsum('meAF,xiJeF->xmAiJ', ovvv, tau2ab)
+        tmp1 += lib.einsum('mfae,xme->xaf', ovvv, r1[:,p0:p1])
+        Hr2aa+= lib.einsum('mb,xmaij->xijab', t1[p0:p1]*.5, tmpaa)
+        Hr2ab-= lib.einsum('mb,xmAiJ->xiJbA', t1[p0:p1], tmpab)
         ovvv = tmpaa = tmpab = None
-    tmpa = lib.einsum('mnie,me->ni', imds.woOoV, r1)
-    tmp  = lib.einsum('ni,njab->ijab', tmpa, t2)
-    tmp -= lib.einsum('af,ijfb->ijab', tmp1, t2)
-    tmp -= lib.einsum('mbij,ma->ijab', imds.woVoO, r1)
+    tmpa = lib.einsum('mnie,xme->xni', imds.woOoV, r1)
+    tmp  = lib.einsum('xni,njab->xijab', tmpa, t2)
+    tmp -= lib.einsum('xaf,ijfb->xijab', tmp1, t2)
+    tmp -= lib.einsum('mbij,xma->xijab', imds.woVoO, r1)
     for p0,p1 in lib.prange(0, nvir, nocc):
-        tmp += lib.einsum('ejab,ie->ijab', np.asarray(imds.wvOvV[p0:p1]), r1[:,p0:p1])
+        tmp += lib.einsum('ejab,xie->xijab', np.asarray(imds.wvOvV[p0:p1]), r1[:,:,p0:p1])
 
     oVVo = np.asarray(imds.woVVo)
-    Hr1 += np.einsum('maei,me->ia',imds.woVVo, r1)
-    Hr2aa+= lib.einsum('mbej,imae->ijba', oVVo, r2ab)
-    Hr2ab+= lib.einsum('MBEJ,iMEa->iJaB', oVVo, r2aa)
-    Hr2ab+= lib.einsum('MbeJ,iMeA->iJbA', oVVo, r2ab)
+    Hr1 += lib.einsum('maei,xme->xia', oVVo, r1)
+    Hr2aa+= lib.einsum('mbej,ximae->xijba', oVVo, r2ab)
+    Hr2ab+= lib.einsum('MBEJ,xiMEa->xiJaB', oVVo, r2aa)
+    Hr2ab+= lib.einsum('MbeJ,xiMeA->xiJbA', oVVo, r2ab)
     oVVo += np.asarray(imds.woVvO)
-    tmp += lib.einsum('mbej,imae->ijab', oVVo, theta)
+    tmp += lib.einsum('mbej,ximae->xijab', oVVo, theta)
     oVVo = None
-    Hr1-= lib.einsum('mnie,mnae->ia', imds.woOoV, theta)
+    Hr1-= lib.einsum('mnie,xmnae->xia', imds.woOoV, theta)
     Hr2aa+= tmp
     Hr2ab+= tmp
     tmp = None
 
     eris_ovov = np.asarray(eris.ovov)
     tau = _make_tau(t2, t1, t1)
-    tmpaa = lib.einsum('menf,ijef->mnij', eris_ovov, tau2aa)
-    tmpab = lib.einsum('meNF,iJeF->mNiJ', eris_ovov, tau2ab)
-    Hr2aa += lib.einsum('mnij,mnab->ijab', tmpaa, tau) * 0.25
-    Hr2ab += lib.einsum('mNiJ,mNaB->iJaB', tmpab, tau) * .5
+    tmpaa = lib.einsum('menf,xijef->xmnij', eris_ovov, tau2aa)
+    tmpab = lib.einsum('meNF,xiJeF->xmNiJ', eris_ovov, tau2ab)
+    Hr2aa += lib.einsum('xmnij,mnab->xijab', tmpaa, tau) * 0.25
+    Hr2ab += lib.einsum('xmNiJ,mNaB->xiJaB', tmpab, tau) * .5
     tmpaa = tmpab = tau = None
 
-    tmpa = -lib.einsum('menf,imfe->ni', eris_ovov, theta)
-    Hr1 += lib.einsum('na,ni->ia', t1, tmpa)
-    tmp  = lib.einsum('mj,imab->ijab', tmpa, t2)
-    tmp1 = np.einsum('menf,mf->en', eris_ovov, r1)
-    tmpa = np.einsum('en,nb->eb', tmp1, t1)
-    tmpa-= lib.einsum('menf,mnbf->eb', eris_ovov, theta)
-    tmp += lib.einsum('eb,ijae->ijab', tmpa, t2)
+    tmpa = -lib.einsum('menf,ximfe->xni', eris_ovov, theta)
+    Hr1 += lib.einsum('na,xni->xia', t1, tmpa)
+    tmp  = lib.einsum('xmj,imab->xijab', tmpa, t2)
+    tmp1 = lib.einsum('menf,xmf->xen', eris_ovov, r1)
+    tmpa = lib.einsum('xen,nb->xeb', tmp1, t1)
+    tmpa-= lib.einsum('menf,xmnbf->xeb', eris_ovov, theta)
+    tmp += lib.einsum('xeb,ijae->xijab', tmpa, t2)
     Hr2aa+= tmp
     Hr2ab-= tmp
     tmp = theta = eris_ovov = None
@@ -1051,14 +1094,17 @@ def eeccsd_matvec_triplet(eom, vector, imds=None):
     #:Hr2ab += lib.einsum('ijef,aebf->ijab', tau2ab, eris_vvvv) * .5
     tau2aa *= .25
     tau2ab *= .5
-    Hr2aa += eom._cc._add_vvvv(None, tau2aa, eris, with_ovvv=False, t2sym='jiba')
-    Hr2ab += eom._cc._add_vvvv(None, tau2ab, eris, with_ovvv=False, t2sym='-jiba')
+    Hr2aa += _add_vvvv_block(eom, tau2aa, eris, t2sym='jiba')
+    Hr2ab += _add_vvvv_block(eom, tau2ab, eris, t2sym='-jiba')
     tau2aa = tau2ab = None
 
-    Hr2aa = Hr2aa - Hr2aa.transpose(0,1,3,2)
-    Hr2aa = Hr2aa - Hr2aa.transpose(1,0,2,3)
-    Hr2ab = Hr2ab - Hr2ab.transpose(1,0,3,2)
-    vector = amplitudes_to_vector_triplet(Hr1, (Hr2aa,Hr2ab))
+    Hr2aa = Hr2aa - Hr2aa.transpose(0,1,2,4,3)
+    Hr2aa = Hr2aa - Hr2aa.transpose(0,2,1,3,4)
+    Hr2ab = Hr2ab - Hr2ab.transpose(0,2,1,4,3)
+    vector = np.asarray([amplitudes_to_vector_triplet(Hr1[k], (Hr2aa[k],Hr2ab[k]))
+                         for k in range(nvec)])
+    if is_1d:
+        vector = vector[0]
     return vector
 
 def eeccsd_matvec_sf(eom, vector, imds=None):
@@ -1337,7 +1383,7 @@ class EOMEESinglet(EOMEE):
     def gen_matvec(self, imds=None, diag=None, **kwargs):
         if imds is None: imds = self.make_imds()
         if diag is None: diag = self.get_diag(imds)[0]
-        matvec = lambda xs: [self.matvec(x, imds) for x in xs]
+        matvec = lambda xs: list(self.matvec(xs, imds))
         return matvec, diag
 
     def vector_to_amplitudes(self, vector, nmo=None, nocc=None):
@@ -1363,7 +1409,7 @@ class EOMEETriplet(EOMEE):
     def gen_matvec(self, imds=None, diag=None, **kwargs):
         if imds is None: imds = self.make_imds()
         if diag is None: diag = self.get_diag(imds)[1]
-        matvec = lambda xs: [self.matvec(x, imds) for x in xs]
+        matvec = lambda xs: list(self.matvec(xs, imds))
         return matvec, diag
 
     def vector_to_amplitudes(self, vector, nmo=None, nocc=None):
@@ -1417,6 +1463,8 @@ class _IMDS:
         if eris is None:
             eris = cc.ao2mo()
         self.eris = eris
+        self.max_memory = cc.max_memory
+        self.async_io = cc.async_io
         self._made_shared_2e = False
 
     def _make_shared_1e(self):
@@ -1478,8 +1526,21 @@ class _IMDS:
         if ea_partition == 'mp':
             self.Wvvvo = imd.Wvvvo(t1, t2, eris)
         else:
-            self.Wvvvv = imd.Wvvvv(t1, t2, eris)
-            self.Wvvvo = imd.Wvvvo(t1, t2, eris, self.Wvvvv)
+            nvir = t1.shape[1]
+            mem_now = lib.current_memory()[0]
+            max_memory = max(0, self.max_memory - mem_now)
+            if nvir**4*8/1e6 < max_memory*.5:
+                self.Wvvvv = imd.Wvvvv(t1, t2, eris)
+            else:
+                # Wvvvv is stored contiguously along the first index, the
+                # order in which it is read by the EA matvec.
+                log.debug('Wvvvv (%d MB) is saved on disk', nvir**4*8/1e6)
+                blksize = min(nvir, max(ccsd.BLKMIN, int(max_memory*.3e6/8/nvir**3)))
+                self.saved = lib.H5TmpFile()
+                dtype = np.result_type(t1, t2, eris.ovov)
+                self.Wvvvv = self.saved.create_dataset('Wvvvv', (nvir,)*4, dtype.char)
+                imd.Wvvvv(t1, t2, eris, self.Wvvvv, blksize)
+            self.Wvvvo = imd.Wvvvo(t1, t2, eris, self.Wvvvv, self.max_memory)
         log.timer_debug1('EOM-CCSD EA intermediates', *cput0)
         return self
 
@@ -1645,6 +1706,84 @@ def _make_tau(t2, t1, r1, fac=1, out=None):
     tau += t2
     return tau
 
+def _make_tau_block(r2, r1, t1, fac=1):
+    '''_make_tau for a block of stacked r1 and r2'''
+    tau = np.einsum('xia,jb->xijab', r1, t1)
+    tau = tau + tau.transpose(0,2,1,4,3)
+    tau *= fac * .5
+    tau += r2
+    return tau
+
+def _add_vvvv_block(eom, t2, eris, t2sym='jiba'):
+    '''Contract a block of stacked t2 (nvec,nocc,nocc,nvir,nvir) with vvvv
+    integrals.  The vvvv integrals are loaded only once for all vectors.
+    '''
+    mycc = eom._cc
+    nvec, nocc = t2.shape[:2]
+    nvir = t2.shape[3]
+    if mycc.direct:
+        return np.asarray([mycc._add_vvvv(None, x, eris, with_ovvv=False, t2sym=t2sym)
+                           for x in t2])
+
+    time0 = time.clock(), time.time()
+    log = logger.Logger(eom.stdout, eom.verbose)
+    idx, idy = np.tril_indices(nocc)
+    nocc2 = idx.size
+    tau = t2[:,idx,idy].reshape(nvec*nocc2,nvir,nvir)
+    Ht2tril = eris._contract_vvvv_t2(mycc, tau, False, None, log)
+    Ht2tril = Ht2tril.reshape(nvec,nocc2,nvir,nvir)
+    Ht2 = np.empty_like(t2)
+    for k in range(nvec):
+        ccsd._unpack_t2_tril(Ht2tril[k], nocc, nvir, Ht2[k], t2sym)
+    log.timer_debug1('vvvv contraction for %d vectors' % nvec, *time0)
+    return Ht2
+
+def _as_vector_block(vector):
+    '''Cast vector to a 2D array of stacked vectors'''
+    vector = np.asarray(vector)
+    is_1d = vector.ndim == 1
+    return vector.reshape(-1,vector.shape[-1]), is_1d
+
+def _vector_to_amplitudes_ip_block(vector, nmo, nocc):
+    nvir = nmo - nocc
+    r1 = vector[:,:nocc]
+    r2 = vector[:,nocc:].reshape(-1,nocc,nocc,nvir)
+    return r1, r2
+
+def _vector_to_amplitudes_ea_block(vector, nmo, nocc):
+    nvir = nmo - nocc
+    r1 = vector[:,:nvir]
+    r2 = vector[:,nvir:].reshape(-1,nocc,nvir,nvir)
+    return r1, r2
+
+def _amplitudes_to_vector_block(r1, r2):
+    nvec = r1.shape[0]
+    return np.hstack((r1.reshape(nvec,-1), r2.reshape(nvec,-1)))
+
+def _iter_Wvvvv(imds):
+    '''Loop over the blocks of Wvvvv along the first index.  If Wvvvv is
+    saved on disk, the next block is prefetched in background while the
+    current block is being contracted.'''
+    Wvvvv = imds.Wvvvv
+    if isinstance(Wvvvv, np.ndarray):
+        yield 0, Wvvvv.shape[0], Wvvvv
+        return
+
+    nvir = Wvvvv.shape[0]
+    max_memory = max(0, imds.max_memory - lib.current_memory()[0])
+    blksize = min(nvir, max(ccsd.BLKMIN, int(max_memory*.3e6/8/nvir**3)))
+    buf = np.empty((blksize,nvir,nvir,nvir), dtype=Wvvvv.dtype)
+    buf_prefetch = np.empty_like(buf)
+    def load(p0, p1, out):
+        if p0 < p1:
+            Wvvvv.read_direct(out, np.s_[p0:p1], np.s_[:p1-p0])
+    with lib.call_in_background(load, sync=not imds.async_io) as prefetch:
+        load(0, blksize, buf_prefetch)
+        for p0, p1 in lib.prange(0, nvir, blksize):
+            buf, buf_prefetch = buf_prefetch, buf
+            prefetch(p1, min(nvir, p1+blksize), buf_prefetch)
+            yield p0, p1, buf[:p1-p0]
+
 def _cp(a):
     return np.array(a, copy=False, order='C')
 
@@ -176,17 +176,35 @@ def Woooo(t1, t2, eris):
     Wklij += np.asarray(eris.oooo).transpose(0,2,1,3)
     return Wklij
 
-def Wvvvv(t1, t2, eris):
+def Wvvvv(t1, t2, eris, out=None, blksize=None):
+    '''Wabcd.  If out (e.g. an HDF5 dataset) is given, Wabcd is generated in
+    blocks of the first index and written to out block by block.'''
     eris_ovov = np.asarray(eris.ovov)
-    Wabcd  = lib.einsum('kcld,klab->abcd', eris_ovov, t2)
-    Wabcd += lib.einsum('kcld,ka,lb->abcd', eris_ovov, t1, t1)
-    Wabcd += np.asarray(_get_vvvv(eris)).transpose(0,2,1,3)
     eris_ovvv = np.asarray(eris.get_ovvv())
-    Wabcd -= lib.einsum('ldac,lb->abcd', eris_ovvv, t1)
-    Wabcd -= lib.einsum('kcbd,ka->abcd', eris_ovvv, t1)
-    return Wabcd
+    if out is None:
+        Wabcd  = lib.einsum('kcld,klab->abcd', eris_ovov, t2)
+        Wabcd += lib.einsum('kcld,ka,lb->abcd', eris_ovov, t1, t1)
+        Wabcd += np.asarray(_get_vvvv(eris)).transpose(0,2,1,3)
+        Wabcd -= lib.einsum('ldac,lb->abcd', eris_ovvv, t1)
+        Wabcd -= lib.einsum('kcbd,ka->abcd', eris_ovvv, t1)
+        return Wabcd
 
-def Wvvvo(t1, t2, eris, _Wvvvv=None):
+    nvir = t1.shape[1]
+    if blksize is None:
+        blksize = nvir
+    for p0, p1 in lib.prange(0, nvir, blksize):
+        Wabcd  = lib.einsum('kcld,klab->abcd', eris_ovov, t2[:,:,p0:p1])
+        Wabcd += lib.einsum('kcld,ka,lb->abcd', eris_ovov, t1[:,p0:p1], t1)
+        Wabcd += _get_vvvv_blk(eris, p0, p1).transpose(0,2,1,3)
+        Wabcd -= lib.einsum('ldac,lb->abcd', eris_ovvv[:,:,p0:p1], t1)
+        Wabcd -= lib.einsum('kcbd,ka->abcd', eris_ovvv, t1[:,p0:p1])
+        out[p0:p1] = Wabcd
+        Wabcd = None
+    return out
+
+def Wvvvo(t1, t2, eris, _Wvvvv=None, max_memory=None):
+    '''Wabcj.  If _Wvvvv is stored on disk, it is contracted block by block
+    within max_memory (in MB, lib.param.MAX_MEMORY by default).'''
     nocc,nvir = t1.shape
     eris_ovvv = np.asarray(eris.get_ovvv())
     # Check if t1=0 (HF+MBPT(2))
@@ -205,7 +223,15 @@ def Wvvvo(t1, t2, eris, _Wvvvv=None):
     if np.any(t1):
         if _Wvvvv is None:
             _Wvvvv = Wvvvv(t1, t2, eris)
-        Wabcj += lib.einsum('abcd,jd->abcj', _Wvvvv, t1)
+        if isinstance(_Wvvvv, np.ndarray):
+            Wabcj += lib.einsum('abcd,jd->abcj', _Wvvvv, t1)
+        else:  # Wvvvv on disk, contract block by block
+            if max_memory is None:
+                max_memory = lib.param.MAX_MEMORY
+            max_memory = max(0, max_memory - lib.current_memory()[0])
+            blksize = min(nvir, max(1, int(max_memory*.3e6/8/nvir**3)))
+            for p0, p1 in lib.prange(0, nvir, blksize):
+                Wabcj[p0:p1] += lib.einsum('abcd,jd->abcj', _Wvvvv[p0:p1], t1)
     return Wabcj
 
 def Wovoo(t1, t2, eris):
@@ -235,3 +261,21 @@ def _get_vvvv(eris):
         return ao2mo.restore(1, np.asarray(eris.vvvv), nvir)
     else:
         return eris.vvvv
+
+def _get_vvvv_blk(eris, p0, p1):
+    '''(ac|bd) for a in [p0:p1], without restoring the entire vvvv tensor'''
+    if eris.vvvv is None and getattr(eris, 'vvL', None) is not None:  # DF eris
+        vvL = np.asarray(eris.vvL)
+        nvir = int(np.sqrt(eris.vvL.shape[0]*2))
+        idx = lib.square_mat_in_trilu_indices(nvir)[p0:p1]
+        vvvv = lib.dot(vvL[idx.ravel()], vvL.T)
+        return lib.unpack_tril(vvvv).reshape(p1-p0,nvir,nvir,nvir)
+    elif len(eris.vvvv.shape) == 2:
+        nvir = int(np.sqrt(eris.vvvv.shape[0]*2))
+        idx = lib.square_mat_in_trilu_indices(nvir)[p0:p1].ravel()
+        # h5py dataset requires the indices in increasing order
+        uniq_idx, inverse = np.unique(idx, return_inverse=True)
+        vvvv = np.asarray(eris.vvvv[uniq_idx])[inverse]
+        return lib.unpack_tril(vvvv).reshape(p1-p0,nvir,nvir,nvir)
+    else:
+        return np.asarray(eris.vvvv[p0:p1])
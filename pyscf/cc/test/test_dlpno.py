@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import numpy
+from pyscf import gto
+from pyscf import scf
+from pyscf.cc import dfccsd
+from pyscf.cc import dlpno
+
+mol = gto.Mole()
+mol.verbose = 7
+mol.output = '/dev/null'
+mol.atom = '''
+O   0.   0.     0.
+H   0.  -0.757  0.587
+H   0.   0.757  0.587
+O   0.   0.     3.0
+H   0.  -0.757  3.587
+H   0.   0.757  3.587'''
+mol.basis = 'cc-pvdz'
+mol.build()
+mf = scf.RHF(mol)
+mf.conv_tol = 1e-12
+mf.scf()
+e_ref = dfccsd.RCCSD(mf, frozen=2).run(conv_tol=1e-9).e_corr
+
+def tearDownModule():
+    global mol, mf
+    mol.stdout.close()
+    del mol, mf
+
+
+class KnownValues(unittest.TestCase):
+    def test_no_truncation(self):
+        mycc = dlpno.DLPNOCCSD(mf, frozen=2)
+        mycc.pair_thresh = 0
+        mycc.pno_thresh = -1
+        mycc.domain_thresh = 0
+        mycc.conv_tol = 1e-9
+        mycc.kernel()
+        self.assertTrue(mycc.converged)
+        self.assertAlmostEqual(mycc.e_corr, e_ref, 6)
+
+    def test_default_thresholds(self):
+        mycc = dlpno.DLPNOCCSD(mf, frozen=2)
+        mycc.kernel()
+        self.assertTrue(mycc.converged)
+        # chemical accuracy
+        self.assertAlmostEqual(mycc.e_corr, e_ref, 3)
+        nocc = mycc.nocc
+        self.assertTrue(len(mycc.pno_coeff) < nocc*(nocc+1)//2)
+        t2 = mycc.make_t2()
+        for (i, j), q in mycc.pno_coeff.items():
+            self.assertEqual(mycc.t2[(i,j)].shape, (q.shape[1],)*2)
+            t2ij = t2[i,j]
+            self.assertAlmostEqual(abs(t2ij - q.dot(q.T).dot(t2ij).dot(q).dot(q.T)).max(), 0, 9)
+            self.assertAlmostEqual(abs(t2[j,i] - t2ij.T).max(), 0, 12)
+
+
+if __name__ == "__main__":
+    print("Full Tests for DLPNO-CCSD")
+    unittest.main()
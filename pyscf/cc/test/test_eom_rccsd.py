@@ -334,6 +334,44 @@ class KnownValues(unittest.TestCase):
         self.assertAlmostEqual(lib.finger(vec1), -17030.363405297598, 9)
         self.assertAlmostEqual(lib.finger(diag), 4688.9122122011922, 9)
 
+    def test_matvec_block(self):
+        numpy.random.seed(3)
+        for myeom in (eom_rccsd.EOMIP(mycc1), eom_rccsd.EOMEA(mycc1)):
+            vecs = numpy.random.random((3,myeom.vector_size())) - .9
+            imds = myeom.make_imds(eris1)
+            diag = myeom.get_diag(imds)
+            ref = [myeom.matvec(v, imds, diag) for v in vecs]
+            self.assertAlmostEqual(abs(myeom.matvec(vecs, imds, diag) - ref).max(), 0, 9)
+            ref = [myeom.l_matvec(v, imds, diag) for v in vecs]
+            self.assertAlmostEqual(abs(myeom.l_matvec(vecs, imds, diag) - ref).max(), 0, 9)
+
+        imds = eom_rccsd.EOMEE(mycc1).make_imds(eris1)
+        for myeom in (eom_rccsd.EOMEESinglet(mycc1), eom_rccsd.EOMEETriplet(mycc1)):
+            vecs = numpy.random.random((3,myeom.vector_size())) - .9
+            ref = [myeom.matvec(v, imds) for v in vecs]
+            self.assertAlmostEqual(abs(myeom.matvec(vecs, imds) - ref).max(), 0, 8)
+
+    def test_ea_outcore_imds(self):
+        numpy.random.seed(4)
+        myeom = eom_rccsd.EOMEA(mycc1)
+        vecs = numpy.random.random((2,myeom.vector_size())) - .9
+        imds = myeom.make_imds(eris1)
+        ref = myeom.matvec(vecs, imds), myeom.l_matvec(vecs, imds), myeom.get_diag(imds)
+        imds = eom_rccsd._IMDS(mycc1, eris1)
+        imds.max_memory = 1
+        imds.make_ea()
+        self.assertFalse(isinstance(imds.Wvvvv, numpy.ndarray))
+        self.assertAlmostEqual(abs(myeom.matvec(vecs, imds) - ref[0]).max(), 0, 9)
+        self.assertAlmostEqual(abs(myeom.l_matvec(vecs, imds) - ref[1]).max(), 0, 9)
+        self.assertAlmostEqual(abs(myeom.get_diag(imds) - ref[2]).max(), 0, 9)
+
+        mycc2 = ccsd.CCSD(mf)
+        mycc2.t1, mycc2.t2 = mycc.t1, mycc.t2
+        mycc2.max_memory = 1
+        e0 = mycc.eaccsd(nroots=2)[0]
+        e1 = mycc2.eaccsd(nroots=2)[0]
+        self.assertAlmostEqual(abs(e1 - e0).max(), 0, 6)
+
 
 ########################################
 # Complex integrals
@@ -22,6 +22,7 @@ from pyscf import scf
 from pyscf import cc
 from pyscf import ao2mo
 from pyscf.cc import ccsd
+from pyscf.cc import ccsd_rdm
 from pyscf.cc import uccsd
 from pyscf.cc import gccsd
 from pyscf.cc import rccsd
@@ -155,6 +156,20 @@ class KnownValues(unittest.TestCase):
         e1+= mf.energy_nuc()
         self.assertAlmostEqual(e1, mcc.e_tot, 7)
 
+        blks = ccsd_rdm.loop_rdm2(mcc, mcc.t1, mcc.t2, mcc.l1, mcc.l2, blksize=7)
+        for p0, p1, dm2blk in blks:
+            self.assertAlmostEqual(abs(dm2blk - dm2[p0:p1]).max(), 0, 12)
+
+    def test_loop_rdm2_frozen(self):
+        mcc = cc.ccsd.CC(mf)
+        mcc.frozen = [0,1,20,22]
+        mcc.kernel()
+        mcc.solve_lambda()
+        dm2 = mcc.make_rdm2()
+        blks = ccsd_rdm.loop_rdm2(mcc, mcc.t1, mcc.t2, mcc.l1, mcc.l2, blksize=5)
+        for p0, p1, dm2blk in blks:
+            self.assertAlmostEqual(abs(dm2blk - dm2[p0:p1]).max(), 0, 12)
+
     def test_scanner(self):
         cc_scanner = scf.RHF(mol).apply(cc.CCSD).as_scanner()
         cc_scanner.conv_tol = 1e-8
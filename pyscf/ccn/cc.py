@@ -71,7 +71,7 @@ def kernel_ground_state_sdt(cc, tolerance=1e-10, maxiter=50):
         Ground state amplitudes and energy.
     """
     t, e = kernel_solve(cc.ao2mo(), eq_gs_sdt, ("t1", "t2", "t3"), tolerance=tolerance, equation_energy=energy_gs_sdt,
-                        dim_spec=("ov", "oovv", "ooovvv"), maxiter=maxiter)
+                        dim_spec=("ov", "oovv", "ooovvv"), maxiter=maxiter, packed=True)
     return e, t["t1"], t["t2"], t["t3"]
 
 
@@ -153,7 +153,7 @@ def kernel_lambda_sdt(cc, t1, t2, t3, tolerance=1e-10, maxiter=50):
         t1=t1, t2=t2, t3=t3,
     ))
     l = kernel_solve(hamiltonian, eq_lambda_sdt, ("a1", "a2", "a3"), tolerance=tolerance,
-                     dim_spec=("ov", "oovv", "ooovvv"), maxiter=maxiter)
+                     dim_spec=("ov", "oovv", "ooovvv"), maxiter=maxiter, packed=True)
     return l["a1"], l["a2"], l["a3"]
 
 
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# Copyright 2014-2018 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Post-processing pass of the equation generator. It produces `equations.py` from the raw generator output.
+
+The generator emits every term as `X += p("spec", e(...))`, antisymmetrizing each term separately. For the triples
+kernels the antisymmetrization dominates the runtime. This pass rewrites the terms of selected functions into
+`p_X["spec"] += e(...)` accumulators (see `util.PSum`) which are antisymmetrized once per permutation spec before the
+function returns.
+
+Usage:
+
+    python -m pyscf.ccn.codegen raw_equations.py > equations.py
+"""
+
+import re
+import sys
+
+# Functions which are rewritten: the triples kernels
+DEFAULT_PATTERN = r"_sdt$"
+
+_def = re.compile(r"^def (\w+)\(")
+_term = re.compile(r"^(?P<indent>\s+)(?P<target>\w+) (?P<op>[+-])= (?P<coef>[^ ()]+ \* )?(?P<rhs>p\(.*?)(?P<comment>  #.*)?$")
+_spec = re.compile(r'^p\("([^"]*)", ')
+_init = re.compile(r"^(?P<indent>\s+)\w+( = \w+)* = 0$")
+_return = re.compile(r"^(?P<indent>\s+)return ")
+
+
+def _split_p(rhs):
+    """
+    Strips nested antisymmetrizers from an expression.
+    Args:
+        rhs (str): an expression `p("spec1", p("spec2", ...))`;
+
+    Returns:
+        A tuple of specs (outermost first) and the bare expression.
+    """
+    specs = []
+    while True:
+        m = _spec.match(rhs)
+        if m is None:
+            break
+        if not rhs.endswith(")"):
+            raise ValueError("Unbalanced antisymmetrizer: {}".format(rhs))
+        specs.append(m.group(1))
+        rhs = rhs[m.end():-1]
+    return tuple(specs), rhs
+
+
+def group_function(lines):
+    """
+    Rewrites antisymmetrized terms of a single generated function into PSum accumulators.
+    Args:
+        lines (list): source lines of the function (without line endings);
+
+    Returns:
+        New source lines.
+    """
+    targets = []
+    body = []
+    for line in lines:
+        m = _term.match(line)
+        if m is None:
+            body.append(line)
+            continue
+        specs, expr = _split_p(m.group("rhs"))
+        target = m.group("target")
+        if target not in targets:
+            targets.append(target)
+        body.append("{indent}p_{target}[{specs}] {op}= {coef}{expr}{comment}".format(
+            indent=m.group("indent"),
+            target=target,
+            specs=", ".join('"{}"'.format(i) for i in specs),
+            op=m.group("op"),
+            coef=m.group("coef") or "",
+            expr=expr,
+            comment=m.group("comment") or "",
+        ))
+
+    if len(targets) == 0:
+        return body
+
+    result = []
+    for line in body:
+        m = _return.match(line)
+        if m is not None:
+            for t in targets:
+                result.append("{}{} += p_{}.evaluate()".format(m.group("indent"), t, t))
+        result.append(line)
+        m = _init.match(line)
+        if m is not None:
+            result.append("{}{} = {}".format(
+                m.group("indent"),
+                ", ".join("p_" + t for t in targets),
+                ", ".join("PSum()" for t in targets),
+            ))
+    return result
+
+
+def group_source(source, pattern=DEFAULT_PATTERN):
+    """
+    Rewrites the generated equations.
+    Args:
+        source (str): the raw generator output;
+        pattern (str): a regular expression matching names of functions to rewrite;
+
+    Returns:
+        The source of `equations.py`.
+    """
+    pattern = re.compile(pattern)
+    lines = source.split("\n")
+    result = []
+    func = None
+    for line in lines:
+        m = _def.match(line)
+        if m is not None or (func is not None and line and not line[0].isspace()):
+            if func is not None:
+                result.extend(group_function(func))
+                func = None
+        if m is not None and pattern.search(m.group(1)):
+            func = [line]
+        elif func is not None:
+            func.append(line)
+        else:
+            result.append(line)
+    if func is not None:
+        result.extend(group_function(func))
+    result = "\n".join(result)
+    if "PSum()" in result:
+        result = result.replace("from .util import e, p\n", "from .util import e, p, PSum\n", 1)
+    return result
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1], "r") as f:
+        sys.stdout.write(group_source(f.read()))
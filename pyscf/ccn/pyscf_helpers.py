@@ -183,7 +183,7 @@ def oneshot(equations, *args):
 
 
 def kernel_solve(hamiltonian, equations, initial_guess, tolerance=1e-9, debug=False, diis=True, equation_energy=None,
-                 dim_spec=None, maxiter=50):
+                 dim_spec=None, maxiter=50, packed=False):
     """
     Coupled-cluster solver (linear systems).
     Args:
@@ -197,6 +197,8 @@ def kernel_solve(hamiltonian, equations, initial_guess, tolerance=1e-9, debug=Fa
         dim_spec (iterable): if `initial_guess` is a dict, this parameter defines shapes of arrays in 'ov' notation
         (list of strings);
         maxiter (int): maximal number of iterations;
+        packed (bool): if True, only the unique (lower-triangular) part of antisymmetric amplitudes is kept in the
+        DIIS subspace;
 
     Returns:
         Resulting coupled-cluster amplitudes and energy if specified.
@@ -235,11 +237,22 @@ def kernel_solve(hamiltonian, equations, initial_guess, tolerance=1e-9, debug=Fa
             initial_guess[k] = initial_guess[k] + delta
 
         if diis and not any(isinstance(i, Number) for i in initial_guess.values()):
-            v = a2v(initial_guess.values())
-            initial_guess = OrderedDict(zip(
-                initial_guess.keys(),
-                v2a(diis.update(v), initial_guess.values())
-            ))
+            if packed:
+                sample = initial_guess.values()
+                labels = list(i.metadata["labels"] for i in sample)
+                ixs = list(ltri_ix_amplitudes(i) for i in sample)
+                shapes = list(i.shape for i in sample)
+                v = a2v_sym(sample, ixs)
+                initial_guess = OrderedDict(zip(
+                    initial_guess.keys(),
+                    (MetaArray(i, labels=j) for i, j in zip(v2a_sym(diis.update(v), labels, shapes, ixs), labels))
+                ))
+            else:
+                v = a2v(initial_guess.values())
+                initial_guess = OrderedDict(zip(
+                    initial_guess.keys(),
+                    v2a(diis.update(v), initial_guess.values())
+                ))
 
         maxiter -= 1
 
@@ -284,6 +284,22 @@ class H2OTests(unittest.TestCase):
 
         testing.assert_allclose(values, self.eomea.e, atol=1e-12)
 
+class H3Tests(unittest.TestCase):
+    def test_iter_sdt(self):
+        """CCSDT iterations (exact for a 3-electron system)."""
+        from pyscf import fci
+        mol = gto.M(atom="H 0 0 0; H 0 0 1.2; H 0 1.1 0.3", basis='6-31g', spin=1, verbose=0)
+        mf = scf.UHF(mol).run(conv_tol=1e-11)
+        e_fci = fci.FCI(mol, mf.mo_coeff[0]).kernel()[0]
+        mf = scf.addons.convert_to_ghf(mf)
+        ccsd = gccsd.GCCSD(mf).run()
+        e3, t1, t2, t3 = cc.kernel_ground_state_sdt(ccsd)
+
+        testing.assert_allclose(mf.e_tot + e3, e_fci, atol=1e-8)
+        testing.assert_allclose(t3, -t3.transpose(1, 0, 2, 3, 4, 5), atol=1e-12)
+        testing.assert_allclose(t3, -t3.transpose(0, 1, 2, 3, 5, 4), atol=1e-12)
+
+
 class utilTests(unittest.TestCase):
     def test_p(self):
         numpy.random.seed(2)
@@ -292,3 +308,60 @@ class utilTests(unittest.TestCase):
         self.assertAlmostEqual(lib.finger(cc.p('.ab', a)), -1.9344875839983993, 12)
         self.assertAlmostEqual(lib.finger(cc.p('abc', a)), -0.0055534783760265282, 14)
         self.assertAlmostEqual(abs(cc.p('a.a', a) - a).max(), 0, 12)
+
+    def test_psum(self):
+        numpy.random.seed(2)
+        a = numpy.random.random((3,3,3))
+        b = numpy.random.random((3,3,3))
+        acc = cc.PSum()
+        acc["ab."] += a
+        acc["ab."] -= .5 * b
+        acc["ab.", ".ab"] += b
+        ref = cc.p("ab.", a) - .5 * cc.p("ab.", b) + cc.p("ab.", cc.p(".ab", b))
+        self.assertAlmostEqual(abs(acc.evaluate() - ref).max(), 0, 12)
+        self.assertEqual(cc.PSum().evaluate(), 0)
+
+    def test_einsum_path_cache(self):
+        from . import util
+        size = util.EINSUM_PATH_CACHE_SIZE
+        util.EINSUM_PATH_CACHE_SIZE = 4
+        try:
+            a = numpy.random.random((3,3))
+            for n in range(2, 10):
+                b = numpy.random.random((3,n))
+                self.assertAlmostEqual(abs(util.e("ij,jk->ik", a, b) - a.dot(b)).max(), 0, 12)
+            self.assertEqual(len(util._einsum_paths), 4)
+        finally:
+            util.EINSUM_PATH_CACHE_SIZE = size
+
+    def test_codegen(self):
+        from . import codegen, util
+        raw = '\n'.join((
+            'from .util import e, p',
+            '',
+            '',
+            'def eq_x_sdt(a, b):',
+            '    h = hh = 0',
+            '    hh += p("ab.", e("ijk->ijk", a))  # d0',
+            '    h += e("ijk->ijk", b)  # d1',
+            '    hh -= 1./2 * p("ab.", p(".ab", e("ijk,ijk->ijk", a, b)))  # d2',
+            '    return h, hh',
+            '',
+        ))
+        src = codegen.group_source(raw)
+        self.assertIn('    p_hh["ab.", ".ab"] -= 1./2 * e("ijk,ijk->ijk", a, b)  # d2', src)
+        self.assertIn('    p_hh = PSum()', src)
+        self.assertIn('    hh += p_hh.evaluate()', src)
+        self.assertNotIn('p(', src)
+
+        numpy.random.seed(2)
+        a = numpy.random.random((3,3,3))
+        b = numpy.random.random((3,3,3))
+        ref = {}
+        new = {}
+        exec(raw.replace('from .util', 'from pyscf.ccn.util'), ref)
+        exec(src.replace('from .util', 'from pyscf.ccn.util'), new)
+        for x, y in zip(ref['eq_x_sdt'](a, b), new['eq_x_sdt'](a, b)):
+            self.assertAlmostEqual(abs(x - y).max(), 0, 12)
+        # Functions not matching the pattern are untouched
+        self.assertEqual(codegen.group_source(raw, pattern='_sd$'), raw)
@@ -16,7 +16,7 @@
 # Author: Artem Pulkin
 #
 
-from collections import Counter, Mapping
+from collections import Counter, Mapping, OrderedDict
 import numpy
 import itertools
 from numbers import Number
@@ -300,14 +300,31 @@ def d2t(d):
     return tuple(sorted(d.items()))
 
 
+# The most recently used contraction paths, keyed by subscripts and operand shapes
+EINSUM_PATH_CACHE_SIZE = 512
+_einsum_paths = OrderedDict()
+
+
+def _einsum_path(*args):
+    """Contraction path of einsum from a least-recently-used cache."""
+    key = (args[0],) + tuple(numpy.shape(i) for i in args[1:])
+    path = _einsum_paths.pop(key, None)
+    if path is None:
+        path = numpy.einsum_path(*args, optimize='greedy')[0]
+        while len(_einsum_paths) >= EINSUM_PATH_CACHE_SIZE:
+            _einsum_paths.popitem(last=False)
+    _einsum_paths[key] = path
+    return path
+
+
 def e(*args):
-    """Numpy optimized einsum."""
+    """Numpy optimized einsum. Contraction paths are searched once per subscripts and operand shapes."""
     for i in args:
         if isinstance(i, Number) and i == 0:
             return 0
     try:
-        return numpy.einsum(*args, optimize=True)
-    except TypeError:
+        return numpy.einsum(*args, optimize=_einsum_path(*args))
+    except (TypeError, AttributeError):
         return lib.einsum(*args)
 
 
@@ -396,6 +413,45 @@ def p(spec, tensor):
     return result
 
 
+class PSum(dict):
+    """
+    Accumulates tensors which are antisymmetrized by `p` afterwards. Terms sharing the same permutation spec are
+    summed up first and antisymmetrized only once.
+
+    Examples:
+
+        >>> acc = PSum()
+        >>> acc["ab."] += a
+        >>> acc["ab.", ".ab"] -= b  # same as p("ab.", p(".ab", b))
+        >>> result = acc.evaluate()
+    """
+    def __missing__(self, key):
+        return 0
+
+    def __setitem__(self, key, value):
+        if isinstance(key, str):
+            key = (key,)
+        dict.__setitem__(self, key, value)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            key = (key,)
+        return dict.__getitem__(self, key)
+
+    def evaluate(self):
+        """
+        Antisymmetrizes and sums all accumulated terms.
+        Returns:
+            The sum of antisymmetrized tensors.
+        """
+        result = 0
+        for specs, tensor in self.items():
+            for spec in reversed(specs):
+                tensor = p(spec, tensor)
+            result = result + tensor
+        return result
+
+
 def _ltri_ix(n, ndims):
     """
     Generates lower-triangular part indexes in arbitrary dimensions.
@@ -415,6 +471,8 @@ def _ltri_ix(n, ndims):
             x_arr = numpy.empty((x.shape[0],1), dtype=int)
             x_arr[:] = i
             result.append(numpy.concatenate((x_arr, x), axis=1,))
+        if len(result) == 0:
+            return numpy.empty((0, ndims), dtype=int)
         return numpy.concatenate(result, axis=0)
 
 
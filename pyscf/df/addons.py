@@ -18,6 +18,8 @@
 
 import sys
 import copy
+import json
+import mmap
 import numpy
 from pyscf import lib
 from pyscf.lib import logger
@@ -77,6 +79,88 @@ class load(ao2mo.load):
     def __init__(self, eri, dataname='j3c'):
         ao2mo.load.__init__(self, eri, dataname)
 
+    def __enter__(self):
+        if isinstance(self.eri, str):
+            filename = self.eri
+        else:
+            filename = getattr(self.eri, 'name', None)
+        if isinstance(filename, str) and is_mmap(filename):
+            return open_mmap(filename)
+        return ao2mo.load.__enter__(self)
+
+
+# The cderi tensor in the raw binary format.  The file starts with a header
+# of one page (magic string + shape and dtype in JSON).  The data follow the
+# header in C order so that the rows of auxiliary functions are page-aligned
+# contiguous segments of the file.
+MMAP_MAGIC = b'PYSCF-CDERI-MMAP'
+MMAP_HEADER_SIZE = max(mmap.ALLOCATIONGRANULARITY, 4096)
+
+def create_mmap(filename, shape, dtype=numpy.double):
+    '''Create the raw binary file for the cderi tensor and return the
+    writable numpy.memmap of the tensor.
+    '''
+    dtype = numpy.dtype(dtype)
+    shape = tuple(int(n) for n in shape)
+    meta = json.dumps({'shape': shape, 'dtype': dtype.str}).encode()
+    assert(len(MMAP_MAGIC) + len(meta) < MMAP_HEADER_SIZE)
+    with open(filename, 'wb') as f:
+        f.write(MMAP_MAGIC + meta)
+        f.truncate(MMAP_HEADER_SIZE + int(numpy.prod(shape)) * dtype.itemsize)
+    return numpy.memmap(filename, dtype, 'r+', MMAP_HEADER_SIZE, shape)
+
+def shrink_mmap(filename, nrow):
+    '''Keep the first nrow rows of the cderi tensor in the mmap file'''
+    with open(filename, 'rb') as f:
+        header = f.read(MMAP_HEADER_SIZE)
+    meta = json.loads(header[len(MMAP_MAGIC):].rstrip(b'\0').decode())
+    shape = meta['shape']
+    assert(nrow <= shape[0])
+    shape[0] = nrow
+    meta['shape'] = shape
+    itemsize = numpy.dtype(meta['dtype']).itemsize
+    with open(filename, 'r+b') as f:
+        f.write((MMAP_MAGIC + json.dumps(meta).encode()).ljust(MMAP_HEADER_SIZE, b'\0'))
+        f.truncate(MMAP_HEADER_SIZE + int(numpy.prod(shape)) * itemsize)
+
+def is_mmap(filename):
+    '''Whether the file is the cderi tensor created by :func:`create_mmap`'''
+    try:
+        with open(filename, 'rb') as f:
+            return f.read(len(MMAP_MAGIC)) == MMAP_MAGIC
+    except (IOError, OSError):
+        return False
+
+def open_mmap(filename, mode='r'):
+    '''Map the cderi tensor saved by :func:`create_mmap` to a numpy.memmap'''
+    with open(filename, 'rb') as f:
+        header = f.read(MMAP_HEADER_SIZE)
+    if not header.startswith(MMAP_MAGIC):
+        raise RuntimeError('%s is not a cderi mmap file' % filename)
+    meta = json.loads(header[len(MMAP_MAGIC):].rstrip(b'\0').decode())
+    shape = tuple(meta['shape'])
+    out = numpy.memmap(filename, numpy.dtype(meta['dtype']), mode,
+                       MMAP_HEADER_SIZE, shape)
+    _madvise(out, getattr(mmap, 'MADV_SEQUENTIAL', None), 0, shape[0])
+    return out
+
+def prefetch_mmap(eri, row0, row1):
+    '''Hint the kernel to read ahead the rows [row0:row1] of the memmap eri.
+    It does nothing if madvise is not available (python < 3.8).'''
+    _madvise(eri, getattr(mmap, 'MADV_WILLNEED', None), row0, row1)
+
+def _madvise(eri, advice, row0, row1):
+    mm = getattr(eri, '_mmap', None)
+    if advice is None or mm is None or not hasattr(mm, 'madvise'):
+        return
+    # The memmap object maps the file from the page boundary below offset
+    start = eri.offset % mmap.ALLOCATIONGRANULARITY
+    p0 = start + row0 * eri.strides[0]
+    p1 = start + row1 * eri.strides[0]
+    p0 -= p0 % mmap.PAGESIZE
+    if p1 > p0:
+        mm.madvise(advice, p0, p1 - p0)
+
 
 def aug_etb_for_dfbasis(mol, dfbasis=DFBASIS, beta=ETB_BETA,
                         start_at=FIRST_ETB_ELEMENT):
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''
+Cholesky decomposition of the AO 2-electron integrals
+
+The 3-index tensor L^P_{ij} which satisfies (ij|kl) ~ sum_P L^P_{ij} L^P_{kl}
+is generated by the pivoted Cholesky decomposition of the (ij|kl) matrix.
+No auxiliary basis is needed.  The accuracy is controlled by the threshold
+of the residual diagonal (ij|ij).
+
+The columns (ij|kl) of the pivots kl are computed for batches of shell pairs
+(one pass over the AO integrals for each batch).  In each pass, the shell
+pairs of which the residual diagonals are close to the largest one are
+selected, and all the Cholesky vectors of the selected shell pairs are
+generated before the next pass.  AO pairs with negligible diagonals are
+screened (Cauchy-Schwarz) before the decomposition.
+
+Ref:
+    F. Aquilante, T. B. Pedersen, R. Lindh, J. Chem. Phys. 126, 194106 (2007)
+'''
+
+import time
+import numpy
+from pyscf import lib
+from pyscf.lib import logger
+from pyscf.df import outcore
+from pyscf.df.df import DF
+from pyscf import __config__
+
+MAX_MEMORY = getattr(__config__, 'df_cd_max_memory', 2000)
+# Threshold of the residual diagonal
+TOL = getattr(__config__, 'df_cd_tol', 1e-6)
+# In each pass, the shell pairs of which the residual diagonal is larger than
+# SPAN * (the largest residual diagonal) are decomposed
+SPAN = getattr(__config__, 'df_cd_span', 1e-2)
+# Max number of AO pairs to be decomposed in one pass
+MAX_QUAL = getattr(__config__, 'df_cd_max_qual', 100)
+
+
+def cholesky_ao_eri(mol, tol=TOL, intor='int2e', max_memory=MAX_MEMORY,
+                    verbose=None, span=SPAN, max_qual=MAX_QUAL):
+    '''Pivoted Cholesky decomposition of the AO integrals (ij|kl).
+
+    Args:
+        mol : Mole object
+
+    Kwargs:
+        tol : float
+            The decomposition stops when all residual diagonals are smaller
+            than tol.
+
+    Returns:
+        2D array of (naux, nao_pair).  The AO pair index is the lower
+        triangular index (i >= j), the same as the DF integral tensor of
+        :class:`DF` object.
+    '''
+    log = logger.new_logger(mol, verbose)
+    time0 = (time.clock(), time.time())
+    intor = mol._add_suffix(intor)
+    ao_loc = mol.ao_loc_nr('_cart' in intor)
+    nbas = mol.nbas
+    nao = ao_loc[-1]
+    nao_pair = nao * (nao+1) // 2
+
+    # AO pairs (i >= j) of each shell pair (I >= J) and their locations in
+    # the integral block of the shell pair
+    shl_pairs = []
+    pair_ids = []
+    pair_locs = []
+    for ish in range(nbas):
+        for jsh in range(ish+1):
+            i0, i1 = ao_loc[ish], ao_loc[ish+1]
+            j0, j1 = ao_loc[jsh], ao_loc[jsh+1]
+            i, j = numpy.meshgrid(numpy.arange(i0, i1), numpy.arange(j0, j1),
+                                  indexing='ij')
+            i, j = i.ravel(), j.ravel()
+            mask = i >= j
+            shl_pairs.append((ish, jsh))
+            pair_ids.append(i[mask]*(i[mask]+1)//2 + j[mask])
+            pair_locs.append(numpy.where(mask)[0])
+    owner = numpy.empty(nao_pair, dtype=int)
+    for k, ids in enumerate(pair_ids):
+        owner[ids] = k
+
+    diag = numpy.empty(nao_pair)
+    for k, (ish, jsh) in enumerate(shl_pairs):
+        shls_slice = (ish, ish+1, jsh, jsh+1) * 2
+        eri = mol.intor(intor, shls_slice=shls_slice)
+        nij = eri.shape[0] * eri.shape[1]
+        diag[pair_ids[k]] = eri.reshape(nij,nij).diagonal()[pair_locs[k]]
+
+    # Cauchy-Schwarz screening
+    screened = numpy.sqrt(abs(diag) * diag.max()) < tol
+    diag[screened] = 0
+    log.debug('CD screening: %d of %d AO pairs are discarded',
+              numpy.count_nonzero(screened), nao_pair)
+    time1 = log.timer_debug1('CD diagonal', *time0)
+
+    cap = nao * 4
+    vecs = numpy.empty((cap,nao_pair))
+    naux = 0
+    max_cols = max(1, int(max_memory*.3e6/8/nao_pair))
+    npass = 0
+    while True:
+        dmax = diag.max()
+        if dmax < tol:
+            break
+        npass += 1
+        dmin = max(span*dmax, tol)
+        qual = numpy.where(diag > dmin)[0]
+        qual = qual[numpy.argsort(-diag[qual])][:max_qual]
+        # Shell pairs in the order of the largest diagonals
+        sps = owner[qual]
+        sps = sps[numpy.sort(numpy.unique(sps, return_index=True)[1])]
+
+        qids = []
+        cols = []
+        ncol = 0
+        for k in sps:
+            if ncol > 0 and ncol + pair_ids[k].size > max_cols:
+                break
+            ish, jsh = shl_pairs[k]
+            shls_slice = (0, nbas, 0, nbas, ish, ish+1, jsh, jsh+1)
+            eri = mol.intor(intor, aosym='s2ij', shls_slice=shls_slice)
+            cols.append(eri.reshape(nao_pair,-1)[:,pair_locs[k]])
+            qids.append(pair_ids[k])
+            ncol += pair_ids[k].size
+        qids = numpy.hstack(qids)
+        cols = numpy.hstack(cols)
+        if naux > 0:
+            cols -= lib.dot(vecs[:naux].T, vecs[:naux,qids])
+        cols[screened] = 0
+
+        naux0 = naux
+        while True:
+            c = numpy.argmax(diag[qids])
+            dc = diag[qids[c]]
+            if dc < dmin:
+                break
+            if naux == cap:
+                cap *= 2
+                vecs = numpy.vstack((vecs, numpy.empty((cap-naux,nao_pair))))
+            v = vecs[naux] = cols[:,c] / numpy.sqrt(dc)
+            naux += 1
+            diag -= v**2
+            diag[qids[c]] = 0
+            cols -= v[:,None] * v[qids]
+        log.debug1('CD pass %d: %d shell pairs, %d columns, %d vectors, '
+                   'max residual diagonal %g', npass, len(sps), qids.size,
+                   naux-naux0, diag.max())
+
+    log.debug('CD of AO integrals: %d vectors in %d passes, tol = %g',
+              naux, npass, tol)
+    log.timer('Cholesky decomposition of AO integrals', *time1)
+    return numpy.array(vecs[:naux], order='C')
+
+
+class CDERI(DF):
+    '''Density fitting object of which the 3-index tensor is generated by the
+    pivoted Cholesky decomposition of the AO integrals.  The methods loop,
+    get_jk, ao2mo etc. are the same to the :class:`DF` object.
+
+    Attributes:
+        tol : float
+            The threshold of the residual diagonal of the decomposition.
+
+    Examples:
+
+    >>> mol = gto.M(atom='N 0 0 0; N 0 0 1.1', basis='ccpvdz')
+    >>> mf = scf.RHF(mol).density_fit(with_df=df.CDERI(mol, tol=1e-6)).run()
+    '''
+    def __init__(self, mol, tol=TOL):
+        DF.__init__(self, mol)
+        self.tol = tol
+        self._keys = self._keys.union(['tol'])
+
+    def dump_flags(self):
+        log = logger.Logger(self.stdout, self.verbose)
+        log.info('******** %s ********', self.__class__)
+        log.info('Cholesky decomposition tol = %g', self.tol)
+        log.info('max_memory = %s', self.max_memory)
+        log.info('cderi_format = %s', self.cderi_format)
+        if isinstance(self._cderi_to_save, str):
+            log.info('_cderi_to_save = %s', self._cderi_to_save)
+        return self
+
+    def build(self):
+        t0 = (time.clock(), time.time())
+        log = logger.Logger(self.stdout, self.verbose)
+        self.check_sanity()
+        self.dump_flags()
+
+        mol = self.mol
+        nao = mol.nao_nr()
+        max_memory = (self.max_memory - lib.current_memory()[0]) * .8
+        cderi = cholesky_ao_eri(mol, self.tol, max_memory=max_memory,
+                                verbose=log)
+        if isinstance(self._cderi_to_save, str):
+            naux, nao_pair = cderi.shape
+            feri, h5d_eri = outcore._create_cderi(self._cderi_to_save, 'j3c', 1,
+                                                  naux, nao_pair, nao,
+                                                  self.cderi_format)
+            h5d_eri[:] = cderi
+            outcore._close_cderi(feri, h5d_eri)
+            self._cderi = self._cderi_to_save
+        else:
+            self._cderi = cderi
+        log.timer_debug1('Generate Cholesky decomposed integrals', *t0)
+        return self
+
+del(MAX_MEMORY)
@@ -20,9 +20,11 @@
 J-metric density fitting
 '''
 
+import os
 import time
 import tempfile
 import numpy
+import scipy.linalg
 import h5py
 from pyscf import lib
 from pyscf import ao2mo
@@ -69,6 +71,25 @@ class DF(lib.StreamObject):
         blockdim : int
             When reading DF integrals from disk the chunk size to load.  It is
             used to improve the IO performance.
+        cderi_format : str
+            File format of _cderi_to_save.  'hdf5' (default) or 'mmap'.  In
+            the 'mmap' format, the DF integral tensor is stored in a raw
+            binary file which is mapped to memory (see
+            :func:`df.addons.create_mmap`).  The method :meth:`loop` then
+            yields the blocks of the tensor without copying.
+        aux_compress : str
+            Compress the auxiliary basis before the DF integral tensor is
+            stored.  None (default) to use the full auxiliary basis.
+            'cholesky' to keep the auxiliary functions selected by the
+            pivoted Cholesky decomposition of the metric.  'svd' to keep
+            the leading singular vectors of the 3-index tensor of the
+            orbital pairs given by aux_compress_mo.
+        aux_compress_tol : float
+            For 'cholesky', the threshold of the residual diagonal of the
+            metric.  For 'svd', the threshold of the eigenvalues of the
+            (L|ij)(ij|M) matrix.
+        aux_compress_mo : 2D array or a list of two 2D arrays
+            Orbitals i, j of the orbital pairs for aux_compress = 'svd'.
     '''
     def __init__(self, mol, auxbasis=None):
         self.mol = mol
@@ -76,6 +97,10 @@ class DF(lib.StreamObject):
         self.verbose = mol.verbose
         self.max_memory = mol.max_memory
         self._auxbasis = auxbasis
+        self.cderi_format = getattr(__config__, 'df_df_DF_cderi_format', 'hdf5')
+        self.aux_compress = getattr(__config__, 'df_df_DF_aux_compress', None)
+        self.aux_compress_tol = getattr(__config__, 'df_df_DF_aux_compress_tol', 1e-7)
+        self.aux_compress_mo = None
 
 ##################################################
 # Following are not input options
@@ -106,6 +131,10 @@ class DF(lib.StreamObject):
         else:
             log.info('auxbasis = auxmol.basis = %s', self.auxmol.basis)
         log.info('max_memory = %s', self.max_memory)
+        log.info('cderi_format = %s', self.cderi_format)
+        if self.aux_compress is not None:
+            log.info('aux_compress = %s  tol = %g', self.aux_compress,
+                     self.aux_compress_tol)
         if isinstance(self._cderi, str):
             log.info('_cderi = %s  where DF integrals are loaded (readonly).',
                      self._cderi)
@@ -131,10 +160,15 @@ class DF(lib.StreamObject):
         max_memory = (self.max_memory - lib.current_memory()[0]) * .8
         int3c = mol._add_suffix('int3c2e')
         int2c = mol._add_suffix('int2c2e')
+        if self.aux_compress == 'cholesky':
+            aux_cd_tol = self.aux_compress_tol
+        else:
+            aux_cd_tol = None
         if (nao_pair*naux*3*8/1e6 < max_memory and
             not isinstance(self._cderi_to_save, str)):
             self._cderi = incore.cholesky_eri(mol, int3c=int3c, int2c=int2c,
-                                              auxmol=auxmol, verbose=log)
+                                              auxmol=auxmol, verbose=log,
+                                              aux_cd_tol=aux_cd_tol)
         else:
             if isinstance(self._cderi_to_save, str):
                 cderi = self._cderi_to_save
@@ -145,12 +179,21 @@ class DF(lib.StreamObject):
                          'saved in file %s .', cderi)
             outcore.cholesky_eri(mol, cderi, dataname='j3c',
                                  int3c=int3c, int2c=int2c, auxmol=auxmol,
-                                 max_memory=max_memory, verbose=log)
-            if nao_pair*naux*8/1e6 < max_memory:
+                                 max_memory=max_memory, verbose=log,
+                                 fmt=self.cderi_format, aux_cd_tol=aux_cd_tol)
+            if self.aux_compress == 'svd':
+                svd_compress(cderi, self.aux_compress_mo,
+                             self.aux_compress_tol, max_memory, log)
+            if nao_pair*naux*8/1e6 < max_memory and self.cderi_format != 'mmap':
                 with addons.load(cderi, 'j3c') as feri:
                     cderi = numpy.asarray(feri)
             self._cderi = cderi
             log.timer_debug1('Generate density fitting integrals', *t0)
+            return self
+
+        if self.aux_compress == 'svd':
+            self._cderi = svd_compress(self._cderi, self.aux_compress_mo,
+                                       self.aux_compress_tol, max_memory, log)
         return self
 
     def kernel(self, *args, **kwargs):
@@ -163,9 +206,18 @@ class DF(lib.StreamObject):
             blksize = self.blockdim
         with addons.load(self._cderi, 'j3c') as feri:
             naoaux = feri.shape[0]
-            for b0, b1 in self.prange(0, naoaux, blksize):
-                eri1 = numpy.asarray(feri[b0:b1], order='C')
-                yield eri1
+            if isinstance(feri, numpy.memmap):
+                # Blocks are the views of the memory-mapped file.  The rows
+                # of the next block are prefetched in the loop order.
+                blocks = list(self.prange(0, naoaux, blksize))
+                for k, (b0, b1) in enumerate(blocks):
+                    if k+1 < len(blocks):
+                        addons.prefetch_mmap(feri, *blocks[k+1])
+                    yield numpy.asarray(feri[b0:b1])
+            else:
+                for b0, b1 in self.prange(0, naoaux, blksize):
+                    eri1 = numpy.asarray(feri[b0:b1], order='C')
+                    yield eri1
 
     def prange(self, start, end, step):
         if isinstance(self._call_count, int):
@@ -222,6 +274,83 @@ class DF(lib.StreamObject):
     get_mo_eri = ao2mo
 
 
+def svd_compress(cderi, mo_coeffs, tol=1e-7, max_memory=2000,
+                 verbose=logger.NOTE):
+    '''Rotate the auxiliary basis of the DF integral tensor to the
+    eigenvectors of (L|ij)(ij|M) for the orbital pairs ij of mo_coeffs
+    and drop the eigenvectors whose eigenvalues are smaller than tol.
+
+    Args:
+        cderi : 2D array, or the filename of the HDF5 (dataset 'j3c') or
+            the mmap file of the DF integral tensor.  The mmap file is
+            compressed in place.  The HDF5 file is replaced by a new file of
+            the compressed tensor.
+
+    Returns:
+        The compressed DF tensor (or the filename)
+    '''
+    log = logger.new_logger(None, verbose)
+    if mo_coeffs is None:
+        raise RuntimeError('aux_compress_mo is required to compress the '
+                           'auxiliary basis with SVD')
+    if isinstance(mo_coeffs, numpy.ndarray) and mo_coeffs.ndim == 2:
+        mo_coeffs = (mo_coeffs,) * 2
+    ijmosym, nij_pair, moij, ijslice = _conc_mos(mo_coeffs[0], mo_coeffs[1])
+
+    with addons.load(cderi, 'j3c') as feri:
+        naux, nao_pair = feri.shape
+        blksize = max(4, int(max_memory*.5e6/8/(nao_pair+nij_pair)))
+        Lij = numpy.empty((naux,nij_pair))
+        for p0, p1 in lib.prange(0, naux, blksize):
+            Lij[p0:p1] = _ao2mo.nr_e2(numpy.asarray(feri[p0:p1], order='C'),
+                                      moij, ijslice, aosym='s2', mosym=ijmosym)
+    w, v = scipy.linalg.eigh(lib.dot(Lij, Lij.T))
+    Lij = None
+    u = numpy.asarray(v[:,w > tol][:,::-1], order='C')
+    nsel = u.shape[1]
+    log.debug('Compress aux basis %d -> %d', naux, nsel)
+
+    if isinstance(cderi, numpy.ndarray):
+        return lib.dot(u.T, cderi)
+
+    if not isinstance(cderi, str):
+        cderi = cderi.name
+    blksize = max(4, int(max_memory*.5e6/8/(naux+nsel)))
+    if addons.is_mmap(cderi):
+        # In C order, the leading nsel rows of the (naux,nao_pair) tensor
+        # are the (nsel,nao_pair) tensor.
+        feri = addons.open_mmap(cderi, 'r+')
+        for p0, p1 in lib.prange(0, nao_pair, blksize):
+            feri[:nsel,p0:p1] = lib.dot(u.T, numpy.asarray(feri[:,p0:p1]))
+        feri.flush()
+        feri = None
+        addons.shrink_mmap(cderi, nsel)
+    else:
+        # HDF5 does not reclaim the space of the deleted dataset.  The
+        # compressed tensor is written to a new file which then replaces
+        # the original one.
+        fswap = tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(cderi)),
+                                            delete=False)
+        fswap.close()
+        try:
+            with h5py.File(cderi, 'r') as feri:
+                with h5py.File(fswap.name, 'w') as fnew:
+                    for key in feri:
+                        if key != 'j3c':
+                            feri.copy(key, fnew)
+                    dat = feri['j3c']
+                    chunks = (min(dat.chunks[0], nsel), dat.chunks[1])
+                    out = fnew.create_dataset('j3c', (nsel,nao_pair), 'f8',
+                                              chunks=chunks)
+                    for p0, p1 in lib.prange(0, nao_pair, blksize):
+                        out[:,p0:p1] = lib.dot(u.T, dat[:,p0:p1])
+            os.rename(fswap.name, cderi)
+        except Exception:
+            os.remove(fswap.name)
+            raise
+    return cderi
+
+
 class DF4C(DF):
     '''Relativistic 4-component'''
     def build(self):
@@ -84,12 +84,52 @@ def fill_2c2e(mol, auxmol, intor='int2c2e', comp=None, hermi=1, out=None):
     return auxmol.intor(intor, comp=comp, hermi=hermi, out=out)
 
 
+def pivoted_cholesky_metric(j2c, tol=1e-7):
+    '''Select the auxiliary functions with the pivoted Cholesky decomposition
+    of the metric j2c.  The decomposition stops when the largest residual
+    diagonal element is smaller than tol.  The metric is reproduced by the
+    selected functions with the error bounded by tol.
+
+    Returns:
+        Sorted indices of the selected auxiliary functions
+    '''
+    j2c = numpy.asarray(j2c, dtype=numpy.double)
+    n = j2c.shape[0]
+    pstrf = getattr(scipy.linalg.lapack, 'dpstrf', None)
+    if pstrf is not None:
+        c, piv, rank, info = pstrf(j2c, tol=tol, lower=True)
+        return numpy.sort(piv[:rank] - 1)
+
+    # Right-looking pivoted Cholesky for the scipy without ?pstrf.  Only the
+    # rows of the selected pivots are stored.
+    diag = j2c.diagonal().copy()
+    low = numpy.empty((min(n, 64),n))
+    idx = []
+    for k in range(n):
+        p = numpy.argmax(diag)
+        if diag[p] < tol:
+            break
+        if k == low.shape[0]:
+            low = numpy.vstack((low, numpy.empty((min(n-k, k),n))))
+        idx.append(p)
+        v = j2c[p] - numpy.dot(low[:k,p], low[:k])
+        low[k] = v / numpy.sqrt(diag[p])
+        diag -= low[k]**2
+        diag[idx] = 0
+    return numpy.sort(idx)
+
 # Note the temporary memory usage is about twice as large as the return cderi
 # array
 def cholesky_eri(mol, auxbasis='weigend+etb', auxmol=None,
                  int3c='int3c2e', aosym='s2ij', int2c='int2c2e', comp=1,
-                 verbose=0, fauxe2=aux_e2):
+                 verbose=0, fauxe2=aux_e2, aux_cd_tol=None):
     '''
+    Kwargs:
+        aux_cd_tol : float
+            If specified, the auxiliary basis is compressed to the functions
+            selected by the pivoted Cholesky decomposition of the metric
+            (see :func:`pivoted_cholesky_metric`).
+
     Returns:
         2D array of (naux,nao*(nao+1)/2) in C-contiguous
     '''
@@ -107,6 +147,12 @@ def cholesky_eri(mol, auxbasis='weigend+etb', auxmol=None,
     j3c = fauxe2(mol, auxmol, intor=int3c, aosym=aosym).reshape(-1,naux)
     t1 = log.timer('3c2e', *t1)
 
+    if aux_cd_tol is not None:
+        idx = pivoted_cholesky_metric(j2c, aux_cd_tol)
+        log.debug('Compress aux basis %d -> %d', naux, idx.size)
+        j2c = j2c[idx[:,None],idx]
+        j3c = j3c[:,idx]
+
     try:
         low = scipy.linalg.cholesky(j2c, lower=True)
         j2c = None
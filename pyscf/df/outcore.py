@@ -26,6 +26,9 @@ from pyscf import gto
 from pyscf.lib import logger
 from pyscf import ao2mo
 from pyscf.ao2mo import _ao2mo
+from pyscf.ao2mo import shard
+from pyscf.df import addons
+from pyscf.df import incore
 from pyscf.df.addons import make_auxmol
 from pyscf import __config__
 
@@ -40,8 +43,23 @@ LINEAR_DEP_THR = getattr(__config__, 'df_df_DF_lindep', 1e-12)
 def cholesky_eri(mol, erifile, auxbasis='weigend+etb', dataname='j3c', tmpdir=None,
                  int3c='int3c2e', aosym='s2ij', int2c='int2c2e', comp=1,
                  max_memory=MAX_MEMORY, ioblk_size=IOBLK_SIZE, auxmol=None,
-                 verbose=logger.NOTE):
+                 verbose=logger.NOTE, fmt='hdf5', aux_cd_tol=None):
     '''3-center 2-electron AO integrals
+
+    If the Cholesky factor of the auxiliary metric fits in memory, the
+    integrals of each block of AO pairs are decomposed immediately and the
+    cderi blocks are written to erifile in a single pass (see
+    :func:`cholesky_eri_1pass`).  Otherwise the raw (ij|L) tensor is first
+    written to a swap file.
+
+    Kwargs:
+        fmt : str
+            'hdf5' to save the integrals in the dataset dataname of the HDF5
+            file erifile.  'mmap' to save them in the raw binary file
+            erifile (see :func:`df.addons.create_mmap`).
+        aux_cd_tol : float
+            Tolerance to compress the auxiliary basis with the pivoted
+            Cholesky decomposition of the metric.
     '''
     assert(aosym in ('s1', 's2ij'))
     assert(comp == 1)
@@ -51,11 +69,20 @@ def cholesky_eri(mol, erifile, auxbasis='weigend+etb', dataname='j3c', tmpdir=No
     if auxmol is None:
         auxmol = make_auxmol(mol, auxbasis)
 
+    # One-pass mode holds the metric and its Cholesky factor in memory
+    naoaux = auxmol.nao_nr()
+    if naoaux**2*8*2/1e6 < max_memory*.5:
+        return cholesky_eri_1pass(mol, erifile, auxbasis, dataname, int3c,
+                                  aosym, int2c, comp, max_memory, ioblk_size,
+                                  auxmol, verbose=log, fmt=fmt,
+                                  aux_cd_tol=aux_cd_tol)
+
     if tmpdir is None:
         tmpdir = lib.param.TMPDIR
     swapfile = tempfile.NamedTemporaryFile(dir=tmpdir)
     cholesky_eri_b(mol, swapfile.name, auxbasis, dataname,
-                   int3c, aosym, int2c, comp, ioblk_size, auxmol, verbose=log)
+                   int3c, aosym, int2c, comp, ioblk_size, auxmol, verbose=log,
+                   aux_cd_tol=aux_cd_tol)
     fswap = h5py.File(swapfile.name, 'r')
     time1 = log.timer('generate (ij|L) 1 pass', *time0)
 
@@ -67,15 +94,8 @@ def cholesky_eri(mol, erifile, auxbasis='weigend+etb', dataname='j3c', tmpdir=No
     else:
         nao_pair = nao * (nao+1) // 2
 
-    feri = _create_h5file(erifile, dataname)
-    if comp == 1:
-        chunks = (min(int(16e3/nao),naoaux), nao) # 128K
-        h5d_eri = feri.create_dataset(dataname, (naoaux,nao_pair), 'f8',
-                                      chunks=chunks)
-    else:
-        chunks = (1, min(int(16e3/nao),naoaux), nao) # 128K
-        h5d_eri = feri.create_dataset(dataname, (comp,naoaux,nao_pair), 'f8',
-                                      chunks=chunks)
+    feri, h5d_eri = _create_cderi(erifile, dataname, comp, naoaux, nao_pair,
+                                  nao, fmt)
     aopairblks = len(fswap[dataname+'/0'])
 
     ioblk_size = max(max_memory*.1, ioblk_size)
@@ -103,7 +123,7 @@ def cholesky_eri(mol, erifile, auxbasis='weigend+etb', dataname='j3c', tmpdir=No
                             (istep, totstep, icomp, row0, row1, nrow), *ti0)
 
     fswap.close()
-    feri.close()
+    _close_cderi(feri, h5d_eri)
     log.timer('cholesky_eri', *time0)
     return erifile
 
@@ -111,7 +131,7 @@ def cholesky_eri(mol, erifile, auxbasis='weigend+etb', dataname='j3c', tmpdir=No
 def cholesky_eri_b(mol, erifile, auxbasis='weigend+etb', dataname='j3c',
                    int3c='int3c2e', aosym='s2ij', int2c='int2c2e',
                    comp=1, ioblk_size=IOBLK_SIZE, auxmol=None,
-                   verbose=logger.NOTE):
+                   verbose=logger.NOTE, aux_cd_tol=None):
     '''3-center 2-electron AO integrals
     '''
     assert(aosym in ('s1', 's2ij'))
@@ -120,37 +140,15 @@ def cholesky_eri_b(mol, erifile, auxbasis='weigend+etb', dataname='j3c',
 
     if auxmol is None:
         auxmol = make_auxmol(mol, auxbasis)
-    j2c = auxmol.intor(int2c, hermi=1)
-    log.debug('size of aux basis %d', j2c.shape[0])
-    time1 = log.timer('2c2e', *time0)
-    try:
-        low = scipy.linalg.cholesky(j2c, lower=True)
-        tag = 'cd'
-    except scipy.linalg.LinAlgError:
-        w, v = scipy.linalg.eigh(j2c)
-        idx = w > LINEAR_DEP_THR
-        low = (v[:,idx] / numpy.sqrt(w[idx]))
-        v = None
-        tag = 'eig'
-    j2c = None
-    naux = low.shape[0]
-    time1 = log.timer('Cholesky 2c2e', *time1)
+    low, tag = _decompose_j2c(auxmol, int2c, log, aux_cd_tol)
+    time1 = log.timer('Cholesky 2c2e', *time0)
 
     feri = _create_h5file(erifile, dataname)
     for icomp in range(comp):
         feri.create_group('%s/%d'%(dataname,icomp)) # for h5py old version
 
     def store(b, label):
-        if b.ndim == 3 and b.flags.f_contiguous:
-            b = lib.transpose(b.T, axes=(0,2,1)).reshape(naux,-1)
-        else:
-            b = b.reshape((-1,naux)).T
-        if tag == 'cd':
-            cderi = scipy.linalg.solve_triangular(low, b, lower=True,
-                                                  overwrite_b=True)
-        else:
-            cderi = lib.dot(low.T, b)
-        feri[label] = cderi
+        feri[label] = _decompose_3c(b, low, tag)
 
     int3c = mol._add_suffix(int3c)
     int3c = gto.moleintor.ascint3(int3c)
@@ -199,10 +197,94 @@ def cholesky_eri_b(mol, erifile, auxbasis='weigend+etb', dataname='j3c',
     return erifile
 
 
+def cholesky_eri_1pass(mol, erifile, auxbasis='weigend+etb', dataname='j3c',
+                       int3c='int3c2e', aosym='s2ij', int2c='int2c2e', comp=1,
+                       max_memory=MAX_MEMORY, ioblk_size=IOBLK_SIZE,
+                       auxmol=None, verbose=logger.NOTE, fmt='hdf5',
+                       aux_cd_tol=None):
+    '''3-center 2-electron AO integrals in the final layout of cholesky_eri
+    without the intermediate swap file.  The Cholesky factor of the
+    auxiliary metric is kept in memory.  Each block of (ij|L) is decomposed
+    as soon as it is computed and written to erifile in the background while
+    the next block is evaluated.
+    '''
+    assert(aosym in ('s1', 's2ij'))
+    log = logger.new_logger(mol, verbose)
+    time0 = (time.clock(), time.time())
+
+    if auxmol is None:
+        auxmol = make_auxmol(mol, auxbasis)
+    low, tag = _decompose_j2c(auxmol, int2c, log, aux_cd_tol)
+    naux = low.shape[1]
+    time1 = log.timer('Cholesky 2c2e', *time0)
+
+    int3c = mol._add_suffix(int3c)
+    int3c = gto.moleintor.ascint3(int3c)
+    atm, bas, env = gto.mole.conc_env(mol._atm, mol._bas, mol._env,
+                                      auxmol._atm, auxmol._bas, auxmol._env)
+    ao_loc = gto.moleintor.make_loc(bas, int3c)
+    nao = ao_loc[mol.nbas]
+    naoaux = ao_loc[-1] - nao
+    if aosym == 's1':
+        nao_pair = nao * nao
+    else:
+        nao_pair = nao * (nao+1) // 2
+    # Two integral buffers are needed: one is being filled while the cderi
+    # block decomposed from the other one is being written.
+    mem_avail = max_memory - naoaux**2*8/1e6 - lib.current_memory()[0]
+    ioblk_size = min(ioblk_size, max(mem_avail*.25, 1))
+    buflen = min(max(int(ioblk_size*1e6/8/naoaux/comp), 1), nao_pair)
+    shranges = _guess_shell_ranges(mol, buflen, aosym)
+    log.debug('erifile %.8g MB, IO buf size %.8g MB',
+              naux*nao_pair*8/1e6, comp*buflen*naoaux*8/1e6)
+    if log.verbose >= logger.DEBUG1:
+        log.debug1('shranges = %s', shranges)
+
+    feri, h5d_eri = _create_cderi(erifile, dataname, comp, naux, nao_pair,
+                                  nao, fmt)
+
+    def save(col0, col1, cderi):
+        if comp == 1:
+            h5d_eri[:,col0:col1] = cderi[0]
+        else:
+            for icomp in range(comp):
+                h5d_eri[icomp,:,col0:col1] = cderi[icomp]
+
+    cintopt = gto.moleintor.make_cintopt(atm, bas, env, int3c)
+    bufsize = comp*max([x[2] for x in shranges])*naoaux
+    buf = numpy.empty(bufsize)
+    buf1 = numpy.empty(bufsize)
+    col1 = 0
+    with lib.call_in_background(save) as bsave:
+        for istep, sh_range in enumerate(shranges):
+            bstart, bend, nrow = sh_range
+            shls_slice = (bstart, bend, 0, mol.nbas, mol.nbas, mol.nbas+auxmol.nbas)
+            ints = gto.moleintor.getints3c(int3c, atm, bas, env, shls_slice,
+                                           comp, aosym, ao_loc, cintopt, out=buf)
+            if comp == 1:
+                ints = ints[None]
+            # cderi may share the memory with buf
+            cderi = [_decompose_3c(x, low, tag) for x in ints]
+            col0, col1 = col1, col1 + cderi[0].shape[1]
+            bsave(col0, col1, cderi)
+            buf, buf1 = buf1, buf
+            time1 = log.timer_debug1('gen CD eri [%d/%d]' % (istep+1,len(shranges)),
+                                     *time1)
+    buf = buf1 = None
+
+    _close_cderi(feri, h5d_eri)
+    log.timer('cholesky_eri', *time0)
+    return erifile
+
+
 def general(mol, mo_coeffs, erifile, auxbasis='weigend+etb', dataname='eri_mo', tmpdir=None,
             int3c='int3c2e', aosym='s2ij', int2c='int2c2e', comp=1,
-            max_memory=MAX_MEMORY, ioblk_size=IOBLK_SIZE, verbose=0, compact=True):
+            max_memory=MAX_MEMORY, ioblk_size=IOBLK_SIZE, verbose=0, compact=True,
+            shard_dirs=shard.SHARD_DIRS):
     ''' Transform ij of (ij|L) to MOs.
+
+    If shard_dirs is given, the auxiliary index of the transformed integrals
+    is sharded across files in these directories (see :mod:`ao2mo.shard`).
     '''
     assert(aosym in ('s1', 's2ij'))
     time0 = (time.clock(), time.time())
@@ -235,12 +317,15 @@ def general(mol, mo_coeffs, erifile, auxbasis='weigend+etb', dataname='eri_mo',
     feri = _create_h5file(erifile, dataname)
     if comp == 1:
         chunks = (min(int(64e3/nmoj),naoaux), nmoj) # 512K
-        h5d_eri = feri.create_dataset(dataname, (naoaux,nij_pair), 'f8',
-                                      chunks=chunks)
+        shape = (naoaux,nij_pair)
     else:
         chunks = (1, min(int(64e3/nmoj),naoaux), nmoj) # 512K
-        h5d_eri = feri.create_dataset(dataname, (comp,naoaux,nij_pair), 'f8',
-                                      chunks=chunks)
+        shape = (comp,naoaux,nij_pair)
+    if shard.shardable(feri, shard_dirs) and nij_pair > 0:
+        h5d_eri = shard.create_dataset(feri, dataname, shape, 'f8', chunks,
+                                       shard_dirs)
+    else:
+        h5d_eri = feri.create_dataset(dataname, shape, 'f8', chunks=chunks)
     aopairblks = len(fswap[dataname+'/0'])
 
     iolen = min(int(ioblk_size*1e6/8/(nao_pair+nij_pair)), naoaux)
@@ -272,25 +357,100 @@ def general(mol, mo_coeffs, erifile, auxbasis='weigend+etb', dataname='eri_mo',
                             (istep, totstep, icomp, row0, row1, nrow), *ti0)
 
     fswap.close()
+    if isinstance(h5d_eri, shard.ShardedDataset):
+        h5d_eri.close()
     feri.close()
     log.timer('AO->MO CD eri transformation 2 pass', *time1)
     log.timer('AO->MO CD eri transformation', *time0)
     return erifile
 
+def _decompose_j2c(auxmol, int2c, log, aux_cd_tol=None):
+    '''Cholesky factor of the auxiliary metric.  For linearly dependent
+    auxiliary basis, the inverse square root of the metric in the
+    non-singular subspace is returned.  If aux_cd_tol is given, the
+    auxiliary functions selected by the pivoted Cholesky decomposition
+    are kept and the transformation from all auxiliary functions is
+    returned.
+    '''
+    j2c = auxmol.intor(int2c, hermi=1)
+    naux = j2c.shape[0]
+    log.debug('size of aux basis %d', naux)
+    if aux_cd_tol is not None:
+        idx = incore.pivoted_cholesky_metric(j2c, aux_cd_tol)
+        log.debug('Compress aux basis %d -> %d', naux, idx.size)
+        low = scipy.linalg.cholesky(j2c[idx[:,None],idx], lower=True)
+        proj = numpy.zeros((naux,idx.size))
+        proj[idx] = scipy.linalg.solve_triangular(low, numpy.eye(idx.size),
+                                                  lower=True).T
+        return proj, 'eig'
+    try:
+        low = scipy.linalg.cholesky(j2c, lower=True)
+        tag = 'cd'
+    except scipy.linalg.LinAlgError:
+        w, v = scipy.linalg.eigh(j2c)
+        idx = w > LINEAR_DEP_THR
+        low = (v[:,idx] / numpy.sqrt(w[idx]))
+        v = None
+        tag = 'eig'
+    return low, tag
+
+def _decompose_3c(b, low, tag):
+    '''Apply the decomposed metric to the (ij|L) block b. The returned cderi
+    may share the memory with b.
+    '''
+    naux = low.shape[0]
+    if b.ndim == 3 and b.flags.f_contiguous:
+        b = lib.transpose(b.T, axes=(0,2,1)).reshape(naux,-1)
+    else:
+        b = b.reshape((-1,naux)).T
+    if tag == 'cd':
+        cderi = scipy.linalg.solve_triangular(low, b, lower=True,
+                                              overwrite_b=True)
+    else:
+        cderi = lib.dot(low.T, b)
+    return cderi
+
 def _guess_shell_ranges(mol, buflen, aosym):
-    from pyscf.ao2mo.outcore import balance_partition
     ao_loc = mol.ao_loc_nr()
+    # Batches of shells i of the 3-center integrals (ij|L) are balanced by
+    # the estimated cost of the shell pairs ij
+    costs = gto.scheduler.shell_pair_cost(mol, ao_loc)
     if 's2' in aosym:
-        return balance_partition(ao_loc*(ao_loc+1)//2, buflen)
+        costs = numpy.tril(costs).sum(axis=1)
+        sizes = ao_loc[1:]*(ao_loc[1:]+1)//2 - ao_loc[:-1]*(ao_loc[:-1]+1)//2
     else:
         nao = ao_loc[-1]
-        return balance_partition(ao_loc*nao, buflen)
+        costs = costs.sum(axis=1)
+        sizes = (ao_loc[1:] - ao_loc[:-1]) * nao
+    return gto.scheduler.balanced_partition(costs, sizes, buflen)
+
+def _create_cderi(erifile, dataname, comp, naux, nao_pair, nao, fmt='hdf5'):
+    '''Output of cholesky_eri.  Returns the file handler (None for the mmap
+    format) and the array-like object to write the integrals.'''
+    if comp == 1:
+        shape = (naux, nao_pair)
+    else:
+        shape = (comp, naux, nao_pair)
+    if fmt == 'mmap':
+        return None, addons.create_mmap(erifile, shape)
+
+    feri = _create_h5file(erifile, dataname)
+    if comp == 1:
+        chunks = (min(int(16e3/nao),naux), nao) # 128K
+    else:
+        chunks = (1, min(int(16e3/nao),naux), nao) # 128K
+    return feri, feri.create_dataset(dataname, shape, 'f8', chunks=chunks)
+
+def _close_cderi(feri, h5d_eri):
+    if feri is None:
+        h5d_eri.flush()
+    else:
+        feri.close()
 
 def _create_h5file(erifile, dataname):
     if h5py.is_hdf5(erifile):
         feri = h5py.File(erifile)
-        if dataname in feri:
-            del(feri[dataname])
+        shard.remove(feri, dataname)
     else:
         feri = h5py.File(erifile, 'w')
     return feri
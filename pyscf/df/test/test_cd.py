@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import tempfile
+import numpy
+from pyscf import lib
+from pyscf import gto
+from pyscf import scf
+from pyscf import ao2mo
+from pyscf import df
+
+mol = gto.Mole()
+mol.build(
+    verbose = 0,
+    atom = '''O     0    0.       0.
+              1     0    -0.757   0.587
+              1     0    0.757    0.587''',
+    basis = 'cc-pvdz',
+)
+
+def tearDownModule():
+    global mol
+    del mol
+
+
+class KnownValues(unittest.TestCase):
+    def test_cholesky_ao_eri(self):
+        eri = mol.intor('int2e', aosym='s4')
+        for tol in (1e-4, 1e-7):
+            cderi = df.cd.cholesky_ao_eri(mol, tol)
+            self.assertTrue(cderi.shape[0] < cderi.shape[1])
+            self.assertTrue(abs(lib.dot(cderi.T, cderi) - eri).max() < tol)
+
+        # Small batches, one shell pair for each pass
+        cderi1 = df.cd.cholesky_ao_eri(mol, 1e-7, max_qual=1)
+        self.assertTrue(abs(lib.dot(cderi1.T, cderi1) - eri).max() < 1e-7)
+
+    def test_cderi(self):
+        mf = scf.RHF(mol)
+        mf.conv_tol = 1e-11
+        e0 = mf.kernel()
+        mf = scf.RHF(mol).density_fit(with_df=df.CDERI(mol, tol=1e-8))
+        mf.conv_tol = 1e-11
+        self.assertAlmostEqual(mf.kernel(), e0, 7)
+
+        mo = mf.mo_coeff[:,:6]
+        ref = ao2mo.full(mol, mo)
+        self.assertAlmostEqual(abs(mf.with_df.ao2mo(mo) - ref).max(), 0, 7)
+
+        ftmp = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        for fmt in ('hdf5', 'mmap'):
+            dfobj = df.CDERI(mol, tol=1e-8)
+            dfobj._cderi_to_save = ftmp.name
+            dfobj.cderi_format = fmt
+            dfobj.build()
+            self.assertAlmostEqual(abs(dfobj.ao2mo(mo) - ref).max(), 0, 7)
+            self.assertEqual(dfobj.get_naoaux(), mf.with_df.get_naoaux())
+
+
+if __name__ == "__main__":
+    print("Full Tests for Cholesky decomposed integrals")
+    unittest.main()
@@ -85,6 +85,79 @@ class KnownValues(unittest.TestCase):
         eri1 = dfobj.get_eri()
         self.assertAlmostEqual(abs(eri0-eri1).max(), 0, 9)
 
+    def test_cderi_mmap(self):
+        ftmp = tempfile.NamedTemporaryFile()
+        dfobj = df.DF(mol)
+        dfobj.max_memory = 0.01
+        dfobj.cderi_format = 'mmap'
+        dfobj._cderi_to_save = ftmp.name
+        dfobj.build()
+        self.assertTrue(df.addons.is_mmap(ftmp.name))
+        self.assertEqual(dfobj.get_naoaux(), 116)
+        for eri1 in dfobj.loop(blksize=50):
+            self.assertFalse(eri1.flags.owndata)
+            self.assertTrue(eri1.flags.c_contiguous)
+        eri1 = dfobj.get_eri()
+        cderi0 = df.incore.cholesky_eri(mol, auxmol=dfobj.auxmol)
+        eri0 = ao2mo.restore(8, numpy.dot(cderi0.T, cderi0), mol.nao_nr())
+        self.assertAlmostEqual(abs(eri0-eri1).max(), 0, 9)
+
+        df.outcore.cholesky_eri(mol, ftmp.name, auxmol=dfobj.auxmol, fmt='mmap')
+        cderi1 = df.addons.open_mmap(ftmp.name)
+        self.assertAlmostEqual(abs(cderi1-cderi0).max(), 0, 9)
+
+    def test_aux_compress(self):
+        auxbasis = df.aug_etb(mol, beta=1.5)
+        dfobj = df.DF(mol, auxbasis)
+        cderi0 = dfobj.build()._cderi
+        eri0 = numpy.dot(cderi0.T, cderi0)
+        self.assertEqual(cderi0.shape[0], 275)
+
+        dfobj = df.DF(mol, auxbasis)
+        dfobj.aux_compress = 'cholesky'
+        dfobj.aux_compress_tol = 1e-6
+        self.assertEqual(dfobj.get_naoaux(), 253)
+        eri1 = numpy.dot(dfobj._cderi.T, dfobj._cderi)
+        self.assertAlmostEqual(abs(eri1-eri0).max(), 0, 4)
+
+        # outcore
+        dfobj.max_memory = .01
+        dfobj.build()
+        eri2 = dfobj.get_eri()
+        self.assertAlmostEqual(abs(ao2mo.restore(4, eri2, mol.nao_nr())-eri1).max(), 0, 9)
+
+        numpy.random.seed(2)
+        nao = mol.nao_nr()
+        mo = numpy.random.random((nao,nao))
+        mo_eri0 = ao2mo.kernel(eri0, (mo[:,:3], mo[:,3:9])*2, compact=False)
+        ftmp = tempfile.NamedTemporaryFile()
+        dfobj = df.DF(mol, auxbasis)
+        dfobj.max_memory = .01
+        dfobj.cderi_format = 'mmap'
+        dfobj._cderi_to_save = ftmp.name
+        dfobj.aux_compress = 'svd'
+        dfobj.aux_compress_mo = (mo[:,:3], mo[:,3:9])
+        self.assertEqual(dfobj.get_naoaux(), 18)
+        mo_eri1 = dfobj.ao2mo((mo[:,:3], mo[:,3:9])*2, compact=False)
+        self.assertAlmostEqual(abs(mo_eri1-mo_eri0).max(), 0, 6)
+
+        # The HDF5 file is rewritten, the space of the full tensor is released
+        dfobj = df.DF(mol, auxbasis)
+        dfobj.max_memory = .01
+        dfobj._cderi_to_save = ftmp.name
+        dfobj.build()
+        size0 = os.path.getsize(ftmp.name)
+        dfobj.aux_compress = 'svd'
+        dfobj.aux_compress_mo = (mo[:,:3], mo[:,3:9])
+        self.assertEqual(dfobj.build().get_naoaux(), 18)
+        self.assertTrue(os.path.getsize(ftmp.name) < size0 * .2)
+        mo_eri1 = dfobj.ao2mo((mo[:,:3], mo[:,3:9])*2, compact=False)
+        self.assertAlmostEqual(abs(mo_eri1-mo_eri0).max(), 0, 6)
+
+        j2c = dfobj.auxmol.intor('int2c2e')
+        idx = df.incore.pivoted_cholesky_metric(j2c, 1e-6)
+        self.assertEqual(idx.size, 253)
+
     def test_init_denisty_fit(self):
         from pyscf.df import df_jk
         from pyscf import cc
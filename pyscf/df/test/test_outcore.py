@@ -94,6 +94,30 @@ class KnownValues(unittest.TestCase):
         with h5py.File(ftmp.name) as feri:
             self.assertTrue(numpy.allclose(feri['eri_mo'], cderi0))
 
+    def test_1pass(self):
+        ftmp = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        cderi0 = df.incore.cholesky_eri(mol)
+        # max_memory=.05 enforces the two-pass algorithm with the swap file
+        df.outcore.cholesky_eri(mol, ftmp.name, max_memory=.05)
+        with h5py.File(ftmp.name) as feri:
+            self.assertAlmostEqual(abs(feri['j3c'].value - cderi0).max(), 0, 9)
+
+        df.outcore.cholesky_eri_1pass(mol, ftmp.name, ioblk_size=.05)
+        with h5py.File(ftmp.name) as feri:
+            self.assertAlmostEqual(abs(feri['j3c'].value - cderi0).max(), 0, 9)
+
+        auxmol1 = auxmol.copy()
+        auxmol1.basis = {'O': 'weigend', 'H': ('weigend', 'weigend')}
+        auxmol1.build(0, 0)
+        df.outcore.cholesky_eri_1pass(mol, ftmp.name, auxmol=auxmol1,
+                                      aosym='s1', ioblk_size=.05)
+        with h5py.File(ftmp.name) as feri:
+            cderi1 = feri['j3c'].value
+        nao = mol.nao_nr()
+        eri0 = ao2mo.restore(1, numpy.dot(cderi0.T, cderi0), nao)
+        eri1 = numpy.dot(cderi1.T, cderi1)
+        self.assertAlmostEqual(abs(eri0.reshape(nao**2,-1)-eri1).max(), 0, 9)
+
     def test_lindep(self):
         ftmp = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
         df.outcore.cholesky_eri(mol, ftmp.name, auxmol=auxmol, verbose=7)
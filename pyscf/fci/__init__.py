@@ -37,6 +37,8 @@ from pyscf.fci import direct_spin1
 from pyscf.fci import direct_uhf
 from pyscf.fci import direct_spin0_symm
 from pyscf.fci import direct_spin1_symm
+from pyscf.fci import direct_spin1_lowmem
+from pyscf.fci import direct_spin1_shm
 from pyscf.fci import addons
 from pyscf.fci import rdm
 from pyscf.fci import spin_op
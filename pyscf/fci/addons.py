@@ -15,12 +15,15 @@
 
 import sys
 import copy
+import ctypes
 import numpy
 from pyscf import lib
 from pyscf.fci import cistring
 from pyscf import symm
 from pyscf import __config__
 
+libfci = lib.load_library('libfci')
+
 LARGE_CI_TOL = getattr(__config__, 'fci_addons_large_ci_tol', 0.1)
 RETURN_STRS = getattr(__config__, 'fci_addons_large_ci_return_strs', True)
 PENALTY = getattr(__config__, 'fci_addons_fix_spin_shift', 0.2)
@@ -694,17 +697,20 @@ def transform_ci_for_orbital_rotation(ci, norb, nelec, u):
     transforming the Hamiltonian, or transforming the coefficients.
     CI_new = fci.kernel(u^T*h1*u, ...) = transform_ci_for_orbital_rotation(CI_old, u)
 
+    The transformation is factorized into a sequence of single-orbital
+    transformations (P. A. Malmqvist, Int. J. Quantum Chem. 30, 479 (1986)),
+    which are applied to the CI vector with the string link tables.  If the
+    factorization is ill-conditioned (e.g. u permutes orbitals), the
+    determinant overlaps between the strings are computed instead.
+
     Args:
         u : 2D array or a list of 2D array
             the orbital rotation to transform the old one-particle basis to new
             one-particle basis
     '''
     neleca, nelecb = _unpack_nelec(nelec)
-    strsa = numpy.asarray(cistring.make_strings(range(norb), neleca))
-    strsb = numpy.asarray(cistring.make_strings(range(norb), nelecb))
-    one_particle_strs = numpy.asarray([1<<i for i in range(norb)])
-    na = len(strsa)
-    nb = len(strsb)
+    na = cistring.num_strings(norb, neleca)
+    nb = cistring.num_strings(norb, nelecb)
     assert(ci.shape == (na, nb))
 
     if isinstance(u, numpy.ndarray) and u.ndim == 2:
@@ -712,46 +718,71 @@ def transform_ci_for_orbital_rotation(ci, norb, nelec, u):
     else:
         ua, ub = u
 
-    if neleca == 0:
-        trans_ci_a = numpy.ones((1,1))
-    else:
-        # Unitary transformation array trans_ci is the overlap between two sets of CI basis.
-        occ_masks = (strsa[:,None] & one_particle_strs) != 0
-        trans_ci_a = numpy.zeros((na,na))
-        #for i in range(na): # for old basis
-        #    for j in range(na):
-        #        uij = u[occ_masks[i]][:,occ_masks[j]]
-        #        trans_ci_a[i,j] = numpy.linalg.det(uij)
-        occ_idx_all_strs = numpy.where(occ_masks)[1].reshape(na,neleca)
-        for i in range(na):
-            ui = ua[occ_masks[i]].T.copy()
-            minors = ui[occ_idx_all_strs]
-            trans_ci_a[i,:] = numpy.linalg.det(minors)
-
-    if neleca == nelecb and numpy.allclose(ua, ub):
-        trans_ci_b = trans_ci_a
-    else:
-        if nelecb == 0:
-            trans_ci_b = numpy.ones((1,1))
-        else:
-            occ_masks = (strsb[:,None] & one_particle_strs) != 0
-            trans_ci_b = numpy.zeros((nb,nb))
-            #for i in range(nb):
-            #    for j in range(nb):
-            #        uij = u[occ_masks[i]][:,occ_masks[j]]
-            #        trans_ci_b[i,j] = numpy.linalg.det(uij)
-            occ_idx_all_strs = numpy.where(occ_masks)[1].reshape(nb,nelecb)
-            for i in range(nb):
-                ui = ub[occ_masks[i]].T.copy()
-                minors = ui[occ_idx_all_strs]
-                trans_ci_b[i,:] = numpy.linalg.det(minors)
-
     # Transform old basis to new basis for all alpha-electron excitations
-    ci = lib.dot(trans_ci_a.T, ci.reshape(na,nb))
+    ci = _transform_strs(ci, norb, neleca, ua)
     # Transform old basis to new basis for all beta-electron excitations
-    ci = lib.dot(ci.reshape(na,nb), trans_ci_b)
+    ci = _transform_strs(ci.T, norb, nelecb, ub).T
+    return numpy.asarray(ci, order='C')
+
+def _transform_strs(ci, norb, nelec, u):
+    '''Transform the string index (the first axis) of ci for the orbital
+    rotation u'''
+    t = _sequential_orbital_factors(u)
+    if t is None:
+        trans_ci = _strs_overlap(norb, nelec, u)
+        return lib.dot(trans_ci.T, ci)
+
+    link_index = cistring.gen_linkstr_index(range(norb), nelec)
+    nstrs, nlink = link_index.shape[:2]
+    ci = numpy.array(ci, order='C', dtype=numpy.double)
+    t = numpy.asarray(t, order='C', dtype=numpy.double)
+    libfci.FCItransform_strs(ci.ctypes.data_as(ctypes.c_void_p),
+                             t.ctypes.data_as(ctypes.c_void_p),
+                             ctypes.c_int(norb), ctypes.c_int(nstrs),
+                             ctypes.c_int(ci.size//nstrs), ctypes.c_int(nlink),
+                             link_index.ctypes.data_as(ctypes.c_void_p))
     return ci
 
+def _sequential_orbital_factors(u, thresh=1e-3):
+    '''Factorize u = T_0 T_1 ... T_{n-1} where T_k differs from the identity
+    matrix only in the k-th row.  Returns the matrix whose k-th row is the
+    k-th row of T_k, or None if the factorization is unstable.
+    '''
+    n = u.shape[0]
+    t = numpy.empty_like(u)
+    r = numpy.eye(n, dtype=u.dtype)
+    try:
+        for k in reversed(range(n)):
+            t[k] = numpy.linalg.solve(r.T, u[k])
+            r[k] = u[k]
+    except numpy.linalg.LinAlgError:
+        return None
+    if (not numpy.isfinite(t).all() or
+        abs(t.diagonal()).min() < thresh * max(1, abs(u).max())):
+        return None
+    return t
+
+def _strs_overlap(norb, nelec, u):
+    '''Determinant overlaps between the strings of two sets of orbitals'''
+    if nelec == 0:
+        return numpy.ones((1,1))
+    strs = numpy.asarray(cistring.make_strings(range(norb), nelec))
+    one_particle_strs = numpy.asarray([1<<i for i in range(norb)])
+    nstrs = len(strs)
+    # Unitary transformation array trans_ci is the overlap between two sets of CI basis.
+    occ_masks = (strs[:,None] & one_particle_strs) != 0
+    trans_ci = numpy.zeros((nstrs,nstrs))
+    #for i in range(nstrs): # for old basis
+    #    for j in range(nstrs):
+    #        uij = u[occ_masks[i]][:,occ_masks[j]]
+    #        trans_ci[i,j] = numpy.linalg.det(uij)
+    occ_idx_all_strs = numpy.where(occ_masks)[1].reshape(nstrs,nelec)
+    for i in range(nstrs):
+        ui = u[occ_masks[i]].T.copy()
+        minors = ui[occ_idx_all_strs]
+        trans_ci[i,:] = numpy.linalg.det(minors)
+    return trans_ci
+
 
 def _unpack_nelec(nelec, spin=None):
     if spin is None:
@@ -108,23 +108,40 @@ def contract_2e(eri, fcivec, norb, nelec, link_index=None):
         eri_{pq,rs} = (pq|rs) - (.5/Nelec) [\sum_q (pq|qs) + \sum_p (pq|rp)]
 
     See also :func:`direct_spin1.absorb_h1e`
+
+    fcivec can also be a block of CI vectors, e.g. an array of shape
+    (nroots,na,nb).  The block is contracted in one pass and the output has
+    the same shape as the input.
     '''
     fcivec = numpy.asarray(fcivec, order='C')
     eri = ao2mo.restore(4, eri, norb)
     link_indexa, link_indexb = _unpack(norb, nelec, link_index)
     na, nlinka = link_indexa.shape[:2]
     nb, nlinkb = link_indexb.shape[:2]
-    assert(fcivec.size == na*nb)
     ci1 = numpy.empty_like(fcivec)
 
-    libfci.FCIcontract_2e_spin1(eri.ctypes.data_as(ctypes.c_void_p),
-                                fcivec.ctypes.data_as(ctypes.c_void_p),
-                                ci1.ctypes.data_as(ctypes.c_void_p),
-                                ctypes.c_int(norb),
-                                ctypes.c_int(na), ctypes.c_int(nb),
-                                ctypes.c_int(nlinka), ctypes.c_int(nlinkb),
-                                link_indexa.ctypes.data_as(ctypes.c_void_p),
-                                link_indexb.ctypes.data_as(ctypes.c_void_p))
+    if fcivec.ndim != 3:
+        assert(fcivec.size == na*nb)
+        libfci.FCIcontract_2e_spin1(eri.ctypes.data_as(ctypes.c_void_p),
+                                    fcivec.ctypes.data_as(ctypes.c_void_p),
+                                    ci1.ctypes.data_as(ctypes.c_void_p),
+                                    ctypes.c_int(norb),
+                                    ctypes.c_int(na), ctypes.c_int(nb),
+                                    ctypes.c_int(nlinka), ctypes.c_int(nlinkb),
+                                    link_indexa.ctypes.data_as(ctypes.c_void_p),
+                                    link_indexb.ctypes.data_as(ctypes.c_void_p))
+    else:
+        nvec = len(fcivec)
+        assert(fcivec.size == nvec*na*nb)
+        libfci.FCIcontract_2e_spin1_multi(eri.ctypes.data_as(ctypes.c_void_p),
+                                          fcivec.ctypes.data_as(ctypes.c_void_p),
+                                          ci1.ctypes.data_as(ctypes.c_void_p),
+                                          ctypes.c_int(norb),
+                                          ctypes.c_int(na), ctypes.c_int(nb),
+                                          ctypes.c_int(nlinka), ctypes.c_int(nlinkb),
+                                          link_indexa.ctypes.data_as(ctypes.c_void_p),
+                                          link_indexb.ctypes.data_as(ctypes.c_void_p),
+                                          ctypes.c_int(nvec))
     return ci1
 
 def make_hdiag(h1e, eri, norb, nelec):
@@ -484,6 +501,14 @@ def kernel_ms1(fci, h1e, eri, norb, nelec, ci0=None, link_index=None,
     def hop(c):
         hc = fci.contract_2e(h2e, c, norb, nelec, (link_indexa,link_indexb))
         return hc.ravel()
+    if (getattr(fci.contract_2e, '__func__', None) is
+        getattr(FCISolver.contract_2e, '__func__', FCISolver.contract_2e)):
+        # The trial vectors of Davidson iteration are contracted in one block
+        def hop_block(cs):
+            cs = numpy.asarray(cs).reshape(-1,na,nb)
+            hc = fci.contract_2e(h2e, cs, norb, nelec, (link_indexa,link_indexb))
+            return hc.reshape(len(cs),-1)
+        hop.block = hop_block
 
     if ci0 is None:
         if callable(getattr(fci, 'get_init_guess', None)):
@@ -710,9 +735,12 @@ class FCISolver(lib.StreamObject):
             self.converged = True
             return scipy.linalg.eigh(op)
 
+        if getattr(op, 'block', None) is not None:
+            aop = lambda xs: list(op.block(xs))
+        else:
+            aop = lambda xs: [op(x) for x in xs]
         self.converged, e, ci = \
-                lib.davidson1(lambda xs: [op(x) for x in xs],
-                              x0, precond, lessio=self.lessio, **kwargs)
+                lib.davidson1(aop, x0, precond, lessio=self.lessio, **kwargs)
         if kwargs['nroots'] == 1:
             self.converged = self.converged[0]
             e = e[0]
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''
+Low-memory FCI solver for large active spaces.
+
+Compared to direct_spin1, the string link tables are not stored.  They are
+generated on the fly for a block of strings with the combinatorial string
+addressing (see cistring.gen_linkstr_index).  The intermediates of the
+sigma vector are blocked over beta strings so that their size is bounded by
+max_memory, and the trial vectors of the Davidson subspace are held in
+memory-mapped scratch files.
+'''
+
+import sys
+import numpy
+from pyscf import lib
+from pyscf import ao2mo
+from pyscf.lib import logger
+from pyscf.fci import cistring
+from pyscf.fci import direct_spin1
+from pyscf.fci.addons import _unpack_nelec
+from pyscf import __config__
+
+# Number of strings for which link tables are generated at a time
+STRS_BLKSIZE = getattr(__config__, 'fci_direct_spin1_lowmem_strs_blksize', 2000)
+
+
+def gen_linkstr_index_blk(norb, nelec, strs, start, stop):
+    '''Link table (in lower triangular pair index) of strings
+    strs[start:stop], grouped by the orbital pairs.
+
+    Returns:
+        A list of (str0, str1, sign) for each orbital pair pq.  str0 is the
+        address of the strings in strs[start:stop], str1 is the address of
+        the string E_pq|str0> (or E_qp|str0>).  For a given pair, str1 is
+        unique in the list.
+    '''
+    tab = cistring.gen_linkstr_index(range(norb), nelec, strs[start:stop],
+                                     tril=True)
+    nstrs, nlink = tab.shape[:2]
+    # The diagonal excitations are indexed relative to strs[start]
+    tab[:,:nelec,2] += start
+    pq = tab[:,:,0].ravel()
+    idx = numpy.argsort(pq, kind='mergesort')
+    str0 = numpy.repeat(numpy.arange(start, stop), nlink)[idx]
+    str1 = tab[:,:,2].ravel()[idx]
+    sign = tab[:,:,3].ravel()[idx].astype(numpy.double)
+    npair = norb * (norb+1) // 2
+    bounds = numpy.searchsorted(pq[idx], numpy.arange(npair+1))
+    return [(str0[p0:p1], str1[p0:p1], sign[p0:p1])
+            for p0, p1 in zip(bounds[:-1], bounds[1:])]
+
+def contract_2e(eri, fcivec, norb, nelec, link_index=None,
+                max_memory=None, verbose=logger.WARN):
+    '''Contract the 4-index Hamiltonian (the output of absorb_h1e) with a FCI
+    vector without storing the link tables.  See also
+    :func:`direct_spin1.contract_2e`.
+
+    The argument link_index is not used.  It is kept for compatibility with
+    direct_spin1.contract_2e.
+    '''
+    if max_memory is None: max_memory = lib.param.MAX_MEMORY
+    if isinstance(verbose, logger.Logger):
+        log = verbose
+    else:
+        log = logger.Logger(sys.stdout, verbose)
+    neleca, nelecb = _unpack_nelec(nelec)
+    strsa = cistring.make_strings(range(norb), neleca)
+    strsb = cistring.make_strings(range(norb), nelecb)
+    na = strsa.size
+    nb = strsb.size
+    npair = norb * (norb+1) // 2
+    eri = ao2mo.restore(4, eri, norb)
+    ci0 = numpy.asarray(fcivec).reshape(na,nb)
+    ci1 = numpy.zeros((na,nb))
+
+    # t1 and the contracted t1 of size npair*na*blksize
+    mem_now = lib.current_memory()[0]
+    mem_avail = max_memory - mem_now
+    blksize = int(mem_avail*1e6/8/(npair*na*2))
+    blksize = max(1, min(nb, blksize))
+    log.debug1('lowmem contract_2e blksize %d for %d beta strings', blksize, nb)
+    if blksize*npair*na*16/1e6 > mem_avail:
+        log.warn('Not enough memory for the intermediates of one beta string. '
+                 '%.0f MB is required', blksize*npair*na*16/1e6)
+
+    for b0, b1 in lib.prange(0, nb, blksize):
+        t1 = numpy.zeros((npair,na,b1-b0))
+        for a0, a1 in lib.prange(0, na, STRS_BLKSIZE):
+            links = gen_linkstr_index_blk(norb, neleca, strsa, a0, a1)
+            for pq, (str0, str1, sign) in enumerate(links):
+                t1[pq,str1] += ci0[str0,b0:b1] * sign[:,None]
+        # (E_pq+E_qp) is hermitian.  t1 of the beta strings of the block can
+        # be gathered from the link tables of these strings.
+        linksb = gen_linkstr_index_blk(norb, nelecb, strsb, b0, b1)
+        for pq, (str0, str1, sign) in enumerate(linksb):
+            t1[pq][:,str0-b0] += ci0[:,str1] * sign
+
+        g1 = numpy.dot(eri, t1.reshape(npair,-1)).reshape(t1.shape)
+        t1 = None
+
+        for a0, a1 in lib.prange(0, na, STRS_BLKSIZE):
+            links = gen_linkstr_index_blk(norb, neleca, strsa, a0, a1)
+            for pq, (str0, str1, sign) in enumerate(links):
+                ci1[str1,b0:b1] += g1[pq,str0] * sign[:,None]
+        for pq, (str0, str1, sign) in enumerate(linksb):
+            ci1[:,str1] += g1[pq][:,str0-b0] * sign
+        g1 = None
+    return ci1.reshape(fcivec.shape)
+
+
+class FCISolver(direct_spin1.FCISolver):
+    '''Memory-lean FCI solver.  The link tables are generated on the fly and
+    the Davidson subspace is stored in memory-mapped files.
+    '''
+    @lib.with_doc(contract_2e.__doc__)
+    def contract_2e(self, eri, fcivec, norb, nelec, link_index=None, **kwargs):
+        nelec = _unpack_nelec(nelec, self.spin)
+        return contract_2e(eri, fcivec, norb, nelec, link_index,
+                           self.max_memory, logger.new_logger(self))
+
+    def eig(self, op, x0=None, precond=None, **kwargs):
+        kwargs['mmap'] = True
+        return direct_spin1.FCISolver.eig(self, op, x0, precond, **kwargs)
+
+    def kernel(self, h1e, eri, norb, nelec, ci0=None,
+               tol=None, lindep=None, max_cycle=None, max_space=None,
+               nroots=None, davidson_only=None, pspace_size=None,
+               orbsym=None, wfnsym=None, ecore=0, **kwargs):
+        if self.verbose >= logger.WARN:
+            self.check_sanity()
+        self.norb = norb
+        self.nelec = nelec
+        neleca, nelecb = _unpack_nelec(nelec, self.spin)
+        # Empty link tables which only carry the number of strings.  The
+        # actual link tables are generated in contract_2e.
+        link_index = (_empty_link_index(norb, neleca),
+                      _empty_link_index(norb, nelecb))
+        self.eci, self.ci = \
+                direct_spin1.kernel_ms1(self, h1e, eri, norb, nelec, ci0,
+                                        link_index, tol, lindep, max_cycle,
+                                        max_space, nroots, davidson_only,
+                                        pspace_size, ecore=ecore, **kwargs)
+        return self.eci, self.ci
+
+FCI = FCISolver
+
+def _empty_link_index(norb, nelec):
+    return numpy.empty((cistring.num_strings(norb, nelec),0,4), dtype=numpy.int32)
+
+
+if __name__ == '__main__':
+    from functools import reduce
+    from pyscf import gto
+    from pyscf import scf
+
+    mol = gto.M(atom='N 0 0 0; N 0 0 1.2', basis='6-31g', verbose=0)
+    mf = scf.RHF(mol).run()
+    norb = 8
+    mo = mf.mo_coeff[:,2:2+norb]
+    h1e = reduce(numpy.dot, (mo.T, mf.get_hcore(), mo))
+    eri = ao2mo.kernel(mol, mo)
+    e1 = direct_spin1.FCI().kernel(h1e, eri, norb, 10)[0]
+    e2 = FCISolver().kernel(h1e, eri, norb, 10, max_memory=1)[0]
+    print(e1 - e2)
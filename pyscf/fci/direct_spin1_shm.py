@@ -0,0 +1,387 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''
+FCI solver parallelized with shared-memory process workers.
+
+A team of processes is forked once for each FCI kernel, before the OpenMP
+and BLAS threads of the Davidson iterations are started.  The team executes
+the sigma vector and the vector operations (inner products and axpy) of the
+Davidson solver.  For the sigma vector, each process takes one block of
+alpha strings; the inner products and axpy are split over the same row
+blocks.  The eri, the Davidson vectors and the buffers for the alpha
+excitations are allocated in anonymous shared memory.  Compared to one
+OpenMP team spanning several sockets, the process workers keep their
+working data (first touch) local to the NUMA node they are running on.
+'''
+
+import mmap
+import ctypes
+import weakref
+import threading
+import multiprocessing
+import numpy
+from pyscf import lib
+from pyscf import ao2mo
+from pyscf.fci import direct_spin1
+from pyscf.fci.addons import _unpack_nelec
+from pyscf import __config__
+
+libfci = direct_spin1.libfci
+
+NPROC = getattr(__config__, 'fci_direct_spin1_shm_nproc', None)
+# Vectors smaller than this size are handled by numpy in the main process
+MIN_PARALLEL_SIZE = getattr(__config__, 'fci_direct_spin1_shm_min_size', 1<<16)
+# Consistent with STRB_BLKSIZE in fci_contract.c
+STRB_BLKSIZE = 112
+
+# Commands of the worker team
+_STOP, _SIGMA, _DOT, _AXPY = range(4)
+
+
+def shm_empty(shape, dtype=numpy.double):
+    '''An array in anonymous shared memory.  It is accessible to the
+    processes forked after its allocation.  The array is zero-initialized.
+    '''
+    dtype = numpy.dtype(dtype)
+    nbytes = max(1, int(numpy.prod(shape)) * dtype.itemsize)
+    buf = mmap.mmap(-1, nbytes)
+    return numpy.ndarray(shape, dtype, buffer=buf)
+
+def _split(n, nproc):
+    bounds = numpy.linspace(0, n, nproc+1).round().astype(int)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+class WorkerTeam(object):
+    '''A team of nproc-1 forked processes plus the current process (rank 0).
+
+    The team owns a shared-memory pool of nvec CI vectors.  The vectors
+    returned by :meth:`contract_2e` and :meth:`asarray` are allocated in the
+    pool.  :meth:`dot` and :meth:`axpy` are executed by the team when all
+    their operands are in the pool, and by numpy otherwise.  The pool slots
+    are released when the arrays are garbage collected.  When the pool is
+    exhausted, regular numpy arrays are returned.
+    '''
+    def __init__(self, norb, nelec, link_index=None, nproc=NPROC, nvec=32):
+        if nproc is None: nproc = multiprocessing.cpu_count()
+        link_indexa, link_indexb = direct_spin1._unpack(norb, nelec, link_index)
+        na, nlinka = link_indexa.shape[:2]
+        nb, nlinkb = link_indexb.shape[:2]
+        self.norb = norb
+        self.na = na
+        self.nb = nb
+        self.nproc = nproc = max(1, min(nproc, na))
+        self.link_indexa = numpy.asarray(link_indexa, order='C')
+        self.link_indexb = numpy.asarray(link_indexb, order='C')
+
+        npair = norb * (norb+1) // 2
+        self.eri = shm_empty((npair,npair))
+        self.ci1bufs = shm_empty((nproc,na*STRB_BLKSIZE))
+        # Pages of the pool are not allocated until they are touched
+        self.vecs = shm_empty((nvec,na*nb))
+        self._free = list(range(nvec))[::-1]
+        self._cmd = shm_empty(4, numpy.int64)
+        self._coeff = shm_empty(1)
+        self._res = shm_empty(nproc)
+        self._rows = _split(na, nproc)
+        self._eri_src = None
+
+        ctx = multiprocessing.get_context('fork')
+        self._barrier = ctx.Barrier(nproc)
+        with lib.with_omp_threads(1):
+            self._procs = [ctx.Process(target=self._worker, args=(rank,))
+                           for rank in range(1, nproc)]
+            for p in self._procs:
+                p.daemon = True
+                p.start()
+
+    def _worker(self, rank):
+        lib.num_threads(1)
+        try:
+            while True:
+                self._barrier.wait()
+                if self._cmd[0] == _STOP:
+                    break
+                self._run(rank)
+                self._barrier.wait()
+        except BaseException:
+            self._barrier.abort()
+            raise
+
+    def _run(self, rank):
+        op, a0, a1, n = [int(x) for x in self._cmd]
+        vecs = self.vecs.ravel()
+        na, nb = self.na, self.nb
+        k0, k1 = self._rows[rank]
+        if n == na * nb:
+            p0, p1 = k0 * nb, k1 * nb
+        else:
+            p0, p1 = _split(n, self.nproc)[rank]
+        if op == _SIGMA:
+            self._sigma(rank, vecs[a0:a0+n], vecs[a1:a1+n])
+        elif op == _DOT:
+            self._res[rank] = numpy.dot(vecs[a0+p0:a0+p1], vecs[a1+p0:a1+p1])
+        elif op == _AXPY:
+            y = vecs[a1+p0:a1+p1]
+            y += self._coeff[0] * vecs[a0+p0:a0+p1]
+
+    def _sigma(self, rank, ci0, ci1):
+        norb, na, nb = self.norb, self.na, self.nb
+        nlinka = self.link_indexa.shape[1]
+        nlinkb = self.link_indexb.shape[1]
+        k0, k1 = self._rows[rank]
+        ci1 = ci1.reshape(na,nb)
+        ci1[k0:k1] = 0
+        for ib in range(0, nb, STRB_BLKSIZE):
+            blen = min(STRB_BLKSIZE, nb-ib)
+            ci1buf = self.ci1bufs[rank,:na*blen]
+            ci1buf[:] = 0
+            libfci.FCIcontract_2e_spin1_rows(
+                self.eri.ctypes.data_as(ctypes.c_void_p),
+                ci0.ctypes.data_as(ctypes.c_void_p),
+                ci1.ctypes.data_as(ctypes.c_void_p),
+                ci1buf.ctypes.data_as(ctypes.c_void_p),
+                ctypes.c_int(norb), ctypes.c_int(na), ctypes.c_int(nb),
+                ctypes.c_int(nlinka), ctypes.c_int(nlinkb),
+                self.link_indexa.ctypes.data_as(ctypes.c_void_p),
+                self.link_indexb.ctypes.data_as(ctypes.c_void_p),
+                ctypes.c_int(ib), ctypes.c_int(blen),
+                ctypes.c_int(k0), ctypes.c_int(k1))
+            self._barrier.wait()
+            # Each process reduces the alpha-excitation buffers for its own rows
+            for buf in self.ci1bufs:
+                ci1[k0:k1,ib:ib+blen] += buf[:na*blen].reshape(na,blen)[k0:k1]
+            self._barrier.wait()
+
+    def _dispatch(self, op, a0, a1, n):
+        if self._procs is None:
+            raise RuntimeError('FCI worker team was closed')
+        self._cmd[:] = (op, a0, a1, n)
+        try:
+            with lib.with_omp_threads(1):
+                self._barrier.wait()
+                self._run(0)
+                self._barrier.wait()
+        except threading.BrokenBarrierError:
+            self.close()
+            raise RuntimeError('FCI process worker failed')
+        except BaseException:
+            self._barrier.abort()
+            self.close()
+            raise
+
+    def close(self):
+        '''Stop the worker processes'''
+        if self._procs is None:
+            return
+        procs, self._procs = self._procs, None
+        self._cmd[0] = _STOP
+        try:
+            self._barrier.wait(timeout=60)
+        except threading.BrokenBarrierError:
+            pass
+        for p in procs:
+            p.join(60)
+            if p.is_alive():
+                p.terminate()
+
+    def _offset(self, x):
+        '''Offset of array x in the vector pool.  None if x is not in the
+        pool.'''
+        if (not isinstance(x, numpy.ndarray) or x.dtype != numpy.double or
+            not x.flags.c_contiguous):
+            return None
+        p0 = x.ctypes.data - self.vecs.ctypes.data
+        if 0 <= p0 and p0 + x.nbytes <= self.vecs.nbytes:
+            return p0 // self.vecs.itemsize
+        return None
+
+    def empty(self):
+        '''A 1D CI vector in the vector pool.  None if the pool is exhausted.
+        '''
+        if not self._free:
+            return None
+        k = self._free.pop()
+        size = self.na * self.nb
+        # A dedicated ndarray (rather than a view of self.vecs) for each
+        # slot, so that the views derived from it keep the slot alive.
+        x = numpy.ndarray(size, buffer=self.vecs.base,
+                          offset=k*size*self.vecs.itemsize)
+        weakref.finalize(x, self._free.append, k)
+        return x
+
+    def asarray(self, x):
+        '''Copy the CI vector x to the vector pool if it is not there.'''
+        x = numpy.asarray(x)
+        if x.size != self.na*self.nb or self._offset(x) is not None:
+            return x
+        y = self.empty()
+        if y is None:
+            return x
+        y[:] = x.ravel()
+        return y.reshape(x.shape)
+
+    def dot(self, x, y):
+        '''Inner product for the Davidson solver'''
+        ox = self._offset(x)
+        oy = self._offset(y)
+        if (ox is None or oy is None or x.size != y.size or
+            x.size < MIN_PARALLEL_SIZE):
+            return numpy.dot(x, y)
+        self._dispatch(_DOT, ox, oy, x.size)
+        return self._res.sum()
+
+    def axpy(self, a, x, y):
+        '''In-place y += a * x for the Davidson solver'''
+        ox = self._offset(x)
+        oy = self._offset(y)
+        if (ox is None or oy is None or x.size != y.size or
+            x.size < MIN_PARALLEL_SIZE or numpy.iscomplexobj(a)):
+            y += a * x
+        else:
+            self._coeff[0] = a
+            self._dispatch(_AXPY, ox, oy, x.size)
+
+    def contract_2e(self, eri, fcivec):
+        '''Contract eri (the output of absorb_h1e) with fcivec.  The sigma
+        vector is returned in the vector pool.'''
+        if eri is not self._eri_src:
+            self.eri[:] = ao2mo.restore(4, eri, self.norb).reshape(self.eri.shape)
+            self._eri_src = eri
+        fcivec = numpy.asarray(fcivec)
+        ci0 = self.asarray(fcivec)
+        ci1 = self.empty()
+        o0 = self._offset(ci0)
+        if ci1 is None or o0 is None:
+            link_index = (self.link_indexa, self.link_indexb)
+            return direct_spin1.contract_2e(eri, fcivec, self.norb, None,
+                                            link_index)
+        self._dispatch(_SIGMA, o0, self._offset(ci1), ci1.size)
+        return ci1.reshape(fcivec.shape)
+
+
+def contract_2e(eri, fcivec, norb, nelec, link_index=None, nproc=NPROC):
+    '''Contract the 4-index Hamiltonian (the output of absorb_h1e) with a FCI
+    vector using nproc processes.  See also :func:`direct_spin1.contract_2e`.
+
+    A worker team is created for this call.  Use :class:`FCISolver` to reuse
+    one team for all sigma vectors of a Davidson diagonalization.
+    '''
+    if nproc is None: nproc = multiprocessing.cpu_count()
+    fcivec = numpy.asarray(fcivec)
+    link_indexa, link_indexb = direct_spin1._unpack(norb, nelec, link_index)
+    na = link_indexa.shape[0]
+    nb = link_indexb.shape[0]
+    assert(fcivec.size == na*nb)
+    if min(nproc, na) <= 1:
+        return direct_spin1.contract_2e(eri, fcivec, norb, nelec, link_index)
+
+    team = WorkerTeam(norb, nelec, (link_indexa, link_indexb), nproc, nvec=2)
+    try:
+        return numpy.array(team.contract_2e(eri, fcivec))
+    finally:
+        team.close()
+
+
+class FCISolver(direct_spin1.FCISolver):
+    '''FCI solver parallelized with shared-memory process workers.
+
+    Attributes:
+        nproc : int
+            Number of processes.  Default is the number of CPUs.
+    '''
+    def __init__(self, mol=None):
+        direct_spin1.FCISolver.__init__(self, mol)
+        self.nproc = NPROC
+        self._team = None
+        self._keys = self._keys.union(['nproc'])
+
+    @property
+    def _nproc(self):
+        if self.nproc is None:
+            return multiprocessing.cpu_count()
+        return self.nproc
+
+    def dump_flags(self, verbose=None):
+        direct_spin1.FCISolver.dump_flags(self, verbose)
+        lib.logger.info(self, 'nproc = %d', self._nproc)
+        return self
+
+    def kernel(self, h1e, eri, norb, nelec, ci0=None, **kwargs):
+        nelec = _unpack_nelec(nelec, self.spin)
+        nroots = kwargs.get('nroots', None) or self.nroots
+        max_space = kwargs.get('max_space', None) or self.max_space
+        # Davidson holds the trial vectors, their sigma vectors and a few
+        # temporary vectors for each root
+        nvec = 2 * (max_space + nroots*3) + nroots*3 + 2
+        # Fork the team before OpenMP and BLAS threads are started
+        self._team = WorkerTeam(norb, nelec, None, self._nproc, nvec)
+        try:
+            return direct_spin1.FCISolver.kernel(self, h1e, eri, norb, nelec,
+                                                 ci0, **kwargs)
+        finally:
+            self._team.close()
+            self._team = None
+
+    @lib.with_doc(contract_2e.__doc__)
+    def contract_2e(self, eri, fcivec, norb, nelec, link_index=None, **kwargs):
+        nelec = _unpack_nelec(nelec, self.spin)
+        team = self._team
+        if (team is not None and team.norb == norb and
+            numpy.size(fcivec) == team.na*team.nb and
+            (link_index is None or
+             link_index[0].shape[0] == team.na and
+             link_index[1].shape[0] == team.nb)):
+            return team.contract_2e(eri, fcivec)
+        return contract_2e(eri, fcivec, norb, nelec, link_index, self._nproc)
+
+    def make_precond(self, hdiag, pspaceig, pspaceci, addr):
+        fn = direct_spin1.FCISolver.make_precond(self, hdiag, pspaceig,
+                                                 pspaceci, addr)
+        team = self._team
+        if team is None:
+            return fn
+        # The trial vectors are placed in the vector pool
+        def precond(x, e, *args):
+            return team.asarray(fn(x, e, *args))
+        return precond
+
+    def eig(self, op, x0=None, precond=None, **kwargs):
+        if self._team is not None and not isinstance(op, numpy.ndarray):
+            kwargs['dot'] = self._team.dot
+            kwargs['axpy'] = self._team.axpy
+        return direct_spin1.FCISolver.eig(self, op, x0, precond, **kwargs)
+
+FCI = FCISolver
+
+
+if __name__ == '__main__':
+    from functools import reduce
+    from pyscf import gto
+    from pyscf import scf
+
+    mol = gto.M(atom='N 0 0 0; N 0 0 1.2', basis='6-31g', verbose=0)
+    mf = scf.RHF(mol).run()
+    norb = 8
+    mo = mf.mo_coeff[:,2:2+norb]
+    h1e = reduce(numpy.dot, (mo.T, mf.get_hcore(), mo))
+    eri = ao2mo.kernel(mol, mo)
+    e1 = direct_spin1.FCI().kernel(h1e, eri, norb, 10)[0]
+    cis = FCISolver()
+    cis.nproc = 4
+    e2 = cis.kernel(h1e, eri, norb, 10)[0]
+    print(e1 - e2)
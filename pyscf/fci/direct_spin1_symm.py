@@ -65,12 +65,90 @@ def contract_2e(eri, fcivec, norb, nelec, link_index=None, orbsym=None, wfnsym=0
         return direct_spin1.contract_2e(eri, fcivec, norb, nelec, link_index)
 
     eri = ao2mo.restore(4, eri, norb)
-    neleca, nelecb = _unpack_nelec(nelec)
+    nelec = _unpack_nelec(nelec)
     link_indexa, link_indexb = direct_spin1._unpack(norb, nelec, link_index)
-    na, nlinka = link_indexa.shape[:2]
-    nb, nlinkb = link_indexb.shape[:2]
-    eri_irs, rank_eri, irrep_eri = reorder_eri(eri, norb, orbsym)
+    na = link_indexa.shape[0]
+    nb = link_indexb.shape[0]
+    eri_irs, aidx, link_indexa, bidx, link_indexb = \
+            _symm_intermediates(eri, norb, nelec, orbsym, (link_indexa, link_indexb))
+
+    civec = _pack_blocks(fcivec, aidx, bidx, wfnsym)
+    ci1 = _contract_2e_blocks(eri_irs, civec, norb, aidx, bidx,
+                              link_indexa, link_indexb, wfnsym)
+    return _unpack_blocks(ci1, aidx, bidx, wfnsym, na, nb).reshape(fcivec.shape)
+
+
+def pack_civec(fcivec, norb, nelec, orbsym, wfnsym=0):
+    """Compact storage of the FCI vector of symmetry wfnsym.  The symmetry
+    allowed blocks (irrep_a, irrep_b = wfnsym ^ irrep_a) of the CI
+    coefficients are stored contiguously in a 1D array, ordered by irrep_a.
+    """
+    neleca, nelecb = _unpack_nelec(nelec)
+    aidx, bidx = _gen_strs_idx(norb, (neleca, nelecb), orbsym)
+    return _pack_blocks(fcivec, aidx, bidx, wfnsym)
 
+def unpack_civec(civec, norb, nelec, orbsym, wfnsym=0):
+    """Restore the (na,nb) FCI vector from the output of :func:`pack_civec`"""
+    neleca, nelecb = _unpack_nelec(nelec)
+    aidx, bidx = _gen_strs_idx(norb, (neleca, nelecb), orbsym)
+    na = cistring.num_strings(norb, neleca)
+    nb = cistring.num_strings(norb, nelecb)
+    return _unpack_blocks(civec, aidx, bidx, wfnsym, na, nb)
+
+def contract_2e_compact(eri, civec, norb, nelec, link_index=None, orbsym=None,
+                        wfnsym=0):
+    """Similar to :func:`contract_2e`, but civec is the compact CI vector
+    (see :func:`pack_civec`).  The returned sigma vector is also compact.
+    """
+    eri = ao2mo.restore(4, eri, norb)
+    nelec = _unpack_nelec(nelec)
+    link_index = direct_spin1._unpack(norb, nelec, link_index)
+    eri_irs, aidx, link_indexa, bidx, link_indexb = \
+            _symm_intermediates(eri, norb, nelec, orbsym, link_index)
+    return _contract_2e_blocks(eri_irs, civec, norb, aidx, bidx,
+                               link_indexa, link_indexb, wfnsym)
+
+def _gen_strs_idx(norb, nelec, orbsym):
+    neleca, nelecb = nelec
+    strsa = cistring.gen_strings4orblist(range(norb), neleca)
+    airreps = birreps = _gen_strs_irrep(strsa, orbsym)
+    if neleca != nelecb:
+        strsb = cistring.gen_strings4orblist(range(norb), nelecb)
+        birreps = _gen_strs_irrep(strsb, orbsym)
+    aidx = [numpy.where(airreps == ir)[0] for ir in range(TOTIRREPS)]
+    bidx = [numpy.where(birreps == ir)[0] for ir in range(TOTIRREPS)]
+    return aidx, bidx
+
+def _block_offsets(aidx, bidx, wfnsym):
+    sizes = [aidx[ir].size * bidx[wfnsym^ir].size for ir in range(TOTIRREPS)]
+    return numpy.append(0, numpy.cumsum(sizes))
+
+def _pack_blocks(fcivec, aidx, bidx, wfnsym):
+    na = sum(x.size for x in aidx)
+    nb = sum(x.size for x in bidx)
+    fcivec = numpy.asarray(fcivec).reshape(na,nb)
+    offsets = _block_offsets(aidx, bidx, wfnsym)
+    civec = numpy.empty(offsets[-1], dtype=fcivec.dtype)
+    for ir in range(TOTIRREPS):
+        p0, p1 = offsets[ir:ir+2]
+        if p1 > p0:
+            civec[p0:p1] = lib.take_2d(fcivec, aidx[ir], bidx[wfnsym^ir]).ravel()
+    return civec
+
+def _unpack_blocks(civec, aidx, bidx, wfnsym, na, nb):
+    offsets = _block_offsets(aidx, bidx, wfnsym)
+    fcivec = numpy.zeros((na,nb), dtype=civec.dtype)
+    for ir in range(TOTIRREPS):
+        p0, p1 = offsets[ir:ir+2]
+        if p1 > p0:
+            lib.takebak_2d(fcivec, civec[p0:p1].reshape(aidx[ir].size,-1),
+                           aidx[ir], bidx[wfnsym^ir])
+    return fcivec
+
+def _symm_intermediates(eri, norb, nelec, orbsym, link_index):
+    neleca, nelecb = nelec
+    link_indexa, link_indexb = link_index
+    eri_irs, rank_eri, irrep_eri = reorder_eri(eri, norb, orbsym)
     strsa = cistring.gen_strings4orblist(range(norb), neleca)
     aidx, link_indexa = gen_str_irrep(strsa, orbsym, link_indexa, rank_eri, irrep_eri)
     if neleca == nelecb:
@@ -78,27 +156,31 @@ def contract_2e(eri, fcivec, norb, nelec, link_index=None, orbsym=None, wfnsym=0
     else:
         strsb = cistring.gen_strings4orblist(range(norb), nelecb)
         bidx, link_indexb = gen_str_irrep(strsb, orbsym, link_indexb, rank_eri, irrep_eri)
-
+    return eri_irs, aidx, link_indexa, bidx, link_indexb
+
+def _contract_2e_blocks(eri_irs, civec, norb, aidx, bidx, link_indexa,
+                        link_indexb, wfnsym):
+    """Sigma vector of the compact CI vector.  Only the symmetry allowed
+    blocks are touched."""
+    nlinka = link_indexa[0].shape[1]
+    nlinkb = link_indexb[0].shape[1]
     Tirrep = ctypes.c_void_p*TOTIRREPS
     linka_ptr = Tirrep(*[x.ctypes.data_as(ctypes.c_void_p) for x in link_indexa])
     linkb_ptr = Tirrep(*[x.ctypes.data_as(ctypes.c_void_p) for x in link_indexb])
     eri_ptrs = Tirrep(*[x.ctypes.data_as(ctypes.c_void_p) for x in eri_irs])
     dimirrep = (ctypes.c_int*TOTIRREPS)(*[x.shape[0] for x in eri_irs])
-    fcivec_shape = fcivec.shape
-    fcivec = fcivec.reshape((na,nb), order='C')
-    ci1new = numpy.zeros_like(fcivec)
     nas = (ctypes.c_int*TOTIRREPS)(*[x.size for x in aidx])
     nbs = (ctypes.c_int*TOTIRREPS)(*[x.size for x in bidx])
+    offsets = _block_offsets(aidx, bidx, wfnsym)
 
+    civec = numpy.asarray(civec, order='C')
+    ci1new = numpy.zeros_like(civec)
 # aa, ab
-    ci0 = []
-    ci1 = []
-    for ir in range(TOTIRREPS):
-        ma, mb = aidx[ir].size, bidx[wfnsym^ir].size
-        ci0.append(numpy.zeros((ma,mb)))
-        ci1.append(numpy.zeros((ma,mb)))
-        if ma > 0 and mb > 0:
-            lib.take_2d(fcivec, aidx[ir], bidx[wfnsym^ir], out=ci0[ir])
+    shapes = [(aidx[ir].size, bidx[wfnsym^ir].size) for ir in range(TOTIRREPS)]
+    ci0 = [civec[offsets[ir]:offsets[ir+1]].reshape(shapes[ir])
+           for ir in range(TOTIRREPS)]
+    ci1 = [ci1new[offsets[ir]:offsets[ir+1]].reshape(shapes[ir])
+           for ir in range(TOTIRREPS)]
     ci0_ptrs = Tirrep(*[x.ctypes.data_as(ctypes.c_void_p) for x in ci0])
     ci1_ptrs = Tirrep(*[x.ctypes.data_as(ctypes.c_void_p) for x in ci1])
     libfci.FCIcontract_2e_symm1(eri_ptrs, ci0_ptrs, ci1_ptrs,
@@ -106,9 +188,6 @@ def contract_2e(eri, fcivec, norb, nelec, link_index=None, orbsym=None, wfnsym=0
                                 ctypes.c_int(nlinka), ctypes.c_int(nlinkb),
                                 linka_ptr, linkb_ptr, dimirrep,
                                 ctypes.c_int(wfnsym))
-    for ir in range(TOTIRREPS):
-        if ci0[ir].size > 0:
-            lib.takebak_2d(ci1new, ci1[ir], aidx[ir], bidx[wfnsym^ir])
 
 # bb, ba
     ci0T = []
@@ -117,19 +196,109 @@ def contract_2e(eri, fcivec, norb, nelec, link_index=None, orbsym=None, wfnsym=0
         ci0T.append(numpy.zeros((mb,ma)))
         if ma > 0 and mb > 0:
             lib.transpose(ci0[wfnsym^ir], out=ci0T[ir])
-    ci0, ci0T = ci0T, None
-    ci1 = [numpy.zeros_like(x) for x in ci0]
-    ci0_ptrs = Tirrep(*[x.ctypes.data_as(ctypes.c_void_p) for x in ci0])
-    ci1_ptrs = Tirrep(*[x.ctypes.data_as(ctypes.c_void_p) for x in ci1])
+    ci1T = [numpy.zeros_like(x) for x in ci0T]
+    ci0_ptrs = Tirrep(*[x.ctypes.data_as(ctypes.c_void_p) for x in ci0T])
+    ci1_ptrs = Tirrep(*[x.ctypes.data_as(ctypes.c_void_p) for x in ci1T])
     libfci.FCIcontract_2e_symm1(eri_ptrs, ci0_ptrs, ci1_ptrs,
                                 ctypes.c_int(norb), nbs, nas,
                                 ctypes.c_int(nlinkb), ctypes.c_int(nlinka),
                                 linkb_ptr, linka_ptr, dimirrep,
                                 ctypes.c_int(wfnsym))
     for ir in range(TOTIRREPS):
-        if ci0[ir].size > 0:
-            lib.takebak_2d(ci1new, lib.transpose(ci1[ir]), aidx[wfnsym^ir], bidx[ir])
-    return ci1new.reshape(fcivec_shape)
+        if ci0T[ir].size > 0:
+            ci1[wfnsym^ir] += ci1T[ir].T
+    return ci1new
+
+def kernel_compact(fci, h1e, eri, norb, nelec, ci0=None, tol=None,
+                   lindep=None, max_cycle=None, max_space=None, nroots=None,
+                   davidson_only=None, pspace_size=None, max_memory=None,
+                   verbose=None, ecore=0, **kwargs):
+    """Davidson diagonalization in the compact representation of the CI
+    vector (see :func:`pack_civec`).  Only the symmetry allowed blocks are
+    stored in the Davidson subspace and touched in the sigma vector.  The
+    returned CI vectors are in the regular (na,nb) shape.
+    """
+    if nroots is None: nroots = fci.nroots
+    if davidson_only is None: davidson_only = fci.davidson_only
+    if pspace_size is None: pspace_size = fci.pspace_size
+    if tol is None: tol = fci.conv_tol
+    if lindep is None: lindep = fci.lindep
+    if max_cycle is None: max_cycle = fci.max_cycle
+    if max_space is None: max_space = fci.max_space
+    if max_memory is None: max_memory = fci.max_memory
+    if verbose is None: verbose = logger.Logger(fci.stdout, fci.verbose)
+    tol_residual = getattr(fci, 'conv_tol_residual', None)
+
+    orbsym = fci.orbsym
+    wfnsym = _id_wfnsym(fci, norb, nelec, orbsym, fci.wfnsym)
+    nelec = _unpack_nelec(nelec, fci.spin)
+    assert(0 <= nelec[0] <= norb and 0 <= nelec[1] <= norb)
+    link_index = direct_spin1._unpack(norb, nelec, None)
+    na = link_index[0].shape[0]
+    nb = link_index[1].shape[0]
+
+    aidx, bidx = _gen_strs_idx(norb, nelec, orbsym)
+    if (_block_offsets(aidx, bidx, wfnsym)[-1] < nroots or
+        # Not enough states of the required symmetry, or the pspace covers
+        # the entire space and the exact diagonalization is used
+        (pspace_size >= na*nb and ci0 is None and not davidson_only)):
+        return direct_spin1.kernel_ms1(fci, h1e, eri, norb, nelec, ci0, None,
+                                       tol, lindep, max_cycle, max_space,
+                                       nroots, davidson_only, pspace_size,
+                                       max_memory, verbose, ecore, **kwargs)
+
+    h2e = fci.absorb_h1e(h1e, eri, norb, nelec, .5)
+    h2e = ao2mo.restore(4, h2e, norb)
+    eri_irs, aidx, link_indexa, bidx, link_indexb = \
+            _symm_intermediates(h2e, norb, nelec, orbsym, link_index)
+    h2e = None
+
+    hdiag = fci.make_hdiag(h1e, eri, norb, nelec)
+    if pspace_size > 0:
+        addr, h0 = fci.pspace(h1e, eri, norb, nelec, hdiag, max(pspace_size,nroots))
+        # Map the addresses of the full vector to the compact vector.  H is
+        # block diagonal in symmetry, the symmetry forbidden determinants
+        # can be removed from the pspace Hamiltonian
+        addr_map = numpy.hstack([(aidx[ir][:,None] * nb + bidx[wfnsym^ir]).ravel()
+                                 for ir in range(TOTIRREPS)])
+        addr_c = numpy.full(na*nb, -1, dtype=int)
+        addr_c[addr_map] = numpy.arange(addr_map.size)
+        addr_c = addr_c[addr]
+        mask = addr_c >= 0
+        addr = addr_c[mask]
+        pw, pv = fci.eig(h0[mask][:,mask])
+        addr_map = addr_c = None
+    else:
+        addr = [0]
+        pw = pv = None
+    hdiag0, hdiag = hdiag, _pack_blocks(hdiag, aidx, bidx, wfnsym)
+    precond = fci.make_precond(hdiag, pw, pv, addr)
+
+    def hop(c):
+        return _contract_2e_blocks(eri_irs, c, norb, aidx, bidx,
+                                   link_indexa, link_indexb, wfnsym)
+
+    if ci0 is None:
+        ci0 = lambda: [_pack_blocks(x, aidx, bidx, wfnsym) for x in
+                       fci.get_init_guess(norb, nelec, nroots, hdiag0)]
+    elif not callable(ci0):
+        if isinstance(ci0, numpy.ndarray) and ci0.size in (na*nb, hdiag.size):
+            ci0 = [ci0]
+        ci0 = [x.ravel() if x.size == hdiag.size
+               else _pack_blocks(x, aidx, bidx, wfnsym) for x in ci0]
+    else:
+        ci0_fn = ci0
+        ci0 = lambda: [_pack_blocks(x, aidx, bidx, wfnsym) for x in ci0_fn()]
+
+    with lib.with_omp_threads(fci.threads):
+        e, c = fci.eig(hop, ci0, precond, tol=tol, lindep=lindep,
+                       max_cycle=max_cycle, max_space=max_space, nroots=nroots,
+                       max_memory=max_memory, verbose=verbose, follow_state=True,
+                       tol_residual=tol_residual, **kwargs)
+    if nroots > 1:
+        return e+ecore, [_unpack_blocks(x, aidx, bidx, wfnsym, na, nb) for x in c]
+    else:
+        return e+ecore, _unpack_blocks(c, aidx, bidx, wfnsym, na, nb)
 
 
 def kernel(h1e, eri, norb, nelec, ci0=None, level_shift=1e-3, tol=1e-10,
@@ -277,6 +446,8 @@ class FCISolver(direct_spin1.FCISolver):
     davidson_only = getattr(__config__, 'fci_direct_spin1_symm_FCI_davidson_only', True)
     # pspace may break point group symmetry
     pspace_size = getattr(__config__, 'fci_direct_spin1_symm_FCI_pspace_size', 0)
+    # Davidson diagonalization with the compact (symmetry blocked) CI vectors
+    compact = getattr(__config__, 'fci_direct_spin1_symm_FCI_compact', True)
 
     def __init__(self, mol=None, **kwargs):
         direct_spin1.FCISolver.__init__(self, mol, **kwargs)
@@ -360,10 +531,20 @@ class FCISolver(direct_spin1.FCISolver):
 
         wfnsym = self.guess_wfnsym(norb, nelec, ci0, orbsym, wfnsym, **kwargs)
         with lib.temporary_env(self, orbsym=orbsym, wfnsym=wfnsym):
-            e, c = direct_spin1.kernel_ms1(self, h1e, eri, norb, nelec, ci0, None,
-                                           tol, lindep, max_cycle, max_space,
-                                           nroots, davidson_only, pspace_size,
-                                           ecore=ecore, **kwargs)
+            # The compact representation is used only if the sigma vector is
+            # not modified (e.g. by addons.fix_spin_)
+            if (self.compact and orbsym is not None and
+                getattr(self.contract_2e, '__func__', None) is
+                getattr(FCISolver.contract_2e, '__func__', FCISolver.contract_2e)):
+                e, c = kernel_compact(self, h1e, eri, norb, nelec, ci0,
+                                      tol, lindep, max_cycle, max_space,
+                                      nroots, davidson_only, pspace_size,
+                                      ecore=ecore, **kwargs)
+            else:
+                e, c = direct_spin1.kernel_ms1(self, h1e, eri, norb, nelec, ci0, None,
+                                               tol, lindep, max_cycle, max_space,
+                                               nroots, davidson_only, pspace_size,
+                                               ecore=ecore, **kwargs)
         self.eci, self.ci = e, c
         return e, c
 
@@ -116,6 +116,66 @@ def select_strs(myci, eri, eri_pq_max, civec_max, strs, norb, nelec):
     strs_add = sorted(set(strs_add[:nadd]) - set(strs))
     return numpy.asarray(strs_add, dtype=numpy.int64)
 
+def make_heat_bath_table(eri, norb, cutoff=0):
+    '''Heat-bath lists of the same-spin double excitations.  For each
+    occupied pair (i>j), the pairs (a>b) with |<ab||ij>| > cutoff are sorted
+    by |<ab||ij>| in descending order.  The lists are padded with zeros to
+    the length of the longest one.
+
+    Returns:
+        hb_val : (npair,nhb) array, the sorted |<ab||ij>|
+        hb_ab : (npair,nhb) int32 array, a*norb+b of the sorted pairs
+    '''
+    eri = ao2mo.restore(1, eri, norb)
+    # <ab||ij> = (ai|bj) - (aj|bi)
+    h = eri.transpose(0,2,1,3) - eri.transpose(0,2,3,1)
+    idx, idy = numpy.tril_indices(norb, -1)
+    pairs = idx*norb + idy
+    h = abs(lib.take_2d(h.reshape(norb**2,-1), pairs, pairs)).T
+    mask = h > cutoff
+    nhb = max(1, mask.sum(axis=1).max())
+    hb_val = numpy.zeros((len(pairs),nhb))
+    hb_ab = numpy.zeros((len(pairs),nhb), dtype=numpy.int32)
+    for ij, hij in enumerate(h):
+        ab = numpy.where(mask[ij])[0]
+        ab = ab[numpy.argsort(-hij[ab], kind='mergesort')]
+        hb_val[ij,:ab.size] = hij[ab]
+        hb_ab[ij,:ab.size] = pairs[ab]
+    return hb_val, hb_ab
+
+def select_strs_heat_bath(myci, hb_table, eri_pq_max, civec_max, strs,
+                          norb, nelec, select_cutoff=None):
+    '''Heat-bath selection of the strings which are connected to strs.
+    The candidate strings are screened by the product of the sorted
+    integrals and the CI coefficients.  See also :func:`select_strs`.
+    '''
+    if select_cutoff is None:
+        select_cutoff = myci.select_cutoff
+    hb_val, hb_ab = hb_table
+    strs = numpy.asarray(strs, dtype=numpy.int64)
+    civec_max = numpy.asarray(civec_max, order='C')
+    nstrs = len(strs)
+    nvir = norb - nelec
+    nhb = hb_val.shape[1]
+    max_add = nelec*nvir + nelec*(nelec-1)//2 * min(nhb, (nvir+2)*(nvir+1)//2-1)
+    blksize = max(1, min(nstrs, int(8e6/max(max_add, 1))))
+    libfci.SCIselect_strs_hb.restype = ctypes.c_int
+    strs_add = []
+    for p0, p1 in lib.prange(0, nstrs, blksize):
+        buf = numpy.empty(((p1-p0)*max_add), dtype=numpy.int64)
+        nadd = libfci.SCIselect_strs_hb(buf.ctypes.data_as(ctypes.c_void_p),
+                                        strs[p0:].ctypes.data_as(ctypes.c_void_p),
+                                        eri_pq_max.ctypes.data_as(ctypes.c_void_p),
+                                        hb_val.ctypes.data_as(ctypes.c_void_p),
+                                        hb_ab.ctypes.data_as(ctypes.c_void_p),
+                                        civec_max[p0:].ctypes.data_as(ctypes.c_void_p),
+                                        ctypes.c_double(select_cutoff),
+                                        ctypes.c_int(norb), ctypes.c_int(nelec),
+                                        ctypes.c_int(p1-p0), ctypes.c_int(nhb))
+        strs_add.append(numpy.unique(buf[:nadd]))
+    strs_add = numpy.unique(numpy.hstack(strs_add))
+    return numpy.setdiff1d(strs_add, strs, assume_unique=True)
+
 def enlarge_space(myci, civec_strs, eri, norb, nelec):
     if isinstance(civec_strs, (tuple, list)):
         nelec, (strsa, strsb) = _unpack(civec_strs[0], nelec)[1:]
@@ -137,8 +197,17 @@ def enlarge_space(myci, civec_strs, eri, norb, nelec):
     eri = ao2mo.restore(1, eri, norb)
     eri_pq_max = abs(eri.reshape(norb**2,-1)).max(axis=1).reshape(norb,norb)
 
-    strsa_add = select_strs(myci, eri, eri_pq_max, civec_a_max, strsa, norb, nelec[0])
-    strsb_add = select_strs(myci, eri, eri_pq_max, civec_b_max, strsb, norb, nelec[1])
+    if getattr(myci, 'heat_bath', False):
+        # Integrals below this bound cannot pass the selection
+        hb_cutoff = myci.select_cutoff / max(civec_a_max.max(), civec_b_max.max())
+        hb_table = make_heat_bath_table(eri, norb, hb_cutoff)
+        strsa_add = select_strs_heat_bath(myci, hb_table, eri_pq_max,
+                                          civec_a_max, strsa, norb, nelec[0])
+        strsb_add = select_strs_heat_bath(myci, hb_table, eri_pq_max,
+                                          civec_b_max, strsb, norb, nelec[1])
+    else:
+        strsa_add = select_strs(myci, eri, eri_pq_max, civec_a_max, strsa, norb, nelec[0])
+        strsb_add = select_strs(myci, eri, eri_pq_max, civec_b_max, strsb, norb, nelec[1])
     strsa = numpy.append(strsa, strsa_add)
     strsb = numpy.append(strsb, strsb_add)
     aidx = numpy.argsort(strsa)
@@ -174,6 +243,20 @@ def cre_des_linkstr(strs, norb, nelec, tril=False):
                               ctypes.c_int(tril))
     return link_index
 
+def _cre_des_linkstr_rows(strs, rows, norb, nelec, tril=True):
+    '''Link table of the strings strs[rows]'''
+    strs = numpy.asarray(strs, dtype=numpy.int64)
+    rows = numpy.asarray(rows, dtype=numpy.int32)
+    nvir = norb - nelec
+    link_index = numpy.zeros((len(rows),nelec+nelec*nvir,4), dtype=numpy.int32)
+    libfci.SCIcre_des_linkstr_rows(link_index.ctypes.data_as(ctypes.c_void_p),
+                                   ctypes.c_int(norb), ctypes.c_int(len(strs)),
+                                   ctypes.c_int(nelec),
+                                   strs.ctypes.data_as(ctypes.c_void_p),
+                                   rows.ctypes.data_as(ctypes.c_void_p),
+                                   ctypes.c_int(len(rows)), ctypes.c_int(tril))
+    return link_index
+
 def cre_des_linkstr_tril(strs, norb, nelec):
     '''Given intermediates, the link table to generate input strs
     '''
@@ -186,7 +269,12 @@ def des_des_linkstr(strs, norb, nelec, tril=False):
         return None
 
     strs = numpy.asarray(strs, dtype=numpy.int64)
-    nvir = norb - nelec
+    inter = _des_des_inter(strs, norb, nelec)
+    return _des_des_linkstr(strs, inter, norb, nelec, tril)
+
+def _des_des_inter(strs, norb, nelec):
+    '''The (N-2)-electron intermediate strings of strs'''
+    strs = numpy.asarray(strs, dtype=numpy.int64)
     nstrs = len(strs)
     inter1 = numpy.empty((nstrs*nelec), dtype=numpy.int64)
     libfci.SCIdes_uniq_strs.restype = ctypes.c_int
@@ -203,9 +291,28 @@ def des_des_linkstr(strs, norb, nelec, tril=False):
                                      ctypes.c_int(norb), ctypes.c_int(nelec-1),
                                      ctypes.c_int(ninter))
     inter = numpy.asarray(sorted(set(inter[:ninter])), dtype=numpy.int64)
-    ninter = len(inter)
+    return inter
 
-    nvir += 2
+def _single_excitations(strs, norb):
+    '''The strings which are single excitations of strs'''
+    strs = numpy.asarray(strs, dtype=numpy.int64)
+    out = []
+    for i in range(norb):
+        occ = strs[strs & (1<<i) != 0] ^ (1<<i)
+        for a in range(norb):
+            if a != i:
+                out.append(occ[occ & (1<<a) == 0] | (1<<a))
+    if not out:
+        return numpy.zeros(0, dtype=numpy.int64)
+    return numpy.unique(numpy.hstack(out))
+
+def _des_des_linkstr(strs, inter, norb, nelec, tril=False):
+    '''des_des link table for the given intermediates'''
+    strs = numpy.asarray(strs, dtype=numpy.int64)
+    inter = numpy.asarray(inter, dtype=numpy.int64)
+    nstrs = len(strs)
+    ninter = len(inter)
+    nvir = norb - nelec + 2
     link_index = numpy.zeros((ninter,nvir*nvir,4), dtype=numpy.int32)
     libfci.SCIdes_des_linkstr(link_index.ctypes.data_as(ctypes.c_void_p),
                               ctypes.c_int(norb), ctypes.c_int(nelec),
@@ -396,6 +503,17 @@ def kernel_float_space(myci, h1e, eri, norb, nelec, ci0=None,
         return hc.ravel()
     precond = lambda x, e, *args: x/(hdiag-e+myci.level_shift)
 
+    # The link tables are updated incrementally when the space is enlarged
+    linkstr = [None, None]
+    def update_link_index(ci_strs):
+        for k in range(2):
+            if linkstr[k] is None:
+                linkstr[k] = _LinkstrIndex(ci_strs[k], norb, nelec[k])
+            else:
+                linkstr[k] = linkstr[k].update(ci_strs[k])
+        return (linkstr[0].cd_index, linkstr[0].dd_index,
+                linkstr[1].cd_index, linkstr[1].dd_index)
+
     namax = cistring.num_strings(norb, nelec[0])
     nbmax = cistring.num_strings(norb, nelec[1])
     e_last = 0
@@ -409,7 +527,7 @@ def kernel_float_space(myci, h1e, eri, norb, nelec, ci0=None,
                   icycle, (len(ci_strs[0]), len(ci_strs[1])), float_tol)
 
         ci0 = [c.ravel() for c in ci0]
-        link_index = _all_linkstr_index(ci_strs, norb, nelec)
+        link_index = update_link_index(ci_strs)
         hdiag = myci.make_hdiag(h1e, eri, ci_strs, norb, nelec)
         #e, ci0 = lib.davidson(hop, ci0.reshape(-1), precond, tol=float_tol)
         e, ci0 = myci.eig(hop, ci0, precond, tol=float_tol, lindep=lindep,
@@ -440,7 +558,7 @@ def kernel_float_space(myci, h1e, eri, norb, nelec, ci0=None,
     ci_strs = ci0[0]._strs
     log.debug('Extra CI in selected space %s', (len(ci_strs[0]), len(ci_strs[1])))
     ci0 = [c.ravel() for c in ci0]
-    link_index = _all_linkstr_index(ci_strs, norb, nelec)
+    link_index = update_link_index(ci_strs)
     hdiag = myci.make_hdiag(h1e, eri, ci_strs, norb, nelec)
     e, c = myci.eig(hop, ci0, precond, tol=tol, lindep=lindep,
                     max_cycle=max_cycle, max_space=max_space, nroots=nroots,
@@ -467,6 +585,120 @@ def kernel(h1e, eri, norb, nelec, ci0=None, level_shift=1e-3, tol=1e-10,
                                   ci_coeff_cutoff=ci_coeff_cutoff, ecore=ecore,
                                   **kwargs)
 
+def pt2_energy(myci, h1e, eri, civec_strs, norb, nelec, e_ci=None,
+               select_cutoff=None, nsample=None, nbatch=None, verbose=None):
+    r'''Epstein-Nesbet second order correction to the selected-CI energy
+
+    E2 = \sum_{D} |<D|H|\Psi>|^2 / (E_ci - <D|H|D>)
+
+    The external determinants D are the products of the strings selected
+    from the variational strings by heat-bath screening with select_cutoff
+    (default myci.pt2_cutoff).  The external determinants are grouped into
+    those with a variational alpha string, which are evaluated
+    deterministically, and those with an external alpha string.  If nsample
+    is given, the latter are estimated stochastically from nbatch batches of
+    nsample randomly drawn external alpha strings.
+
+    Kwargs:
+        e_ci : float
+            The variational energy (without the core energy).  It is
+            computed if not given.
+
+    Returns:
+        e_pt2 and its statistical error (0 for the deterministic evaluation)
+    '''
+    log = logger.new_logger(myci, verbose)
+    if select_cutoff is None: select_cutoff = myci.pt2_cutoff
+    if nsample is None: nsample = myci.pt2_nsample
+    if nbatch is None: nbatch = myci.pt2_nbatch
+    nelec = direct_spin1._unpack_nelec(nelec, myci.spin)
+    ci_coeff, nelec, (strsa, strsb) = _unpack(civec_strs, nelec, myci._strs)
+    na = len(strsa)
+    nb = len(strsb)
+    ci_coeff = numpy.asarray(ci_coeff).reshape(na,nb)
+    h2e = direct_spin1.absorb_h1e(h1e, eri, norb, nelec, .5)
+    h2e = ao2mo.restore(1, h2e, norb)
+    if e_ci is None:
+        hc = contract_2e(h2e, _as_SCIvector(ci_coeff, (strsa,strsb)), norb, nelec)
+        e_ci = numpy.dot(ci_coeff.ravel(), hc.ravel()) / numpy.dot(ci_coeff.ravel(), ci_coeff.ravel())
+        hc = None
+
+    eri_pq_max = abs(h2e.reshape(norb**2,-1)).max(axis=1).reshape(norb,norb)
+    civec_a_max = abs(ci_coeff).max(axis=1)
+    civec_b_max = abs(ci_coeff).max(axis=0)
+    hb_table = make_heat_bath_table(h2e, norb, select_cutoff/abs(ci_coeff).max())
+    ext_a = select_strs_heat_bath(myci, hb_table, eri_pq_max, civec_a_max,
+                                  strsa, norb, nelec[0], select_cutoff)
+    ext_b = select_strs_heat_bath(myci, hb_table, eri_pq_max, civec_b_max,
+                                  strsb, norb, nelec[1], select_cutoff)
+    log.debug('PT2 external strings alpha %d  beta %d', len(ext_a), len(ext_b))
+
+    # An external alpha string couples to the variational determinants
+    # through the beta strings of strsb (double alpha excitations) or the
+    # beta strings which are single excitations of strsb (single alpha
+    # excitations).
+    ext_a1 = numpy.intersect1d(ext_a, _single_excitations(strsa, norb))
+    ext_b1 = numpy.intersect1d(ext_b, _single_excitations(strsb, norb))
+    strsb_ext = numpy.union1d(strsb, ext_b)
+    strsb_ext1 = numpy.union1d(strsb, ext_b1)
+    linka = [_LinkstrIndex(strsa, norb, nelec[0])]
+    # The three beta spaces are nested.  They are identified by their sizes
+    linkb = {}
+    for cols in (strsb, strsb_ext1, strsb_ext):
+        if cols.size not in linkb:
+            linkb[cols.size] = _LinkstrIndex(cols, norb, nelec[1])
+
+    def pt2_block(strsa_sub, strsb_sub):
+        '''PT2 contributions of the determinants strsa_sub x strsb_sub.
+        None of them is a variational determinant.'''
+        if strsa_sub.size == 0 or strsb_sub.size == 0:
+            return 0
+        strsa_all = numpy.union1d(strsa, strsa_sub)
+        strsb_all = numpy.union1d(strsb, strsb_sub)
+        linka[0] = linka[0].update(strsa_all)
+        lb = linkb[strsb_all.size]
+        link_index = (linka[0].cd_index, linka[0].dd_index,
+                      lb.cd_index, lb.dd_index)
+        ci1 = numpy.zeros((len(strsa_all),len(strsb_all)))
+        lib.takebak_2d(ci1, ci_coeff, numpy.searchsorted(strsa_all, strsa),
+                       numpy.searchsorted(strsb_all, strsb))
+        hc = contract_2e(h2e, _as_SCIvector(ci1, (strsa_all,strsb_all)),
+                         norb, nelec, link_index).reshape(ci1.shape)
+        hc = lib.take_2d(hc, numpy.searchsorted(strsa_all, strsa_sub),
+                         numpy.searchsorted(strsb_all, strsb_sub))
+        hdiag = make_hdiag(h1e, eri, (strsa_sub,strsb_sub), norb, nelec)
+        return (hc**2 / (e_ci - hdiag.reshape(hc.shape))).sum()
+
+    def pt2_ext_rows(strsa_sub):
+        '''PT2 contributions of the external alpha strings strsa_sub'''
+        single = numpy.in1d(strsa_sub, ext_a1)
+        return (pt2_block(strsa_sub[single], strsb_ext1) +
+                pt2_block(strsa_sub[~single], strsb))
+
+    e_var_a = pt2_block(strsa, ext_b)
+    if nsample is None or nsample >= len(ext_a):
+        # Batches of the external alpha strings sized to max_memory
+        blksize = int(myci.max_memory*1e6/8/4/max(1, len(strsb_ext1)))
+        blksize = max(1, blksize - len(strsa))
+        e_ext_a = sum(pt2_ext_rows(ext_a[p0:p1])
+                      for p0, p1 in lib.prange(0, len(ext_a), blksize))
+        e_pt2 = e_var_a + e_ext_a
+        err = 0
+    else:
+        rand = numpy.random.RandomState(myci.pt2_seed)
+        samples = []
+        for i in range(nbatch):
+            sample = numpy.sort(rand.choice(ext_a, nsample, replace=False))
+            samples.append(pt2_ext_rows(sample) * len(ext_a) / nsample)
+            log.debug1('PT2 batch %d  E(ext) = %.12g', i, samples[-1])
+        e_pt2 = e_var_a + numpy.mean(samples)
+        if nbatch > 1:
+            err = numpy.std(samples, ddof=1) / numpy.sqrt(nbatch)
+        else:
+            err = 0
+    log.info('EN-PT2 correction = %.15g  +/- %.3g', e_pt2, err)
+    return e_pt2, err
+
 def make_rdm1s(civec_strs, norb, nelec, link_index=None):
     '''Spin separated 1-particle density matrices.
     The return values include two density matrices: (alpha,alpha), (beta,beta)
@@ -716,6 +948,11 @@ class SelectedCI(direct_spin1.FCISolver):
     conv_tol = getattr(__config__, 'fci_selected_ci_SCI_conv_tol', 1e-9)
     start_tol = getattr(__config__, 'fci_selected_ci_SCI_start_tol', 3e-4)
     tol_decay_rate = getattr(__config__, 'fci_selected_ci_SCI_tol_decay_rate', 0.3)
+    heat_bath = getattr(__config__, 'fci_selected_ci_SCI_heat_bath', False)
+    pt2_cutoff = getattr(__config__, 'fci_selected_ci_SCI_pt2_cutoff', 1e-5)
+    pt2_nsample = getattr(__config__, 'fci_selected_ci_SCI_pt2_nsample', None)
+    pt2_nbatch = getattr(__config__, 'fci_selected_ci_SCI_pt2_nbatch', 10)
+    pt2_seed = getattr(__config__, 'fci_selected_ci_SCI_pt2_seed', 1)
 
     def __init__(self, mol=None):
         direct_spin1.FCISolver.__init__(self, mol)
@@ -726,13 +963,15 @@ class SelectedCI(direct_spin1.FCISolver):
         #self.ci = None
         self._strs = None
         keys = set(('ci_coeff_cutoff', 'select_cutoff', 'conv_tol',
-                    'start_tol', 'tol_decay_rate'))
+                    'start_tol', 'tol_decay_rate', 'heat_bath', 'pt2_cutoff',
+                    'pt2_nsample', 'pt2_nbatch', 'pt2_seed'))
         self._keys = self._keys.union(keys)
 
     def dump_flags(self, verbose=None):
         direct_spin1.FCISolver.dump_flags(self, verbose)
         logger.info(self, 'ci_coeff_cutoff %g', self.ci_coeff_cutoff)
         logger.info(self, 'select_cutoff   %g', self.select_cutoff)
+        logger.info(self, 'heat_bath       %s', self.heat_bath)
 
     def contract_2e(self, eri, civec_strs, norb, nelec, link_index=None, **kwargs):
 # The argument civec_strs is a CI vector in function FCISolver.contract_2e.
@@ -758,6 +997,7 @@ class SelectedCI(direct_spin1.FCISolver):
 
     enlarge_space = enlarge_space
     kernel = kernel_float_space
+    pt2_energy = pt2_energy
     kernel_fixed_space = kernel_fixed_space
 
 #    def approx_kernel(self, h1e, eri, norb, nelec, ci0=None, link_index=None,
@@ -880,6 +1120,84 @@ def _unpack(civec_strs, nelec, ci_strs=None, spin=None):
         ci_strs = (strsa, strsb)
     return civec_strs, (neleca, nelecb), ci_strs
 
+class _LinkstrIndex(object):
+    '''The cre_des and des_des link tables (in the lower triangular pair
+    index) of one string space.  When the string space is changed, only the
+    rows of the strings (and intermediates) which are connected to the added
+    or removed strings are regenerated.  The other rows are carried over
+    with their string addresses remapped.
+    '''
+    def __init__(self, strs, norb, nelec):
+        self.strs = strs = numpy.asarray(strs, dtype=numpy.int64)
+        self.norb = norb
+        self.nelec = nelec
+        self.cd_index = cre_des_linkstr_tril(strs, norb, nelec)
+        if nelec > 1:
+            self.inter = _des_des_inter(strs, norb, nelec)
+            self.dd_index = _des_des_linkstr(strs, self.inter, norb, nelec, True)
+        else:
+            self.inter = self.dd_index = None
+
+    def update(self, strs):
+        '''Link tables for the new string space strs'''
+        strs = numpy.asarray(strs, dtype=numpy.int64)
+        strs_old = self.strs
+        if strs.size == strs_old.size and numpy.all(strs == strs_old):
+            return self
+        if strs.size == 0 or strs_old.size == 0:
+            return _LinkstrIndex(strs, self.norb, self.nelec)
+
+        norb, nelec = self.norb, self.nelec
+        addr = numpy.searchsorted(strs, strs_old)
+        addr[addr == strs.size] = 0
+        kept = strs[addr] == strs_old
+        old2new = numpy.where(kept, addr, -1)
+        is_new = numpy.ones(strs.size, dtype=bool)
+        is_new[old2new[kept]] = False
+        new_rows = numpy.where(is_new)[0]
+        removed = numpy.where(~kept)[0]
+
+        cd_new = _cre_des_linkstr_rows(strs, new_rows, norb, nelec)
+        # Rows of the existing strings which are connected to the new
+        # strings or to the removed strings
+        touched = [cd_new[:,:,2][cd_new[:,:,3] != 0]]
+        if removed.size > 0:
+            tab = self.cd_index[removed]
+            touched.append(old2new[tab[:,:,2][tab[:,:,3] != 0]])
+        touched = numpy.unique(numpy.hstack(touched))
+        touched = touched[touched >= 0]
+        touched = touched[~is_new[touched]]
+
+        cd_index = numpy.empty((strs.size,)+self.cd_index.shape[1:], dtype=numpy.int32)
+        cd_index[old2new[kept]] = _remap_linkstr(self.cd_index[kept], old2new)
+        cd_index[new_rows] = cd_new
+        cd_index[touched] = _cre_des_linkstr_rows(strs, touched, norb, nelec)
+
+        obj = self.__class__.__new__(self.__class__)
+        obj.__dict__.update(self.__dict__)
+        obj.strs = strs
+        obj.cd_index = cd_index
+        if nelec > 1:
+            # Intermediates which are connected to the new or removed strings
+            inter_touched = [_des_des_inter(strs[new_rows], norb, nelec)]
+            if removed.size > 0:
+                inter_touched.append(_des_des_inter(strs_old[removed], norb, nelec))
+            inter_touched = numpy.unique(numpy.hstack(inter_touched))
+            untouched = ~numpy.isin(self.inter, inter_touched, assume_unique=True)
+            dd_touched = _des_des_linkstr(strs, inter_touched, norb, nelec, True)
+            nonzero = dd_touched[:,0,3] != 0
+            obj.inter = numpy.append(self.inter[untouched], inter_touched[nonzero])
+            obj.dd_index = numpy.vstack((_remap_linkstr(self.dd_index[untouched], old2new),
+                                         dd_touched[nonzero]))
+        return obj
+
+def _remap_linkstr(link_index, old2new):
+    link_index = link_index.copy()
+    addr = link_index[:,:,2]
+    mask = link_index[:,:,3] != 0
+    addr[mask] = old2new[addr[mask]]
+    return link_index
+
 def _all_linkstr_index(ci_strs, norb, nelec):
     cd_indexa = cre_des_linkstr_tril(ci_strs[0], norb, nelec[0])
     dd_indexa = des_des_linkstr_tril(ci_strs[0], norb, nelec[0])
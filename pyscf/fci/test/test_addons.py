@@ -257,6 +257,27 @@ class KnownValues(unittest.TestCase):
         self.assertAlmostEqual(e1, e1ref, 9)
         self.assertAlmostEqual(abs(abs(ci1ref)-abs(ci1)).sum(), 0, 9)
 
+    def test_transform_ci_sequential(self):
+        numpy.random.seed(3)
+        norb = 6
+        nelec = (3,2)
+        na = fci.cistring.num_strings(norb, 3)
+        nb = fci.cistring.num_strings(norb, 2)
+        ci0 = numpy.random.random((na,nb))
+        def ref_transform(u):
+            ta = fci.addons._strs_overlap(norb, 3, u)
+            tb = fci.addons._strs_overlap(norb, 2, u)
+            return reduce(numpy.dot, (ta.T, ci0, tb))
+        u = numpy.random.random((norb,norb))
+        ci1 = fci.addons.transform_ci_for_orbital_rotation(ci0, norb, nelec, u)
+        self.assertAlmostEqual(abs(ci1 - ref_transform(u)).max(), 0, 12)
+        # A permutation of orbitals cannot be factorized into single-orbital
+        # transformations.  It is handled by the determinant algorithm.
+        u = numpy.eye(norb)[[1,0,2,3,5,4]]
+        self.assertTrue(fci.addons._sequential_orbital_factors(u) is None)
+        ci1 = fci.addons.transform_ci_for_orbital_rotation(ci0, norb, nelec, u)
+        self.assertAlmostEqual(abs(ci1 - ref_transform(u)).max(), 0, 12)
+
     def test_overlap(self):
         numpy.random.seed(12)
         s = numpy.random.random((6,6))
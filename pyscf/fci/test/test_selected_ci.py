@@ -459,6 +459,75 @@ class KnownValues(unittest.TestCase):
         self.assertAlmostEqual(abs(cd_index1a - fci.cistring.reform_linkstr_index(cd_index2a)).max(), 0, 12)
         self.assertAlmostEqual(abs(cd_index1b - fci.cistring.reform_linkstr_index(cd_index2b)).max(), 0, 12)
 
+    def test_select_strs_heat_bath(self):
+        myci = selected_ci.SCI()
+        myci.select_cutoff = 1e-3
+        norb, nelec = 10, 4
+        strs = cistring.make_strings(range(norb), nelec)
+        numpy.random.seed(11)
+        strs = strs[numpy.random.random(len(strs)) > .8]
+        nn = norb*(norb+1)//2
+        eri = (numpy.random.random(nn*(nn+1)//2)-.2)**3
+        eri[eri<.1] *= 3e-3
+        eri = ao2mo.restore(1, eri, norb)
+        eri_pq_max = abs(eri.reshape(norb**2,-1)).max(axis=1).reshape(norb,norb)
+        civec_max = numpy.random.random(len(strs))
+        hb_table = selected_ci.make_heat_bath_table(eri, norb)
+        strs_add0 = select_strs_heat_bath(myci, eri, eri_pq_max, civec_max,
+                                          strs, norb, nelec)
+        strs_add1 = selected_ci.select_strs_heat_bath(
+            myci, hb_table, eri_pq_max, civec_max, strs, norb, nelec)
+        self.assertTrue(len(strs_add1) > 0)
+        self.assertTrue(numpy.all(strs_add0 == strs_add1))
+
+        # Only the integrals which can pass the selection are kept
+        hb_table = selected_ci.make_heat_bath_table(
+            eri, norb, myci.select_cutoff/civec_max.max())
+        self.assertTrue(hb_table[0].shape[1] < norb*(norb-1)//2)
+        strs_add1 = selected_ci.select_strs_heat_bath(
+            myci, hb_table, eri_pq_max, civec_max, strs, norb, nelec)
+        self.assertTrue(numpy.all(strs_add0 == strs_add1))
+
+    def test_linkstr_index_update(self):
+        norb, nelec = 10, 4
+        strs = cistring.make_strings(range(norb), nelec)
+        rand = numpy.random.RandomState(3)
+        strs0 = numpy.sort(rand.choice(strs, 60, replace=False))
+        book = selected_ci._LinkstrIndex(strs0, norb, nelec)
+        for i in range(3):
+            strs1 = numpy.union1d(rand.choice(strs0, 50, replace=False),
+                                  rand.choice(strs, 40, replace=False))
+            book = book.update(strs1)
+            ref = selected_ci._LinkstrIndex(strs1, norb, nelec)
+            self.assertTrue(numpy.all(book.cd_index == ref.cd_index))
+            idx = numpy.argsort(book.inter)
+            self.assertTrue(numpy.all(book.inter[idx] == ref.inter))
+            self.assertTrue(numpy.all(book.dd_index[idx] == ref.dd_index))
+            strs0 = strs1
+
+    def test_pt2_energy(self):
+        myci = selected_ci.SCI()
+        nelec = (3,3)
+        e = myci.energy(h1, eri, civec_strs, norb, nelec)
+        e /= numpy.linalg.norm(ci_coeff)**2
+        myci.pt2_cutoff = 0
+        e_pt2 = myci.pt2_energy(h1, eri, civec_strs, norb, nelec, e_ci=e)[0]
+
+        fcivec = selected_ci.to_fci(civec_strs, norb, nelec)
+        h2e = direct_spin1.absorb_h1e(h1, eri, norb, nelec, .5)
+        hc = direct_spin1.contract_2e(h2e, fcivec, norb, nelec)
+        hdiag = direct_spin1.make_hdiag(h1, eri, norb, nelec).reshape(hc.shape)
+        addra = [cistring.str2addr(norb, 3, x) for x in ci_strs[0]]
+        addrb = [cistring.str2addr(norb, 3, x) for x in ci_strs[1]]
+        de = hc**2 / (e - hdiag)
+        de[numpy.ix_(addra,addrb)] = 0
+        self.assertAlmostEqual(e_pt2, de.sum(), 9)
+
+        myci.pt2_nsample = 3
+        myci.pt2_nbatch = 40
+        e_pt2_sto, err = myci.pt2_energy(h1, eri, civec_strs, norb, nelec, e_ci=e)
+        self.assertTrue(abs(e_pt2_sto - e_pt2) < 4*err)
+
     def test_contract_2e_vs_slow_version(self):
         myci = selected_ci.SCI()
         ci1 = myci.contract_2e(eri, civec_strs, norb, nelec)
@@ -666,6 +735,30 @@ def select_strs(myci, eri, eri_pq_max, civec_max, strs, norb, nelec):
     strs_add = sorted(set(strs_add) - set(strs))
     return numpy.asarray(strs_add, dtype=numpy.int64)
 
+def select_strs_heat_bath(myci, eri, eri_pq_max, civec_max, strs, norb, nelec):
+    strs_add = []
+    for ia, str0 in enumerate(strs):
+        occ = [i for i in range(norb) if str0 & (1<<i)]
+        vir = [i for i in range(norb) if not str0 & (1<<i)]
+        ca = civec_max[ia]
+        for i in occ:
+            for a in vir:
+                if eri_pq_max[a,i]*ca > myci.select_cutoff:
+                    strs_add.append(str0 ^ (1<<i) | (1<<a))
+        for i1, i in enumerate(occ):
+            for j in occ[:i1]:
+                str1 = str0 ^ (1<<i) ^ (1<<j)
+                for a in range(norb):
+                    for b in range(a):
+                        if (str1 & (1<<a) or str1 & (1<<b) or
+                            set((a, b)) == set((i, j))):
+                            continue
+                        h = abs(eri[a,i,b,j] - eri[a,j,b,i])
+                        if h*ca > myci.select_cutoff:
+                            strs_add.append(str1 | (1<<a) | (1<<b))
+    strs_add = sorted(set(strs_add) - set(strs))
+    return numpy.asarray(strs_add, dtype=numpy.int64)
+
 if __name__ == "__main__":
     print("Full Tests for selected_ci")
     unittest.main()
@@ -75,6 +75,21 @@ class KnownValues(unittest.TestCase):
         ci3 = fci.direct_spin1.contract_2e(g2e, ci2, norb, neleci)
         self.assertAlmostEqual(numpy.linalg.norm(ci3), 127.49780293866368, 6)
 
+    def test_contract_multi(self):
+        eri = fci.direct_spin1.absorb_h1e(h1e, g2e, norb, neleci, .5)
+        cs = numpy.array((ci2, ci3, ci2-ci3))
+        hcs = fci.direct_spin1.contract_2e(eri, cs, norb, neleci)
+        self.assertEqual(hcs.shape, cs.shape)
+        for c, hc in zip(cs, hcs):
+            ref = fci.direct_spin1.contract_2e(eri, c, norb, neleci)
+            self.assertAlmostEqual(abs(hc - ref).max(), 0, 12)
+
+        sol = fci.direct_spin1.FCI(mol)
+        e, c = sol.kernel(h1e, g2e, norb, nelec, nroots=3)
+        self.assertAlmostEqual(e[0], -8.9347029192929, 8)
+        for ei, ci in zip(e, c):
+            self.assertAlmostEqual(sol.energy(h1e, g2e, ci, norb, nelec), ei, 8)
+
     def test_kernel(self):
         eref, cref = fci.direct_spin0.kernel(h1e, g2e, norb, mol.nelectron)
         e, c = fci.direct_spin1.kernel(h1e, g2e, norb, nelec)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import numpy
+from pyscf import lib
+from pyscf import ao2mo
+from pyscf import fci
+from pyscf.fci import direct_spin1_lowmem
+
+nelec = (4,3)
+norb = 8
+numpy.random.seed(10)
+h1e = numpy.random.random((norb,norb))
+h1e = h1e + h1e.T
+h2e = ao2mo.restore(1, numpy.random.random((norb*(norb+1)//2,)*2), norb)
+h2e = h2e + h2e.transpose(2,3,0,1)
+na = fci.cistring.num_strings(norb, nelec[0])
+nb = fci.cistring.num_strings(norb, nelec[1])
+
+def tearDownModule():
+    global h1e, h2e
+    del h1e, h2e
+
+class KnownValues(unittest.TestCase):
+    def test_contract(self):
+        ci0 = numpy.random.random((na,nb))
+        eri = fci.direct_spin1.absorb_h1e(h1e, h2e, norb, nelec, .5)
+        ref = fci.direct_spin1.contract_2e(eri, ci0, norb, nelec)
+        ci1 = direct_spin1_lowmem.contract_2e(eri, ci0, norb, nelec)
+        self.assertAlmostEqual(abs(ci1 - ref).max(), 0, 9)
+        # Multiple blocks of beta strings
+        max_memory = lib.current_memory()[0] + .5
+        ci1 = direct_spin1_lowmem.contract_2e(eri, ci0, norb, nelec,
+                                              max_memory=max_memory)
+        self.assertAlmostEqual(abs(ci1 - ref).max(), 0, 9)
+
+    def test_kernel(self):
+        myci = fci.direct_spin1.FCI()
+        e0, c0 = myci.kernel(h1e, h2e, norb, nelec, nroots=2, davidson_only=True)
+        myci = direct_spin1_lowmem.FCI()
+        # Davidson subspace in memory-mapped files
+        e1, c1 = myci.kernel(h1e, h2e, norb, nelec, nroots=2, davidson_only=True,
+                             max_memory=0)
+        self.assertAlmostEqual(abs(e1 - e0).max(), 0, 8)
+        self.assertAlmostEqual(abs(abs(numpy.dot(c1[0].ravel(), c0[0].ravel()))-1), 0, 6)
+
+    def test_davidson_mmap(self):
+        a = numpy.random.random((40,40))
+        a = a + a.T
+        aop = lambda xs: [a.dot(x) for x in xs]
+        x0 = a[:2]
+        e0 = lib.davidson1(aop, x0, a.diagonal(), nroots=2)[1]
+        conv, e1, x1 = lib.davidson1(aop, x0, a.diagonal(), nroots=2,
+                                     max_memory=0, mmap=True)
+        self.assertAlmostEqual(abs(e1 - e0).max(), 0, 9)
+        self.assertAlmostEqual(abs(e1 - numpy.linalg.eigh(a)[0][:2]).max(), 0, 9)
+
+
+if __name__ == "__main__":
+    print("Full Tests for direct_spin1_lowmem")
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import numpy
+from pyscf import ao2mo
+from pyscf import fci
+from pyscf.fci import direct_spin1_shm
+
+nelec = (4,3)
+norb = 8
+numpy.random.seed(10)
+h1e = numpy.random.random((norb,norb))
+h1e = h1e + h1e.T
+h2e = ao2mo.restore(1, numpy.random.random((norb*(norb+1)//2,)*2), norb)
+h2e = h2e + h2e.transpose(2,3,0,1)
+na = fci.cistring.num_strings(norb, nelec[0])
+nb = fci.cistring.num_strings(norb, nelec[1])
+
+def tearDownModule():
+    global h1e, h2e
+    del h1e, h2e
+
+class KnownValues(unittest.TestCase):
+    def test_contract(self):
+        ci0 = numpy.random.random((na,nb))
+        eri = fci.direct_spin1.absorb_h1e(h1e, h2e, norb, nelec, .5)
+        ref = fci.direct_spin1.contract_2e(eri, ci0, norb, nelec)
+        ci1 = direct_spin1_shm.contract_2e(eri, ci0, norb, nelec, nproc=3)
+        self.assertAlmostEqual(abs(ci1 - ref).max(), 0, 9)
+
+    def test_kernel(self):
+        myci = fci.direct_spin1.FCI()
+        e0, c0 = myci.kernel(h1e, h2e, norb, nelec, nroots=2, davidson_only=True)
+        myci = direct_spin1_shm.FCI()
+        myci.nproc = 2
+        e1, c1 = myci.kernel(h1e, h2e, norb, nelec, nroots=2, davidson_only=True)
+        self.assertAlmostEqual(abs(e1 - e0).max(), 0, 8)
+
+    def test_kernel_team_vector_ops(self):
+        myci = fci.direct_spin1.FCI()
+        e0, c0 = myci.kernel(h1e, h2e, norb, nelec, davidson_only=True)
+        min_size = direct_spin1_shm.MIN_PARALLEL_SIZE
+        direct_spin1_shm.MIN_PARALLEL_SIZE = 0
+        try:
+            myci = direct_spin1_shm.FCI()
+            myci.nproc = 3
+            e1, c1 = myci.kernel(h1e, h2e, norb, nelec, davidson_only=True)
+        finally:
+            direct_spin1_shm.MIN_PARALLEL_SIZE = min_size
+        self.assertAlmostEqual(e1 - e0, 0, 8)
+        self.assertTrue(myci._team is None)
+
+    def test_team(self):
+        min_size = direct_spin1_shm.MIN_PARALLEL_SIZE
+        direct_spin1_shm.MIN_PARALLEL_SIZE = 0
+        team = direct_spin1_shm.WorkerTeam(norb, nelec, nproc=3, nvec=3)
+        try:
+            x = team.asarray(numpy.random.random(na*nb))
+            y = team.asarray(numpy.random.random(na*nb))
+            self.assertTrue(team._offset(x) is not None)
+            self.assertAlmostEqual(team.dot(x, y) / x.dot(y), 1, 12)
+            ref = y + .5 * x
+            team.axpy(.5, x, y)
+            self.assertAlmostEqual(abs(y - ref).max(), 0, 12)
+
+            eri = fci.direct_spin1.absorb_h1e(h1e, h2e, norb, nelec, .5)
+            ref = fci.direct_spin1.contract_2e(eri, x, norb, nelec)
+            ci1 = team.contract_2e(eri, x)
+            self.assertAlmostEqual(abs(ci1 - ref).max(), 0, 9)
+            # The pool is exhausted; numpy arrays are used
+            self.assertTrue(team.empty() is None)
+            ci1 = team.contract_2e(eri, x)
+            self.assertTrue(team._offset(ci1) is None)
+            self.assertAlmostEqual(abs(ci1 - ref).max(), 0, 9)
+        finally:
+            direct_spin1_shm.MIN_PARALLEL_SIZE = min_size
+            team.close()
+
+
+if __name__ == "__main__":
+    print("Full Tests for direct_spin1_shm")
+    unittest.main()
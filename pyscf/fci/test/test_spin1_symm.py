@@ -72,6 +72,44 @@ class KnownValues(unittest.TestCase):
         e = fci.direct_spin1_symm.energy(h1e, g2e, c, norb, nelec)
         self.assertAlmostEqual(e, -84.200905534209554, 8)
 
+    def test_compact(self):
+        neleca, nelecb = nelec//2+1, nelec//2-1
+        na = fci.cistring.num_strings(norb, neleca)
+        nb = fci.cistring.num_strings(norb, nelecb)
+        civec = numpy.random.random((na,nb))
+        for wfnsym in range(4):
+            c = fci.addons.symmetrize_wfn(civec, norb, (neleca,nelecb), orbsym, wfnsym)
+            c1 = fci.direct_spin1_symm.pack_civec(c, norb, (neleca,nelecb), orbsym, wfnsym)
+            self.assertAlmostEqual(numpy.linalg.norm(c1), numpy.linalg.norm(c), 12)
+            c2 = fci.direct_spin1_symm.unpack_civec(c1, norb, (neleca,nelecb), orbsym, wfnsym)
+            self.assertAlmostEqual(abs(c2 - c).max(), 0, 12)
+
+            ref = cis.contract_2e(g2e, c, norb, (neleca,nelecb), wfnsym=wfnsym)
+            ref = fci.direct_spin1_symm.pack_civec(ref, norb, (neleca,nelecb), orbsym, wfnsym)
+            c2 = fci.direct_spin1_symm.contract_2e_compact(
+                g2e, c1, norb, (neleca,nelecb), orbsym=orbsym, wfnsym=wfnsym)
+            self.assertAlmostEqual(abs(c2 - ref).max(), 0, 12)
+
+        cis1 = fci.direct_spin1_symm.FCISolver(mol)
+        cis1.orbsym = orbsym
+        cis1.nroots = 3
+        cis1.compact = False
+        e0, c0 = cis1.kernel(h1e, g2e, norb, nelec, wfnsym=1)
+        cis1.compact = True
+        e1, c1 = cis1.kernel(h1e, g2e, norb, nelec, wfnsym=1)
+        self.assertAlmostEqual(abs(e1 - e0).max(), 0, 9)
+        for x, y in zip(c0, c1):
+            self.assertAlmostEqual(abs(numpy.dot(x.ravel(), y.ravel())), 1, 8)
+
+        # The initial guess is generated by get_init_guess
+        guess = []
+        cis1.get_init_guess = lambda *args: guess.append(1) or \
+                fci.direct_spin1_symm.FCISolver.get_init_guess(cis1, *args)
+        cis1.pspace_size = 100
+        e1, c1 = cis1.kernel(h1e, g2e, norb, nelec, wfnsym=1)
+        self.assertEqual(len(guess), 1)
+        self.assertAlmostEqual(abs(e1 - e0).max(), 0, 9)
+
     def test_fci_spin_square_nroots(self):
         mol = gto.M(
             verbose = 0,
@@ -82,24 +82,20 @@ def kernel(mycc, t1=None, t2=None, l1=None, l2=None, eris=None, atmlst=None,
     if atmlst is None:
         atmlst = range(mol.natm)
     offsetdic = mol.offset_nr_by_atom()
-    diagidx = numpy.arange(nao)
-    diagidx = diagidx*(diagidx+1)//2 + diagidx
     de = numpy.zeros((len(atmlst),3))
     Imat = numpy.zeros((nao,nao))
     vhf1 = fdm2.create_dataset('vhf1', (len(atmlst),3,nao,nao), 'f8')
 
 # 2e AO integrals dot 2pdm
     max_memory = max(0, mycc.max_memory - lib.current_memory()[0])
-    blksize = max(1, int(max_memory*.9e6/8/(nao**3*2.5)))
+    blksize = max(1, int(max_memory*.9e6/8/(nao**3*3)))
 
     for k, ia in enumerate(atmlst):
         shl0, shl1, p0, p1 = offsetdic[ia]
-        ip1 = p0
         vhf = numpy.zeros((3,nao,nao))
-        for b0, b1, nf in _shell_prange(mol, shl0, shl1, blksize):
-            ip0, ip1 = ip1, ip1 + nf
-            dm2buf = _load_block_tril(fdm2['dm2'], ip0, ip1, nao)
-            dm2buf[:,:,diagidx] *= .5
+        for b0, b1, ip0, ip1, dm2buf in _loop_dm2_ao(mol, fdm2['dm2'], shl0, shl1,
+                                                     blksize, mycc.async_io):
+            nf = ip1 - ip0
             shls_slice = (b0,b1,0,mol.nbas,0,mol.nbas,0,mol.nbas)
             eri0 = mol.intor('int2e', aosym='s2kl', shls_slice=shls_slice)
             Imat += lib.einsum('ipx,iqx->pq', eri0.reshape(nf,nao,-1), dm2buf)
@@ -400,6 +396,33 @@ def _load_block_tril(h5dat, row0, row1, nao, out=None):
         out[:,i] = h5dat[i2+row0:i2+row1]
     return out
 
+def _loop_dm2_ao(mol, dm2, shl0, shl1, blksize, async_io=True):
+    '''Generator of the AO 2-pdm blocks dm2[ip0:ip1] (the last two indices
+    are stored in lower triangular form) for shells shl0:shl1.  The next
+    block is loaded in background while the current block is being
+    contracted with the AO integral derivatives.
+    '''
+    ao_loc = mol.ao_loc_nr()
+    nao = ao_loc[-1]
+    diagidx = numpy.arange(nao)
+    diagidx = diagidx*(diagidx+1)//2 + diagidx
+    tasks = [(b0, b1, ao_loc[b0], ao_loc[b1])
+             for b0, b1, nf in _shell_prange(mol, shl0, shl1, blksize)]
+    bufs = [None, None]
+    def load(k):
+        if k < len(tasks):
+            ip0, ip1 = tasks[k][2:]
+            buf = _load_block_tril(dm2, ip0, ip1, nao)
+            buf[:,:,diagidx] *= .5
+            bufs[k%2] = buf
+
+    with lib.call_in_background(load, sync=not async_io) as prefetch:
+        load(0)
+        for k, (b0, b1, ip0, ip1) in enumerate(tasks):
+            prefetch(k+1)
+            dm2buf, bufs[k%2] = bufs[k%2], None
+            yield b0, b1, ip0, ip1, dm2buf
+
 def _cp(a):
     return numpy.array(a, copy=False, order='C')
 
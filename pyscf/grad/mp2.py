@@ -23,6 +23,7 @@ MP2 analytical nuclear gradients
 import time
 import numpy
 from pyscf import lib
+from pyscf import gto
 from functools import reduce
 from pyscf.lib import logger
 from pyscf.grad import rhf as rhf_grad
@@ -235,16 +236,7 @@ def as_scanner(grad_mp):
 
 
 def _shell_prange(mol, start, stop, blksize):
-    nao = 0
-    ib0 = start
-    for ib in range(start, stop):
-        now = (mol.bas_angular(ib)*2+1) * mol.bas_nctr(ib)
-        nao += now
-        if nao > blksize and nao > now:
-            yield (ib0, ib, nao-now)
-            ib0 = ib
-            nao = now
-    yield (ib0, stop, nao)
+    return iter(gto.scheduler.shell_ranges(mol, start, stop, blksize))
 
 def _response_dm1(mp, Xvo):
     nvir, nocc = Xvo.shape
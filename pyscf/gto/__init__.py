@@ -23,6 +23,7 @@ from pyscf.gto.mole import *
 from pyscf.gto.moleintor import getints, getints_by_shell
 from pyscf.gto.eval_gto import eval_gto
 from pyscf.gto import ecp
+from pyscf.gto import scheduler
 
 parse = basis.parse
 #import pyscf.gto.mole.cmd_args
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''
+Cost model and partitioning for the AO integral tasks
+
+The integral drivers (ao2mo, DF, the gradients of correlated methods)
+evaluate the integrals in batches of shells or shell pairs.  The size of a
+batch is bounded by the available memory.  Within this bound, the batches
+generated by the functions of this module have balanced computational cost.
+The cost of a shell pair is estimated from the angular momentum, the number
+of primitive and contracted functions, and the Schwarz screening.
+'''
+
+import ctypes
+import numpy
+from pyscf.gto.mole import ANG_OF, NPRIM_OF, NCTR_OF
+from pyscf import __config__
+
+SCREEN_CUTOFF = getattr(__config__, 'gto_scheduler_screen_cutoff', 1e-13)
+
+
+def shell_pair_cost(mol, ao_loc=None, q_cond=None, cutoff=SCREEN_CUTOFF):
+    '''Estimated cost of the 2-electron integrals of each shell pair.
+
+    The cost of shell pair (i,j) is modelled as
+
+        nf_i*nf_j * (nprim_i*nprim_j*nroots_ij + nctr_i*nctr_j)
+
+    nf is the number of functions of one contracted shell, nroots_ij the
+    number of Rys roots for the angular momentum l_i+l_j.  The first term
+    is the cost of the primitive integrals, the second term the cost of the
+    contraction.  If the Schwarz conditions q_cond are given, the shell pairs
+    which are screened (q_ij * max(q) < cutoff) cost the output only.
+
+    Kwargs:
+        ao_loc : 1D array
+            Offsets of the shells in the AO functions.  mol.ao_loc_nr() by
+            default.
+        q_cond : 2D array
+            Schwarz conditions sqrt(max|(ij|ij)|) of the shell pairs.
+
+    Returns:
+        2D array of (nbas,nbas)
+    '''
+    if ao_loc is None:
+        ao_loc = mol.ao_loc_nr()
+    bas = numpy.asarray(mol._bas)
+    l = bas[:,ANG_OF]
+    nprim = bas[:,NPRIM_OF]
+    nctr = bas[:,NCTR_OF]
+    nf = (ao_loc[1:] - ao_loc[:-1]) / nctr.astype(float)
+    nroots = (l[:,None] + l) // 2 + 1
+    nf2 = nf[:,None] * nf
+    nctr2 = nctr[:,None] * nctr
+    cost = nf2 * (nprim[:,None] * nprim * nroots + nctr2)
+    if q_cond is not None:
+        mask = q_cond * q_cond.max() < cutoff
+        cost[mask] = (nf2 * nctr2)[mask]
+    return cost
+
+def get_q_cond(opt, nbas):
+    '''Schwarz conditions stored in the integral optimizer (VHFOpt or
+    AO2MOpt).  Returns None if the optimizer does not hold them.'''
+    ptr = opt._this.contents.q_cond
+    if not ptr:
+        return None
+    ptr = ctypes.cast(ptr, ctypes.POINTER(ctypes.c_double))
+    return numpy.ctypeslib.as_array(ptr, shape=(nbas,nbas)).copy()
+
+def schwarz_cond(mol, intor='int2e'):
+    '''Schwarz conditions sqrt(max|(ij|ij)|) of the shell pairs'''
+    from pyscf.scf import _vhf
+    opt = _vhf.VHFOpt(mol, intor, 'CVHFnrs8_prescreen', 'CVHFsetnr_direct_scf')
+    return get_q_cond(opt, mol.nbas)
+
+
+def balanced_partition(costs, sizes, blksize, start=0, stop=None):
+    '''Split the tasks [start:stop] into contiguous batches.  The size of
+    each batch (the sum of the task sizes) is bounded by blksize, unless the
+    batch has only one task.  The number of batches is the smallest one
+    allowed by the size bound.  Among these partitions, the one with the
+    smallest max-cost of batches is searched (by bisection).
+
+    Returns:
+        A list of (task0, task1, batch_size)
+    '''
+    if stop is None:
+        stop = len(sizes)
+    sizes = numpy.asarray(sizes[start:stop])
+    costs = numpy.asarray(costs[start:stop], dtype=float)
+    ntasks = sizes.size
+    if ntasks == 0:
+        return []
+
+    size_loc = numpy.append(0, numpy.cumsum(sizes))
+    cost_loc = numpy.append(0, numpy.cumsum(costs))
+    displs = _greedy_partition(size_loc, cost_loc, blksize, numpy.inf)
+    nblk = len(displs) - 1
+    if nblk > 1 and cost_loc[-1] > 0:
+        lo = max(costs.max(), cost_loc[-1] / nblk)
+        hi = cost_loc[-1]
+        while hi - lo > lo * 1e-3:
+            cap = (lo + hi) * .5
+            trial = _greedy_partition(size_loc, cost_loc, blksize, cap)
+            if len(trial) - 1 <= nblk:
+                hi = cap
+                displs = trial
+            else:
+                lo = cap
+    return [(start+i0, start+i1, size_loc[i1]-size_loc[i0])
+            for i0, i1 in zip(displs[:-1], displs[1:])]
+
+def _greedy_partition(size_loc, cost_loc, blksize, cap):
+    '''Cut the batches as large as possible under the bounds of size and
+    cost'''
+    n = len(size_loc) - 1
+    displs = [0]
+    p0 = 0
+    while p0 < n:
+        p1 = min(numpy.searchsorted(size_loc, size_loc[p0]+blksize, 'right'),
+                 numpy.searchsorted(cost_loc, cost_loc[p0]+cap, 'right')) - 1
+        p0 = min(max(p1, p0+1), n)
+        displs.append(p0)
+    return displs
+
+def shell_ranges(mol, start, stop, blksize, ao_loc=None, q_cond=None):
+    '''Batches of shells [start:stop] for the integrals (ij|kl) which are
+    computed for the shells i of a batch and all shells j, k, l.
+
+    Returns:
+        A list of (shell0, shell1, number of AOs)
+    '''
+    if ao_loc is None:
+        ao_loc = mol.ao_loc_nr()
+    costs = shell_pair_cost(mol, ao_loc, q_cond).sum(axis=1)
+    return balanced_partition(costs, ao_loc[1:]-ao_loc[:-1], blksize,
+                              start, stop)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import numpy
+from pyscf import gto
+from pyscf import ao2mo
+from pyscf.gto import scheduler
+
+mol = gto.Mole()
+mol.verbose = 0
+mol.atom = '''
+O   0.   0.       0.
+H   0.   -0.757   0.587
+H   0.   0.757    0.587
+H   0.   0.       20.'''
+mol.basis = {'O': 'cc-pvtz', 'H': 'sto-3g'}
+mol.spin = 1
+mol.build()
+
+def tearDownModule():
+    global mol
+    del mol
+
+class KnownValues(unittest.TestCase):
+    def test_shell_pair_cost(self):
+        cost = scheduler.shell_pair_cost(mol)
+        self.assertEqual(cost.shape, (mol.nbas, mol.nbas))
+        self.assertTrue(abs(cost - cost.T).max() == 0)
+        # f shell of O is more expensive than s shell of H
+        ish = [i for i in range(mol.nbas) if mol.bas_angular(i) == 3][0]
+        self.assertTrue(cost[ish,ish] > cost[-1,-1])
+
+        q_cond = scheduler.schwarz_cond(mol)
+        self.assertEqual(q_cond.shape, (mol.nbas, mol.nbas))
+        cost1 = scheduler.shell_pair_cost(mol, q_cond=q_cond, cutoff=1e-8)
+        # The far away H atom does not overlap with the others
+        self.assertTrue(cost1[-1,0] < cost[-1,0])
+        self.assertEqual(cost1[-1,-1], cost[-1,-1])
+
+    def test_balanced_partition(self):
+        numpy.random.seed(1)
+        sizes = numpy.random.randint(1, 10, 200)
+        costs = numpy.random.random(200) ** 4
+        for blksize in (9, 40, 300, 5000):
+            tasks = scheduler.balanced_partition(costs, sizes, blksize)
+            self.assertEqual(tasks[0][0], 0)
+            self.assertEqual(tasks[-1][1], 200)
+            for (i0, i1, n), (j0, j1, m) in zip(tasks[:-1], tasks[1:]):
+                self.assertEqual(i1, j0)
+            for i0, i1, n in tasks:
+                self.assertEqual(n, sizes[i0:i1].sum())
+                self.assertTrue(n <= blksize or i1 - i0 == 1)
+
+        tasks = scheduler.balanced_partition(costs, sizes, 300, 20, 120)
+        self.assertEqual((tasks[0][0], tasks[-1][1]), (20, 120))
+
+        ao_loc = mol.ao_loc_nr()
+        tasks = scheduler.shell_ranges(mol, 0, mol.nbas, 20)
+        self.assertEqual(sum(x[2] for x in tasks), mol.nao_nr())
+        for i0, i1, n in tasks:
+            self.assertEqual(n, ao_loc[i1] - ao_loc[i0])
+
+        # Compare to the partition by the number of AOs
+        costs = scheduler.shell_pair_cost(mol).sum(axis=1)
+        for blksize in (8, 16, 25):
+            tasks = scheduler.shell_ranges(mol, 0, mol.nbas, blksize)
+            ref = ao2mo.outcore.balance_partition(ao_loc, blksize)
+            self.assertEqual(len(tasks), len(ref))
+            max_cost = max(costs[i0:i1].sum() for i0, i1, n in tasks)
+            max_cost_ref = max(costs[i0:i1].sum() for i0, i1, n in ref)
+            self.assertTrue(max_cost < max_cost_ref)
+
+
+if __name__ == "__main__":
+    print("Full Tests for integral scheduler")
+    unittest.main()
@@ -258,7 +258,8 @@ def davidson1(aop, x0, precond, tol=1e-12, max_cycle=50, max_space=12,
              lindep=DAVIDSON_LINDEP, max_memory=MAX_MEMORY,
              dot=numpy.dot, callback=None,
              nroots=1, lessio=False, pick=None, verbose=logger.WARN,
-             follow_state=FOLLOW_STATE, tol_residual=None):
+             follow_state=FOLLOW_STATE, tol_residual=None, mmap=False,
+             axpy=None):
     '''Davidson diagonalization method to solve  a c = e c.  Ref
     [1] E.R. Davidson, J. Comput. Phys. 17 (1), 87-94 (1975).
     [2] http://people.inf.ethz.ch/arbenz/ewp/Lnotes/chapter11.pdf
@@ -313,6 +314,12 @@ def davidson1(aop, x0, precond, tol=1e-12, max_cycle=50, max_space=12,
             If the solution dramatically changes in two iterations, clean the
             subspace and restart the iteration with the old solution.  It can
             help to improve numerical stability.  Default is False.
+        mmap : bool
+            When the subspace does not fit in max_memory, store the trial
+            vectors in memory-mapped scratch files rather than HDF5 datasets.
+        axpy : function(a, x, y) => None
+            In-place update y += a * x used to orthogonalize the trial
+            vectors.  Default is numpy arithmetic.
 
     Returns:
         conv : bool
@@ -347,6 +354,8 @@ def davidson1(aop, x0, precond, tol=1e-12, max_cycle=50, max_space=12,
 
     if not callable(precond):
         precond = make_diag_precond(precond)
+    if axpy is None:
+        axpy = _axpy
 
     if callable(x0):  # lazy initialization to reduce memory footprint
         x0 = x0()
@@ -372,6 +381,9 @@ def davidson1(aop, x0, precond, tol=1e-12, max_cycle=50, max_space=12,
             if _incore:
                 xs = []
                 ax = []
+            elif mmap:
+                xs = _MmapXlist()
+                ax = _MmapXlist()
             else:
                 xs = _Xlist()
                 ax = _Xlist()
@@ -505,7 +517,7 @@ def davidson1(aop, x0, precond, tol=1e-12, max_cycle=50, max_space=12,
         for i in range(space):
             xsi = numpy.asarray(xs[i])
             for xi in xt:
-                xi -= xsi * dot(xsi.conj(), xi)
+                axpy(-dot(xsi.conj(), xi), xsi, xi)
             xsi = None
         norm_min = 1
         for i,xi in enumerate(xt):
@@ -1419,6 +1431,9 @@ def cho_solve(a, b):
     return scipy.linalg.solve(a, b, sym_pos=True)
 
 
+def _axpy(a, x, y):
+    y += a * x
+
 def _qr(xs, dot, lindep=1e-14):
     '''QR decomposition for a list of vectors (for linearly independent vectors only).
     xs = (r.T).dot(qs)
@@ -1531,6 +1546,37 @@ class _Xlist(list):
         key = self.index.pop(index)
         del(self.scr_h5[str(key)])
 
+class _MmapXlist(_Xlist):
+    '''Vectors are held in memory-mapped scratch files which are paged in
+    and out by the OS on access.'''
+    def __init__(self):
+        self.index = []
+        self._mmaps = {}
+
+    def __getitem__(self, n):
+        return self._mmaps[self.index[n]][1]
+
+    def append(self, x):
+        length = len(self.index)
+        key = length + 1
+        index_set = set(self.index)
+        if key in index_set:
+            key = set(range(length)).difference(index_set).pop()
+        self.index.append(key)
+
+        x = numpy.asarray(x)
+        ftmp = tempfile.NamedTemporaryFile(dir=parameters.TMPDIR)
+        buf = numpy.memmap(ftmp, dtype=x.dtype, mode='w+', shape=x.shape)
+        buf[:] = x
+        self._mmaps[key] = (ftmp, buf)
+
+    def __setitem__(self, n, x):
+        self[n][:] = x
+
+    def pop(self, index):
+        key = self.index.pop(index)
+        del(self._mmaps[key])
+
 del(SAFE_EIGH_LINDEP, DAVIDSON_LINDEP, DSOLVE_LINDEP, MAX_MEMORY)
 
 
@@ -423,6 +423,179 @@ void FCIcontract_2e_spin1(double *eri, double *ci0, double *ci1,
 }
 
 
+/*
+ * ctr_rhf2e_kern for nvec CI vectors.  The vectors are interleaved,
+ * ci0[na,nb,nvec], so that the intermediates of all vectors are stored in
+ * t1[nnorb,bcount,nvec] and contracted with eri in one dgemm.  The link
+ * tables are walked once for all vectors.  For the alpha excitations, the
+ * interleaved vectors are the same as one vector of nb*nvec beta strings.
+ */
+static void ctr_rhf2e_kern_multi(double *eri, double *ci0, double *ci1,
+                                 double *ci1buf, double *t1buf,
+                                 int bcount, int stra_id, int strb_id,
+                                 int norb, int na, int nb, int nlinka, int nlinkb,
+                                 _LinkTrilT *clink_indexa, _LinkTrilT *clink_indexb,
+                                 int nvec)
+{
+        const char TRANS_N = 'N';
+        const double D0 = 0;
+        const double D1 = 1;
+        const int nnorb = norb * (norb+1)/2;
+        const int nrow = nvec * bcount;
+        double *t1 = t1buf;
+        double *vt1 = t1buf + (size_t)nnorb*nrow;
+        const _LinkTrilT *tab = clink_indexb + strb_id * nlinkb;
+        double *pci0 = ci0 + stra_id*(size_t)nb*nvec;
+        double *pci1 = ci1 + stra_id*(size_t)nb*nvec;
+        double *pt1, *pci;
+        int i, j, ia, str0, sign;
+        size_t str1;
+
+        memset(t1, 0, sizeof(double)*nnorb*nrow);
+        FCIprog_a_t1(ci0, t1, nrow, stra_id, strb_id*nvec,
+                     norb, nb*nvec, nlinka, clink_indexa);
+        for (str0 = 0; str0 < bcount; str0++) {
+                for (j = 0; j < nlinkb; j++) {
+                        ia   = EXTRACT_IA  (tab[j]);
+                        str1 = EXTRACT_ADDR(tab[j]);
+                        sign = EXTRACT_SIGN(tab[j]);
+                        if (sign == 0) {
+                                break;
+                        }
+                        pt1 = t1 + ia*nrow + str0*nvec;
+                        pci = pci0 + str1*nvec;
+                        for (i = 0; i < nvec; i++) {
+                                pt1[i] += sign * pci[i];
+                        }
+                }
+                tab += nlinkb;
+        }
+
+        dgemm_(&TRANS_N, &TRANS_N, &nrow, &nnorb, &nnorb,
+               &D1, t1, &nrow, eri, &nnorb, &D0, vt1, &nrow);
+
+        tab = clink_indexb + strb_id * nlinkb;
+        for (str0 = 0; str0 < bcount; str0++) {
+                for (j = 0; j < nlinkb; j++) {
+                        ia   = EXTRACT_IA  (tab[j]);
+                        str1 = EXTRACT_ADDR(tab[j]);
+                        sign = EXTRACT_SIGN(tab[j]);
+                        if (sign == 0) {
+                                break;
+                        }
+                        pt1 = vt1 + ia*nrow + str0*nvec;
+                        pci = pci1 + str1*nvec;
+                        for (i = 0; i < nvec; i++) {
+                                pci[i] += sign * pt1[i];
+                        }
+                }
+                tab += nlinkb;
+        }
+        spread_bufa_t1(ci1buf, vt1, nrow, nrow, stra_id, 0,
+                       norb, nrow, nlinka, clink_indexa);
+}
+
+/*
+ * FCIcontract_2e_spin1 for nvec CI vectors ci0[nvec,na,nb]
+ */
+void FCIcontract_2e_spin1_multi(double *eri, double *ci0, double *ci1,
+                                int norb, int na, int nb, int nlinka, int nlinkb,
+                                int *link_indexa, int *link_indexb, int nvec)
+{
+        _LinkTrilT *clinka = malloc(sizeof(_LinkTrilT) * nlinka * na);
+        _LinkTrilT *clinkb = malloc(sizeof(_LinkTrilT) * nlinkb * nb);
+        FCIcompress_link_tril(clinka, link_indexa, na, nlinka);
+        FCIcompress_link_tril(clinkb, link_indexb, nb, nlinkb);
+        const size_t civ_size = (size_t)na * nb;
+        // The t1 intermediates of all vectors are of the same size as in
+        // the single vector driver
+        const int blksize = MAX(1, STRB_BLKSIZE / nvec);
+        const int nnorb = norb * (norb+1)/2;
+        double *ci0t = malloc(sizeof(double) * civ_size*nvec);
+        double *ci1t = malloc(sizeof(double) * civ_size*nvec);
+        size_t k;
+        int i;
+        for (i = 0; i < nvec; i++) {
+                for (k = 0; k < civ_size; k++) {
+                        ci0t[k*nvec+i] = ci0[i*civ_size+k];
+                }
+        }
+
+        memset(ci1t, 0, sizeof(double)*civ_size*nvec);
+        double *ci1bufs[MAX_THREADS];
+#pragma omp parallel
+{
+        int strk, ib;
+        size_t blen;
+        double *t1buf = malloc(sizeof(double) * ((size_t)blksize*nvec*nnorb*2+2));
+        double *ci1buf = malloc(sizeof(double) * ((size_t)na*blksize*nvec+2));
+        ci1bufs[omp_get_thread_num()] = ci1buf;
+        for (ib = 0; ib < nb; ib += blksize) {
+                blen = MIN(blksize, nb-ib);
+                memset(ci1buf, 0, sizeof(double) * na*blen*nvec);
+#pragma omp for schedule(static)
+                for (strk = 0; strk < na; strk++) {
+                        ctr_rhf2e_kern_multi(eri, ci0t, ci1t, ci1buf, t1buf,
+                                             blen, strk, ib, norb, na, nb,
+                                             nlinka, nlinkb, clinka, clinkb,
+                                             nvec);
+                }
+                NPomp_dsum_reduce_inplace(ci1bufs, blen*na*nvec);
+#pragma omp master
+                FCIaxpy2d(ci1t+ib*nvec, ci1buf, na, nb*nvec, blen*nvec);
+#pragma omp barrier
+        }
+        free(ci1buf);
+        free(t1buf);
+}
+        for (i = 0; i < nvec; i++) {
+                for (k = 0; k < civ_size; k++) {
+                        ci1[i*civ_size+k] = ci1t[k*nvec+i];
+                }
+        }
+        free(ci0t);
+        free(ci1t);
+        free(clinka);
+        free(clinkb);
+}
+
+
+/*
+ * Contract the alpha strings strk0:strk1 of ci0 for the beta strings
+ * ib:ib+blen.  The contributions of the beta excitations are added to the
+ * rows strk0:strk1 of ci1.  The contributions of the alpha excitations are
+ * accumulated in ci1buf[na,blen].  It is the kernel of
+ * FCIcontract_2e_spin1 for the process-parallel driver where each process
+ * takes one block of alpha strings.
+ */
+void FCIcontract_2e_spin1_rows(double *eri, double *ci0, double *ci1,
+                               double *ci1buf, int norb, int na, int nb,
+                               int nlinka, int nlinkb,
+                               int *link_indexa, int *link_indexb,
+                               int ib, int blen, int strk0, int strk1)
+{
+        // Only the link tables of the strings strk0:strk1 and ib:ib+blen
+        // are compressed
+        _LinkTrilT *clinka = malloc(sizeof(_LinkTrilT) * nlinka * na);
+        _LinkTrilT *clinkb = malloc(sizeof(_LinkTrilT) * nlinkb * nb);
+        FCIcompress_link_tril(clinka+strk0*nlinka, link_indexa+strk0*nlinka*4,
+                              strk1-strk0, nlinka);
+        FCIcompress_link_tril(clinkb+ib*nlinkb, link_indexb+ib*nlinkb*4,
+                              blen, nlinkb);
+        double *t1buf = malloc(sizeof(double) * (blen*norb*(norb+1)+2));
+        int strk;
+        for (strk = strk0; strk < strk1; strk++) {
+                ctr_rhf2e_kern(eri, ci0, ci1, ci1buf, t1buf,
+                               blen, blen, blen, strk, ib,
+                               norb, na, nb, nlinka, nlinkb,
+                               clinka, clinkb);
+        }
+        free(t1buf);
+        free(clinka);
+        free(clinkb);
+}
+
+
 /*
  * eri_ab is mixed integrals (alpha,alpha|beta,beta), |beta,beta) in small strides
  */
@@ -23,6 +23,7 @@
 //#include <omp.h>
 #include "config.h"
 #include "vhf/fblas.h"
+#include "np_helper/np_helper.h"
 #include "fci.h"
 
 /*
@@ -385,3 +386,68 @@ void FCIcompress_link_tril(_LinkTrilT *clink, int *link_index,
                 link_index += nlink * 4;
         }
 }
+
+/*
+ * Transform the string index (the first axis) of ci[nstr,ncol] for the
+ * orbital rotation a^+_k -> \sum_p a^+_p t[k,p].  The rotation is applied
+ * as a sequence of single-orbital transformations for k = 0 .. norb-1.
+ * For orbital k, the strings which occupy k are the sources and the other
+ * strings are the targets of the excitations a^+_p a_k, so that the vector
+ * can be updated in place.
+ */
+#define TRANS_COLBLK    64
+void FCItransform_strs(double *ci, double *t, int norb, int nstr, int ncol,
+                       int nlink, int *link_index)
+{
+        _LinkT *clink = malloc(sizeof(_LinkT) * nlink * nstr);
+        FCIcompress_link(clink, link_index, norb, nstr, nlink);
+
+#pragma omp parallel
+{
+        int k, str0, j, a, i, n, c0, c1;
+        double fac, tkk;
+        double *pci0, *pci1;
+        _LinkT *tab;
+#pragma omp for schedule(dynamic)
+        for (c0 = 0; c0 < ncol; c0 += TRANS_COLBLK) {
+                c1 = MIN(c0+TRANS_COLBLK, ncol);
+                for (k = 0; k < norb; k++) {
+                        for (str0 = 0; str0 < nstr; str0++) {
+                                tab = clink + str0 * nlink;
+                                pci0 = ci + str0 * (size_t)ncol;
+                                for (j = 0; j < nlink; j++) {
+                                        a = EXTRACT_A(tab[j]);
+                                        i = EXTRACT_I(tab[j]);
+                                        if (i != k || a == k || t[k*norb+a] == 0) {
+                                                continue;
+                                        }
+                                        fac = EXTRACT_SIGN(tab[j]) * t[k*norb+a];
+                                        pci1 = ci + EXTRACT_ADDR(tab[j]) * (size_t)ncol;
+                                        for (n = c0; n < c1; n++) {
+                                                pci1[n] += fac * pci0[n];
+                                        }
+                                }
+                        }
+                        tkk = t[k*norb+k];
+                        for (str0 = 0; str0 < nstr; str0++) {
+                                tab = clink + str0 * nlink;
+                                pci0 = ci + str0 * (size_t)ncol;
+                                // the diagonal excitations are stored first
+                                for (j = 0; j < nlink; j++) {
+                                        a = EXTRACT_A(tab[j]);
+                                        i = EXTRACT_I(tab[j]);
+                                        if (a != i) {
+                                                break;
+                                        } else if (i == k) {
+                                                for (n = c0; n < c1; n++) {
+                                                        pci0[n] *= tkk;
+                                                }
+                                                break;
+                                        }
+                                }
+                        }
+                }
+        }
+}
+        free(clink);
+}
@@ -63,66 +63,88 @@ static void make_occ_vir(int *occ, int *vir, uint64_t str1, int norb)
         }
 }
 
-void SCIcre_des_linkstr(int *link_index, int norb, int nstrs, int nocc,
-                        uint64_t *strs, int store_trilidx)
+static void cre_des_linkstr_row(int *tab, int norb, int nocc, int nstrs,
+                                uint64_t *strs, int str_id, int store_trilidx)
 {
-        int ninter = nstrs;
         int occ[norb];
         int vir[norb];
         int nvir = norb - nocc;
-        int nlink = nocc * nvir + nocc;
-        int str_id, i, a, k, ai, addr;
+        int i, a, k, ai, addr;
         uint64_t str0, str1;
-        int *tab;
 
-        for (str_id = 0; str_id < ninter; str_id++) {
-                str1 = strs[str_id];
-                make_occ_vir(occ, vir, str1, norb);
+        str1 = strs[str_id];
+        make_occ_vir(occ, vir, str1, norb);
 
-                tab = link_index + str_id * nlink * 4;
-                if (store_trilidx) {
-                        for (k = 0; k < nocc; k++) {
-                                tab[k*4+0] = occ[k]*(occ[k]+1)/2+occ[k];
-                                tab[k*4+2] = str_id;
-                                tab[k*4+3] = 1;
-                        }
-                        for (a = 0; a < nvir; a++) {
-                        for (i = 0; i < nocc; i++) {
-                                str0 = (str1^(1ULL<<occ[i])) | (1ULL<<vir[a]);
-                                addr = SCIstr2addr(str0, strs, nstrs);
-                                if (addr >= 0) {
-                                        if (vir[a] > occ[i]) {
-                                                ai = vir[a]*(vir[a]+1)/2+occ[i];
-                                        } else {
-                                                ai = occ[i]*(occ[i]+1)/2+vir[a];
-                                        }
-                                        tab[k*4+0] = ai;
-                                        tab[k*4+2] = addr;
-                                        tab[k*4+3] = FCIcre_des_sign(vir[a], occ[i], str1);
-                                        k++;
+        if (store_trilidx) {
+                for (k = 0; k < nocc; k++) {
+                        tab[k*4+0] = occ[k]*(occ[k]+1)/2+occ[k];
+                        tab[k*4+2] = str_id;
+                        tab[k*4+3] = 1;
+                }
+                for (a = 0; a < nvir; a++) {
+                for (i = 0; i < nocc; i++) {
+                        str0 = (str1^(1ULL<<occ[i])) | (1ULL<<vir[a]);
+                        addr = SCIstr2addr(str0, strs, nstrs);
+                        if (addr >= 0) {
+                                if (vir[a] > occ[i]) {
+                                        ai = vir[a]*(vir[a]+1)/2+occ[i];
+                                } else {
+                                        ai = occ[i]*(occ[i]+1)/2+vir[a];
                                 }
-                        } }
-
-                } else {
-                        for (k = 0; k < nocc; k++) {
-                                tab[k*4+0] = occ[k];
-                                tab[k*4+1] = occ[k];
-                                tab[k*4+2] = str_id;
-                                tab[k*4+3] = 1;
+                                tab[k*4+0] = ai;
+                                tab[k*4+2] = addr;
+                                tab[k*4+3] = FCIcre_des_sign(vir[a], occ[i], str1);
+                                k++;
                         }
-                        for (a = 0; a < nvir; a++) {
-                        for (i = 0; i < nocc; i++) {
-                                str0 = (str1^(1ULL<<occ[i])) | (1ULL<<vir[a]);
-                                addr = SCIstr2addr(str0, strs, nstrs);
-                                if (addr >= 0) {
-                                        tab[k*4+0] = vir[a];
-                                        tab[k*4+1] = occ[i];
-                                        tab[k*4+2] = addr;
-                                        tab[k*4+3] = FCIcre_des_sign(vir[a], occ[i], str1);
-                                        k++;
-                                }
-                        } }
+                } }
+
+        } else {
+                for (k = 0; k < nocc; k++) {
+                        tab[k*4+0] = occ[k];
+                        tab[k*4+1] = occ[k];
+                        tab[k*4+2] = str_id;
+                        tab[k*4+3] = 1;
                 }
+                for (a = 0; a < nvir; a++) {
+                for (i = 0; i < nocc; i++) {
+                        str0 = (str1^(1ULL<<occ[i])) | (1ULL<<vir[a]);
+                        addr = SCIstr2addr(str0, strs, nstrs);
+                        if (addr >= 0) {
+                                tab[k*4+0] = vir[a];
+                                tab[k*4+1] = occ[i];
+                                tab[k*4+2] = addr;
+                                tab[k*4+3] = FCIcre_des_sign(vir[a], occ[i], str1);
+                                k++;
+                        }
+                } }
+        }
+}
+
+void SCIcre_des_linkstr(int *link_index, int norb, int nstrs, int nocc,
+                        uint64_t *strs, int store_trilidx)
+{
+        int nlink = nocc * (norb - nocc) + nocc;
+        int str_id;
+        for (str_id = 0; str_id < nstrs; str_id++) {
+                cre_des_linkstr_row(link_index+str_id*nlink*4, norb, nocc,
+                                    nstrs, strs, str_id, store_trilidx);
+        }
+}
+
+/*
+ * Link table for the strings strs[rows[:nrows]].  link_index should be
+ * initialized with zeros.
+ */
+void SCIcre_des_linkstr_rows(int *link_index, int norb, int nstrs, int nocc,
+                             uint64_t *strs, int *rows, int nrows,
+                             int store_trilidx)
+{
+        int nlink = nocc * (norb - nocc) + nocc;
+        int k;
+#pragma omp parallel for schedule(static)
+        for (k = 0; k < nrows; k++) {
+                cre_des_linkstr_row(link_index+k*nlink*4, norb, nocc,
+                                    nstrs, strs, rows[k], store_trilidx);
         }
 }
 
@@ -316,6 +338,67 @@ int SCIselect_strs(uint64_t *inter, uint64_t *strs,
 }
 
 
+/*
+ * Heat-bath selection.  For the occupied pair (i>j), hb_ab[ij,:] are the
+ * pairs (a*norb+b) sorted by hb_val[ij,:] = |<ab||ij>| in descending order.
+ * The lists have nhb entries and are padded with zeros.  The loop over the
+ * sorted pairs terminates as soon as the product of the integral and the
+ * CI coefficient is below select_cutoff.
+ */
+int SCIselect_strs_hb(uint64_t *inter, uint64_t *strs,
+                      double *eri_pq_max, double *hb_val, int *hb_ab,
+                      double *civec_max, double select_cutoff,
+                      int norb, int nocc, int nstrs, int nhb)
+{
+        int occ[norb];
+        int vir[norb];
+        int nvir = norb - nocc;
+        int str_id, i, j, a, b, k, ij;
+        uint64_t str0, str1;
+        double ca;
+        double *pval;
+        int *pab;
+
+        int ninter = 0;
+        for (str_id = 0; str_id < nstrs; str_id++) {
+                str0 = strs[str_id];
+                make_occ_vir(occ, vir, str0, norb);
+                ca = civec_max[str_id];
+
+                for (i = 0; i < nocc; i++) {
+                for (a = 0; a < nvir; a++) {
+                        if (eri_pq_max[vir[a]*norb+occ[i]]*ca > select_cutoff) {
+                                inter[ninter] = (str0 ^ (1ULL<<occ[i])) | (1ULL<<vir[a]);
+                                ninter++;
+                        }
+                } }
+
+                for (i = 1; i < nocc; i++) {
+                for (j = 0; j < i; j++) {
+                        ij = occ[i]*(occ[i]-1)/2 + occ[j];
+                        pval = hb_val + (size_t)ij * nhb;
+                        pab = hb_ab + (size_t)ij * nhb;
+                        str1 = str0 ^ (1ULL<<occ[i]) ^ (1ULL<<occ[j]);
+                        for (k = 0; k < nhb; k++) {
+                                if (pval[k]*ca <= select_cutoff) {
+                                        break;
+                                }
+                                a = pab[k] / norb;
+                                b = pab[k] % norb;
+                                if ((str1 & (1ULL<<a)) || (str1 & (1ULL<<b)) ||
+                                    // skip the excitations which lead to str0
+                                    ((str0 & (1ULL<<a)) && (str0 & (1ULL<<b)))) {
+                                        continue;
+                                }
+                                inter[ninter] = str1 | (1ULL<<a) | (1ULL<<b);
+                                ninter++;
+                        }
+                } }
+        }
+        return ninter;
+}
+
+
 /*
  ***********************************************************
  *
@@ -21,6 +21,7 @@ Some hacky functions
 '''
 
 import os, sys
+import time
 import warnings
 import imp
 import tempfile
@@ -194,12 +195,6 @@ def arg_first_match(test, lst):
             return i
     raise ValueError('No element of the given list matches the test condition.')
 
-def _balanced_partition(cum, ntasks):
-    segsize = float(cum[-1]) / ntasks
-    bounds = numpy.arange(ntasks+1) * segsize
-    displs = abs(bounds[:,None] - cum).argmin(axis=1)
-    return displs
-
 def _blocksize_partition(cum, blocksize):
     n = len(cum) - 1
     displs = [0]
@@ -695,6 +690,10 @@ def izip(*args):
 
 from threading import Thread
 from multiprocessing import Queue, Process
+try:
+    import queue as _queue
+except ImportError:  # python 2
+    import Queue as _queue
 class ProcessWithReturnValue(Process):
     def __init__(self, group=None, target=None, name=None, args=(),
                  kwargs=None):
@@ -848,6 +847,98 @@ class call_in_background(object):
         if self.handler is not None:
             self.handler.join()
 
+class call_in_pipeline(object):
+    '''A chain of functions executed in background threads, one thread for
+    each function.  The stages are connected by bounded queues.  The return
+    value of a stage is passed to the next stage (a tuple is unpacked to the
+    arguments of the next function).  The caller is blocked only when the
+    queue of the first stage is full.
+
+    Attributes:
+        depth (int): Max number of pending calls in the queue of each stage.
+        sync (bool): Whether to run the functions in the caller thread.
+        busy_time (list): Wall time spent in each function.
+        blocked_time (float): Wall time the caller waited for the first
+            queue.
+
+    Examples:
+
+    >>> with call_in_pipeline(transform, save, depth=2) as pipe:
+    ...     for x in blocks:
+    ...         pipe(compute(x))  # == save(*transform(compute(x)))
+    >>> print(pipe.busy_time)
+    '''
+    def __init__(self, *fns, **kwargs):
+        self.fns = fns
+        self.depth = kwargs.get('depth', 2)
+        self.sync = kwargs.get('sync', not ASYNC_IO)
+        self.busy_time = [0.] * len(fns)
+        self.blocked_time = 0.
+        self._threads = []
+        self._queues = []
+        self._error = None
+
+    def _run_stage(self, k, args):
+        t0 = time.time()
+        out = self.fns[k](*args)
+        self.busy_time[k] += time.time() - t0
+        if not isinstance(out, tuple):
+            out = (out,)
+        return out
+
+    def _worker(self, k):
+        q_in = self._queues[k]
+        if k+1 < len(self.fns):
+            q_out = self._queues[k+1]
+        else:
+            q_out = None
+        while True:
+            args = q_in.get()
+            if args is None:
+                break
+            if self._error is not None:
+                continue  # Drain the queue
+            try:
+                out = self._run_stage(k, args)
+            except BaseException as e:
+                self._error = e
+                continue
+            if q_out is not None:
+                q_out.put(out)
+        if q_out is not None:
+            q_out.put(None)
+
+    def __call__(self, *args):
+        if self._error is not None:
+            raise ThreadRuntimeError('Error in pipeline: %s' % self._error)
+        if not self._threads:
+            for k in range(len(self.fns)):
+                args = self._run_stage(k, args)
+            return
+        t0 = time.time()
+        self._queues[0].put(args)
+        self.blocked_time += time.time() - t0
+
+    def __enter__(self):
+        if not (self.sync or imp.lock_held()):
+            self._queues = [_queue.Queue(self.depth) for fn in self.fns]
+            self._threads = [Thread(target=self._worker, args=(k,))
+                             for k in range(len(self.fns))]
+            for t in self._threads:
+                t.daemon = True
+                t.start()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if self._threads:
+            t0 = time.time()
+            self._queues[0].put(None)
+            for t in self._threads:
+                t.join()
+            self.blocked_time += time.time() - t0
+        if self._error is not None and type is None:
+            raise ThreadRuntimeError('Error in pipeline: %s' % self._error)
+
 
 class H5TmpFile(h5py.File):
     '''Create and return an HDF5 temporary file.
@@ -873,6 +964,17 @@ class H5TmpFile(h5py.File):
             tmpfile = tempfile.NamedTemporaryFile(dir=param.TMPDIR)
             filename = tmpfile.name
         h5py.File.__init__(self, filename, *args, **kwargs)
+        # Files which are removed when the temporary file is closed, e.g. the
+        # shard files of the datasets (see pyscf.ao2mo.shard)
+        self.attached_files = []
+
+    def close(self):
+        h5py.File.close(self)
+        for filename in getattr(self, 'attached_files', []):
+            if os.path.isfile(filename):
+                os.remove(filename)
+        self.attached_files = []
+
 #FIXME: Does GC flush/close the HDF5 file when releasing the resource?
 # To make HDF5 file reusable, file has to be closed or flushed
     def __del__(self):
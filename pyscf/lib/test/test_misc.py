@@ -30,6 +30,27 @@ class KnownValues(unittest.TestCase):
 
         self.assertRaises(lib.ThreadRuntimeError, bg_raise)
 
+    def test_call_in_pipeline(self):
+        out = []
+        def double(i, x):
+            return i, x * 2
+        def save(i, x):
+            out.append((i, x))
+        with lib.call_in_pipeline(double, save, depth=1) as pipe:
+            for i in range(5):
+                pipe(i, numpy.arange(3))
+        self.assertEqual([x[0] for x in out], list(range(5)))
+        self.assertTrue(all(abs(x[1] - numpy.arange(3)*2).max() == 0 for x in out))
+        self.assertEqual(len(pipe.busy_time), 2)
+
+        def raise1(i):
+            raise ValueError
+        def pipe_raise():
+            with lib.call_in_pipeline(raise1, save) as pipe:
+                for i in range(5):
+                    pipe(i)
+        self.assertRaises(lib.ThreadRuntimeError, pipe_raise)
+
     def test_index_tril_to_pair(self):
         i_j = (numpy.random.random((2,30)) * 100).astype(int)
         i0 = numpy.max(i_j, axis=0)
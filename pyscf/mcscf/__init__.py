@@ -303,6 +303,7 @@ def DFCASCI(mf_or_mol, ncas, nelecas, auxbasis=None, ncore=None):
     return df.density_fit(mc, auxbasis)
 
 approx_hessian = df.approx_hessian
+integral_policy = df.integral_policy
 
 def density_fit(mc, auxbasis=None, with_df=None):
     return mc.density_fit(auxbasis, with_df)
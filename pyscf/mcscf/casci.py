@@ -543,12 +543,47 @@ def as_scanner(mc):
                 mf_scanner(mol)
                 mo_coeff = mf_scanner.mo_coeff
             if ci0 is None:
-                ci0 = self.ci
+                # Transform the CI vector of the previous orbitals to the new
+                # orbitals (the signs and order of the SCF orbitals may change)
+                ci0 = _transform_ci_guess(self, self.ci, self.mo_coeff,
+                                          mo_coeff, self._scf.get_ovlp(mol))
             self.mol = mol
             e_tot = self.kernel(mo_coeff, ci0)[0]
             return e_tot
     return CASCI_Scanner(mc)
 
+def _transform_ci_guess(mc, ci, mo_old, mo_new, s):
+    '''Transform the CI vector of the active orbitals of mo_old to the
+    representation of the active orbitals of mo_new.  s is the AO overlap
+    matrix for mo_new.  The CI vector is returned unchanged if the CI solver
+    does not support the transformation.
+    '''
+    transform = getattr(mc.fcisolver, 'transform_ci_for_orbital_rotation', None)
+    if (ci is None or mo_old is None or transform is None or
+        not isinstance(mc.ncore, (int, numpy.integer)) or
+        numpy.shape(mo_old) != numpy.shape(mo_new)):
+        return ci
+
+    ncore = mc.ncore
+    ncas = mc.ncas
+    nocc = ncore + ncas
+    neleca, nelecb = mc.nelecas
+    shape = (fci.cistring.num_strings(ncas, neleca),
+             fci.cistring.num_strings(ncas, nelecb))
+    u = reduce(numpy.dot, (mo_old[:,ncore:nocc].T, s, mo_new[:,ncore:nocc]))
+
+    def trans(x):
+        # Other CI vectors (e.g. selected CI) are not transformed
+        if isinstance(x, numpy.ndarray) and x.shape == shape:
+            return transform(x, ncas, (neleca,nelecb), u)
+        return x
+
+    if isinstance(ci, numpy.ndarray):
+        return trans(ci)
+    elif isinstance(ci, (tuple, list)):
+        return [trans(x) for x in ci]
+    return ci
+
 
 class CASCI(lib.StreamObject):
     '''CASCI
@@ -23,6 +23,7 @@ from pyscf.lib import logger
 from pyscf import scf
 from pyscf import symm
 from pyscf import fci
+from pyscf import ao2mo
 from pyscf.mcscf import casci
 from pyscf.mcscf import addons
 from pyscf import __config__
@@ -59,6 +60,31 @@ class SymAdaptedCASCI(casci.CASCI):
         mo_coeff = self.mo_coeff = label_symmetry_(self, mo_coeff, ci0)
         return casci.CASCI.kernel(self, mo_coeff, ci0, verbose)
 
+    def ao2mo(self, mo_coeff=None):
+        '''Active space integrals from the irrep-blocked ao2mo transformation
+        when the irreps of the active orbitals are known.
+        '''
+        ncore = self.ncore
+        ncas = self.ncas
+        nocc = ncore + ncas
+        orbsym = getattr(self.fcisolver, 'orbsym', None)
+        if orbsym is None or len(orbsym) != ncas:
+            return casci.CASCI.ao2mo(self, mo_coeff)
+
+        if mo_coeff is None:
+            mo_coeff = self.mo_coeff[:,ncore:nocc]
+        elif mo_coeff.shape[1] != ncas:
+            mo_coeff = mo_coeff[:,ncore:nocc]
+
+        if self._scf._eri is not None:
+            eri = ao2mo.irrep.full(self._scf._eri, mo_coeff, orbsym,
+                                   max_memory=self.max_memory)
+        else:
+            eri = ao2mo.irrep.full(self.mol, mo_coeff, orbsym,
+                                   max_memory=self.max_memory,
+                                   verbose=self.verbose)
+        return eri.restore(4)
+
     def _eig(self, mat, b0, b1, orbsym=None):
         # self.mo_coeff.orbsym is initialized in kernel function
         if orbsym is None:
@@ -25,7 +25,12 @@ from pyscf import lib
 from pyscf.lib import logger
 from pyscf.ao2mo import _ao2mo
 from pyscf import df
+from pyscf.mcscf import mc_ao2mo
+from pyscf import __config__
 
+# Max rotation between active and inactive orbitals for which the exact active
+# integrals are updated incrementally.  See integral_policy
+INCREMENTAL_TOL = getattr(__config__, 'mcscf_df_integral_policy_incremental_tol', 1e-3)
 
 def density_fit(casscf, auxbasis=None, with_df=None):
     '''Generate DF-CASSCF for given CASSCF object.  It is done by overwriting
@@ -239,6 +244,333 @@ def approx_hessian(casscf, auxbasis=None, with_df=None):
     return CASSCF()
 
 
+def integral_policy(casscf, core='exact', active='exact', hessian='df',
+                    auxbasis=None, with_df=None):
+    '''Select the integral approximation for each class of the CASSCF
+    integrals independently.
+
+    Args:
+        casscf : an CASSCF or CASCI object
+
+    Kwargs:
+        core : 'exact', 'df' or a DF object
+            The core J/K (the core potential vhf_c and get_veff).
+        active : 'exact', 'df' or a DF object
+            The active integrals ppaa and papa (get_h2eff for CASCI).
+        hessian : 'exact', 'df' or a DF object
+            The integrals only used by the orbital hessian: j_pc, k_pc of
+            the diagonal hessian and the JK contractions of the augmented
+            hessian (get_jk).
+        auxbasis : str or basis dict
+            The auxiliary basis of the DF object for the 'df' classes.
+        with_df : DF object
+            The DF object for the 'df' classes.
+
+    Any object with the DF interface (loop, get_naoaux, get_jk) can be
+    given for a class, e.g. a DF object which holds the Cholesky vectors of
+    the ERIs in its _cderi.
+
+    When the active integrals are exact and the hessian-only integrals are
+    approximated, the exact active integrals are updated incrementally if
+    the rotation between the active and inactive orbitals is smaller than
+    the attribute incremental_tol.  The old exact integrals are transformed
+    to the rotated orbitals and the contributions of the rotated components
+    are corrected with the approximate integrals of the hessian class.  The
+    error is of the order of the approximation error times the rotation.
+
+    Returns:
+        A CASSCF/CASCI object with the selected integrals
+
+    Examples:
+
+    >>> mol = gto.M(atom='H 0 0 0; F 0 0 1', basis='ccpvdz', verbose=0)
+    >>> mf = scf.RHF(mol).run()
+    >>> mc = mcscf.df.integral_policy(mcscf.CASSCF(mf, 4, 4), core='df')
+    '''
+    casscf_class = casscf.__class__
+
+    if with_df is None:
+        if (getattr(casscf._scf, 'with_df', None) and
+            (auxbasis is None or auxbasis == casscf._scf.with_df.auxbasis)):
+            with_df = casscf._scf.with_df
+        else:
+            with_df = df.DF(casscf.mol)
+            with_df.max_memory = casscf.max_memory
+            with_df.stdout = casscf.stdout
+            with_df.verbose = casscf.verbose
+            if auxbasis is not None:
+                with_df.auxbasis = auxbasis
+
+    def get_df(policy):
+        if isinstance(policy, str):
+            if policy.lower() == 'exact':
+                return None
+            elif policy.lower() == 'df':
+                return with_df
+            raise ValueError('Unknown integral policy %s' % policy)
+        return policy
+
+    class CASSCF(casscf_class):
+        def __init__(self):
+            self.__dict__.update(casscf.__dict__)
+            self.core_df = get_df(core)
+            self.active_df = get_df(active)
+            self.hessian_df = get_df(hessian)
+            self.incremental_tol = INCREMENTAL_TOL
+            self._eris_ref = None
+            self._keys = self._keys.union(['core_df', 'active_df',
+                                           'hessian_df', 'incremental_tol'])
+
+        def dump_flags(self, verbose=None):
+            casscf_class.dump_flags(self, verbose)
+            log = logger.new_logger(self, verbose)
+            tags = lambda x: 'exact' if x is None else x.__class__.__name__
+            log.info('Integrals: core J/K %s, active %s, hessian %s',
+                     tags(self.core_df), tags(self.active_df),
+                     tags(self.hessian_df))
+            if self.active_df is None and self.hessian_df is not None:
+                log.info('incremental_tol = %g', self.incremental_tol)
+            return self
+
+        def reset(self, mol=None):
+            '''Drop the reference integrals of the incremental update'''
+            if mol is not None:
+                self.mol = mol
+            self._eris_ref = None
+            return self
+
+        def ao2mo(self, mo_coeff=None):
+            if 'CASSCF' in casscf_class.__name__:
+                return _HybridERIS(self, mo_coeff)
+            else:
+                return casscf_class.ao2mo(self, mo_coeff)
+
+        def get_h2eff(self, mo_coeff=None):  # For CASCI
+            if self.active_df:
+                ncore = self.ncore
+                nocc = ncore + self.ncas
+                if mo_coeff is None:
+                    mo_coeff = self.mo_coeff[:,ncore:nocc]
+                elif mo_coeff.shape[1] != self.ncas:
+                    mo_coeff = mo_coeff[:,ncore:nocc]
+                return self.active_df.ao2mo(mo_coeff)
+            else:
+                return casscf_class.get_h2eff(self, mo_coeff)
+
+        def get_veff(self, mol=None, dm=None, hermi=1):
+            if self.core_df:
+                if dm is None:
+                    mocore = self.mo_coeff[:,:self.ncore]
+                    dm = numpy.dot(mocore, mocore.T) * 2
+                vj, vk = self.core_df.get_jk(dm, hermi=hermi)
+                return vj - vk * .5
+            else:
+                return casscf_class.get_veff(self, mol, dm, hermi)
+
+        def get_jk(self, mol, dm, hermi=1):
+            if self.hessian_df:
+                return self.hessian_df.get_jk(dm, hermi=hermi)
+            else:
+                return casscf_class.get_jk(self, mol, dm, hermi)
+
+        def _exact_paaa(self, mo, u, out=None):
+            if self.active_df:
+                nmo = mo.shape[1]
+                ncore = self.ncore
+                ncas = self.ncas
+                nocc = ncore + ncas
+                mo1 = numpy.dot(mo, u)
+                mo1_cas = mo1[:,ncore:nocc]
+                paaa = self.active_df.ao2mo([mo1, mo1_cas, mo1_cas, mo1_cas],
+                                            compact=False)
+                return paaa.reshape(nmo,ncas,ncas,ncas)
+            else:
+                return casscf_class._exact_paaa(self, mo, u, out)
+
+    return CASSCF()
+
+class _HybridERIS(object):
+    '''CASSCF integrals with the integral policy of each class'''
+    def __init__(self, casscf, mo):
+        log = logger.new_logger(casscf)
+        t0 = (time.clock(), time.time())
+        mol = casscf.mol
+        nmo = mo.shape[1]
+        ncore = casscf.ncore
+        ncas = casscf.ncas
+        nocc = ncore + ncas
+        active_df = casscf.active_df
+        hessian_df = casscf.hessian_df
+
+        dm_core = numpy.dot(mo[:,:ncore], mo[:,:ncore].T)
+        if casscf.core_df:
+            vj, vk = casscf.core_df.get_jk(dm_core)
+        else:
+            vj, vk = casscf._scf.get_jk(mol, dm_core)
+        self.vhf_c = reduce(numpy.dot, (mo.T, vj*2-vk, mo))
+        t0 = log.timer('core J/K', *t0)
+
+        self.j_pc = self.k_pc = None
+        incremental = (active_df is None and hessian_df is not None and
+                       casscf.incremental_tol > 0)
+        u = None
+        if (incremental and casscf._eris_ref is not None and
+            not _same_mol(casscf._eris_ref[3], mol)):
+            log.debug('Geometry or basis changed.  Drop the reference active '
+                      'integrals')
+            casscf._eris_ref = None
+        if incremental and casscf._eris_ref is not None:
+            mo_ref = casscf._eris_ref[0]
+            s = casscf._scf.get_ovlp()
+            u = reduce(numpy.dot, (mo_ref.T, s, mo))
+            rot = numpy.vstack((u[:ncore,ncore:nocc], u[nocc:,ncore:nocc]))
+            rot = abs(rot).max() if rot.size > 0 else 0
+            if rot > casscf.incremental_tol:
+                log.debug('Rotation to active space %g.  '
+                          'Update active integrals exactly', rot)
+                u = None
+            else:
+                log.debug('Rotation to active space %g.  '
+                          'Update active integrals incrementally', rot)
+
+        if active_df is not None:
+            self.ppaa, self.papa, j_pc, k_pc = \
+                    _df_active(active_df, mo, ncore, ncas,
+                               with_jk=hessian_df is active_df,
+                               max_memory=casscf.max_memory)
+            if hessian_df is active_df:
+                self.j_pc, self.k_pc = j_pc, k_pc
+        elif u is not None:
+            mo_ref, ppaa, papa = casscf._eris_ref[:3]
+            self.ppaa, self.papa, self.j_pc, self.k_pc = \
+                    _incremental_active(hessian_df, mo, u, ppaa, papa, ncore,
+                                        ncas, casscf.max_memory)
+        else:
+            level = 1 if hessian_df is None else 2
+            eris = mc_ao2mo._ERIS(casscf, mo, level=level, with_vhf=False)
+            self.ppaa, self.papa = eris.ppaa, eris.papa
+            if hessian_df is None:
+                self.j_pc, self.k_pc = eris.j_pc, eris.k_pc
+            if getattr(eris, 'feri', None) is not None:
+                self.feri = eris.feri
+            if incremental:
+                mem_now = lib.current_memory()[0]
+                if (mem_now + nmo**2*ncas**2*2*8/1e6 < casscf.max_memory*.9):
+                    casscf._eris_ref = (mo, numpy.asarray(self.ppaa),
+                                        numpy.asarray(self.papa),
+                                        _mol_key(mol))
+                else:
+                    casscf._eris_ref = None
+        t0 = log.timer('active integrals', *t0)
+
+        if self.j_pc is None:
+            if hessian_df is None:
+                # Only reachable with active_df
+                eris = mc_ao2mo._ERIS(casscf, mo, level=1, with_vhf=False)
+                self.j_pc, self.k_pc = eris.j_pc, eris.k_pc
+            else:
+                self.j_pc, self.k_pc = _df_active(hessian_df, mo, ncore, ncas,
+                                                  with_ppaa=False,
+                                                  max_memory=casscf.max_memory)[2:]
+            log.timer('hessian integrals', *t0)
+
+def _df_active(with_df, mo, ncore, ncas, with_ppaa=True, with_jk=True,
+               mo_a=None, max_memory=2000):
+    '''ppaa, papa, j_pc, k_pc from the 3-index tensors.
+
+    If mo_a (the coefficients of a second set of active orbitals in the MO
+    basis) is given, the returned ppaa and papa are the differences
+    (pq|ab) - (pq|a'b') and (pa|qb) - (pa'|qb').
+    '''
+    mo = numpy.asarray(mo, order='F')
+    nmo = mo.shape[1]
+    nocc = ncore + ncas
+    naux = with_df.get_naoaux()
+    j_pc = numpy.zeros((nmo,ncore))
+    k_cp = numpy.zeros((ncore,nmo))
+    if with_ppaa:
+        ppaa = numpy.zeros((nmo*nmo,ncas*ncas))
+        Lpa = numpy.empty((naux,nmo,ncas))
+        if mo_a is not None:
+            LpA = numpy.empty((naux,nmo,ncas))
+    else:
+        ppaa = papa = None
+
+    mem_now = lib.current_memory()[0]
+    blksize = int((max_memory - mem_now)*.5e6/8/(nmo**2*2))
+    blksize = max(1, min(naux, with_df.blockdim, blksize))
+    buf = numpy.empty((blksize,nmo,nmo))
+    p1 = 0
+    # The order of the aux blocks is not significant as long as Lpa and LpA
+    # are stored in the same order
+    for eri1 in with_df.loop(blksize):
+        p0, p1 = p1, p1 + eri1.shape[0]
+        Lpq = _ao2mo.nr_e2(eri1, mo, (0,nmo,0,nmo), aosym='s2', mosym='s1',
+                           out=buf[:p1-p0]).reshape(p1-p0,nmo,nmo)
+        if with_jk:
+            bufd = numpy.einsum('kii->ki', Lpq)
+            j_pc += numpy.einsum('ki,kj->ij', bufd, bufd[:,:ncore])
+            k_cp += numpy.einsum('kij,kij->ij', Lpq[:,:ncore], Lpq[:,:ncore])
+        if with_ppaa:
+            Lpa[p0:p1] = Lpq[:,:,ncore:nocc]
+            Laa = numpy.array(Lpq[:,ncore:nocc,ncore:nocc])
+            if mo_a is not None:
+                LpA[p0:p1] = lib.dot(Lpq.reshape(-1,nmo), mo_a).reshape(p1-p0,nmo,ncas)
+                Laa -= lib.einsum('kpa,pb->kab', LpA[p0:p1], mo_a)
+            lib.dot(Lpq.reshape(p1-p0,-1).T, Laa.reshape(p1-p0,-1), 1, ppaa, 1)
+        Lpq = Laa = None
+    buf = None
+
+    if with_ppaa:
+        ppaa = ppaa.reshape(nmo,nmo,ncas,ncas)
+        Lpa = Lpa.reshape(naux,-1)
+        papa = lib.dot(Lpa.T, Lpa)
+        if mo_a is not None:
+            LpA = LpA.reshape(naux,-1)
+            papa = lib.dot(LpA.T, LpA, -1, papa, 1)
+        papa = papa.reshape(nmo,ncas,nmo,ncas)
+    return ppaa, papa, j_pc, k_cp.T.copy()
+
+def _mol_key(mol):
+    '''Geometry and basis (in mol._env and mol._bas) which the reference
+    integrals are computed for'''
+    return numpy.array(mol._atm), numpy.array(mol._bas), numpy.array(mol._env)
+
+def _same_mol(key, mol):
+    return all(numpy.array_equal(x, y) for x, y in
+               zip(key, (mol._atm, mol._bas, mol._env)))
+
+def _incremental_active(with_df, mo, u, ppaa, papa, ncore, ncas, max_memory):
+    '''Active integrals of the orbitals mo = mo_ref * u from the exact
+    integrals (ppaa, papa) of the reference orbitals mo_ref.
+
+    The new active orbitals a are split to the components in the reference
+    active space A and the rotated components D.  The integrals of A are
+    transformed from the reference integrals.  The contributions of D are
+    computed with the approximate integrals
+
+        (pq|ab) = (pq|AA)_exact + (pq|ab)_DF - (pq|AA)_DF
+    '''
+    nocc = ncore + ncas
+    ua = u[ncore:nocc,ncore:nocc]
+    # A in the basis of the new MOs
+    mo_a = numpy.dot(u[ncore:nocc].T, ua)
+
+    ppaa = lib.einsum('pqab,pi->iqab', ppaa, u)
+    ppaa = lib.einsum('iqab,qj->ijab', ppaa, u)
+    ppaa = lib.einsum('ijab,ak->ijkb', ppaa, ua)
+    ppaa = lib.einsum('ijkb,bl->ijkl', ppaa, ua)
+    papa = lib.einsum('paqb,pi->iaqb', papa, u)
+    papa = lib.einsum('iaqb,qj->iajb', papa, u)
+    papa = lib.einsum('iajb,ak->ikjb', papa, ua)
+    papa = lib.einsum('ikjb,bl->ikjl', papa, ua)
+
+    dppaa, dpapa, j_pc, k_pc = _df_active(with_df, mo, ncore, ncas,
+                                          mo_a=mo_a, max_memory=max_memory)
+    ppaa += dppaa
+    papa += dpapa
+    return ppaa, papa, j_pc, k_pc
+
 class _ERIS(object):
     def __init__(self, casscf, mo, with_df):
         import gc
@@ -474,6 +474,194 @@ def kernel(casscf, mo_coeff, tol=1e-7, conv_tol_grad=None,
     return conv, e_tot, e_cas, fcivec, mo, mo_energy
 
 
+def kernel_async(casscf, mo_coeff, tol=1e-7, conv_tol_grad=None,
+                 ci0=None, callback=None, verbose=logger.NOTE, dump_chk=True):
+    """1-step CASSCF driver which overlaps the CI solver with the orbital
+    optimization.
+
+    After the orbitals are updated, the CI solver is executed in background
+    (see lib.call_in_background).  In the meantime, the orbital rotation of
+    the next macro iteration is solved with the density matrices of the
+    previous CI vector (the CI response in micro iterations is not updated).
+    When the CI solver finishes, the orbital gradients are evaluated with the
+    new density matrices.  The speculative orbital step is accepted if these
+    gradients agree with the gradients used by the orbital step.  Otherwise
+    the orbital step is redone with the new density matrices as in the
+    regular 1-step driver.
+
+    This driver is efficient for expensive CI solvers (e.g. DMRG, SHCI)
+    which release the Python interpreter lock during the CI solution.
+    """
+    log = logger.new_logger(casscf, verbose)
+    cput0 = (time.clock(), time.time())
+    log.debug('Start 1-step CASSCF (asynchronous CI solver)')
+    if callback is None:
+        callback = casscf.callback
+
+    mo = mo_coeff
+    nmo = mo_coeff.shape[1]
+    ncore = casscf.ncore
+    ncas = casscf.ncas
+    nocc = ncore + ncas
+    eris = casscf.ao2mo(mo)
+    e_tot, e_cas, fcivec = casscf.casci(mo, ci0, eris, log, locals())
+    if ncas == nmo and not casscf.internal_rotation:
+        if casscf.canonicalization:
+            log.debug('CASSCF canonicalization')
+            mo, fcivec, mo_energy = casscf.canonicalize(mo, fcivec, eris,
+                                                        casscf.sorting_mo_energy,
+                                                        casscf.natorb, verbose=log)
+        else:
+            mo_energy = None
+        return True, e_tot, e_cas, fcivec, mo, mo_energy
+
+    if conv_tol_grad is None:
+        conv_tol_grad = numpy.sqrt(tol)
+        logger.info(casscf, 'Set conv_tol_grad to %g', conv_tol_grad)
+    conv_tol_ddm = conv_tol_grad * 3
+    conv = False
+    totmicro = totinner = 0
+    norm_gorb = norm_gci = -1
+    de, elast = e_tot, e_tot
+    r0 = None
+
+    t1m = log.timer('Initializing 1-step CASSCF', *cput0)
+    casdm1, casdm2 = casscf.fcisolver.make_rdm12(fcivec, ncas, casscf.nelecas)
+    norm_ddm = 1e2
+    casdm1_prev = casdm1_last = casdm1
+    t3m = t2m = log.timer('CAS DM', *t1m)
+
+    ci_results = []
+    def solve_ci(mo, ci0, eris):
+        e_tot, e_cas, fcivec = casscf.casci(mo, ci0, eris, log)
+        casdm1, casdm2 = casscf.fcisolver.make_rdm12(fcivec, ncas, casscf.nelecas)
+        ci_results.append((e_tot, e_cas, fcivec, casdm1, casdm2))
+
+    def orbital_step(casdm1, casdm2, fcivec, with_ci_response):
+        imicro = 0
+        njk = 0
+        g_orb0 = None
+        rota = casscf.rotate_orb_cc(mo, lambda:fcivec, lambda:casdm1,
+                                    lambda:casdm2, eris, r0, conv_tol_grad*.3,
+                                    max_stepsize, log)
+        for u, g_orb, njk, r1 in rota:
+            imicro += 1
+            norm_gorb = numpy.linalg.norm(g_orb)
+            if imicro == 1:
+                g_orb0 = g_orb.copy()
+            norm_t = numpy.linalg.norm(u-numpy.eye(nmo))
+            if imicro >= max_cycle_micro:
+                log.debug('micro %d  |u-1|=%5.3g  |g[o]|=%5.3g',
+                          imicro, norm_t, norm_gorb)
+                break
+
+            if with_ci_response:
+                casdm1, casdm2, gci, fcivec = \
+                        casscf.update_casdm(mo, u, fcivec, e_cas, eris,
+                                            {'norm_gorb': norm_gorb})
+                norm_ddm_micro = numpy.linalg.norm(casdm1 - casdm1_prev)
+                log.debug('micro %d  |u-1|=%5.3g  |g[o]|=%5.3g  |ddm|=%5.3g',
+                          imicro, norm_t, norm_gorb, norm_ddm_micro)
+            else:
+                norm_ddm_micro = 0
+                log.debug('micro %d  |u-1|=%5.3g  |g[o]|=%5.3g',
+                          imicro, norm_t, norm_gorb)
+
+            if (norm_t < conv_tol_grad or
+                (norm_gorb < conv_tol_grad*.5 and
+                 norm_ddm_micro < conv_tol_ddm*.4)):
+                break
+        rota.close()
+        return u.copy(), g_orb0, imicro, njk, r1, casdm1, casdm2, fcivec
+
+    imacro = 0
+    step = None
+    with lib.call_in_background(solve_ci) as async_solve_ci:
+        while not conv and imacro < casscf.max_cycle_macro:
+            imacro += 1
+            envs = locals()
+            max_cycle_micro = casscf.micro_cycle_scheduler(envs)
+            max_stepsize = casscf.max_stepsize_scheduler(envs)
+            if step is None:
+                # Orbital step with the CI response, as in the regular driver
+                step = orbital_step(casdm1, casdm2, fcivec, True)
+                t3m = log.timer('orbital rotation', *t3m)
+            u, g_orb0, imicro, njk, r0, casdm1, casdm2, fcivec = step
+            norm_gorb0 = numpy.linalg.norm(g_orb0)
+            totmicro += imicro
+            totinner += njk
+
+            eris = None
+            mo = casscf.rotate_mo(mo, u, log)
+            eris = casscf.ao2mo(mo)
+            t2m = log.timer('update eri', *t3m)
+
+            ci_job = async_solve_ci(mo, fcivec, eris)
+            # The orbital step of the next iteration with the density matrices
+            # of the previous CI vector.  The orbitals are not updated.
+            step = orbital_step(casdm1, casdm2, fcivec, False)
+            t3m = log.timer('speculative orbital rotation', *t2m)
+            if ci_job is not None:  # in the synchronized mode, ci_job is None
+                ci_job.join()
+            e_tot, e_cas, fcivec, casdm1, casdm2 = ci_results.pop()
+            t3m = log.timer('CASCI solver', *t2m)
+
+            norm_ddm = numpy.linalg.norm(casdm1 - casdm1_last)
+            casdm1_prev = casdm1_last = casdm1
+            # Orbital gradients at the new orbitals with the new CI vector
+            g_orb = casscf.gen_g_hop(mo, 1, casdm1, casdm2, eris)[0]
+            norm_gorb = numpy.linalg.norm(g_orb)
+            norm_dg = numpy.linalg.norm(g_orb - step[1])
+            de, elast = e_tot - elast, e_tot
+            log.info('macro iter %d (%d JK  %d micro), '
+                     'CASSCF E = %.15g  dE = %.8g',
+                     imacro, njk, imicro, e_tot, de)
+            log.info('               |grad[o]|=%5.3g  |ddm|=%5.3g  '
+                     '|grad[o] error of speculative step|=%5.3g',
+                     norm_gorb, norm_ddm, norm_dg)
+
+            if abs(de) < tol and norm_gorb < conv_tol_grad and norm_ddm < conv_tol_ddm:
+                conv = True
+            elif norm_dg > norm_gorb * .5 or de > tol:
+                log.debug('Speculative orbital step is rejected')
+                step = None
+            else:
+                # Keep the new CI vector and density matrices for the next
+                # CI solver and orbital step
+                step = step[:5] + (casdm1, casdm2, fcivec)
+            t1m = log.timer('macro iter %d'%imacro, *t1m)
+
+            if dump_chk:
+                casscf.dump_chk(locals())
+
+            if callable(callback):
+                callback(locals())
+
+    if conv:
+        log.info('1-step CASSCF converged in %d macro (%d JK %d micro) steps',
+                 imacro, totinner, totmicro)
+    else:
+        log.info('1-step CASSCF not converged, %d macro (%d JK %d micro) steps',
+                 imacro, totinner, totmicro)
+
+    if casscf.canonicalization:
+        log.info('CASSCF canonicalization')
+        mo, fcivec, mo_energy = \
+                casscf.canonicalize(mo, fcivec, eris, casscf.sorting_mo_energy,
+                                    casscf.natorb, casdm1, log)
+        if casscf.natorb and dump_chk: # dump_chk may save casdm1
+            occ, ucas = casscf._eig(-casdm1, ncore, nocc)
+            casdm1 = numpy.diag(-occ)
+    else:
+        mo_energy = None
+
+    if dump_chk:
+        casscf.dump_chk(locals())
+
+    log.timer('1-step CASSCF', *cput0)
+    return conv, e_tot, e_cas, fcivec, mo, mo_energy
+
+
 def as_scanner(mc):
     '''Generating a scanner for CASSCF PES.
 
@@ -518,8 +706,10 @@ def as_scanner(mc):
                 mo = mf_scanner.mo_coeff
             else:
                 mo = self.mo_coeff
-            mo = project_init_guess(self, mo)
-            e_tot = self.kernel(mo, self.ci)[0]
+            mo1 = project_init_guess(self, mo)
+            ci0 = casci._transform_ci_guess(self, self.ci, mo, mo1,
+                                            mf_scanner.get_ovlp(mol))
+            e_tot = self.kernel(mo1, ci0)[0]
             return e_tot
     return CASSCF_Scanner(mc)
 
@@ -587,6 +777,10 @@ class CASSCF(casci.CASCI):
             Default is the checkpoint file of mean field object.
         ci_response_space : int
             subspace size to solve the CI vector response.  Default is 3.
+        async_ci : bool
+            Whether to execute the CI solver in background and overlap it
+            with the orbital optimization (see :func:`kernel_async`).
+            Default is False.
         callback : function(envs_dict) => None
             callback function takes one dict as the argument which is
             generated by the builtin function :func:`locals`, so that the
@@ -671,6 +865,7 @@ class CASSCF(casci.CASCI):
     natorb = getattr(__config__, 'mcscf_mc1step_CASSCF_natorb', False)
     canonicalization = getattr(__config__, 'mcscf_mc1step_CASSCF_canonicalization', True)
     sorting_mo_energy = getattr(__config__, 'mcscf_mc1step_CASSCF_sorting_mo_energy', False)
+    async_ci = getattr(__config__, 'mcscf_mc1step_CASSCF_async_ci', False)
 
     def __init__(self, mf_or_mol, ncas, nelecas, ncore=None, frozen=None):
         casci.CASCI.__init__(self, mf_or_mol, ncas, nelecas, ncore)
@@ -702,7 +897,7 @@ class CASSCF(casci.CASCI):
                     'ci_grad_trust_region', 'with_dep4', 'chk_ci',
                     'kf_interval', 'kf_trust_region', 'fcisolver_max_cycle',
                     'fcisolver_conv_tol', 'natorb', 'canonicalization',
-                    'sorting_mo_energy'))
+                    'sorting_mo_energy', 'async_ci'))
         self._keys = set(self.__dict__.keys()).union(keys)
 
     def dump_flags(self, verbose=None):
@@ -742,6 +937,7 @@ class CASSCF(casci.CASCI):
         log.info('max_memory %d MB (current use %d MB)',
                  self.max_memory, lib.current_memory()[0])
         log.info('internal_rotation = %s', self.internal_rotation)
+        log.info('async_ci = %s', self.async_ci)
         if getattr(self.fcisolver, 'dump_flags', None):
             self.fcisolver.dump_flags(self.verbose)
         if self.mo_coeff is None:
@@ -760,7 +956,7 @@ To enable the solvent model for CASSCF, a decoration to CASSCF object as below n
                      self._scf.with_solvent.__class__)
         return self
 
-    def kernel(self, mo_coeff=None, ci0=None, callback=None, _kern=kernel):
+    def kernel(self, mo_coeff=None, ci0=None, callback=None, _kern=None):
         '''
         Returns:
             Five elements, they are
@@ -778,6 +974,8 @@ To enable the solvent model for CASSCF, a decoration to CASSCF object as below n
         else: # overwrite self.mo_coeff because it is needed in many methods of this class
             self.mo_coeff = mo_coeff
         if callback is None: callback = self.callback
+        if _kern is None:
+            _kern = kernel_async if self.async_ci else kernel
 
         if self.verbose >= logger.WARN:
             self.check_sanity()
@@ -58,7 +58,8 @@ class SymAdaptedCASSCF(mc1step.CASSCF):
         if mo_coeff is None:
             mo_coeff = self.mo_coeff
         if callback is None: callback = self.callback
-        if _kern is None: _kern = mc1step.kernel
+        if _kern is None:
+            _kern = mc1step.kernel_async if self.async_ci else mc1step.kernel
 
         if self.verbose >= logger.WARN:
             self.check_sanity()
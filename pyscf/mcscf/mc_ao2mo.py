@@ -260,15 +260,16 @@ def trans_e1_outcore(mol, mo, ncore, ncas, erifile,
 # level = 1: ppaa, papa and vhf, jpc, kpc
 # level = 2: ppaa, papa, vhf,  jpc=0, kpc=0
 class _ERIS(object):
-    def __init__(self, casscf, mo, method='incore', level=1):
+    def __init__(self, casscf, mo, method='incore', level=1, with_vhf=True):
         mol = casscf.mol
         nao, nmo = mo.shape
         ncore = casscf.ncore
         ncas = casscf.ncas
 
-        dm_core = numpy.dot(mo[:,:ncore], mo[:,:ncore].T)
-        vj, vk = casscf._scf.get_jk(mol, dm_core)
-        self.vhf_c = reduce(numpy.dot, (mo.T, vj*2-vk, mo))
+        if with_vhf:
+            dm_core = numpy.dot(mo[:,:ncore], mo[:,:ncore].T)
+            vj, vk = casscf._scf.get_jk(mol, dm_core)
+            self.vhf_c = reduce(numpy.dot, (mo.T, vj*2-vk, mo))
 
         mem_incore, mem_outcore, mem_basic = _mem_usage(ncore, ncas, nmo)
         mem_now = lib.current_memory()[0]
@@ -186,6 +186,20 @@ class KnownValues(unittest.TestCase):
         mc1.kernel(mo)
         self.assertAlmostEqual(mc1.e_tot, -105.82923271851176, 8)
 
+    def test_async_ci(self):
+        mc1 = mcscf.CASSCF(m, 4, 4)
+        mc1.chkfile = None
+        mc1.async_ci = True
+        mc1.kernel()
+        self.assertTrue(mc1.converged)
+        self.assertAlmostEqual(mc1.e_tot, mc0.e_tot, 8)
+
+        mc1 = mcscf.CASSCF(msym, 6, 6)
+        mc1.chkfile = None
+        mc1.async_ci = True
+        mc1.kernel()
+        self.assertAlmostEqual(mc1.e_tot, -108.92973472364999, 7)
+
     # FIXME: How to test ci_response_space? The test below seems numerical instable
     #def test_ci_response_space(self):
     #    mc1 = mcscf.CASSCF(m, 4, 4)
@@ -186,6 +186,54 @@ class KnownValues(unittest.TestCase):
         mc.kernel()
         self.assertAlmostEqual(mc.e_tot, -108.98010545803884, 7)
 
+    def test_integral_policy(self):
+        mc = mcscf.integral_policy(mcscf.CASSCF(m, 4, 4), core='exact',
+                                   active='exact', hessian='df',
+                                   auxbasis='weigend')
+        emc = mc.mc1step()[0]
+        self.assertAlmostEqual(emc, -108.913786407955, 7)
+        mc.core_df = mc.hessian_df
+        emc = mc.mc1step()[0]
+        self.assertAlmostEqual(emc, -108.91074915513589, 7)
+
+        # DF ERIs in mf._eri, the exact and the DF classes are identical
+        with_df = df.DF(mol, auxbasis='weigend')
+        with_df.max_memory = 4000
+        with_df.build()
+        cderi = ao2mo.restore(1, numpy.dot(with_df._cderi.T, with_df._cderi),
+                              mol.nao_nr())
+        mf = scf.RHF(mol)
+        mf._eri = ao2mo.restore(8, cderi, mol.nao_nr())
+        mf.max_memory = 4000
+        mo = m.mo_coeff
+        numpy.random.seed(1)
+        k = numpy.random.random((mo.shape[1],mo.shape[1])) * 1e-4
+        mo1 = numpy.dot(mo, scipy.linalg.expm(k - k.T))
+        eris0 = mcscf.CASSCF(mf, 6, 6).ao2mo(mo1)
+
+        mc = mcscf.integral_policy(mcscf.CASSCF(mf, 6, 6), with_df=with_df)
+        mc.ao2mo(mo)
+        self.assertTrue(mc._eris_ref[0] is mo)
+        eris1 = mc.ao2mo(mo1)  # incremental update
+        self.assertTrue(mc._eris_ref[0] is mo)
+        for key in ('ppaa', 'papa', 'j_pc', 'k_pc', 'vhf_c'):
+            self.assertAlmostEqual(abs(getattr(eris0, key) -
+                                       getattr(eris1, key)).max(), 0, 9)
+
+        # The reference is dropped when the geometry changes or by reset()
+        mc.mol = mol.set_geom_('N 0 0 0; N 0 0 1.21', unit='Angstrom', inplace=False)
+        mc.ao2mo(mo1)
+        self.assertTrue(mc._eris_ref[0] is mo1)
+        mc.reset()
+        self.assertTrue(mc._eris_ref is None)
+
+        mc = mcscf.integral_policy(mcscf.CASSCF(mf, 6, 6), core='df',
+                                   active='df', hessian='exact', with_df=with_df)
+        eris1 = mc.ao2mo(mo1)
+        for key in ('ppaa', 'papa', 'j_pc', 'k_pc', 'vhf_c'):
+            self.assertAlmostEqual(abs(getattr(eris0, key) -
+                                       getattr(eris1, key)).max(), 0, 9)
+
     def test_newton_casscf(self):
         mc = mcscf.newton(mcscf.CASSCF(m, 4, 4))
         mc.kernel()
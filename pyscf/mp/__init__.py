@@ -21,6 +21,7 @@ from pyscf.mp import mp2
 from pyscf.mp import dfmp2
 from pyscf.mp import ump2
 from pyscf.mp import gmp2
+from pyscf.mp import dlpno
 
 def MP2(mf, frozen=0, mo_coeff=None, mo_occ=None):
     __doc__ = mp2.MP2.__doc__
@@ -0,0 +1,513 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''
+Local MP2 in the pair natural orbital (PNO) basis, DLPNO-MP2 style.
+
+The occupied orbitals are localized by one of the methods of the pyscf.lo
+module.  The orbital pairs are prescreened by a dipole estimate of the pair
+energies and the remaining pairs are screened by the semicanonical MP2 pair
+energies.  The semicanonical amplitudes of a pair are computed in the domain
+of the projected atomic orbitals (PAOs) on the atoms where the two localized
+orbitals have significant Loewdin populations, so the cost per pair does
+not grow with the size of the molecule.  For the strong pairs, the virtual
+space is truncated to the PNOs of the semicanonical amplitudes and the local
+MP2 equations (with the off-diagonal occupied Fock couplings) are solved in
+the PNO basis.  All integrals are generated from the DF 3-center tensor.
+
+Ref: Pinski, Riplinger, Valeev, Neese, JCP 143, 034108 (2015)
+'''
+
+import time
+from functools import reduce
+import numpy
+from pyscf import lib
+from pyscf import lo
+from pyscf import df
+from pyscf.lib import logger
+from pyscf.ao2mo import _ao2mo
+from pyscf.mp import mp2
+from pyscf import __config__
+
+WITH_T2 = getattr(__config__, 'mp_dlpno_with_t2', True)
+# Linear dependency threshold of the PAOs in a pair domain
+PAO_LINDEP = getattr(__config__, 'mp_dlpno_pao_lindep', 1e-8)
+
+
+def kernel(mp, mo_energy=None, mo_coeff=None, eris=None, with_t2=WITH_T2,
+           verbose=logger.NOTE):
+    '''DLPNO-MP2 correlation energy.
+
+    Returns:
+        e_corr and the pair amplitudes.  The amplitudes are kept in the PNO
+        basis of each pair, as a dict {(i,j): T_ij} for the strong pairs
+        i <= j (see :attr:`DLPNOMP2.pno_coeff`).  They are returned if
+        with_t2 is set, otherwise None.
+    '''
+    log = logger.new_logger(mp, verbose)
+    cput0 = (time.clock(), time.time())
+    foo, pairs, e_weak, e_pno_corr = build_pno(mp, mo_energy, mo_coeff, log)
+    log.timer('PNO construction', *cput0)
+
+    e_corr = solve_lmp2(mp, pairs, foo, log)
+    nocc = foo.shape[0]
+    log.info('Strong pairs %d  weak pairs %d', len(pairs),
+             nocc*(nocc+1)//2 - len(pairs))
+    log.info('E(strong pairs) = %.15g  E(weak pairs) = %.15g  '
+             'PNO truncation correction = %.15g', e_corr, e_weak, e_pno_corr)
+    e_corr += e_weak + e_pno_corr
+    log.timer('DLPNO-MP2', *cput0)
+    if with_t2:
+        return e_corr, mp.t2_pno
+    else:
+        mp.t2_pno = None
+        return e_corr, None
+
+def build_pno(mp, mo_energy=None, mo_coeff=None, log=None):
+    '''Localize the occupied orbitals, screen the pairs and generate the PNOs
+    of the strong pairs.  The localized orbitals are saved in mp.lo_coeff.
+
+    Returns:
+        foo : 2D array
+            Fock matrix of the localized occupied orbitals
+        pairs, e_weak, e_pno_corr :
+            See :func:`make_pno`
+    '''
+    if log is None: log = logger.new_logger(mp)
+    if mo_energy is None or mo_coeff is None:
+        mo_coeff = mp2._mo_without_core(mp, mp.mo_coeff)
+        mo_energy = mp2._mo_energy_without_core(mp, mp.mo_energy)
+    else:
+        assert(mp.frozen is 0 or mp.frozen is None)
+    cput0 = (time.clock(), time.time())
+
+    nocc = mp.nocc
+    orbo = mo_coeff[:,:nocc]
+    orbv = mo_coeff[:,nocc:]
+    eo = mo_energy[:nocc]
+    ev = mo_energy[nocc:]
+
+    lo_coeff = mp.localize(orbo)
+    u = reduce(numpy.dot, (orbo.T, mp._scf.get_ovlp(), lo_coeff))
+    foo = numpy.dot(u.T*eo, u)
+    mp.lo_coeff = lo_coeff
+    cput1 = log.timer('localization', *cput0)
+
+    Lov = mp.loop_ao2mo(numpy.hstack((lo_coeff, orbv)), nocc)
+    cput1 = log.timer('DF 3-index integrals', *cput1)
+
+    e_pre = dipole_pair_energy(mp, lo_coeff, orbv, foo, ev)
+    domains = make_domains(mp, lo_coeff)
+    # PAOs in the basis of the canonical virtual orbitals
+    vpao = numpy.dot(orbv.T, mp._scf.get_ovlp())
+    naux = Lov.shape[0]
+    Lpao = lib.dot(Lov.reshape(naux*nocc,-1), vpao).reshape(naux,nocc,-1)
+    Lov = None
+    cput1 = log.timer('PAO domains', *cput1)
+
+    pairs, e_weak, e_pno_corr = make_pno(mp, Lpao, vpao, foo, ev, domains,
+                                         e_pre, log)
+    return foo, pairs, e_weak, e_pno_corr
+
+def dipole_pair_energy(mp, lo_coeff, orbv, foo, ev):
+    '''Dipole estimates of the MP2 pair energies of the localized orbitals
+
+    e_ij = -2/R_ij^6 sum_ab [mu_ia . mu_jb - 3 (mu_ia . n)(mu_jb . n)]^2
+                            / (e_a + e_b - F_ii - F_jj)
+
+    where R_ij n is the vector between the centroids of orbitals i and j and
+    mu_ia are the transition dipoles.  The denominators are replaced by
+    their lowest value, so that the sum over a and b reduces to a product of
+    the 3x3 second moments of the transition dipoles of i and j.  The cost
+    is O(1) per pair.  The diagonal is set to infinity.
+    '''
+    mol = mp.mol
+    r = mol.intor_symmetric('int1e_r', comp=3)
+    rlo = lib.einsum('xpq,qi->xpi', r, lo_coeff)
+    centroid = lib.einsum('xpi,pi->ix', rlo, lo_coeff)
+    mu = lib.einsum('xpi,pa->iax', rlo, orbv)
+    m2 = lib.einsum('iax,iay->ixy', mu, mu)
+
+    nocc = lo_coeff.shape[1]
+    fii = foo.diagonal()
+    rij = centroid[:,None] - centroid
+    dist = numpy.linalg.norm(rij, axis=2)
+    numpy.fill_diagonal(dist, 1)
+    n = rij / dist[:,:,None]
+    a = numpy.eye(3) - 3 * lib.einsum('ijx,ijy->ijxy', n, n)
+    am = lib.einsum('ijxy,jyz->ijxz', a, m2)
+    val = lib.einsum('ijxy,ijyz,izx->ij', am, a, m2)
+    denom = ev[0] * 2 - fii[:,None] - fii
+    e_pre = -2 * val / (dist**6 * denom)
+    e_pre[numpy.diag_indices(nocc)] = numpy.inf
+    return e_pre
+
+def make_domains(mp, lo_coeff):
+    '''The PAO domain of each localized orbital: the AOs of the atoms where
+    the Loewdin population of the orbital is larger than mp.domain_thresh.
+    Unlike Mulliken populations, the Loewdin populations are positive and
+    the tails of Pipek-Mezey orbitals are not cancelled.
+
+    Returns:
+        A list of AO index arrays, one for each localized orbital.
+    '''
+    mol = mp.mol
+    s = mp._scf.get_ovlp()
+    e, u = numpy.linalg.eigh(s)
+    pop = numpy.dot(u*numpy.sqrt(e), numpy.dot(u.T, lo_coeff))**2
+    aoslices = mol.aoslice_by_atom()
+    domains = []
+    for i in range(lo_coeff.shape[1]):
+        idx = [numpy.arange(p0, p1) for b0, b1, p0, p1 in aoslices
+               if mp.domain_thresh <= 0 or
+               abs(pop[p0:p1,i].sum()) > mp.domain_thresh]
+        domains.append(numpy.hstack(idx))
+    return domains
+
+def _domain_virtuals(spao, fpao, lindep=PAO_LINDEP):
+    '''Orthonormal, semicanonical virtual orbitals of a PAO domain from the
+    PAO overlap and Fock matrices.  Returns the coefficients on the PAOs and
+    the orbital energies.'''
+    e, u = numpy.linalg.eigh(spao)
+    mask = e > lindep
+    x = u[:,mask] / numpy.sqrt(e[mask])
+    e_dom, r = numpy.linalg.eigh(reduce(numpy.dot, (x.T, fpao, x)))
+    return numpy.dot(x, r), e_dom
+
+def make_pno(mp, Lpao, vpao, foo, ev, domains, e_pre=None, log=None):
+    '''Screen the localized occupied pairs and generate the PNOs for the
+    strong pairs.
+
+    The pairs with |dipole estimate| below mp.pair_prescreen_thresh are weak
+    pairs.  For the other pairs, the semicanonical MP2 amplitudes and pair
+    energy are computed in the PAO domain of the pair, the union of the
+    domains of the two orbitals.  Pairs with |pair energy| below
+    mp.pair_thresh are weak pairs as well.
+
+    Args:
+        Lpao : 3D array
+            3-index integrals (L|i p) of the localized orbitals and the PAOs,
+            of shape (naux,nocc,nao)
+        vpao : 2D array
+            PAOs in the basis of the canonical virtual orbitals
+        domains : list
+            AO indices of the PAO domain of each localized orbital
+        e_pre : 2D array
+            Prescreening estimates of the pair energies
+
+    Returns:
+        pairs : dict
+            For each strong pair (i,j) with i <= j, a tuple of
+            (PNO coefficients in the virtual space, PNO orbital energies,
+            exchange integrals K_ab = (ia|jb) in the PNO basis).
+        e_weak : float
+            MP2 energy estimates of the dropped pairs
+        e_pno_corr : float
+            Semicanonical estimate of the PNO truncation error
+    '''
+    if log is None: log = logger.new_logger(mp)
+    nocc = foo.shape[0]
+    fii = foo.diagonal()
+    spao = numpy.dot(vpao.T, vpao)
+    fpao = numpy.dot(vpao.T*ev, vpao)
+    prescreen_thresh = mp.pair_prescreen_thresh
+    if prescreen_thresh is None:
+        prescreen_thresh = mp.pair_thresh * 1e-2
+
+    e_pair = numpy.zeros((nocc,nocc))
+    pairs = {}
+    e_weak = 0
+    e_pno_corr = 0
+    npno = []
+    ndom = []
+    nprescreen = 0
+    for i in range(nocc):
+        for j in range(i+1):
+            fac = 1 if i == j else 2
+            if e_pre is not None and abs(e_pre[i,j]) * fac < prescreen_thresh:
+                e_pair[i,j] = e_pair[j,i] = e_pre[i,j]
+                e_weak += e_pre[i,j] * fac
+                nprescreen += 1
+                continue
+
+            idx = numpy.union1d(domains[i], domains[j])
+            x, e_dom = _domain_virtuals(spao[idx[:,None],idx],
+                                        fpao[idx[:,None],idx])
+            ndom.append(e_dom.size)
+            li = lib.dot(Lpao[:,i,idx], x)
+            lj = lib.dot(Lpao[:,j,idx], x)
+            kij = lib.dot(li.T, lj)
+            tij = kij / (fii[i] + fii[j] - e_dom[:,None] - e_dom)
+            eij = numpy.einsum('ab,ab', tij*2-tij.T, kij)
+            e_pair[i,j] = e_pair[j,i] = eij
+            eij *= fac
+            if abs(eij) < mp.pair_thresh:
+                e_weak += eij
+                continue
+
+            tt = (tij*4 - tij.T*2) / (1 + (i==j))
+            dm = lib.dot(tt.T, tij) + lib.dot(tt, tij.T)
+            occ, q = numpy.linalg.eigh((dm + dm.T) * .5)
+            q = q[:,occ >= mp.pno_thresh]
+            # semi-canonicalize PNOs
+            e_pno, r = numpy.linalg.eigh(numpy.dot(q.T*e_dom, q))
+            q = numpy.dot(q, r)
+            kij = reduce(numpy.dot, (q.T, kij, q))
+            tij = kij / (fii[i] + fii[j] - e_pno[:,None] - e_pno)
+            e_pno_corr += eij - numpy.einsum('ab,ab', tij*2-tij.T, kij) * fac
+            # PNOs in the basis of the canonical virtual orbitals
+            q = lib.dot(vpao[:,idx], numpy.dot(x, q))
+            pairs[(j,i)] = (q, e_pno, kij)
+            npno.append(q.shape[1])
+
+    log.info('Prescreened pairs %d', nprescreen)
+    if ndom:
+        log.info('Number of domain virtuals per pair: average %.1f  max %d',
+                 numpy.mean(ndom), max(ndom))
+    if npno:
+        log.info('Number of PNOs per pair: average %.1f  max %d',
+                 numpy.mean(npno), max(npno))
+    mp.e_pair = e_pair
+    mp.pno_coeff = dict([(ij, pno[0]) for ij, pno in pairs.items()])
+    return pairs, e_weak, e_pno_corr
+
+def solve_lmp2(mp, pairs, foo, log=None):
+    '''Iteratively solve the local MP2 amplitude equations of the strong
+    pairs in the PNO basis
+
+    R_ij = K_ij + (e_a + e_b - F_ii - F_jj) T_ij
+           - sum_{k!=i} F_ik S_{ij,kj} T_kj S_{kj,ij}
+           - sum_{k!=j} F_kj S_{ij,ik} T_ik S_{ik,ij}
+    '''
+    if log is None: log = logger.new_logger(mp)
+    nocc = foo.shape[0]
+    fii = foo.diagonal()
+    keys = sorted(pairs.keys())
+
+    denom = {}
+    t2 = {}
+    for ij in keys:
+        q, e_pno, kij = pairs[ij]
+        i, j = ij
+        denom[ij] = e_pno[:,None] + e_pno - fii[i] - fii[j]
+        t2[ij] = -kij / denom[ij]
+
+    def get_t2(k, l):
+        if k <= l:
+            return pairs[(k,l)][0], t2[(k,l)]
+        else:
+            return pairs[(l,k)][0], t2[(l,k)].T
+
+    fock_thresh = mp.fock_thresh
+    couple = [numpy.where(abs(foo[k]) > fock_thresh)[0] for k in range(nocc)]
+
+    def energy(t2):
+        e = 0
+        for (i, j), tij in t2.items():
+            kij = pairs[(i,j)][2]
+            e += numpy.einsum('ab,ab', tij*2-tij.T, kij) * (1 + (i!=j))
+        return e
+
+    def vector(t2):
+        return numpy.hstack([t2[ij].ravel() for ij in keys])
+
+    adiis = lib.diis.DIIS(mp)
+    adiis.space = mp.diis_space
+
+    e_corr = energy(t2)
+    log.info('Init E_corr(LMP2 strong pairs) = %.15g', e_corr)
+    conv = False
+    for cycle in range(mp.max_cycle):
+        t2new = {}
+        for ij in keys:
+            q, e_pno, kij = pairs[ij]
+            i, j = ij
+            rij = kij + denom[ij] * t2[ij]
+            for k in couple[i]:
+                if k != i and (min(k,j), max(k,j)) in pairs:
+                    qkj, tkj = get_t2(k, j)
+                    s = numpy.dot(q.T, qkj)
+                    rij -= foo[i,k] * reduce(numpy.dot, (s, tkj, s.T))
+            for k in couple[j]:
+                if k != j and (min(i,k), max(i,k)) in pairs:
+                    qik, tik = get_t2(i, k)
+                    s = numpy.dot(q.T, qik)
+                    rij -= foo[k,j] * reduce(numpy.dot, (s, tik, s.T))
+            t2new[ij] = t2[ij] - rij / denom[ij]
+
+        vec = vector(t2new)
+        normt = numpy.linalg.norm(vec - vector(t2))
+        if mp.diis and cycle >= mp.diis_start_cycle:
+            vec = adiis.update(vec)
+            p0 = 0
+            for ij in keys:
+                n = t2new[ij].size
+                t2new[ij] = vec[p0:p0+n].reshape(t2new[ij].shape)
+                p0 += n
+        t2 = t2new
+        e_old, e_corr = e_corr, energy(t2)
+        log.info('cycle = %d  E_corr(LMP2 strong pairs) = %.15g  dE = %.9g  '
+                 'norm(t2) = %.6g', cycle+1, e_corr, e_corr - e_old, normt)
+        if abs(e_corr - e_old) < mp.conv_tol and normt < mp.conv_tol_normt:
+            conv = True
+            break
+    mp.converged = conv
+    mp.t2_pno = t2
+    return e_corr
+
+
+class DLPNOMP2(mp2.MP2):
+    '''DLPNO-MP2 with DF integrals
+
+    Attributes:
+        localization : str
+            Method to localize the occupied orbitals.  It can be 'boys',
+            'pm' (Pipek-Mezey), 'ibo' or 'none' (canonical orbitals).
+        pair_thresh : float
+            Pairs with |semicanonical MP2 pair energy| below this threshold
+            are treated as weak pairs.  Default is 1e-4.
+        pno_thresh : float
+            PNOs with occupation numbers below this threshold are dropped.
+            Default is 1e-7.
+        pair_prescreen_thresh : float
+            Pairs with |dipole estimate of the pair energy| below this
+            threshold are dropped before the semicanonical amplitudes are
+            computed.  Default (None) is pair_thresh * 0.01.
+        domain_thresh : float
+            The PAO domain of a localized orbital includes the atoms where
+            the Loewdin population of the orbital is larger than this
+            threshold.  Default is 1e-4.
+        fock_thresh : float
+            Occupied Fock couplings below this threshold are ignored in the
+            local MP2 equations.  Default is 1e-6.
+
+    Saved results:
+        e_pair : 2D array
+            Semicanonical MP2 pair energies (in the pair domains) of the
+            localized pairs, or the dipole estimates for the prescreened
+            pairs.
+        lo_coeff : 2D array
+            Localized occupied orbitals
+        pno_coeff : dict
+            PNO coefficients (in the basis of canonical virtual orbitals)
+            of each strong pair (i,j), i <= j
+    '''
+
+    localization = getattr(__config__, 'mp_dlpno_DLPNOMP2_localization', 'pm')
+    pair_thresh = getattr(__config__, 'mp_dlpno_DLPNOMP2_pair_thresh', 1e-4)
+    pno_thresh = getattr(__config__, 'mp_dlpno_DLPNOMP2_pno_thresh', 1e-7)
+    pair_prescreen_thresh = getattr(__config__, 'mp_dlpno_DLPNOMP2_pair_prescreen_thresh', None)
+    domain_thresh = getattr(__config__, 'mp_dlpno_DLPNOMP2_domain_thresh', 1e-4)
+    fock_thresh = getattr(__config__, 'mp_dlpno_DLPNOMP2_fock_thresh', 1e-6)
+    max_cycle = getattr(__config__, 'mp_dlpno_DLPNOMP2_max_cycle', 50)
+    conv_tol = getattr(__config__, 'mp_dlpno_DLPNOMP2_conv_tol', 1e-8)
+    conv_tol_normt = getattr(__config__, 'mp_dlpno_DLPNOMP2_conv_tol_normt', 1e-6)
+    diis = getattr(__config__, 'mp_dlpno_DLPNOMP2_diis', True)
+    diis_space = getattr(__config__, 'mp_dlpno_DLPNOMP2_diis_space', 6)
+    diis_start_cycle = getattr(__config__, 'mp_dlpno_DLPNOMP2_diis_start_cycle', 1)
+
+    def __init__(self, mf, frozen=0, mo_coeff=None, mo_occ=None):
+        mp2.MP2.__init__(self, mf, frozen, mo_coeff, mo_occ)
+        if getattr(mf, 'with_df', None):
+            self.with_df = mf.with_df
+        else:
+            self.with_df = df.DF(mf.mol)
+            self.with_df.auxbasis = df.make_auxbasis(mf.mol, mp2fit=True)
+        self.converged = False
+        self.lo_coeff = None
+        self.e_pair = None
+        self.pno_coeff = None
+        self.t2_pno = None
+        keys = set(('with_df', 'localization', 'pair_thresh', 'pno_thresh',
+                    'pair_prescreen_thresh', 'domain_thresh', 'fock_thresh', 'max_cycle', 'conv_tol', 'conv_tol_normt',
+                    'diis', 'diis_space', 'diis_start_cycle'))
+        self._keys = set(self.__dict__.keys()).union(keys)
+
+    def dump_flags(self):
+        mp2.MP2.dump_flags(self)
+        log = logger.Logger(self.stdout, self.verbose)
+        log.info('localization = %s', self.localization)
+        log.info('pair_thresh = %g', self.pair_thresh)
+        log.info('pno_thresh = %g', self.pno_thresh)
+        log.info('pair_prescreen_thresh = %s', self.pair_prescreen_thresh)
+        log.info('domain_thresh = %g', self.domain_thresh)
+        log.info('fock_thresh = %g', self.fock_thresh)
+        log.info('max_cycle = %d', self.max_cycle)
+        log.info('conv_tol = %g', self.conv_tol)
+        log.info('conv_tol_normt = %g', self.conv_tol_normt)
+        return self
+
+    @lib.with_doc(mp2.MP2.kernel.__doc__)
+    def kernel(self, mo_energy=None, mo_coeff=None, eris=None, with_t2=WITH_T2):
+        return mp2.MP2.kernel(self, mo_energy, mo_coeff, eris, with_t2, kernel)
+
+    def localize(self, orbo):
+        '''Localize the occupied orbitals'''
+        method = self.localization.lower()
+        if method in ('none', 'canonical') or orbo.shape[1] <= 1:
+            return orbo
+        elif method in ('boys', 'fb'):
+            return lo.Boys(self.mol, orbo).kernel()
+        elif method in ('pm', 'pipek', 'pipekmezey'):
+            return lo.PipekMezey(self.mol, orbo).kernel()
+        elif method == 'ibo':
+            return lo.ibo.ibo(self.mol, orbo, verbose=self.verbose)
+        else:
+            raise ValueError('Unknown localization method %s' % self.localization)
+
+    def loop_ao2mo(self, mo_coeff, nocc):
+        '''The 3-index tensor (L|ia) of shape (naux,nocc,nvir)'''
+        mo = numpy.asarray(mo_coeff, order='F')
+        nmo = mo.shape[1]
+        nvir = nmo - nocc
+        ijslice = (0, nocc, nocc, nmo)
+        with_df = self.with_df
+        naux = with_df.get_naoaux()
+        Lov = numpy.empty((naux,nocc*nvir))
+        p1 = 0
+        for eri1 in with_df.loop():
+            p0, p1 = p1, p1 + eri1.shape[0]
+            _ao2mo.nr_e2(eri1, mo, ijslice, aosym='s2', out=Lov[p0:p1])
+        return Lov.reshape(naux,nocc,nvir)
+
+    def nuc_grad_method(self):
+        raise NotImplementedError
+
+DLPNO_MP2 = DLPNOMP2
+
+from pyscf import scf
+scf.hf.RHF.DLPNOMP2 = lib.class_as_method(DLPNOMP2)
+scf.rohf.ROHF.DLPNOMP2 = None
+scf.uhf.UHF.DLPNOMP2 = None
+
+del(WITH_T2)
+
+
+if __name__ == '__main__':
+    from pyscf import gto
+    from pyscf.mp import dfmp2
+    mol = gto.Mole()
+    mol.verbose = 0
+    mol.atom = [
+        [8 , (0. , 0.     , 0.)],
+        [1 , (0. , -0.757 , 0.587)],
+        [1 , (0. , 0.757  , 0.587)]]
+    mol.basis = 'cc-pvdz'
+    mol.build()
+    mf = scf.RHF(mol).run()
+    e_ref = dfmp2.DFMP2(mf).kernel()[0]
+    pt = DLPNOMP2(mf)
+    pt.kernel()
+    print(pt.e_corr - e_ref)
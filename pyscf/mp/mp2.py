@@ -493,7 +493,9 @@ def _ao2mo_ovov(mp, orbo, orbv, feri, max_memory=2000, verbose=None):
 
     ao_loc = mol.ao_loc_nr()
     dmax = max(4, min(nao/3, numpy.sqrt(max_memory*.95e6/8/(nao+nocc)**2)))
-    sh_ranges = ao2mo.outcore.balance_partition(ao_loc, dmax)
+    sh_ranges = gto.scheduler.shell_ranges(
+            mol, 0, nbas, dmax, ao_loc,
+            gto.scheduler.get_q_cond(ao2mopt, nbas))
     dmax = max(x[2] for x in sh_ranges)
     eribuf = numpy.empty((nao,dmax,dmax,nao))
     ftmp = lib.H5TmpFile()
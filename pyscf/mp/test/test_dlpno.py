@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import numpy
+from pyscf import gto
+from pyscf import scf
+from pyscf.mp import dfmp2
+from pyscf.mp import dlpno
+
+mol = gto.Mole()
+mol.verbose = 7
+mol.output = '/dev/null'
+mol.atom = '''
+O   0.   0.     0.
+H   0.  -0.757  0.587
+H   0.   0.757  0.587
+O   0.   0.     3.0
+H   0.  -0.757  3.587
+H   0.   0.757  3.587'''
+mol.basis = 'cc-pvdz'
+mol.build()
+mf = scf.RHF(mol)
+mf.conv_tol = 1e-12
+mf.scf()
+e_ref = dfmp2.DFMP2(mf).kernel()[0]
+
+def tearDownModule():
+    global mol, mf
+    mol.stdout.close()
+    del mol, mf
+
+
+class KnownValues(unittest.TestCase):
+    def test_no_truncation(self):
+        pt = dlpno.DLPNOMP2(mf)
+        pt.localization = 'pm'
+        pt.pair_thresh = 0
+        pt.pno_thresh = -1
+        pt.domain_thresh = 0
+        pt.kernel()
+        self.assertTrue(pt.converged)
+        self.assertAlmostEqual(pt.e_corr, e_ref, 7)
+        self.assertEqual(len(pt.pno_coeff), 55)
+
+        pt.localization = 'none'
+        pt.kernel()
+        self.assertAlmostEqual(pt.e_corr, e_ref, 9)
+
+    def test_default_thresholds(self):
+        pt = dlpno.DLPNOMP2(mf)
+        pt.kernel()
+        self.assertAlmostEqual(pt.e_corr, e_ref, 3)
+        self.assertTrue(len(pt.pno_coeff) < 55)
+        self.assertAlmostEqual(abs(pt.e_pair.sum()-e_ref), 0, 2)
+
+        pt.localization = 'boys'
+        pt.pno_thresh = 1e-8
+        pt.kernel()
+        self.assertAlmostEqual(pt.e_corr, e_ref, 3)
+
+    def test_prescreen_domains(self):
+        pt = dlpno.DLPNOMP2(mf)
+        pt.pair_prescreen_thresh = 1e-5
+        pt.domain_thresh = 1e-3
+        pt.kernel()
+        self.assertAlmostEqual(pt.e_corr, e_ref, 3)
+        # The strongest pair is intramolecular.  Its PAO domain does not
+        # cover the other water molecule.
+        (i, j), q = max(pt.pno_coeff.items(), key=lambda x: abs(pt.e_pair[x[0]]))
+        domains = dlpno.make_domains(pt, pt.lo_coeff)
+        self.assertTrue(len(numpy.union1d(domains[i], domains[j])) < mol.nao)
+        self.assertAlmostEqual(abs(q.T.dot(q) - numpy.eye(q.shape[1])).max(), 0, 9)
+
+    def test_frozen(self):
+        pt = dlpno.DLPNOMP2(mf, frozen=2)
+        pt.localization = 'ibo'
+        pt.kernel()
+        e1 = dfmp2.DFMP2(mf, frozen=2).kernel()[0]
+        self.assertAlmostEqual(pt.e_corr, e1, 3)
+
+    def test_with_t2(self):
+        pt = dlpno.DLPNOMP2(mf)
+        t2 = pt.kernel(with_t2=True)[1]
+        self.assertTrue(sorted(t2.keys()) == sorted(pt.pno_coeff.keys()))
+        i, j = sorted(t2.keys())[0]
+        self.assertEqual(t2[(i,j)].shape, (pt.pno_coeff[(i,j)].shape[1],)*2)
+        self.assertTrue(pt.kernel(with_t2=False)[1] is None)
+        self.assertTrue(pt.t2_pno is None)
+
+
+if __name__ == "__main__":
+    print("Full Tests for DLPNO-MP2")
+    unittest.main()
@@ -18,6 +18,7 @@
 #
 
 import os
+import sys
 import ctypes
 import time
 import tempfile
@@ -30,10 +31,16 @@ from pyscf import fci
 from pyscf.mcscf import mc_ao2mo
 from pyscf import ao2mo
 from pyscf.ao2mo import _ao2mo
+from pyscf.fci import cistring
+from pyscf.fci import direct_spin1
+from pyscf import __config__
 
 libmc = lib.load_library('libmcscf')
 
 NUMERICAL_ZERO = 1e-14
+# Build the perturber functions of Sr and Si from the CI vector instead of
+# contracting the integrals with the 3-pdm and the 4-pdm intermediates
+DIRECT_PERTURBER = getattr(__config__, 'mrpt_nevpt2_direct_perturber', True)
 # Ref JCP, 117, 9138
 
 # h1e is the CAS space effective 1e hamiltonian
@@ -308,6 +315,13 @@ def Sr(mc,ci,dms, eris=None, verbose=None):
         h2e_v = eris['ppaa'][nocc:,ncore:nocc].transpose(0,2,1,3)
         h1e_v = eris['h1eff'][nocc:,ncore:nocc] - numpy.einsum('mbbn->mn',h2e_v)
 
+    if _use_direct_perturber(mc):
+        norm, ener = _direct_perturber(h1e, h2e.transpose(0,2,1,3), ci, ncas,
+                                       mc.nelecas, h1e_v,
+                                       h2e_v.transpose(0,2,1,3), False,
+                                       mc.max_memory,
+                                       logger.new_logger(mc, verbose))
+        return _norm_to_energy(norm, ener, mc.mo_energy[nocc:])
 
     if getattr(mc.fcisolver, 'nevpt_intermediate', None):
         a16 = mc.fcisolver.nevpt_intermediate('A16',ncas,mc.nelecas,ci)
@@ -351,6 +365,14 @@ def Si(mc, ci, dms, eris=None, verbose=None):
         h2e_v = eris['ppaa'][ncore:nocc,:ncore].transpose(0,2,1,3)
         h1e_v = eris['h1eff'][ncore:nocc,:ncore]
 
+    if _use_direct_perturber(mc):
+        norm, ener = _direct_perturber(h1e, h2e.transpose(0,2,1,3), ci, ncas,
+                                       mc.nelecas, h1e_v.T,
+                                       h2e_v.transpose(2,0,1,3), True,
+                                       mc.max_memory,
+                                       logger.new_logger(mc, verbose))
+        return _norm_to_energy(norm, ener, -mc.mo_energy[:ncore])
+
     if getattr(mc.fcisolver, 'nevpt_intermediate', None):
         #mc.fcisolver.make_a22(ncas, state)
         a22 = mc.fcisolver.nevpt_intermediate('A22',ncas,mc.nelecas,ci)
@@ -382,6 +404,30 @@ def Sijrs(mc, eris, verbose=None):
     nvirt = mo_virt.shape[1]
     ncas = mo_cas.shape[1]
     nocc = ncore + ncas
+    eia = mc.mo_energy[:ncore,None] -mc.mo_energy[None,nocc:]
+    if eris is not None and 'Lcv' in eris:
+        # (ia|jb) are assembled from the 3-index tensors for blocks of core
+        # orbitals.  Only the blocks of j <= i are computed.
+        Lcv = eris['Lcv']
+        naux = Lcv.shape[0]
+        blksize = int(_df_blksize(mc, nvirt**2*3) ** .5)
+        blksize = max(1, min(ncore, blksize))
+        norm = 0
+        e = 0
+        for i0, i1 in lib.prange(0, ncore, blksize):
+            Li = numpy.asarray(Lcv[:,i0:i1]).reshape(naux,-1)
+            for j0, j1 in lib.prange(0, i1, blksize):
+                Lj = numpy.asarray(Lcv[:,j0:j1]).reshape(naux,-1)
+                gi = lib.dot(Li.T, Lj).reshape(i1-i0,nvirt,j1-j0,nvirt)
+                theta = gi*2 - gi.transpose(0,3,2,1)
+                theta *= gi
+                fac = 1 if j0 == i0 else 2
+                norm += theta.sum() * fac
+                theta /= lib.direct_sum('ia+jb->iajb', eia[i0:i1], eia[j0:j1])
+                e += theta.sum() * fac
+                gi = theta = None
+        return norm, e
+
     if eris is None:
         erifile = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
         feri = ao2mo.outcore.general(mc.mol, (mo_core,mo_virt,mo_core,mo_virt),
@@ -389,7 +435,6 @@ def Sijrs(mc, eris, verbose=None):
     else:
         feri = eris['cvcv']
 
-    eia = mc.mo_energy[:ncore,None] -mc.mo_energy[None,nocc:]
     norm = 0
     e = 0
     with ao2mo.load(feri) as cvcv:
@@ -420,21 +465,37 @@ def Sijr(mc, dms, eris, verbose=None):
     else:
         h1e = eris['h1eff'][ncore:nocc,ncore:nocc]
         h2e = eris['ppaa'][ncore:nocc,ncore:nocc].transpose(0,2,1,3)
-        h2e_v = eris['pacv'][:ncore].transpose(3,1,2,0)
+        if 'Lcv' in eris:
+            h2e_v = None
+        else:
+            h2e_v = eris['pacv'][:ncore].transpose(3,1,2,0)
     if 'h1' in dms:
         hdm1 = dms['h1']
     else:
         hdm1 = make_hdm1(dm1)
 
     a3 = make_a3(h1e,h2e,dm1,dm2,hdm1)
-    norm = 2.0*numpy.einsum('rpji,raji,pa->rji',h2e_v,h2e_v,hdm1)\
-         - 1.0*numpy.einsum('rpji,raij,pa->rji',h2e_v,h2e_v,hdm1)
-    h = 2.0*numpy.einsum('rpji,raji,pa->rji',h2e_v,h2e_v,a3)\
-         - 1.0*numpy.einsum('rpji,raij,pa->rji',h2e_v,h2e_v,a3)
-
     diff = mc.mo_energy[nocc:,None,None] - mc.mo_energy[None,:ncore,None] - mc.mo_energy[None,None,:ncore]
 
-    return _norm_to_energy(norm, h, diff)
+    def contract(h2e_v, diff):
+        norm = 2.0*numpy.einsum('rpji,raji,pa->rji',h2e_v,h2e_v,hdm1)\
+             - 1.0*numpy.einsum('rpji,raij,pa->rji',h2e_v,h2e_v,hdm1)
+        h = 2.0*numpy.einsum('rpji,raji,pa->rji',h2e_v,h2e_v,a3)\
+             - 1.0*numpy.einsum('rpji,raij,pa->rji',h2e_v,h2e_v,a3)
+        return _norm_to_energy(norm, h, diff)
+
+    if h2e_v is not None:
+        return contract(h2e_v, diff)
+
+    nvirt = mo_virt.shape[1]
+    blksize = _df_blksize(mc, ncore*ncore*(ncas*2+2))
+    norm_t = ener_t = 0
+    for r0, r1 in lib.prange(0, nvirt, blksize):
+        h2e_v = _pacv_df(eris, 0, ncore, r0, r1).transpose(3,1,2,0)
+        norm, ener = contract(h2e_v, diff[r0:r1])
+        norm_t += norm
+        ener_t += ener
+    return norm_t, ener_t
 
 def Srsi(mc, dms, eris, verbose=None):
     #Subspace S_ijr^{(1)}
@@ -452,15 +513,37 @@ def Srsi(mc, dms, eris, verbose=None):
     else:
         h1e = eris['h1eff'][ncore:nocc,ncore:nocc]
         h2e = eris['ppaa'][ncore:nocc,ncore:nocc].transpose(0,2,1,3)
-        h2e_v = eris['pacv'][nocc:].transpose(3,0,2,1)
+        if 'Lcv' in eris:
+            h2e_v = None
+        else:
+            h2e_v = eris['pacv'][nocc:].transpose(3,0,2,1)
 
     k27 = make_k27(h1e,h2e,dm1,dm2)
-    norm = 2.0*numpy.einsum('rsip,rsia,pa->rsi',h2e_v,h2e_v,dm1)\
-         - 1.0*numpy.einsum('rsip,sria,pa->rsi',h2e_v,h2e_v,dm1)
-    h = 2.0*numpy.einsum('rsip,rsia,pa->rsi',h2e_v,h2e_v,k27)\
-         - 1.0*numpy.einsum('rsip,sria,pa->rsi',h2e_v,h2e_v,k27)
     diff = mc.mo_energy[nocc:,None,None] + mc.mo_energy[None,nocc:,None] - mc.mo_energy[None,None,:ncore]
-    return _norm_to_energy(norm, h, diff)
+
+    # h2e_v_sr[s,r] = h2e_v[r,s].  They are different blocks when the
+    # integrals are assembled for a subset of r.
+    def contract(h2e_v, h2e_v_sr, diff):
+        norm = 2.0*numpy.einsum('rsip,rsia,pa->rsi',h2e_v,h2e_v,dm1)\
+             - 1.0*numpy.einsum('rsip,sria,pa->rsi',h2e_v,h2e_v_sr,dm1)
+        h = 2.0*numpy.einsum('rsip,rsia,pa->rsi',h2e_v,h2e_v,k27)\
+             - 1.0*numpy.einsum('rsip,sria,pa->rsi',h2e_v,h2e_v_sr,k27)
+        return _norm_to_energy(norm, h, diff)
+
+    if h2e_v is not None:
+        return contract(h2e_v, h2e_v, diff)
+
+    nmo = mc.mo_coeff.shape[1]
+    nvirt = nmo - nocc
+    blksize = _df_blksize(mc, nvirt*ncore*(ncas*2+2))
+    norm_t = ener_t = 0
+    for r0, r1 in lib.prange(0, nvirt, blksize):
+        h2e_v = _pacv_df(eris, nocc, nmo, r0, r1).transpose(3,0,2,1)
+        h2e_v_sr = _pacv_df(eris, nocc+r0, nocc+r1, 0, nvirt).transpose(3,0,2,1)
+        norm, ener = contract(h2e_v, h2e_v_sr, diff[r0:r1])
+        norm_t += norm
+        ener_t += ener
+    return norm_t, ener_t
 
 def Srs(mc, dms, eris=None, verbose=None):
     #Subspace S_rs^{(-2)}
@@ -484,7 +567,12 @@ def Srs(mc, dms, eris=None, verbose=None):
         h2e_v = eris['papa'][nocc:,:,nocc:].transpose(0,2,1,3)
 
 # a7 is very sensitive to the accuracy of HF orbital and CI wfn
-    rm2, a7 = make_a7(h1e,h2e,dm1,dm2,dm3)
+    if 'a7' in dms:
+        delta = numpy.eye(ncas)
+        rm2 = numpy.einsum('iljk->ijkl',dm2) - numpy.einsum('ik,jl->ijkl',dm1,delta)
+        a7 = dms['a7']
+    else:
+        rm2, a7 = make_a7(h1e,h2e,dm1,dm2,dm3)
     norm = 0.5*numpy.einsum('rsqp,rsba,pqba->rs',h2e_v,h2e_v,rm2)
     h = 0.5*numpy.einsum('rsqp,rsba,pqab->rs',h2e_v,h2e_v,a7)
     diff = mc.mo_energy[nocc:,None] + mc.mo_energy[None,nocc:]
@@ -519,13 +607,16 @@ def Sij(mc, dms, eris, verbose=None):
         hdm2 = dms['h2']
     else:
         hdm2 = make_hdm2(dm1,dm2)
-    if 'h3' in dms:
-        hdm3 = dms['h3']
-    else:
-        hdm3 = make_hdm3(dm1,dm2,dm3,hdm1,hdm2)
 
 # a9 is very sensitive to the accuracy of HF orbital and CI wfn
-    a9 = make_a9(h1e,h2e,hdm1,hdm2,hdm3)
+    if 'a9' in dms:
+        a9 = dms['a9']
+    else:
+        if 'h3' in dms:
+            hdm3 = dms['h3']
+        else:
+            hdm3 = make_hdm3(dm1,dm2,dm3,hdm1,hdm2)
+        a9 = make_a9(h1e,h2e,hdm1,hdm2,hdm3)
     norm = 0.5*numpy.einsum('qpij,baij,pqab->ij',h2e_v,h2e_v,hdm2)
     h = 0.5*numpy.einsum('qpij,baij,pqab->ij',h2e_v,h2e_v,a9)
     diff = mc.mo_energy[:ncore,None] + mc.mo_energy[None,:ncore]
@@ -566,8 +657,12 @@ def Sir(mc, dms, eris, verbose=None):
          - numpy.einsum('rpqi,ri,qp->ir',h2e_v2,h1e_v,dm1)*2.0\
          + numpy.einsum('ri,ri->ir',h1e_v,h1e_v)*2.0
 
-    a12 = make_a12(h1e,h2e,dm1,dm2,dm3)
-    a13 = make_a13(h1e,h2e,dm1,dm2,dm3)
+    if 'a12' in dms:
+        a12 = dms['a12']
+        a13 = dms['a13']
+    else:
+        a12 = make_a12(h1e,h2e,dm1,dm2,dm3)
+        a13 = make_a13(h1e,h2e,dm1,dm2,dm3)
 
     h = numpy.einsum('rpiq,raib,pqab->ir',h2e_v1,h2e_v1,a12)*2.0\
          - numpy.einsum('rpiq,rabi,pqab->ir',h2e_v1,h2e_v2,a12)\
@@ -586,6 +681,16 @@ class NEVPT(lib.StreamObject):
             wfn were calculated in CASCI/CASSCF
         compressed_mps : bool
             compressed MPS perturber method for DMRG-SC-NEVPT2
+        with_df : DF object
+            If given, the integrals are computed with the 3-index tensors of
+            the density fitting object.  See :func:`NEVPT.density_fit`.
+        direct_perturber : bool
+            Whether to build the perturber functions of the Sr and Si
+            subspaces from the CI vector.  It avoids the 4-particle
+            intermediates (ncas^6 arrays derived from the 4-pdm).  The
+            intermediates of Srs, Sij and Sir are computed with the CI vector
+            as well, so the 3-pdm is not constructed.  Default is True.  It
+            is ignored for DMRG solvers.
 
     Examples:
 
@@ -600,6 +705,8 @@ class NEVPT(lib.StreamObject):
         self._mc = mc
         self.root = root
         self.compressed_mps = False
+        self.direct_perturber = DIRECT_PERTURBER
+        self.with_df = None
 
 ##################################################
 # don't modify the following attributes, they are not input options
@@ -622,6 +729,37 @@ class NEVPT(lib.StreamObject):
     def h1e_for_cas(self, mo_coeff=None, ncas=None, ncore=None):
         return self._mc.h1e_for_cas(mo_coeff, ncas, ncore)
 
+    def density_fit(self, auxbasis=None, with_df=None):
+        '''Compute the integrals of NEVPT2 with density fitting.
+
+        The 3-index tensors are used to assemble the (core,virtual) blocks
+        of the integrals on demand.  The 4-index (cv|cv) and (pa|cv)
+        integrals are not stored.
+
+        Kwargs:
+            auxbasis : str or dict
+                Auxiliary basis.  Default is the auxiliary basis of the DF
+                object of the CASSCF/SCF method or the RI basis for MP2.
+            with_df : DF object
+        '''
+        from pyscf import df
+        if with_df is None:
+            with_df = getattr(self._mc, 'with_df', None)
+            if with_df is None:
+                with_df = getattr(self._scf, 'with_df', None)
+            if (with_df is None or
+                (auxbasis is not None and auxbasis != with_df.auxbasis)):
+                with_df = df.DF(self.mol)
+                with_df.max_memory = self.max_memory
+                with_df.stdout = self.stdout
+                with_df.verbose = self.verbose
+                if auxbasis is None:
+                    with_df.auxbasis = df.make_auxbasis(self.mol, mp2fit=True)
+                else:
+                    with_df.auxbasis = auxbasis
+        self.with_df = with_df
+        return self
+
     def load_ci(self, root=None):
         '''Hack me to load CI wfn from disk'''
         if root is None:
@@ -699,6 +837,12 @@ class NEVPT(lib.StreamObject):
         if getattr(self.fcisolver, 'nevpt_intermediate', None):
             logger.info(self, 'DMRG-NEVPT')
             dm1, dm2, dm3 = self.fcisolver._make_dm123(self.load_ci(),ncas,self.nelecas,None)
+        elif _use_direct_perturber(self):
+            # The 3-pdm is not needed.  The intermediates of Srs, Sij and Sir
+            # are computed with the CI vector (see _ket_sc_intermediates).
+            dm1, dm2 = fci.direct_spin1.make_rdm12(self.load_ci(), ncas,
+                                                   self.nelecas, reorder=False)
+            dm3 = None
         else:
             dm1, dm2, dm3 = fci.rdm.make_dm123('FCI3pdm_kern_sf',
                                                self.load_ci(), self.load_ci(), ncas, self.nelecas)
@@ -709,10 +853,28 @@ class NEVPT(lib.StreamObject):
               }
         time1 = log.timer('3pdm, 4pdm', *time0)
 
-        eris = _ERIS(self, self.mo_coeff)
+        if self.with_df:
+            eris = _ERIS_df(self, self.mo_coeff, self.with_df)
+        else:
+            eris = _ERIS(self, self.mo_coeff)
         time1 = log.timer('integral transformation', *time1)
 
-        if not getattr(self.fcisolver, 'nevpt_intermediate', None):  # regular FCI solver
+        if _use_direct_perturber(self):
+            log.debug('Sr and Si are computed with the perturber functions')
+            nvirt = self.mo_coeff.shape[1] - nocc
+            keys = []
+            if nvirt > 0:
+                keys.append('a7')
+            if ncore > 0:
+                keys.append('a9')
+                if nvirt > 0:
+                    keys.extend(['a12', 'a13'])
+            dms.update(_ket_sc_intermediates(
+                eris['h1eff'][ncore:nocc,ncore:nocc],
+                eris['ppaa'][ncore:nocc,ncore:nocc], self.load_ci(), ncas,
+                self.nelecas, dm1, dm2, keys, self.max_memory, log))
+            time1 = log.timer('Srs, Sij, Sir intermediates', *time1)
+        elif not getattr(self.fcisolver, 'nevpt_intermediate', None):  # regular FCI solver
             link_indexa = fci.cistring.gen_linkstr_index(range(ncas), self.nelecas[0])
             link_indexb = fci.cistring.gen_linkstr_index(range(ncas), self.nelecas[1])
             aaaa = eris['ppaa'][ncore:nocc,ncore:nocc].copy()
@@ -838,6 +1000,377 @@ def _contract4pdm(kern, eri, civec, norb, nelec, link_index=None):
             fdm3[j,:,i,j] -= fdm2[i,:]
     return fdm3
 
+def _use_direct_perturber(mc):
+    return (getattr(mc, 'direct_perturber', False) and
+            not getattr(mc.fcisolver, 'nevpt_intermediate', None))
+
+def _direct_perturber(h1e, eri, civec, norb, nelec, h1e_v, eri_v, cre=False,
+                      max_memory=2000, verbose=None):
+    r'''Norm and energy of the strongly contracted perturber functions
+
+        |x> = \sum_{a,sigma} o_{a,sigma} (h1e_v[x,a] + \sum_{bc} eri_v[x,a,b,c] E_{bc}) |CI>
+
+    where o is the annihilation operator (cre=False, the Sr subspace) or the
+    creation operator (cre=True, the Si subspace) of active orbitals.  The
+    energy is <x|H_act - E_0|x> with the active space Hamiltonian (h1e, eri).
+
+    The perturber functions are computed for blocks of the external orbitals
+    x.  The intermediates E_{bc}|CI> are generated for blocks of the beta
+    strings.  Neither the 3-pdm nor the 4-pdm is constructed.
+    '''
+    if isinstance(verbose, logger.Logger):
+        log = verbose
+    else:
+        log = logger.Logger(sys.stdout, verbose)
+    neleca, nelecb = direct_spin1._unpack_nelec(nelec)
+    nx = h1e_v.shape[0]
+    nn = norb * norb
+    norm = numpy.zeros(nx)
+    ener = numpy.zeros(nx)
+    if nx == 0:
+        return norm, ener
+
+    na = cistring.num_strings(norb, neleca)
+    nb = cistring.num_strings(norb, nelecb)
+    civec = numpy.asarray(civec).reshape(na,nb)
+    eri = ao2mo.restore(1, eri, norb)
+    eri_v = eri_v.reshape(nx*norb,nn)
+    h2e = direct_spin1.absorb_h1e(h1e, eri, norb, (neleca,nelecb), .5)
+    e0 = numpy.dot(civec.ravel(), direct_spin1.contract_2e(
+        h2e, civec, norb, (neleca,nelecb)).ravel())
+
+    # The beta-spin perturbers are the alpha-spin perturbers of the transposed
+    # CI vector
+    for ci0, (nelec0, nelec1) in ((civec, (neleca,nelecb)),
+                                  (civec.T, (nelecb,neleca))):
+        if (cre and nelec0 == norb) or (not cre and nelec0 == 0):
+            continue
+        ci0 = numpy.ascontiguousarray(ci0)
+        na, nb = ci0.shape
+        if cre:
+            nelecx = (nelec0+1, nelec1)
+            # <I'|a_p^+|I> = <I|a_p|I'>
+            tab = cistring.gen_des_str_index(range(norb), nelec0+1)
+            orb = tab[:,:,1]
+        else:
+            nelecx = (nelec0-1, nelec1)
+            tab = cistring.gen_cre_str_index(range(norb), nelec0-1)
+            orb = tab[:,:,0]
+        addr = tab[:,:,2]
+        sign = tab[:,:,3]
+        nax = addr.shape[0]
+        link_indexa = cistring.gen_linkstr_index(range(norb), nelec0)
+        link_indexb = cistring.gen_linkstr_index(range(norb), nelec1)
+        h2ex = direct_spin1.absorb_h1e(h1e, eri, norb, nelecx, .5)
+        link_indexx = direct_spin1._unpack(norb, nelecx, None)
+
+        mem_now = lib.current_memory()[0]
+        mem_avail = max(0, max_memory - mem_now)
+        # perturbers and their sigma vectors
+        xblk = int(mem_avail*.5e6/8/(nax*nb*2))
+        xblk = max(1, min(nx, xblk))
+        # E_{bc}|CI> and its contraction with eri_v
+        bblk = int((mem_avail*1e6/8 - xblk*nax*nb*2) / (na*(nn+xblk*norb)))
+        bblk = max(1, min(nb, bblk))
+        log.debug1('direct perturber blksize x %d, beta strings %d', xblk, bblk)
+
+        for x0, x1 in lib.prange(0, nx, xblk):
+            phi = numpy.zeros((x1-x0,nax,nb))
+            for b0, b1 in lib.prange(0, nb, bblk):
+                t1 = _trans_e1(ci0, norb, link_indexa, link_indexb, b0, b1)
+                w = numpy.dot(eri_v[x0*norb:x1*norb], t1.reshape(nn,-1))
+                w = w.reshape(x1-x0,norb,na,b1-b0)
+                w += h1e_v[x0:x1,:,None,None] * ci0[:,b0:b1]
+                t1 = None
+                for k in range(addr.shape[1]):
+                    phi[:,:,b0:b1] += w[:,orb[:,k],addr[:,k]] * sign[:,k,None]
+                w = None
+            sigma = direct_spin1.contract_2e(h2ex, phi, norb, nelecx, link_indexx)
+            phi = phi.reshape(x1-x0,-1)
+            sigma = sigma.reshape(x1-x0,-1)
+            nx_blk = numpy.einsum('xi,xi->x', phi, phi)
+            norm[x0:x1] += nx_blk
+            ener[x0:x1] += numpy.einsum('xi,xi->x', phi, sigma) - e0 * nx_blk
+            phi = sigma = None
+    return norm, ener
+
+def _trans_e1(ci0, norb, link_indexa, link_indexb, b0, b1):
+    '''E_{bc}|CI> for the beta strings b0:b1'''
+    na, nb = ci0.shape
+    t1 = numpy.zeros((norb*norb,na,b1-b0))
+    nlinka = link_indexa.shape[1]
+    str0 = numpy.repeat(numpy.arange(na), nlinka)
+    link = link_indexa.reshape(-1,4)
+    pq = link[:,0] * norb + link[:,1]
+    t1[pq,link[:,2]] = ci0[str0,b0:b1] * link[:,3,None]
+
+    # <J|E_{bc}|J'> = <J'|E_{cb}|J>
+    nlinkb = link_indexb.shape[1]
+    str0 = numpy.repeat(numpy.arange(b1-b0), nlinkb)
+    link = link_indexb[b0:b1].reshape(-1,4)
+    pq = link[:,1] * norb + link[:,0]
+    t1[pq,:,str0] += ci0[:,link[:,2]].T * link[:,3,None]
+    return t1
+
+def _op_index(norb, nelec0, cre):
+    '''Orbitals, string addresses and signs to apply the alpha creation
+    (cre=True) or annihilation operators on the strings of nelec0 electrons.
+    The output string I' collects <I'|o_p|I> from I = addr[I',k], p = orb[I',k]
+    '''
+    if cre:
+        # <I'|a_p^+|I> = <I|a_p|I'>
+        tab = cistring.gen_des_str_index(range(norb), nelec0+1)
+        return tab[:,:,1], tab[:,:,2], tab[:,:,3]
+    else:
+        tab = cistring.gen_cre_str_index(range(norb), nelec0-1)
+        return tab[:,:,0], tab[:,:,2], tab[:,:,3]
+
+def _apply_op(vs, norb, nelec, cre, spin, p0=0, p1=None, sum_orb=False):
+    r'''Apply the creation or annihilation operators of the orbitals p0:p1 on
+    the vectors vs[na,nb,m].  The result is out[na',nb',p,m] = o_p vs[:,:,m].
+    If sum_orb is set, vs[na,nb,m,p] are the vectors of each orbital and
+    out[na',nb',m] = \sum_p o_p vs[:,:,m,p].
+    '''
+    if p1 is None:
+        p1 = norb
+    orb, addr, sign = _op_index(norb, nelec[spin], cre)
+    nstr = addr.shape[0]
+    na, nb = vs.shape[:2]
+    if spin == 0:
+        shape = (nstr, nb)
+    else:
+        shape = (na, nstr)
+        # beta operators are placed after the alpha operators
+        if nelec[0] % 2 == 1:
+            sign = -sign
+
+    if sum_orb:
+        out = numpy.zeros(shape+(vs.shape[2],))
+        for k in range(addr.shape[1]):
+            if spin == 0:
+                tmp = vs[addr[:,k],:,:,orb[:,k]]
+                tmp *= sign[:,k,None,None]
+                out += tmp
+            else:
+                tmp = vs[:,addr[:,k],:,orb[:,k]]
+                tmp *= sign[:,k,None,None]
+                out += tmp.transpose(1,0,2)
+    else:
+        out = numpy.zeros(shape+(p1-p0,vs.shape[2]))
+        for k in range(addr.shape[1]):
+            idx = numpy.where((orb[:,k] >= p0) & (orb[:,k] < p1))[0]
+            if spin == 0:
+                tmp = vs[addr[idx,k]]
+                tmp *= sign[idx,k,None,None]
+                out[idx,:,orb[idx,k]-p0] = tmp
+            else:
+                tmp = vs[:,addr[idx,k]]
+                tmp *= sign[idx,k,None]
+                out[:,idx,orb[idx,k]-p0] = tmp
+    return out
+
+def _ket_sc_intermediates(h1e, eri, civec, norb, nelec, dm1, dm2,
+                          keys=('a7', 'a9', 'a12', 'a13'),
+                          max_memory=2000, verbose=logger.NOTE):
+    r'''The matrices <O_P CI|H_act - E_0|O_A CI> of the Srs (a7), Sij (a9)
+    and Sir (a12, a13) subspaces without the 3-pdm.
+
+    For O = o1_x o2_y (o = a or a^+), the commutator [H, O] gives
+
+        (H - E_0) O |CI> = \sum_{uv} L[xy,uv] o1_u o2_v |CI>
+                         + s1 \sum_z o1_z o2_y V_xz + s2 \sum_z o1_x o2_z V_yz
+
+    where V_xz = \sum_{rs} (xz|rs) E_{rs} |CI>, s = 1 for a^+ and -1 for a,
+    and L is a function of the integrals.  The first term is evaluated with
+    the 2-pdm.  Only the second term needs the CI vectors, through
+    U_x = \sum_z o_z V_xz.  The cost is O(ncas^4 N_det) instead of the
+    O(ncas^6 N_det) of the 3-pdm.
+    '''
+    if isinstance(verbose, logger.Logger):
+        log = verbose
+    else:
+        log = logger.Logger(sys.stdout, verbose)
+    cput0 = (time.clock(), time.time())
+    neleca, nelecb = nelec = direct_spin1._unpack_nelec(nelec)
+    nelecs = (neleca, nelecb)
+    na = cistring.num_strings(norb, neleca)
+    nb = cistring.num_strings(norb, nelecb)
+    nn = norb * norb
+    civec = numpy.asarray(civec).reshape(na,nb)
+    eri = ao2mo.restore(1, eri, norb)
+    h1e = numpy.asarray(h1e)
+    g1e = h1e - numpy.einsum('iqqj->ij', eri)
+    delta = numpy.eye(norb)
+
+    def has_op(nelec, cre, spin):
+        if cre:
+            return nelec[spin] < norb
+        else:
+            return nelec[spin] > 0
+
+    def nelec_after(nelec, cre, spin):
+        nelec = list(nelec)
+        nelec[spin] += 1 if cre else -1
+        return tuple(nelec)
+
+    # U[cre,spin][:,:,x] = \sum_z o_z V_xz.  The beta-spin U are computed
+    # with the alpha-spin operators on the transposed CI vector
+    ops = [(cre, spin) for cre in (False, True) for spin in (0, 1)
+           if has_op(nelecs, cre, spin)]
+    U = {}
+    for cre, spin in ops:
+        nelecx = nelec_after(nelecs, cre, spin)
+        U[cre,spin] = numpy.empty((cistring.num_strings(norb, nelecx[0]),
+                                   cistring.num_strings(norb, nelecx[1]), norb))
+    eri_v = eri.reshape(nn,nn)
+    for spin, ci0, nelec0 in ((0, civec, nelecs),
+                              (1, civec.T, (nelecb, neleca))):
+        ops_s = [cre for cre, sp in ops if sp == spin]
+        if not ops_s:
+            continue
+        ci0 = numpy.ascontiguousarray(ci0)
+        na0, nb0 = ci0.shape
+        link_indexa = cistring.gen_linkstr_index(range(norb), nelec0[0])
+        link_indexb = cistring.gen_linkstr_index(range(norb), nelec0[1])
+        mem_now = lib.current_memory()[0]
+        mem_avail = max(0, max_memory - mem_now)
+        bblk = int(mem_avail*.3e6/8/(na0*nn*3))
+        bblk = max(1, min(nb0, bblk))
+        for b0, b1 in lib.prange(0, nb0, bblk):
+            t1 = _trans_e1(ci0, norb, link_indexa, link_indexb, b0, b1)
+            vxz = numpy.dot(t1.reshape(nn,-1).T, eri_v)
+            vxz = vxz.reshape(na0,b1-b0,norb,norb)
+            t1 = None
+            for cre in ops_s:
+                u = _apply_op(vxz, norb, nelec0, cre, 0, sum_orb=True)
+                if spin == 0:
+                    U[cre,spin][:,b0:b1] = u
+                elif neleca % 2 == 1:
+                    # beta operators are placed after the alpha operators
+                    U[cre,spin][b0:b1] = -u.transpose(1,0,2)
+                else:
+                    U[cre,spin][b0:b1] = u.transpose(1,0,2)
+            vxz = u = None
+    cput1 = log.timer_debug1('U intermediates', *cput0)
+
+    def contract_v(cre1, cre2, spin_pairs):
+        r'''\sum <O_P CI|V-terms of (H - E_0) O_A CI> for O = o1 o2 and the
+        spins ((bra o1, bra o2), (ket o1, ket o2)) in spin_pairs'''
+        s1 = 1 if cre1 else -1
+        s2 = 1 if cre2 else -1
+        out = numpy.zeros((norb,)*4)
+        for (bs1, bs2), (ks1, ks2) in spin_pairs:
+            # The terms of the ket are not necessarily zero when o1 o2 |CI>
+            # vanishes.  It is enough to skip the zero bra.
+            if not (has_op(nelecs, cre2, bs2) and
+                    has_op(nelec_after(nelecs, cre2, bs2), cre1, bs1)):
+                continue
+            nelec2 = nelec_after(nelecs, cre2, bs2)
+            nelecp = nelec_after(nelec2, cre1, bs1)
+            na1 = cistring.num_strings(norb, nelecp[0])
+            nb1 = cistring.num_strings(norb, nelecp[1])
+            ci2 = _apply_op(civec[:,:,None], norb, nelecs, cre2, bs2)[:,:,:,0]
+            # s1 \sum_z o1_z o2_y V_xz + s2 \sum_z o1_x o2_z V_yz
+            # = -s1 o2_y U1_x + s2 o1_x U2_y (+ the anti-commutator)
+            nelec_k1 = nelec_after(nelecs, cre1, ks1)
+            nelec_k2 = nelec_after(nelecs, cre2, ks2)
+            with_u1 = (has_op(nelecs, cre1, ks1) and
+                       has_op(nelec_k1, cre2, ks2))
+            with_u2 = (has_op(nelecs, cre2, ks2) and
+                       has_op(nelec_k2, cre1, ks1))
+            if not (with_u1 or with_u2):
+                continue
+            mem_now = lib.current_memory()[0]
+            mem_avail = max(0, max_memory - mem_now)
+            blksize = int(mem_avail*.45e6/8/(na1*nb1*norb*2))
+            blksize = max(1, min(norb, blksize))
+            for x0, x1 in lib.prange(0, norb, blksize):
+                if with_u2:
+                    ket = _apply_op(U[cre2,ks2], norb, nelec_k2, cre1, ks1,
+                                    x0, x1)
+                    if s2 < 0:
+                        ket *= -1
+                else:
+                    ket = numpy.zeros((na1,nb1,x1-x0,norb))
+                if with_u1:
+                    tmp = _apply_op(U[cre1,ks1][:,:,x0:x1], norb, nelec_k1,
+                                    cre2, ks2).transpose(0,1,3,2)
+                    if s1 > 0:
+                        ket -= tmp
+                    else:
+                        ket += tmp
+                    tmp = None
+                ket = ket.reshape(na1*nb1,(x1-x0)*norb)
+                for p0, p1 in lib.prange(0, norb, blksize):
+                    bra = _apply_op(ci2, norb, nelec2, cre1, bs1, p0, p1)
+                    out[p0:p1,:,x0:x1] += numpy.dot(
+                        bra.reshape(na1*nb1,(p1-p0)*norb).T,
+                        ket).reshape(p1-p0,norb,x1-x0,norb)
+                    bra = None
+                ket = None
+        return out
+
+    def contract_l(s, t1, t2, cx):
+        '''<O_P CI|O_Q CI> L[A,Q] with the overlap s[P,Q]'''
+        return (lib.einsum('pquy,ux->pqxy', s, t1) +
+                lib.einsum('pqxv,vy->pqxy', s, t2) +
+                cx * lib.einsum('pquv,uxvy->pqxy', s, eri))
+
+    # The spin-flipped contributions are identical if the CI vector is
+    # symmetric or anti-symmetric under the exchange of the alpha and beta
+    # strings
+    spin_flip = (neleca == nelecb and
+                 (abs(civec - civec.T).max() < 1e-10 or
+                  abs(civec + civec.T).max() < 1e-10))
+
+    def contract_v2(cre1, cre2, spin_pair, spin_pair_flip):
+        if spin_flip:
+            return contract_v(cre1, cre2, (spin_pair,)) * 2
+        else:
+            return contract_v(cre1, cre2, (spin_pair, spin_pair_flip))
+
+    aa, bb, ab, ba = (0,0), (1,1), (0,1), (1,0)
+    out = {}
+    if 'a7' in keys:
+        # O_xy = a_x a_y.  a7[p,q,a,b] = <O_qp|H-E_0|O_ba>
+        s = (numpy.einsum('iljk->ijkl', dm2) -
+             numpy.einsum('ik,jl->ijkl', dm1, delta)).transpose(1,0,2,3)
+        # a_xb a_ya = -a_ya a_xb
+        m = contract_v(False, False, ((ab,ab),))
+        m = m + m.transpose(1,0,3,2)
+        m += contract_v2(False, False, (aa,aa), (bb,bb))
+        m += contract_l(s, -g1e, -g1e, 1)
+        out['a7'] = m.transpose(1,0,3,2)
+        cput1 = log.timer_debug1('a7', *cput1)
+    if 'a9' in keys:
+        # O_xy = a^+_x a^+_y.  a9[p,q,a,b] = <O_qp|H-E_0|O_ba>
+        s = make_hdm2(dm1, dm2).transpose(1,0,3,2)
+        m = contract_v(True, True, ((ab,ab),))
+        m = m + m.transpose(1,0,3,2)
+        m += contract_v2(True, True, (aa,aa), (bb,bb))
+        m += contract_l(s, h1e, h1e, 1)
+        out['a9'] = m.transpose(1,0,3,2)
+        cput1 = log.timer_debug1('a9', *cput1)
+    if 'a12' in keys or 'a13' in keys:
+        # O_xy = a^+_x a_y.  a12[p,q,a,b] = <E_pq|H-E_0|E_ab>,
+        # a13[p,q,a,b] = \sum_{st} <O_pq|H-E_0|O_ab> of all spins s, t
+        s12 = dm2.transpose(1,0,2,3)
+        s13 = (numpy.einsum('pa,qb->pqab', delta, dm1) * 2 -
+               numpy.einsum('qbap->pqab', dm2) +
+               numpy.einsum('ab,qp->pqab', delta, dm1))
+        # {a^+_z, a_y} = delta_zy brings V_xy = \sum_{rs} (xy|rs) E_rs |CI>
+        # which is the linear combination of E_rs |CI>
+        anti = lib.einsum('pqrs,xyrs->pqxy', s12, eri)
+        m = contract_v2(True, False, (aa,aa), (bb,bb))
+        if 'a13' in keys:
+            out['a13'] = (m + contract_v2(True, False, (ab,ab), (ba,ba)) +
+                          contract_l(s13, h1e, -g1e, -1) + anti)
+        if 'a12' in keys:
+            m += contract_v2(True, False, (aa,bb), (bb,aa))
+            out['a12'] = m + contract_l(s12, h1e, -g1e, -1) + anti * 2
+        cput1 = log.timer_debug1('a12, a13', *cput1)
+    return out
+
 def _extract_orbs(mc, mo_coeff):
     ncore = mc.ncore
     ncas = mc.ncas
@@ -884,6 +1417,81 @@ def _ERIS(mc, mo, method='incore'):
     eris['h1eff'] = reduce(numpy.dot, (mo.T, mc.get_hcore(), mo)) + vhfcore
     return eris
 
+def _ERIS_df(mc, mo, with_df):
+    '''Integrals from the 3-index tensors of with_df.  The 3-index tensors
+    Lpa (naux,nmo,ncas) and Lcv (naux,ncore,nvir) are stored in place of the
+    pacv and cvcv integrals.
+    '''
+    log = logger.new_logger(mc)
+    time0 = (time.clock(), time.time())
+    mo = numpy.asarray(mo, order='F')
+    nmo = mo.shape[1]
+    ncore = mc.ncore
+    ncas = mc.ncas
+    nocc = ncore + ncas
+    nvir = nmo - nocc
+    naux = with_df.get_naoaux()
+
+    eris = {}
+    Lpa = numpy.empty((naux,nmo,ncas))
+    mem_now = lib.current_memory()[0]
+    if (naux*ncore*nvir*8/1e6 + Lpa.nbytes/1e6 + mem_now < mc.max_memory*.9 or
+        mc.mol.incore_anyway):
+        Lcv = numpy.empty((naux,ncore,nvir))
+    else:
+        eris['feri'] = lib.H5TmpFile()
+        Lcv = eris['feri'].create_dataset('Lcv', (naux,ncore,nvir), 'f8')
+
+    ppaa = numpy.zeros((nmo*nmo,ncas*ncas))
+    mem_now = lib.current_memory()[0]
+    blksize = int((mc.max_memory - mem_now)*.5e6/8/(nmo**2*2))
+    blksize = max(1, min(naux, blksize))
+    buf = numpy.empty((blksize,nmo,nmo))
+    p1 = 0
+    # The order of the aux blocks is not significant as long as Lpa and Lcv
+    # are stored in the same order
+    for eri1 in with_df.loop(blksize):
+        p0, p1 = p1, p1 + eri1.shape[0]
+        Lpq = _ao2mo.nr_e2(eri1, mo, (0,nmo,0,nmo), aosym='s2', mosym='s1',
+                           out=buf[:p1-p0])
+        Lpq = Lpq.reshape(p1-p0,nmo,nmo)
+        Lpa[p0:p1] = Lpq[:,:,ncore:nocc]
+        Lcv[p0:p1] = Lpq[:,:ncore,nocc:]
+        Laa = numpy.asarray(Lpq[:,ncore:nocc,ncore:nocc]).reshape(p1-p0,-1)
+        lib.dot(Lpq.reshape(p1-p0,-1).T, Laa, 1, ppaa, 1)
+        Lpq = Laa = None
+    buf = None
+    time0 = log.timer('DF ppaa, Lpa, Lcv', *time0)
+
+    Lpa2 = Lpa.reshape(naux,-1)
+    papa = lib.dot(Lpa2.T, Lpa2)
+
+    dmcore = numpy.dot(mo[:,:ncore], mo[:,:ncore].T)
+    vj, vk = with_df.get_jk(dmcore)
+    vhfcore = reduce(numpy.dot, (mo.T, vj*2-vk, mo))
+
+    eris['vhf_c'] = vhfcore
+    eris['ppaa'] = ppaa.reshape(nmo,nmo,ncas,ncas)
+    eris['papa'] = papa.reshape(nmo,ncas,nmo,ncas)
+    eris['Lpa'] = Lpa
+    eris['Lcv'] = Lcv
+    eris['h1eff'] = reduce(numpy.dot, (mo.T, mc.get_hcore(), mo)) + vhfcore
+    log.timer('DF integrals', *time0)
+    return eris
+
+def _pacv_df(eris, p0, p1, r0, r1):
+    '''(pa|ir) for p in [p0:p1] and virtual r in [r0:r1]'''
+    Lpa = eris['Lpa'][:,p0:p1]
+    Lcv = numpy.asarray(eris['Lcv'][:,:,r0:r1])
+    naux, ncore = Lcv.shape[:2]
+    ncas = Lpa.shape[2]
+    pacv = lib.dot(Lpa.reshape(naux,-1).T, Lcv.reshape(naux,-1))
+    return pacv.reshape(p1-p0,ncas,ncore,r1-r0)
+
+def _df_blksize(mc, unit):
+    mem_avail = mc.max_memory - lib.current_memory()[0]
+    return max(1, int(mem_avail*.5e6/8/unit))
+
 # see mcscf.mc_ao2mo
 def trans_e1_incore(mc, mo):
     eri_ao = mc._scf._eri
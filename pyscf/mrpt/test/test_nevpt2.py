@@ -21,6 +21,7 @@ from pyscf import scf
 from pyscf import ao2mo
 from pyscf import mcscf
 from pyscf import fci
+from pyscf import df
 from pyscf.mrpt import nevpt2
 
 mol = gto.Mole()
@@ -74,6 +75,32 @@ class KnowValues(unittest.TestCase):
         self.assertAlmostEqual(e, -0.0021281408063186956, 7)
         self.assertAlmostEqual(norm, 0.0037402334190064367, 7)
 
+    def test_direct_perturber(self):
+        nev = nevpt2.NEVPT(mc)
+        nev.direct_perturber = True
+        nev.max_memory = 0
+        norm, e = nevpt2.Sr(nev, mc.ci, dms, eris)
+        self.assertAlmostEqual(e, -0.020245617857870119, 7)
+        self.assertAlmostEqual(norm, 0.039479583324952064, 7)
+        norm, e = nevpt2.Si(nev, mc.ci, dms, eris)
+        self.assertAlmostEqual(e, -0.0021281408063186956, 7)
+        self.assertAlmostEqual(norm, 0.0037402334190064367, 7)
+
+    def test_ket_sc_intermediates(self):
+        dms1 = {'1': dm1, '2': dm2, '3': None}
+        dms1.update(nevpt2._ket_sc_intermediates(
+            h1e, h2e.transpose(0,2,1,3), mc.ci, norb, nelec, dm1, dm2,
+            max_memory=0))
+        norm, e = nevpt2.Srs(mc, dms1, eris)
+        self.assertAlmostEqual(e, -0.017531645975808627, 7)
+        self.assertAlmostEqual(norm, 0.056323606234166601, 7)
+        norm, e = nevpt2.Sij(mc, dms1, eris)
+        self.assertAlmostEqual(e, -0.0035003054452919296, 7)
+        self.assertAlmostEqual(norm, 0.0085211359528094520, 7)
+        norm, e = nevpt2.Sir(mc, dms1, eris)
+        self.assertAlmostEqual(e, -0.033866295344083322, 7)
+        self.assertAlmostEqual(norm, 0.074269050656629421, 7)
+
     def test_Sijrs(self):
         norm, e = nevpt2.Sijrs(mc, eris)
         self.assertAlmostEqual(e, -0.0071504286486605891, 7)
@@ -119,6 +146,31 @@ class KnowValues(unittest.TestCase):
         e = nevpt2.NEVPT(mc).kernel()
         self.assertAlmostEqual(e, -0.16978532268234559, 6)
 
+        nev = nevpt2.NEVPT(mc)
+        nev.direct_perturber = False
+        self.assertAlmostEqual(nev.kernel(), e, 9)
+
+    def test_density_fit(self):
+        mydf = df.DF(mol, auxbasis='weigend')
+        eri = 0
+        for eri1 in mydf.loop():
+            eri = eri + numpy.dot(eri1.T, eri1)
+        mf1 = scf.RHF(mol)
+        mf1._eri = ao2mo.restore(8, eri, mol.nao_nr())
+        mf1.kernel()
+        mc1 = mcscf.CASCI(mf1, norb, nelec)
+        mc1.fcisolver.conv_tol = 1e-15
+        mc1.kernel()
+        e_ref = nevpt2.NEVPT(mc1).kernel()
+
+        e = nevpt2.NEVPT(mc1).density_fit(with_df=mydf).kernel()
+        self.assertAlmostEqual(e, e_ref, 9)
+
+        # Lcv on disk and small blocks
+        nev = nevpt2.NEVPT(mc1).density_fit(with_df=mydf)
+        nev.max_memory = 0
+        self.assertAlmostEqual(nev.kernel(), e_ref, 9)
+
 
 if __name__ == "__main__":
     print("Full Tests for nevpt2")
@@ -15,17 +15,26 @@
 
 '''
 FCIDUMP functions (write, read) for real Hamiltonian
+
+The functions write_h5, read_h5 handle the binary (HDF5) equivalent of
+FCIDUMP.  to_h5 and from_h5 convert between the two formats.
 '''
 
 from functools import reduce
 import numpy
+import h5py
+from pyscf import lib
 from pyscf import ao2mo
+from pyscf.ao2mo.irrep import IrrepBlockedERI
 from pyscf import __config__
 
 DEFAULT_FLOAT_FORMAT = getattr(__config__, 'fcidump_float_format', ' %.16g')
 TOL = getattr(__config__, 'fcidump_write_tol', 1e-15)
+# Number of integrals to process in each chunk of the (vectorized) readers
+# and writers
+BLKSIZE = getattr(__config__, 'fcidump_blksize', 1<<20)
 
-def write_head(fout, nmo, nelec, ms=0, orbsym=None):
+def write_head(fout, nmo, nelec, ms=0, orbsym=None, isym=1):
     if not isinstance(nelec, (int, numpy.number)):
         ms = abs(nelec[0] - nelec[1])
         nelec = nelec[0] + nelec[1]
@@ -34,43 +43,86 @@ def write_head(fout, nmo, nelec, ms=0, orbsym=None):
         fout.write('  ORBSYM=%s\n' % ','.join([str(x) for x in orbsym]))
     else:
         fout.write('  ORBSYM=%s\n' % ('1,' * nmo))
-    fout.write('  ISYM=1,\n')
+    fout.write('  ISYM=%d,\n' % isym)
     fout.write(' &END\n')
 
 
 def write_eri(fout, eri, nmo, tol=TOL, float_format=DEFAULT_FLOAT_FORMAT):
     npair = nmo*(nmo+1)//2
     output_format = float_format + ' %4d %4d %4d %4d\n'
+    if isinstance(eri, IrrepBlockedERI):
+        for ijkl, val in _iter_packed_eri(eri, nmo, tol):
+            _write_eri_lines(fout, output_format, val, ijkl, nmo)
+        return
     if eri.size == nmo**4:
         eri = ao2mo.restore(8, eri, nmo)
 
     if eri.ndim == 2: # 4-fold symmetry
         assert(eri.size == npair**2)
-        ij = 0
-        for i in range(nmo):
-            for j in range(0, i+1):
-                kl = 0
-                for k in range(0, nmo):
-                    for l in range(0, k+1):
-                        if abs(eri[ij,kl]) > tol:
-                            fout.write(output_format % (eri[ij,kl], i+1, j+1, k+1, l+1))
-                        kl += 1
-                ij += 1
+        idx, idy = numpy.tril_indices(nmo)
+        blksize = max(1, BLKSIZE // npair)
+        for p0, p1 in lib.prange(0, npair, blksize):
+            ij, kl = numpy.where(abs(eri[p0:p1]) > tol)
+            val = eri[p0:p1][ij,kl]
+            ij += p0
+            _write_lines(fout, output_format, val,
+                         idx[ij]+1, idy[ij]+1, idx[kl]+1, idy[kl]+1)
     else:  # 8-fold symmetry
         assert(eri.size == npair*(npair+1)//2)
-        ij = 0
-        ijkl = 0
-        for i in range(nmo):
-            for j in range(0, i+1):
-                kl = 0
-                for k in range(0, i+1):
-                    for l in range(0, k+1):
-                        if ij >= kl:
-                            if abs(eri[ijkl]) > tol:
-                                fout.write(output_format % (eri[ijkl], i+1, j+1, k+1, l+1))
-                            ijkl += 1
-                        kl += 1
-                ij += 1
+        for ijkl, val in _iter_packed_eri(eri, nmo, tol):
+            _write_eri_lines(fout, output_format, val, ijkl, nmo)
+
+def _write_lines(fout, output_format, val, i, j, k, l):
+    fout.write(''.join([output_format % x for x in
+                        zip(val.tolist(), i.tolist(), j.tolist(),
+                            k.tolist(), l.tolist())]))
+
+def _write_eri_lines(fout, output_format, val, ijkl, nmo):
+    '''Write integrals of the 8-fold compound indices ijkl'''
+    ij, kl = _unpack_ijkl(ijkl, nmo)
+    idx, idy = numpy.tril_indices(nmo)
+    _write_lines(fout, output_format, val,
+                 idx[ij]+1, idy[ij]+1, idx[kl]+1, idy[kl]+1)
+
+def _unpack_ijkl(ijkl, nmo):
+    '''Split the 8-fold compound index ij*(ij+1)/2+kl into ij and kl'''
+    npair = nmo*(nmo+1)//2
+    offsets = numpy.arange(npair+1, dtype=numpy.int64)
+    offsets = offsets * (offsets+1) // 2
+    ij = numpy.searchsorted(offsets, ijkl, side='right') - 1
+    return ij, ijkl - offsets[ij]
+
+def _iter_packed_eri(eri, nmo, tol=TOL, blksize=BLKSIZE):
+    '''Iterate over the integrals with magnitude larger than tol.  The
+    integrals (ij >= kl) are generated in chunks of (ijkl, value) where ijkl
+    is the 8-fold compound index ij*(ij+1)/2+kl.
+    '''
+    if isinstance(eri, IrrepBlockedERI):
+        # Only the symmetry allowed blocks are visited
+        for ir in sorted(eri.pairs):
+            pairs = eri.pairs[ir]
+            for p0, p1 in lib.prange(0, pairs.size, max(1, blksize//pairs.size)):
+                block = numpy.asarray(eri.blocks[ir][p0:p1])
+                p, q = numpy.where(abs(block) > tol)
+                mask = q <= p + p0
+                p, q = p[mask], q[mask]
+                ij = pairs[p+p0].astype(numpy.int64)
+                yield ij*(ij+1)//2 + pairs[q], block[p,q]
+        return
+
+    npair = nmo*(nmo+1)//2
+    if eri.size != npair*(npair+1)//2:
+        eri = ao2mo.restore(8, eri, nmo)
+    for p0, p1 in lib.prange(0, eri.size, blksize):
+        ijkl = numpy.where(abs(eri[p0:p1]) > tol)[0]
+        yield ijkl + p0, eri[p0:p1][ijkl]
+
+def _ao2mo_full(eri_or_mol, mo_coeff, orbsym=None):
+    '''MO integrals in the irrep-blocked format if the orbital symmetry is
+    available'''
+    if orbsym is None:
+        return ao2mo.full(eri_or_mol, mo_coeff, verbose=0)
+    return ao2mo.irrep.full(eri_or_mol, mo_coeff, orbsym)
 
 def write_hcore(fout, h, nmo, tol=TOL, float_format=DEFAULT_FLOAT_FORMAT):
     h = h.reshape(nmo,nmo)
@@ -100,11 +152,11 @@ def from_chkfile(filename, chkfile, tol=TOL, float_format=DEFAULT_FLOAT_FORMAT):
             orbsym = symm.label_orb_symm(mol, mol.irrep_id,
                                          mol.symm_orb, mo_coeff, check=False)
             write_head(fout, nmo, mol.nelectron, mol.spin, orbsym)
+            eri = ao2mo.irrep.full(mol, mo_coeff, orbsym)
         else:
             write_head(fout, nmo, mol.nelectron, mol.spin)
-
-        eri = ao2mo.full(mol, mo_coeff, verbose=0)
-        write_eri(fout, ao2mo.restore(8, eri, nmo), nmo, tol, float_format)
+            eri = ao2mo.restore(8, ao2mo.full(mol, mo_coeff, verbose=0), nmo)
+        write_eri(fout, eri, nmo, tol, float_format)
 
         t = mol.intor_symmetric('int1e_kin')
         v = mol.intor_symmetric('int1e_nuc')
@@ -133,10 +185,13 @@ def from_mo(mol, filename, mo_coeff, orbsym=None,
 
     if orbsym is None:
         orbsym = getattr(mo_coeff, 'orbsym', None)
+        # The irrep-blocked integrals require the orbsym of PySCF convention
+        eri = _ao2mo_full(mol, mo_coeff, orbsym)
+    else:
+        eri = ao2mo.full(mol, mo_coeff, verbose=0)
     t = mol.intor_symmetric('int1e_kin')
     v = mol.intor_symmetric('int1e_nuc')
     h1e = reduce(numpy.dot, (mo_coeff.T, t+v, mo_coeff))
-    eri = ao2mo.full(mol, mo_coeff, verbose=0)
     nuc = mol.energy_nuc()
     from_integrals(filename, h1e, eri, h1e.shape[0], mol.nelec, nuc, 0, orbsym,
                    tol, float_format)
@@ -149,14 +204,14 @@ def from_scf(mf, filename, tol=TOL, float_format=DEFAULT_FLOAT_FORMAT):
     assert mo_coeff.dtype == numpy.double
 
     h1e = reduce(numpy.dot, (mo_coeff.T, mf.get_hcore(), mo_coeff))
+    orbsym = getattr(mo_coeff, 'orbsym', None)
     if mf._eri is None:
         if getattr(mf, 'exxdiv'):  # PBC system
             eri = mf.with_df.ao2mo(mo_coeff)
         else:
-            eri = ao2mo.full(mf.mol, mo_coeff)
+            eri = _ao2mo_full(mf.mol, mo_coeff, orbsym)
     else:  # Handle cached integrals or customized systems
-        eri = ao2mo.full(mf._eri, mo_coeff)
-    orbsym = getattr(mo_coeff, 'orbsym', None)
+        eri = _ao2mo_full(mf._eri, mo_coeff, orbsym)
     nuc = mf.energy_nuc()
     from_integrals(filename, h1e, eri, h1e.shape[0], mf.mol.nelec, nuc, 0, orbsym,
                    tol, float_format)
@@ -192,28 +247,24 @@ def read(filename):
     norb_pair = norb * (norb+1) // 2
     h1e = numpy.zeros((norb,norb))
     h2e = numpy.zeros(norb_pair*(norb_pair+1)//2)
-    dat = finp.readline().split()
-    while dat:
-        i, j, k, l = [int(x) for x in dat[1:5]]
-        if k != 0:
-            if i >= j:
-                ij = i * (i-1) // 2 + j-1
-            else:
-                ij = j * (j-1) // 2 + i-1
-            if k >= l:
-                kl = k * (k-1) // 2 + l-1
-            else:
-                kl = l * (l-1) // 2 + k-1
-            if ij >= kl:
-                h2e[ij*(ij+1)//2+kl] = float(dat[0])
-            else:
-                h2e[kl*(kl+1)//2+ij] = float(dat[0])
-        elif k == 0:
-            if j != 0:
-                h1e[i-1,j-1] = float(dat[0])
-            else:
-                dic['ECORE'] = float(dat[0])
-        dat = finp.readline().split()
+    # The integrals are parsed in chunks of lines
+    lines = finp.readlines(BLKSIZE*48)
+    while lines:
+        dat = numpy.array(' '.join(lines).split(), dtype=float).reshape(-1,5)
+        val = dat[:,0]
+        i, j, k, l = dat[:,1:].astype(int).T
+        mask = k != 0
+        ij = _pair_index(i[mask], j[mask])
+        kl = _pair_index(k[mask], l[mask])
+        ij, kl = numpy.maximum(ij, kl), numpy.minimum(ij, kl)
+        h2e[ij*(ij+1)//2+kl] = val[mask]
+
+        mask = (k == 0) & (j != 0)
+        h1e[i[mask]-1,j[mask]-1] = val[mask]
+        mask = (k == 0) & (j == 0)
+        if numpy.any(mask):
+            dic['ECORE'] = val[mask][-1]
+        lines = finp.readlines(BLKSIZE*48)
 
     idx, idy = numpy.tril_indices(norb, -1)
     if numpy.linalg.norm(h1e[idy,idx]) == 0:
@@ -225,6 +276,107 @@ def read(filename):
     finp.close()
     return dic
 
+def _pair_index(i, j):
+    '''Lower triangular pair index for the 1-based orbital indices'''
+    i, j = numpy.maximum(i, j), numpy.minimum(i, j)
+    return (i * (i-1) // 2 + j-1).astype(numpy.int64)
+
+
+def write_h5(h5file, h1e, h2e, nmo, nelec, nuc=0, ms=0, orbsym=None, isym=1,
+             tol=TOL):
+    '''Write the Hamiltonian in the binary (HDF5) equivalent of FCIDUMP.
+
+    The header entries NORB, NELEC, MS2, ISYM are saved as the attributes of
+    the file.  ORBSYM, ECORE and the lower triangular part of the 1-electron
+    integrals H1 are saved as datasets.  The 2-electron integrals (ij >= kl)
+    which are larger than tol are saved in two datasets, H2_INDEX for the
+    8-fold compound index ij*(ij+1)/2+kl and H2 for the values.
+
+    Args:
+        h2e : ndarray or :class:`ao2mo.irrep.IrrepBlockedERI`
+            2-electron integrals with 1, 4 or 8-fold permutation symmetry, or
+            the irrep-blocked integrals.
+    '''
+    if not isinstance(nelec, (int, numpy.number)):
+        ms = abs(nelec[0] - nelec[1])
+        nelec = nelec[0] + nelec[1]
+    if orbsym is None or len(orbsym) == 0:
+        orbsym = [1] * nmo
+
+    with h5py.File(h5file, 'w') as f:
+        f.attrs['NORB'] = nmo
+        f.attrs['NELEC'] = nelec
+        f.attrs['MS2'] = ms
+        f.attrs['ISYM'] = isym
+        f['ORBSYM'] = numpy.asarray(orbsym, dtype=numpy.int32)
+        f['ECORE'] = nuc
+        f['H1'] = lib.pack_tril(numpy.asarray(h1e).reshape(nmo,nmo))
+        chunks = (min(BLKSIZE, 1<<13),)
+        index = f.create_dataset('H2_INDEX', (0,), 'i8', maxshape=(None,),
+                                 chunks=chunks)
+        value = f.create_dataset('H2', (0,), 'f8', maxshape=(None,),
+                                 chunks=chunks)
+        n0 = 0
+        for ijkl, val in _iter_packed_eri(h2e, nmo, tol):
+            n1 = n0 + ijkl.size
+            index.resize((n1,))
+            value.resize((n1,))
+            index[n0:n1] = ijkl
+            value[n0:n1] = val
+            n0 = n1
+    return h5file
+
+def _iter_h5_eri(f, blksize=BLKSIZE):
+    index = f['H2_INDEX']
+    value = f['H2']
+    for p0, p1 in lib.prange(0, index.shape[0], blksize):
+        yield index[p0:p1], value[p0:p1]
+
+def read_h5(h5file):
+    '''Read the HDF5 file generated by :func:`write_h5`.  Return a dictionary
+    with the same keys as :func:`read`:  H1, H2, ECORE, NORB, NELEC, MS2,
+    ORBSYM, ISYM.  H2 is the 2-electron integrals with 8-fold symmetry.
+    '''
+    dic = {}
+    with h5py.File(h5file, 'r') as f:
+        norb = dic['NORB'] = int(f.attrs['NORB'])
+        dic['NELEC'] = int(f.attrs['NELEC'])
+        dic['MS2'] = int(f.attrs['MS2'])
+        dic['ISYM'] = int(f.attrs['ISYM'])
+        dic['ORBSYM'] = [int(x) for x in f['ORBSYM'][()]]
+        dic['ECORE'] = float(f['ECORE'][()])
+        dic['H1'] = lib.unpack_tril(f['H1'][()])
+
+        norb_pair = norb * (norb+1) // 2
+        h2e = numpy.zeros(norb_pair*(norb_pair+1)//2)
+        for ijkl, val in _iter_h5_eri(f):
+            h2e[ijkl] = val
+        dic['H2'] = h2e
+    return dic
+
+def to_h5(filename, h5file, tol=TOL):
+    '''Convert the text FCIDUMP file to the HDF5 format'''
+    dic = read(filename)
+    return write_h5(h5file, dic['H1'], dic['H2'], dic['NORB'], dic['NELEC'],
+                    dic.get('ECORE', 0), dic['MS2'], dic['ORBSYM'],
+                    dic.get('ISYM', 1), tol)
+
+def from_h5(h5file, filename, tol=TOL, float_format=DEFAULT_FLOAT_FORMAT):
+    '''Convert the HDF5 file generated by :func:`write_h5` to the text
+    FCIDUMP.  The 2-electron integrals are streamed from the HDF5 file.
+    '''
+    output_format = float_format + ' %4d %4d %4d %4d\n'
+    with h5py.File(h5file, 'r') as f, open(filename, 'w') as fout:
+        nmo = int(f.attrs['NORB'])
+        write_head(fout, nmo, int(f.attrs['NELEC']), int(f.attrs['MS2']),
+                   f['ORBSYM'][()], int(f.attrs['ISYM']))
+        for ijkl, val in _iter_h5_eri(f):
+            mask = abs(val) > tol
+            _write_eri_lines(fout, output_format, val[mask], ijkl[mask], nmo)
+        write_hcore(fout, lib.unpack_tril(f['H1'][()]), nmo, tol, float_format)
+        output_format = float_format + '  0  0  0  0\n'
+        fout.write(output_format % f['ECORE'][()])
+
 if __name__ == '__main__':
     import sys
     # fcidump.py chkfile output
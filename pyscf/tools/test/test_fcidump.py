@@ -52,6 +52,35 @@ class KnownValues(unittest.TestCase):
         fcidump.from_integrals(tmpfcidump.name, h1, h2, h1.shape[0],
                                mol.nelectron, tol=1e-15)
 
+    def test_h5(self):
+        tmpfcidump = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        tmph5 = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        nmo = mf.mo_coeff.shape[1]
+        h1 = reduce(numpy.dot, (mf.mo_coeff.T, mf.get_hcore(), mf.mo_coeff))
+        h2 = ao2mo.full(mf._eri, mf.mo_coeff)
+        fcidump.from_integrals(tmpfcidump.name, h1, h2, nmo, mol.nelectron,
+                               nuc=mol.energy_nuc(), orbsym=mf.mo_coeff.orbsym,
+                               tol=1e-15)
+        ref = fcidump.read(tmpfcidump.name)
+        self.assertAlmostEqual(abs(ref['H2'] - ao2mo.restore(8, h2, nmo)).max(), 0, 12)
+
+        fcidump.to_h5(tmpfcidump.name, tmph5.name)
+        dic = fcidump.read_h5(tmph5.name)
+        for key in ('H1', 'H2', 'ECORE', 'ORBSYM', 'NORB', 'NELEC', 'MS2', 'ISYM'):
+            self.assertAlmostEqual(abs(numpy.asarray(dic[key]) -
+                                       numpy.asarray(ref[key])).max(), 0, 12)
+
+        fcidump.from_h5(tmph5.name, tmpfcidump.name)
+        dic = fcidump.read(tmpfcidump.name)
+        self.assertAlmostEqual(abs(dic['H2'] - ref['H2']).max(), 0, 12)
+        self.assertAlmostEqual(abs(dic['H1'] - ref['H1']).max(), 0, 12)
+        self.assertAlmostEqual(dic['ECORE'], ref['ECORE'], 12)
+
+        eri = ao2mo.irrep.full(mf._eri, mf.mo_coeff)
+        fcidump.write_h5(tmph5.name, h1, eri, nmo, mol.nelectron, tol=1e-15)
+        dic = fcidump.read_h5(tmph5.name)
+        self.assertAlmostEqual(abs(dic['H2'] - ref['H2']).max(), 0, 12)
+
 if __name__ == "__main__":
     print("Full Tests for fcidump")
     unittest.main()